@@ -1,5 +1,11 @@
+from django import forms
 from django.contrib import admin
-from .models import Category, Product, Order, OrderItem, Payment
+from . import reports
+from .pagination import DeferredJoinPaginator
+from .models import (
+    Category, DailySalesSummary, Product, Order, OrderItem, Payment, SearchTermDaily, StockShard,
+    StockReservation,
+)
 
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
@@ -8,6 +14,9 @@ class PaymentAdmin(admin.ModelAdmin):
     search_fields = ('transaction_id', 'order__name', 'mobile_number')
     date_hierarchy = 'created'
     ordering = ('-created',)
+    list_select_related = ('order',)
+    paginator = DeferredJoinPaginator
+    show_full_result_count = False
 
 
 @admin.register(Category)
@@ -21,18 +30,77 @@ class OrderItemInline(admin.TabularInline):
     model = OrderItem
     raw_id_fields = ('product',)
     extra = 0
+    
+    def get_queryset(self, request):
+        # OrderItem.__str__ প্রতি সারিতে product পড়ে
+        return super().get_queryset(request).select_related('product')
+
+
+class StockShardInline(admin.TabularInline):
+    model = StockShard
+    readonly_fields = ('index', 'quantity')
+    extra = 0
+    can_delete = False
+
+
+# শার্ডেড পণ্যের stock শার্ড থেকে আসে (api.inventory.reconcile); available দিয়ে লুকানো যায়
+SHARDED_READONLY_FIELDS = ('stock',)
+SHARDED_STOCK_HELP = 'শার্ডেড পণ্য: স্টক বদলাতে manage.py shard_stock <id> --total <পরিমাণ>'
+
+
+class ProductChangeListForm(forms.ModelForm):
+    """``list_editable`` row that leaves a sharded product's stock alone"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.stock_shards:
+            for name in SHARDED_READONLY_FIELDS:
+                if name in self.fields:
+                    # disabled ফিল্ড POST এর মান উপেক্ষা করে আগের মানই রাখে
+                    self.fields[name].disabled = True
+                    self.fields[name].help_text = SHARDED_STOCK_HELP
 
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ('name', 'category', 'price', 'stock', 'available', 'featured', 'created')  # ✅ featured যোগ করুন
-    list_filter = ('available', 'featured', 'created', 'category')  # ✅ featured যোগ করুন
+    list_display = ('name', 'category', 'price', 'stock', 'available', 'featured', 'image_status', 'created')  # ✅ featured যোগ করুন
+    list_filter = ('available', 'featured', 'image_status', 'created', 'category')  # ✅ featured যোগ করুন
     list_editable = ('price', 'stock', 'available', 'featured')  # ✅ featured যোগ করুন
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ('name', 'description')
     raw_id_fields = ('category',)
+    readonly_fields = ('stock_shards', 'image_status', 'image_error')
+    inlines = [StockShardInline]
     date_hierarchy = 'created'
     ordering = ('-created',)
+    list_select_related = ('category',)
+    paginator = DeferredJoinPaginator
+    show_full_result_count = False
+    
+    def get_readonly_fields(self, request, obj=None):
+        readonly = super().get_readonly_fields(request, obj)
+        if obj is not None and obj.stock_shards:
+            return (*readonly, *SHARDED_READONLY_FIELDS)
+        return readonly
+    
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', ProductChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+    
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        if db_field.name == 'image':
+            # ফর্মে শুধু এক্সটেনশন যাচাই; ডিকোড ব্যাকগ্রাউন্ড জবে (api.image_jobs)
+            kwargs['form_class'] = forms.FileField
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    list_display = ('order', 'product', 'quantity', 'shard_index', 'status', 'expires_at')
+    list_filter = ('status',)
+    raw_id_fields = ('order', 'product')
+    ordering = ('-created',)
+    list_select_related = ('order', 'product')
 
 
 @admin.register(Order)
@@ -42,4 +110,55 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ('name', 'email', 'phone', 'address')
     inlines = [OrderItemInline]
     date_hierarchy = 'created'
-    ordering = ('-created',)
\ No newline at end of file
+    ordering = ('-created',)
+    paginator = DeferredJoinPaginator
+    show_full_result_count = False
+
+
+@admin.register(SearchTermDaily)
+class SearchTermDailyAdmin(admin.ModelAdmin):
+    list_display = ('term', 'day', 'searches', 'zero_results', 'clicks')
+    search_fields = ('term',)
+    date_hierarchy = 'day'
+    ordering = ('-day', '-searches')
+    
+    # শুধু api.search_analytics লেখে
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailySalesSummary)
+class DailySalesSummaryAdmin(admin.ModelAdmin):
+    """
+    Revenue dashboard.  Reads only the summary tables that
+    ``rollup_reports`` maintains, never ``Order``/``Payment`` themselves.
+    """
+    list_display = ('day', 'orders', 'paid_orders', 'items_sold', 'revenue', 'paid_revenue', 'aov')
+    date_hierarchy = 'day'
+    ordering = ('-day',)
+    list_per_page = 31
+    
+    @admin.display(description='AOV')
+    def aov(self, obj):
+        return obj.average_order_value
+    
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if changelist is not None:
+            # date_hierarchy র ফিল্টার করা দিনগুলোর মোট, পেমেন্ট মেথড ও সফলতার হার
+            response.context_data['dashboard'] = reports.dashboard(changelist.queryset)
+        return response
+    
+    # শুধু rollup_reports লেখে
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
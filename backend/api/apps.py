@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_migrate
 
 
 class ApiConfig(AppConfig):
@@ -6,5 +7,8 @@ class ApiConfig(AppConfig):
     name = 'api'
     
     def ready(self):
-        """Signal handlers can be imported here"""
-        pass
\ No newline at end of file
+        """Signal handlers and system checks can be imported here"""
+        from . import checks, signals  # noqa: F401
+        # মাইগ্রেশনের সময় SQLite FTS ট্রিগার সরিয়ে রাখা, পরে আবার তৈরি
+        pre_migrate.connect(signals.drop_fts_triggers, sender=self)
+        post_migrate.connect(signals.restore_fts_triggers, sender=self)
\ No newline at end of file
@@ -0,0 +1,157 @@
+# api/async_views.py
+
+"""
+Async versions of the search endpoints for ASGI deployments.
+
+``search_products``, ``autocomplete_suggestions`` and ``search_statistics``
+return exactly what their DRF counterparts in ``api.views`` return, but
+awaiting the database (Django's async ORM) instead of blocking a worker
+thread, and running independent lookups concurrently:
+
+* search: the page query alongside the facets, and with the SQL search
+  backends the COUNT too (``SearchBackend.asearch``);
+* statistics: trending products, trending categories, popular and
+  zero-result terms all at once.
+
+They are plain Django async views (DRF 3.14 views are sync only), so they
+skip content negotiation and the browsable API and always answer JSON.
+Per-view query budgets are not enforced here: async ORM queries run on
+another thread's connection.  The views are always mounted under
+``/api/async/search/...``; ``ASYNC_SEARCH_VIEWS = True`` serves them on the
+regular ``/api/search/...`` URLs too, which is meant for ASGI servers
+(``uvicorn backend.asgi:application``).  ``benchmark_async`` compares both
+paths.
+"""
+
+import asyncio
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework.exceptions import NotFound
+
+from .fuzzy import fuzzy_index
+from .instrumentation import registry
+from .models import Category
+from .renderers import FastJSONRenderer
+from .response_cache import response_cache
+from .search_analytics import popular_terms, zero_result_terms
+from .search_backends import get_backend
+from .serializers import CategorySerializer, ProductReadSerializer
+from .views import (
+    SEARCH_QUERY_REQUIRED,
+    _needs_correction,
+    _popular_category_querysets,
+    _rank_arguments,
+    _search_facets,
+    _search_params,
+    _search_payload,
+    _trending_querysets,
+)
+
+
+def _json(data, status=200):
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def async_get(view):
+    """GET-only async view, timed under ``async:<name>`` in the metrics registry"""
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        started = time.perf_counter()
+        try:
+            return await view(request, *args, **kwargs)
+        finally:
+            registry.record_timing(f'async:{view.__name__}', time.perf_counter() - started)
+    return wrapped
+
+
+async def _rows(queryset):
+    return [row async for row in queryset]
+
+
+async def _none():
+    return None
+
+
+async def _category_id(slug):
+    if not slug:
+        return None
+    return await Category.objects.filter(slug=slug).values_list('id', flat=True).afirst()
+
+
+async def _search(params, arguments, query):
+    facets = sync_to_async(_search_facets)(params, arguments) if params['facets'] else _none()
+    # পেজ (আর ব্যাকএন্ড পারলে COUNT) ফেসেটের সাথে একসাথে
+    (total, ranked), facets = await asyncio.gather(get_backend().asearch(query, **arguments), facets)
+    return total, ranked, facets
+
+
+@async_get
+async def search_products(request):
+    """Async ``api.views.search_products``"""
+    try:
+        params = _search_params(request)
+    except NotFound as exc:
+        return _json({'detail': str(exc.detail)}, status=404)
+    if not params['query']:
+        return _json(SEARCH_QUERY_REQUIRED, status=400)
+
+    arguments = _rank_arguments(params, await _category_id(params['category_slug']))
+    total, ranked, facets = await _search(params, arguments, params['query'])
+    if _needs_correction(params, ranked):
+        if not fuzzy_index.is_fresh():
+            await sync_to_async(fuzzy_index.ensure_fresh)()
+        params['corrected_query'] = fuzzy_index.correct(params['query'], refresh=False)
+        if params['corrected_query']:
+            total, ranked, facets = await _search(params, arguments, params['corrected_query'])
+    return _json(_search_payload(request, params, total, ranked, facets))
+
+
+@async_get
+async def autocomplete_suggestions(request):
+    """Async ``api.views.autocomplete_suggestions``"""
+    query = request.GET.get('q', '').strip().lower()
+
+    if len(query) < 2:
+        return _json({'suggestions': []})
+
+    return _json({
+        'query': query,
+        'suggestions': await get_backend().asuggest(query)
+    })
+
+
+async def _statistics(request):
+    trending, newest = _trending_querysets()
+    categories, largest = _popular_category_querysets()
+    # চারটি স্বাধীন লুকআপ একসাথে
+    trending, categories, popular, zero_results = await asyncio.gather(
+        _rows(trending),
+        _rows(categories),
+        sync_to_async(popular_terms)(limit=5),
+        sync_to_async(zero_result_terms)(limit=5),
+    )
+    # খালি রোলআপে (নতুন দোকান) আগের মতো নতুন পণ্য/পণ্য-সংখ্যা
+    trending = trending or await _rows(newest)
+    categories = categories or await _rows(largest)
+    return {
+        'trending_products': ProductReadSerializer(request).many(trending),
+        'popular_categories': CategorySerializer(categories, many=True).data,
+        'popular_searches': popular,
+        'zero_result_searches': zero_results,
+    }
+
+
+@async_get
+async def search_statistics(request):
+    """Async ``api.views.search_statistics``; shares its cache entries"""
+    async def build():
+        return await _statistics(request)
+
+    return _json(await response_cache.aget_or_set(
+        'search_statistics', ['products', 'categories', 'sales', 'search_terms'], request, build
+    ))
@@ -0,0 +1,323 @@
+# api/autocomplete.py
+
+"""
+In-memory prefix index for ``autocomplete_suggestions``.
+
+Every product name, category name and popular search term (from
+``api.search_analytics``) is normalized and stored once per word start
+(``"কাট বাদাম"`` is reachable from ``"কাট"`` and from ``"বাদাম"``) in a
+sorted array per suggestion type.  A prefix lookup is a ``bisect`` into that
+array.  The top-k items for a prefix are computed on its first lookup and
+cached; a write drops only the cached prefixes of the keys it adds or
+removes, so repeated keystrokes never touch the DB and stay cached while
+unrelated products change.
+"""
+
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+
+PRODUCT_LIMIT = 10
+CATEGORY_LIMIT = 5
+POPULAR_LIMIT = 8
+MAX_SUGGESTIONS = 15
+MAX_CACHED_PREFIXES = 10000
+
+_INVISIBLE = dict.fromkeys(map(ord, '\u200b\u200c\u200d\u2060\ufeff'))
+_BENGALI_DIGITS = {ord('০') + i: str(i) for i in range(10)}
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    """
+    Normalize Bengali and Latin text into a lookup key.
+
+    NFC also splits the precomposed nukta letters (ড়, ঢ়, য়) into base + nukta,
+    so both spellings produce the same key.  Zero-width joiners are dropped,
+    khanda ta is spelled out, Bengali digits become ASCII and Latin is
+    case-folded.
+    """
+    text = unicodedata.normalize('NFC', text or '')
+    text = text.translate(_INVISIBLE).translate(_BENGALI_DIGITS)
+    text = text.replace('ৎ', 'ত্')
+    return _WHITESPACE.sub(' ', text.casefold()).strip()
+
+
+def _word_keys(normalized):
+    """The normalized text starting at each word boundary."""
+    words = normalized.split(' ')
+    return {' '.join(words[i:]) for i in range(len(words)) if words[i]}
+
+
+class _PrefixArray:
+    """Sorted ``(key, rank, item_id)`` tuples for one suggestion type."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.entries = []
+        self.items = {}
+        self.keys = {}
+        self.top = {}
+
+    def add(self, item_id, text, rank, payload, bulk=False):
+        """Insert one item; with ``bulk`` the caller must ``sort()`` afterwards."""
+        self.remove(item_id)
+        keys = _word_keys(normalize(text))
+        for key in keys:
+            if bulk:
+                self.entries.append((key, rank, item_id))
+            else:
+                insort(self.entries, (key, rank, item_id))
+        self.items[item_id] = payload
+        self.keys[item_id] = (keys, rank)
+        self._forget(keys)
+
+    def sort(self):
+        self.entries.sort()
+
+    def remove(self, item_id):
+        if item_id not in self.items:
+            return
+        keys, rank = self.keys.pop(item_id)
+        for key in keys:
+            position = bisect_left(self.entries, (key, rank, item_id))
+            if position < len(self.entries) and self.entries[position] == (key, rank, item_id):
+                del self.entries[position]
+        del self.items[item_id]
+        self._forget(keys)
+
+    def _forget(self, keys):
+        """Drop the cached top-k of every prefix of ``keys``"""
+        if not self.top:
+            return
+        for key in keys:
+            for end in range(len(key) + 1):
+                self.top.pop(key[:end], None)
+
+    def lookup(self, prefix):
+        """The best ``limit`` payloads whose key starts with ``prefix``, cached per prefix"""
+        cached = self.top.get(prefix)
+        if cached is not None:
+            return cached
+        best = {}
+        position = bisect_left(self.entries, (prefix,))
+        for key, rank, item_id in self.entries[position:]:
+            if not key.startswith(prefix):
+                break
+            if item_id not in best or rank < best[item_id]:
+                best[item_id] = rank
+        ranked = sorted(best, key=lambda item_id: (best[item_id], item_id))
+        result = tuple(self.items[item_id] for item_id in ranked[:self.limit])
+        if len(self.top) >= MAX_CACHED_PREFIXES:
+            self.top.clear()
+        self.top[prefix] = result
+        return result
+
+
+class AutocompleteIndex:
+    """
+    Per-process autocomplete structure, kept current by ``api.signals``.
+
+    Like ``api.search_index.ProductSearchIndex`` it re-checks a cheap catalog
+    fingerprint every ``SEARCH_INDEX_REFRESH_SECONDS`` so writes from other
+    processes are picked up.  Popular terms are reloaded after this process
+    flushes search analytics and otherwise every
+    ``SEARCH_POPULAR_REFRESH_SECONDS``.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._checked_at = 0.0
+        self._popular_loaded_at = 0.0
+        self._popular_stale = False
+        self._reset()
+
+    def _reset(self):
+        self._products = _PrefixArray(PRODUCT_LIMIT)
+        self._categories = _PrefixArray(CATEGORY_LIMIT)
+        self._popular = _PrefixArray(POPULAR_LIMIT)
+
+    @property
+    def built(self):
+        return self._built
+
+    # ---------------------------------------------------------------- build
+    def _database_fingerprint(self):
+        from .models import Category, Product
+
+        stats = Product.objects.filter(available=True).aggregate(
+            count=Count('id'), last_updated=Max('updated')
+        )
+        return stats['count'], stats['last_updated'], Category.objects.count()
+
+    def _local_fingerprint(self):
+        last_updated = max(
+            (payload['updated'] for payload in self._products.items.values()),
+            default=None,
+        )
+        return len(self._products.items), last_updated, len(self._categories.items)
+
+    def build(self):
+        from .models import Category, Product
+
+        with self._lock:
+            self._reset()
+            products = Product.objects.filter(available=True).values(
+                'id', 'name', 'slug', 'created', 'updated'
+            )
+            for product in products.iterator(chunk_size=2000):
+                self._add_product(product, bulk=True)
+            for category in Category.objects.values('id', 'name', 'slug'):
+                self._add_category(category, bulk=True)
+            for prefix_array in (self._products, self._categories):
+                prefix_array.sort()
+            self._load_popular()
+            self._built = True
+            self._checked_at = time.monotonic()
+
+    def ensure_fresh(self):
+        interval = getattr(settings, 'SEARCH_INDEX_REFRESH_SECONDS', 30)
+        with self._lock:
+            if not self._built:
+                self.build()
+                return
+            if self._popular_stale:
+                self._load_popular()
+            if interval is None or time.monotonic() - self._checked_at < interval:
+                return
+            self._checked_at = time.monotonic()
+            if self._database_fingerprint() != self._local_fingerprint():
+                self.build()
+            elif time.monotonic() - self._popular_loaded_at >= getattr(
+                settings, 'SEARCH_POPULAR_REFRESH_SECONDS', 300
+            ):
+                self._load_popular()
+
+    def is_fresh(self):
+        """True when ``ensure_fresh`` has nothing to do; never touches the database"""
+        interval = getattr(settings, 'SEARCH_INDEX_REFRESH_SECONDS', 30)
+        return self._built and not self._popular_stale and (
+            interval is None or time.monotonic() - self._checked_at < interval
+        )
+
+    def invalidate(self):
+        with self._lock:
+            self._built = False
+            self._reset()
+
+    def _load_popular(self):
+        """Index the most searched terms (``api.search_analytics``)"""
+        from .search_analytics import popular_terms
+
+        popular = _PrefixArray(POPULAR_LIMIT)
+        limit = getattr(settings, 'AUTOCOMPLETE_POPULAR_TERMS', 200)
+        # বেশি সার্চ হওয়া টার্ম আগে
+        for position, row in enumerate(popular_terms(limit=limit)):
+            term = row['term']
+            popular.add(term, term, position, {
+                'type': 'popular',
+                'name': term,
+                'slug': term.replace(' ', '-'),
+                'url': f'/search?q={term}'
+            }, bulk=True)
+        popular.sort()
+        with self._lock:
+            self._popular = popular
+            self._popular_loaded_at = time.monotonic()
+            self._popular_stale = False
+
+    def popular_changed(self):
+        """Reload popular terms on the next lookup (after an analytics flush)"""
+        self._popular_stale = True
+
+    # ------------------------------------------------------ incremental updates
+    def _add_product(self, product, bulk=False):
+        # নতুন পণ্য আগে (Product এর ডিফল্ট '-created' অর্ডারিং এর মতো)
+        rank = -product['created'].timestamp() if product['created'] else 0.0
+        self._products.add(product['id'], product['name'], rank, {
+            'type': 'product',
+            'name': product['name'],
+            'slug': product['slug'],
+            'id': product['id'],
+            'url': f'/product/{product["id"]}',
+            'updated': product['updated'],
+        }, bulk=bulk)
+
+    def _add_category(self, category, bulk=False):
+        self._categories.add(category['id'], category['name'], normalize(category['name']), {
+            'type': 'category',
+            'name': category['name'],
+            'slug': category['slug'],
+            'id': category['id'],
+            'url': f'/category/{category["slug"]}'
+        }, bulk=bulk)
+
+    def update_product(self, product):
+        with self._lock:
+            if not self._built:
+                return
+            if product.available:
+                self._add_product({
+                    'id': product.id,
+                    'name': product.name,
+                    'slug': product.slug,
+                    'created': product.created,
+                    'updated': product.updated,
+                })
+            else:
+                self._products.remove(product.id)
+
+    def remove_product(self, product_id):
+        with self._lock:
+            if self._built:
+                self._products.remove(product_id)
+
+    def update_category(self, category):
+        with self._lock:
+            if self._built:
+                self._add_category({'id': category.id, 'name': category.name, 'slug': category.slug})
+
+    def remove_category(self, category_id):
+        with self._lock:
+            if self._built:
+                self._categories.remove(category_id)
+
+    # --------------------------------------------------------------- lookups
+    def suggest(self, query, refresh=True):
+        """
+        Suggestions for ``query`` in the shape ``autocomplete_suggestions``
+        has always returned: products, then categories, then popular terms,
+        de-duplicated by name and capped at 15.  ``refresh=False`` skips
+        ``ensure_fresh`` (see ``ProductSearchIndex.search``).
+        """
+        if refresh:
+            self.ensure_fresh()
+        prefix = normalize(query)
+        with self._lock:
+            groups = (
+                self._products.lookup(prefix),
+                self._categories.lookup(prefix),
+                self._popular.lookup(prefix),
+            )
+
+        suggestions = []
+        seen_names = set()
+        for group in groups:
+            for payload in group:
+                if payload['name'] in seen_names:
+                    continue
+                suggestion = dict(payload)
+                suggestion.pop('updated', None)
+                suggestions.append(suggestion)
+                seen_names.add(payload['name'])
+        return suggestions[:MAX_SUGGESTIONS]
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,376 @@
+# api/catalog_io.py
+
+"""
+Streaming CSV / JSONL import and export of the product catalog.
+
+Rows are read and written one at a time and written to the database in
+batches, so files of any size run in constant memory.  Each import batch
+is one transaction: existing products (matched by ``slug``) are changed
+with one ``bulk_update``, new ones are inserted with one ``bulk_create``,
+and search vectors, in-memory indexes and cached responses are refreshed
+once for the batch.
+
+``stock`` of a sharded product (``stock_shards > 0``) is a restock: it is
+spread over the product's ``StockShard`` rows with
+``inventory.shard_product``, since ``Product.stock`` only mirrors them.
+Such rows are rejected while the product has held reservations.
+"""
+
+import csv
+import json
+import re
+import time
+import unicodedata
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import image_jobs, inventory
+from .models import Category, Product, StockReservation
+from .signals import products_changed
+
+# ফাইলের কলাম; category মানে ক্যাটাগরির slug
+FIELDS = ('slug', 'name', 'category', 'price', 'description', 'stock', 'available', 'featured', 'image')
+FORMATS = ('csv', 'jsonl')
+
+_TRUE = {'1', 'true', 'yes', 'y', 'on'}
+_FALSE = {'0', 'false', 'no', 'n', 'off', ''}
+
+
+class RowError(ValueError):
+    pass
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'csv'
+
+
+# ------------------------------------------------------------------ reading
+def read_records(stream, fmt):
+    """Yield ``(line, record, error)``; ``error`` is set for undecodable lines"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record, None
+        return
+    for line, text in enumerate(stream, 1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as exc:
+            yield line, None, f'invalid JSON: {exc}'
+            continue
+        if not isinstance(record, dict):
+            yield line, None, 'expected a JSON object'
+            continue
+        yield line, record, None
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise RowError(f'not a boolean: {value!r}')
+
+
+def clean(record):
+    """
+    Typed values for the columns present in ``record``.  Empty cells and
+    nulls count as absent, so a partial file only changes the columns it
+    fills.
+    """
+    row = {}
+    for field in FIELDS:
+        value = record.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == '':
+            continue
+        try:
+            if field == 'price':
+                value = Decimal(str(value))
+                if value < 0 or value.as_tuple().exponent < -2:
+                    raise RowError(f'invalid price: {record[field]!r}')
+            elif field == 'stock':
+                value = int(value)
+                if value < 0:
+                    raise RowError(f'negative stock: {value}')
+            elif field in ('available', 'featured'):
+                value = _boolean(value)
+        except (InvalidOperation, TypeError, ValueError) as exc:
+            if isinstance(exc, RowError):
+                raise
+            raise RowError(f'invalid {field}: {record[field]!r}') from exc
+        row[field] = value
+    return row
+
+
+# ------------------------------------------------------------------ slugs
+def slug_base(name):
+    """
+    Like ``slugify(name, allow_unicode=True)``, but Bengali (or any) letters
+    keep their vowel signs: ``আজওয়া খেজুর`` becomes ``আজওয়া-খেজুর``.
+    """
+    value = unicodedata.normalize('NFKC', str(name)).lower()
+    # slugify এর \w কার-চিহ্ন (া, ি, ু...) মুছে দেয়, তাই চিহ্নগুলো আলাদা করে রাখা
+    value = ''.join(
+        char if char.isalnum() or char == '_' or unicodedata.category(char).startswith('M') else ' '
+        for char in value
+    )
+    return re.sub(r'\s+', '-', value.strip())
+
+
+def unique_slugs(names, taken=()):
+    """
+    One new unique slug per name.  One query finds which base slugs are
+    taken; only those are scanned for numbered variants (``-2``, ``-3``...).
+    """
+    bases = [slug_base(name)[:190].strip('-') or 'product' for name in names]
+    if not bases:
+        return []
+    used = set(taken)
+    colliding = sorted(set(Product.objects.filter(slug__in=set(bases)).values_list('slug', flat=True)))
+    for start in range(0, len(colliding), 100):
+        # OR করা startswith খুব বড় হলে sqlite এর expression depth ছাড়িয়ে যায়
+        prefixes = Q()
+        for base in colliding[start:start + 100]:
+            prefixes |= Q(slug__startswith=f'{base}-')
+        used.update(Product.objects.filter(prefixes).values_list('slug', flat=True))
+    used.update(colliding)
+
+    slugs = []
+    for base in bases:
+        slug, n = base, 1
+        while slug in used:
+            n += 1
+            slug = f'{base}-{n}'
+        used.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+# ------------------------------------------------------------------ import
+class _Rollback(Exception):
+    pass
+
+
+class ProductImporter:
+    """
+    Upserts cleaned rows in batches.  ``stats`` counts ``created``,
+    ``updated``, ``unchanged`` and ``errors``; ``errors`` keeps the first
+    ``max_reported_errors`` as ``(line, message)``.
+    """
+
+    max_reported_errors = 50
+
+    def __init__(self, batch_size=500, create_categories=False, dry_run=False):
+        self.batch_size = batch_size
+        self.create_categories = create_categories
+        self.dry_run = dry_run
+        self.stats = Counter()
+        self.errors = []
+        # ক্যাটাগরি কম, একবারেই মেমোরিতে
+        self.categories = dict(Category.objects.values_list('slug', 'id'))
+        self.started = None
+
+    @property
+    def rows_per_second(self):
+        elapsed = time.perf_counter() - self.started if self.started else 0
+        processed = sum(self.stats[key] for key in ('created', 'updated', 'unchanged'))
+        return processed / elapsed if elapsed else 0.0
+
+    def error(self, line, message):
+        self.stats['errors'] += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append((line, message))
+
+    def run(self, records, progress=None):
+        """Import ``(line, record, error)`` triples from ``read_records``"""
+        self.started = time.perf_counter()
+        batch = []
+        for line, record, error in records:
+            if error:
+                self.error(line, error)
+                continue
+            try:
+                batch.append((line, clean(record)))
+            except RowError as exc:
+                self.error(line, str(exc))
+                continue
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+                if progress:
+                    progress(self)
+        if batch:
+            self.import_batch(batch)
+            if progress:
+                progress(self)
+        return self.stats
+
+    def import_batch(self, batch):
+        categories = dict(self.categories)
+        try:
+            with transaction.atomic():
+                self._upsert(batch)
+                if self.dry_run:
+                    # সব লেখা হয় (সময় মাপতে), তারপর rollback
+                    raise _Rollback
+        except _Rollback:
+            # rollback হওয়া নতুন ক্যাটাগরির id আর নেই
+            self.categories = categories
+
+    def _resolve_categories(self, batch):
+        missing = {row['category'] for _, row in batch if 'category' in row} - set(self.categories)
+        if missing and self.create_categories:
+            Category.objects.bulk_create(
+                [Category(slug=slug, name=slug.replace('-', ' ').title()) for slug in sorted(missing)],
+                ignore_conflicts=True,
+            )
+            self.categories.update(Category.objects.filter(slug__in=missing).values_list('slug', 'id'))
+
+    def _upsert(self, batch):
+        self._resolve_categories(batch)
+        existing = Product.objects.defer('search_vector').in_bulk(
+            [row['slug'] for _, row in batch if 'slug' in row], field_name='slug'
+        )
+
+        new_rows = [(line, row) for line, row in batch if row.get('slug') not in existing]
+        # slug ছাড়া নতুন সারি: নাম থেকে, একটি ক্যোয়ারীতে ইউনিক
+        unnamed = [row for _, row in new_rows if 'slug' not in row and 'name' in row]
+        reserved = {row['slug'] for _, row in new_rows if 'slug' in row}
+        for row, slug in zip(unnamed, unique_slugs([row['name'] for row in unnamed], reserved)):
+            row['slug'] = slug
+
+        sharded = [product.pk for product in existing.values() if product.stock_shards]
+        held = set(
+            StockReservation.objects.filter(product__in=sharded, status='held').values_list('product_id', flat=True)
+        ) if sharded else set()
+
+        now = timezone.now()
+        created = {}
+        changed = {}
+        changed_fields = set()
+        restock = {}
+        for line, row in batch:
+            if 'category' in row:
+                if row['category'] not in self.categories:
+                    self.error(line, f'unknown category: {row["category"]}')
+                    continue
+                row['category_id'] = self.categories[row.pop('category')]
+
+            product = existing.get(row.get('slug')) or created.get(row.get('slug'))
+            if product is None:
+                missing = [
+                    column for column, field in (('name', 'name'), ('category', 'category_id'), ('price', 'price'))
+                    if field not in row
+                ]
+                if missing:
+                    self.error(line, f'new product needs {", ".join(missing)}')
+                    continue
+                product = Product(**row)
+                product.image_status = 'pending' if product.image else 'none'
+                created[product.slug] = product
+                continue
+
+            fields = {field for field, value in row.items() if getattr(product, field) != value}
+            if product.slug in created:
+                # একই ফাইলে একই নতুন slug আবার: পরেরটাই থাকবে
+                for field in fields:
+                    setattr(product, field, row[field])
+                continue
+            if product.stock_shards and 'stock' in fields:
+                if product.pk in held:
+                    self.error(line, 'sharded stock has held reservations; run reconcile_stock first')
+                    continue
+                # শার্ডেড পণ্যের Product.stock শুধু শার্ডের প্রতিফলন; নতুন স্টক শার্ডে ভাগ হয়
+                fields.discard('stock')
+                restock[product.pk] = (line, row['stock'])
+            if not fields and product.pk not in restock:
+                if product.pk not in changed:
+                    self.stats['unchanged'] += 1
+                continue
+            for field in fields:
+                setattr(product, field, row[field])
+            if fields & set(Product.SEARCH_SOURCE_FIELDS):
+                product.search_dirty = True
+                fields.add('search_dirty')
+            if 'image' in fields:
+                product.image_status = 'pending' if product.image else 'none'
+                product.image_error = ''
+                fields |= {'image_status', 'image_error'}
+            product.updated = now
+            changed[product.pk] = product
+            changed_fields |= fields | {'updated'}
+
+        if changed:
+            Product.objects.bulk_update(changed.values(), sorted(changed_fields))
+        for pk, (line, total) in restock.items():
+            try:
+                inventory.shard_product(changed[pk], changed[pk].stock_shards, total)
+            except ValueError as exc:
+                # এর মধ্যে চেকআউট হোল্ড নিয়েছে
+                self.error(line, str(exc))
+        if created:
+            Product.objects.bulk_create(created.values())
+            if any(product.pk is None for product in created.values()):
+                # MySQL এ bulk_create pk ফেরত দেয় না
+                ids = dict(Product.objects.filter(slug__in=created).values_list('slug', 'id'))
+                for slug, product in created.items():
+                    product.pk = ids[slug]
+        self.stats['created'] += len(created)
+        self.stats['updated'] += len(changed)
+
+        products = [*changed.values(), *created.values()]
+        ids = [product.pk for product in products]
+        if ids:
+            # সার্চ ভেক্টর ব্যাচে একবার, প্রতি সারিতে নয়
+            Product.objects.filter(id__in=ids, search_dirty=True).refresh_search_vectors()
+            products_changed(ids)
+        for product in products:
+            if product.image_status == 'pending':
+                transaction.on_commit(lambda pk=product.pk: image_jobs.enqueue(pk))
+
+
+# ------------------------------------------------------------------ export
+def export_rows(queryset, batch_size=1000):
+    """Yield file rows for ``queryset``, keyset-paginated by id"""
+    for ids in queryset.id_batches(batch_size):
+        rows = (
+            Product.objects.filter(id__in=ids).order_by('id')
+            .values('slug', 'name', 'category__slug', 'price', 'description', 'stock', 'available', 'featured', 'image')
+        )
+        for row in rows:
+            row['category'] = row.pop('category__slug')
+            row['price'] = str(row['price'])
+            row['image'] = row['image'] or ''
+            yield {field: row[field] for field in FIELDS}
+
+
+def write_rows(stream, rows, fmt):
+    """Write ``rows`` to a text ``stream``; returns the number written"""
+    written = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**row, 'available': str(row['available']).lower(), 'featured': str(row['featured']).lower()})
+            written += 1
+        return written
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False))
+        stream.write('\n')
+        written += 1
+    return written
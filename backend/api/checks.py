@@ -0,0 +1,46 @@
+# api/checks.py
+
+"""
+System checks for database objects that Django's migrations do not track.
+
+``fts_triggers`` reads ``sqlite_master`` and is deliberately not tagged
+``database``: ``runserver`` only runs untagged checks, and a server must
+not start while the FTS table has stopped following writes.
+"""
+
+from django.core.checks import Error, Warning, register
+from django.db import DatabaseError, connection
+
+from .search_backends import backend_name
+from .search_backends.sqlite import FTS_TABLE, SQLiteFTSBackend
+
+
+@register('search')
+def fts_triggers(app_configs=None, **kwargs):
+    """
+    ``api_product_fts`` must have its sync triggers
+    (``api.search_backends.sqlite.TRIGGERS``), or the SQLite FTS table
+    silently stops following writes.
+    """
+    if connection.vendor != 'sqlite':
+        return []
+    backend = SQLiteFTSBackend()
+    try:
+        missing = backend.missing_triggers() if backend.available() else []
+    except DatabaseError:
+        # ডাটাবেস এখনো মাইগ্রেট হয়নি
+        return []
+    if not missing:
+        return []
+    # অন্য ব্যাকএন্ডে টেবিলটা এখন পড়া হয় না, তবে বদলালে পুরনো ফল দেবে
+    level, check_id = (Error, 'api.E001') if backend_name() == 'sqlite' else (Warning, 'api.W001')
+    return [level(
+        f'{FTS_TABLE} sync triggers are missing: {", ".join(missing)}',
+        hint=(
+            'migrate recreates them, so they were lost outside it (a restored dump, a manual schema change, '
+            'migrations run without signals). Run "python manage.py update_search_vectors" to recreate them '
+            'and refill the FTS table.'
+        ),
+        obj=FTS_TABLE,
+        id=check_id,
+    )]
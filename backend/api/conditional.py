@@ -0,0 +1,89 @@
+# api/conditional.py
+
+"""
+Conditional GET (``ETag`` / ``Last-Modified``) for catalog viewsets.
+
+Validators come from one aggregate query (``COUNT`` plus ``MAX(updated)``
+over the rows the request would return) instead of from the response body,
+so a repeat visitor's ``If-None-Match`` is answered with ``304 Not
+Modified`` before anything is serialized.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    Adds ``conditional(respond)`` for list/retrieve actions.
+
+    ``validator_fields`` are the timestamps whose maximum changes whenever
+    the representation does, e.g. ``('updated', 'category__updated')`` for
+    products that embed their category.  Deletions change the count.
+    """
+
+    validator_fields = ('updated',)
+
+    def filtered_queryset(self):
+        """``filter_queryset(get_queryset())``, built once per request"""
+        # filterset ভ্যালিডেশনও ক্যোয়ারী চালায়, তাই দুবার নয়
+        if getattr(self, '_filtered_queryset', None) is None:
+            self._filtered_queryset = self.filter_queryset(self.get_queryset())
+        return self._filtered_queryset
+
+    def get_validator_queryset(self):
+        queryset = self.filtered_queryset()
+        if self.action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_validators(self):
+        """``(etag, last_modified)`` for this request, or ``(None, None)``"""
+        values = self.get_validator_queryset().order_by().aggregate(
+            count=Count('pk'),
+            **{f'max_{i}': Max(field) for i, field in enumerate(self.validator_fields)},
+        )
+        if not values['count']:
+            return None, None
+        stamps = [values[f'max_{i}'] for i in range(len(self.validator_fields))]
+        stamps = [stamp for stamp in stamps if stamp is not None]
+        last_modified = int(max(stamps).timestamp()) if stamps else None
+
+        # রেসপন্সের আকার URL, host (absolute image URL) ও Accept এর উপর নির্ভর করে
+        request = self.request
+        key = repr((
+            self.__class__.__name__,
+            self.action,
+            values['count'],
+            [stamp.isoformat() for stamp in stamps],
+            request.build_absolute_uri(),
+            request.META.get('HTTP_ACCEPT', ''),
+        ))
+        etag = 'W/' + quote_etag(hashlib.md5(key.encode()).hexdigest())
+        return etag, last_modified
+
+    def _set_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # ব্রাউজার রাখবে, কিন্তু প্রতিবার যাচাই করে নেবে
+        response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def conditional(self, respond):
+        """Return 304 if the client's copy is current, else ``respond()``"""
+        etag, last_modified = self.get_validators()
+        if etag is None:
+            return respond()
+        not_modified = get_conditional_response(self.request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return self._set_validators(not_modified, etag, last_modified)
+        response = respond()
+        if response.status_code == 200:
+            self._set_validators(response, etag, last_modified)
+        return response
@@ -0,0 +1,178 @@
+# api/exports.py
+
+"""
+Flat, streaming exports of orders for finance.
+
+Orders are walked in primary-key order with ``.iterator(chunk_size=...)``;
+Django prefetches items (with product names) and payments once per chunk,
+so memory depends on the chunk size, not on how many orders are exported.
+Rows are plain dicts of strings and numbers, written as NDJSON or CSV one
+line at a time.
+"""
+
+import csv
+import json
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.db.models import Exists, OuterRef, Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Order, OrderItem, Payment
+
+FORMATS = ('ndjson', 'csv')
+RECORDS = ('items', 'payments')
+
+# একটি সারি = অর্ডারের একটি আইটেম; পেমেন্টের সারাংশ প্রতিটি সারিতে
+ITEM_COLUMNS = (
+    'order_id', 'order_created', 'customer_name', 'email', 'phone', 'order_total', 'order_paid',
+    'payment_status', 'payment_method', 'transaction_id', 'paid_amount',
+    'item_id', 'product_id', 'product_name', 'price', 'quantity', 'line_total',
+)
+# একটি সারি = একটি পেমেন্ট
+PAYMENT_COLUMNS = (
+    'order_id', 'order_created', 'customer_name', 'email', 'order_total', 'order_paid',
+    'payment_id', 'transaction_id', 'payment_method', 'payment_status', 'amount', 'mobile_number',
+    'payment_created', 'payment_updated',
+)
+COLUMNS = {'items': ITEM_COLUMNS, 'payments': PAYMENT_COLUMNS}
+
+
+def parse_moment(value, end_of_day=False):
+    """ISO date or datetime -> aware datetime; a bare ``to`` date includes that whole day"""
+    try:
+        # parse_datetime তারিখ-মাত্রকেও মধ্যরাত ধরে নেয়, তাই আগে parse_date
+        day = parse_date(value)
+        moment = datetime.combine(day, time.max if end_of_day else time.min) if day else parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValueError(f'not a date: {value}')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def orders_for_export(date_from=None, date_to=None, paid=None, payment_statuses=None):
+    orders = Order.objects.all()
+    if date_from is not None:
+        orders = orders.filter(created__gte=date_from)
+    if date_to is not None:
+        orders = orders.filter(created__lte=date_to)
+    if paid is not None:
+        orders = orders.filter(paid=paid)
+    if payment_statuses:
+        # JOIN করলে অর্ডার ডুপ্লিকেট হতো
+        orders = orders.filter(Exists(
+            Payment.objects.filter(order=OuterRef('pk'), status__in=payment_statuses)
+        ))
+    return orders
+
+
+def _iterate(orders, record, chunk_size, payment_statuses=None):
+    payments = Payment.objects.order_by('created', 'id')
+    if record == 'payments' and payment_statuses:
+        payments = payments.filter(status__in=payment_statuses)
+    prefetches = [Prefetch('payments', queryset=payments)]
+    if record == 'items':
+        prefetches.append(Prefetch(
+            'items',
+            queryset=OrderItem.objects.select_related('product').only(
+                'id', 'order_id', 'product_id', 'price', 'quantity', 'product__name'
+            ).order_by('id'),
+        ))
+    # iterator(chunk_size) + prefetch: প্রতি chunk এ একবার করে prefetch
+    return orders.order_by('id').prefetch_related(*prefetches).iterator(chunk_size=chunk_size)
+
+
+def _datetime(value):
+    return value.isoformat() if value is not None else None
+
+
+def export_rows(orders, record='items', chunk_size=1000, payment_statuses=None):
+    """Yield flat row dicts (see ``COLUMNS``) for ``orders``"""
+    for order in _iterate(orders, record, chunk_size, payment_statuses):
+        base = {
+            'order_id': order.id,
+            'order_created': _datetime(order.created),
+            'customer_name': order.name,
+            'email': order.email,
+            'phone': order.phone,
+            'order_total': str(order.total_price),
+            'order_paid': order.paid,
+        }
+        payments = list(order.payments.all())
+
+        if record == 'payments':
+            for payment in payments:
+                yield {
+                    **base,
+                    'payment_id': payment.id,
+                    'transaction_id': payment.transaction_id,
+                    'payment_method': payment.payment_method,
+                    'payment_status': payment.status,
+                    'amount': str(payment.amount),
+                    'mobile_number': payment.mobile_number,
+                    'payment_created': _datetime(payment.created),
+                    'payment_updated': _datetime(payment.updated),
+                }
+            continue
+
+        latest = payments[-1] if payments else None
+        summary = {
+            'payment_status': latest.status if latest else None,
+            'payment_method': latest.payment_method if latest else None,
+            'transaction_id': latest.transaction_id if latest else None,
+            'paid_amount': str(sum((p.amount for p in payments if p.status == 'completed'), Decimal('0.00'))),
+        }
+        items = order.items.all()
+        if not items:
+            # আইটেম ছাড়া অর্ডারও ফাইনান্সের হিসাবে থাকে
+            yield {**base, **summary, **dict.fromkeys(ITEM_COLUMNS[-6:])}
+        for item in items:
+            yield {
+                **base,
+                **summary,
+                'item_id': item.id,
+                'product_id': item.product_id,
+                'product_name': item.product.name,
+                'price': str(item.price),
+                'quantity': item.quantity,
+                'line_total': str(item.price * item.quantity),
+            }
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the line (for ``csv.writer``)"""
+
+    def write(self, value):
+        return value
+
+
+def encode_rows(rows, fmt, columns):
+    """Yield the export as text chunks, one per row (plus the CSV header)"""
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow([
+                str(row[column]).lower() if isinstance(row[column], bool) else row[column]
+                for column in columns
+            ])
+        return
+    for row in rows:
+        yield json.dumps({column: row[column] for column in columns}, ensure_ascii=False) + '\n'
+
+
+def buffered(chunks, size=64 * 1024):
+    """Join small text chunks into ~``size`` byte pieces for the response"""
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
@@ -0,0 +1,261 @@
+# api/fuzzy.py
+
+"""
+Typo-tolerant query correction for ``search_products``.
+
+When a search finds nothing (``kheju``, ``মধূ``, ``khejur``), each query
+term is replaced by the closest word of the catalog vocabulary, the words
+of every product and category name, and the search runs once more.
+
+Words are compared by trigram similarity (shared / all distinct trigrams,
+like PostgreSQL's ``pg_trgm``) of a *folded* spelling: ``normalize`` from
+``api.autocomplete`` plus folding of the letters Bengali spellers (and
+Banglish) mix up, e.g. ি/ী, ু/ূ, ত/ট, দ/ড, ন/ণ, স/শ/ষ and ড়/র.  Latin terms
+are also looked up through ``api.transliteration``.  Candidates come from
+a ``trigram -> words`` index, so a lookup only touches words that share a
+trigram with the term, never the whole vocabulary.
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .autocomplete import normalize
+from .search_index import MIN_TERM_LENGTH, split_query
+from .transliteration import transliterate
+
+DEFAULT_THRESHOLD = 0.3
+
+_FOLD = str.maketrans({
+    'ী': 'ি', 'ূ': 'ু', 'ঈ': 'ই', 'ঊ': 'উ',
+    'ট': 'ত', 'ঠ': 'থ', 'ড': 'দ', 'ঢ': 'ধ', 'ণ': 'ন', 'শ': 'স', 'ষ': 'স', 'ঙ': 'ং',
+    # হসন্ত, চন্দ্রবিন্দু, বিসর্গ, নুক্তা বানানে প্রায়ই বাদ পড়ে
+    '্': None, 'ঁ': None, 'ঃ': None, '়': None,
+})
+_RA_NUKTA = re.compile('[ডঢ]়')
+_JA_WITHOUT_NUKTA = re.compile('য(?!়)')
+_PUNCTUATION = '.,;:!?()[]{}"\'`-–—/\\|।॥'
+
+
+def fold(word):
+    """Spelling-insensitive key of ``word``"""
+    word = _RA_NUKTA.sub('র', normalize(word))
+    # য (জ এর মতো উচ্চারণ) আর য় (নুক্তা সহ) আলাদা থাকে
+    word = _JA_WITHOUT_NUKTA.sub('জ', word)
+    return word.translate(_FOLD)
+
+
+def trigrams(key):
+    """Trigrams of ``key``, padded like ``pg_trgm`` so word starts weigh more"""
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def words(text):
+    """Vocabulary words of a name: lower-cased, punctuation stripped"""
+    result = []
+    for word in (text or '').lower().split():
+        word = word.strip(_PUNCTUATION)
+        if len(word) >= MIN_TERM_LENGTH:
+            result.append(word)
+    return result
+
+
+def threshold():
+    return getattr(settings, 'SEARCH_FUZZY_THRESHOLD', DEFAULT_THRESHOLD)
+
+
+class FuzzyIndex:
+    """
+    Per-process trigram index over product and category name words, kept
+    current by ``api.signals`` and re-checked against a catalog fingerprint
+    every ``SEARCH_INDEX_REFRESH_SECONDS`` like the other search indexes.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._checked_at = 0.0
+        self._reset()
+
+    def _reset(self):
+        # folded key -> {word: number of names using it}
+        self._keys = {}
+        self._sizes = {}
+        self._grams = {}
+        # ('product' | 'category', id) -> words, to undo on edits
+        self._items = {}
+        self._last_updated = None
+
+    @property
+    def built(self):
+        return self._built
+
+    # ---------------------------------------------------------------- build
+    def _database_fingerprint(self):
+        from .models import Category, Product
+
+        stats = Product.objects.filter(available=True).aggregate(
+            count=Count('id'), last_updated=Max('updated')
+        )
+        return stats['count'], stats['last_updated'], Category.objects.count()
+
+    def _local_fingerprint(self):
+        products = sum(1 for kind, _ in self._items if kind == 'product')
+        return products, self._last_updated, len(self._items) - products
+
+    def build(self):
+        from .models import Category, Product
+
+        with self._lock:
+            self._reset()
+            products = Product.objects.filter(available=True).values('id', 'name', 'updated')
+            for product in products.iterator(chunk_size=2000):
+                self._add_product(product)
+            for category in Category.objects.values('id', 'name'):
+                self._add(('category', category['id']), category['name'])
+            self._built = True
+            self._checked_at = time.monotonic()
+
+    def ensure_fresh(self):
+        interval = getattr(settings, 'SEARCH_INDEX_REFRESH_SECONDS', 30)
+        with self._lock:
+            if not self._built:
+                self.build()
+                return
+            if interval is None or time.monotonic() - self._checked_at < interval:
+                return
+            self._checked_at = time.monotonic()
+            if self._database_fingerprint() != self._local_fingerprint():
+                self.build()
+
+    def is_fresh(self):
+        """True when ``ensure_fresh`` has nothing to do; never touches the database"""
+        interval = getattr(settings, 'SEARCH_INDEX_REFRESH_SECONDS', 30)
+        return self._built and (
+            interval is None or time.monotonic() - self._checked_at < interval
+        )
+
+    def invalidate(self):
+        with self._lock:
+            self._built = False
+            self._reset()
+
+    # ------------------------------------------------------ incremental updates
+    def _add(self, item, text):
+        self._remove(item)
+        item_words = words(text)
+        self._items[item] = item_words
+        for word in item_words:
+            key = fold(word)
+            spellings = self._keys.get(key)
+            if spellings is None:
+                spellings = self._keys[key] = Counter()
+                grams = trigrams(key)
+                self._sizes[key] = len(grams)
+                for gram in grams:
+                    self._grams.setdefault(gram, set()).add(key)
+            spellings[word] += 1
+
+    def _remove(self, item):
+        for word in self._items.pop(item, ()):
+            key = fold(word)
+            spellings = self._keys[key]
+            spellings[word] -= 1
+            if spellings[word] <= 0:
+                del spellings[word]
+            if spellings:
+                continue
+            del self._keys[key]
+            del self._sizes[key]
+            for gram in trigrams(key):
+                keys = self._grams[gram]
+                keys.discard(key)
+                if not keys:
+                    del self._grams[gram]
+
+    def _add_product(self, product):
+        self._add(('product', product['id']), product['name'])
+        if product['updated'] and (self._last_updated is None or product['updated'] > self._last_updated):
+            self._last_updated = product['updated']
+
+    def update_product(self, product):
+        with self._lock:
+            if not self._built:
+                return
+            if product.available:
+                self._add_product({'id': product.id, 'name': product.name, 'updated': product.updated})
+            else:
+                self._remove(('product', product.id))
+
+    def remove_product(self, product_id):
+        with self._lock:
+            if self._built:
+                self._remove(('product', product_id))
+
+    def update_category(self, category):
+        with self._lock:
+            if self._built:
+                self._add(('category', category.id), category.name)
+
+    def remove_category(self, category_id):
+        with self._lock:
+            if self._built:
+                self._remove(('category', category_id))
+
+    # --------------------------------------------------------------- lookups
+    def matches(self, key, limit=5):
+        """
+        ``[(similarity, word), ...]`` for the vocabulary keys at least
+        ``SEARCH_FUZZY_THRESHOLD`` similar to the folded ``key``, best first.
+        """
+        grams = trigrams(key)
+        shared = Counter()
+        with self._lock:
+            # শুধু যেসব শব্দে অন্তত একটি trigram মেলে
+            for gram in grams:
+                shared.update(self._grams.get(gram, ()))
+            minimum = threshold()
+            scored = []
+            for candidate, count in shared.items():
+                similarity = count / (len(grams) + self._sizes[candidate] - count)
+                if similarity >= minimum:
+                    # একই কী এর একাধিক বানানে সবচেয়ে বেশি ব্যবহৃতটি
+                    word, uses = self._keys[candidate].most_common(1)[0]
+                    scored.append((similarity, uses, word))
+        scored.sort(key=lambda entry: (-entry[0], -entry[1], entry[2]))
+        return [(similarity, word) for similarity, _, word in scored[:limit]]
+
+    def best_match(self, term):
+        """The vocabulary word closest to ``term`` (or its transliteration), or ``None``"""
+        best = None
+        for key in dict.fromkeys([fold(term), *map(fold, transliterate(term))]):
+            for similarity, word in self.matches(key, limit=1):
+                if best is None or similarity > best[0]:
+                    best = (similarity, word)
+            if best is not None and best[0] == 1:
+                # হুবহু মিলের চেয়ে ভালো কিছু নেই, বাকি বানান দেখার দরকার নেই
+                break
+        return best and best[1]
+
+    def correct(self, query, refresh=True):
+        """
+        ``query`` with every term replaced by its ``best_match`` (terms
+        without one are dropped), or ``None`` when nothing would change.
+        ``refresh=False`` skips ``ensure_fresh`` (see
+        ``ProductSearchIndex.search``).
+        """
+        if refresh:
+            self.ensure_fresh()
+        _, match_terms = split_query(query)
+        corrected = [word for word in map(self.best_match, match_terms) if word]
+        if not corrected or corrected == match_terms:
+            return None
+        return ' '.join(corrected)
+
+
+fuzzy_index = FuzzyIndex()
@@ -0,0 +1,201 @@
+# api/gateways.py
+
+"""
+HTTP clients for the payment gateways (bKash, Rocket, Nagad, card).
+
+Every payment method talks to a gateway base URL with the same small JSON
+protocol (``api.mock_gateway`` implements it for development and load
+tests)::
+
+    POST /payments                          -> {"reference": ..., "status": ...}
+        {"transaction_id", "amount", "method", "mobile_number", "callback_url"}
+    POST /payments/<transaction_id>/verify  -> {"reference": ..., "status": ...}
+        {"reference"}
+
+``PAYMENT_GATEWAYS`` maps a method to client options (``url``,
+``timeout``, ``retries``, ``backoff``, ``pool_size``); missing methods and
+options come from ``PAYMENT_GATEWAY_URL`` (the local mock by default),
+``PAYMENT_GATEWAY_TIMEOUT`` and ``PAYMENT_GATEWAY_RETRIES``.
+
+A client keeps a pool of keep-alive connections (plain ``http.client``, no
+extra dependency), and retries connection errors, timeouts, 429 and 5xx
+with exponential backoff and jitter.  Each call sends an
+``Idempotency-Key`` that stays the same across retries, so a request the
+gateway processed but whose response got lost is not charged twice.
+
+Calls block for as long as the gateway takes; ``api.payments`` makes them
+from background threads, never inside a request.
+"""
+
+import http.client
+import json
+import queue
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from .instrumentation import registry
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+DEFAULT_GATEWAY_URL = 'http://127.0.0.1:8765'
+
+
+class GatewayError(Exception):
+    """The gateway refused a request, or kept failing until retries ran out"""
+
+    def __init__(self, message, status=None, retryable=False):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+class ConnectionPool:
+    """
+    Up to ``size`` idle keep-alive connections to one gateway host
+    (``size=0`` opens a new connection per request).
+    """
+
+    def __init__(self, url, size=10, timeout=5.0):
+        parts = urlsplit(url)
+        self.https = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.size = size
+        self.timeout = timeout
+        self.opened = 0
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        with self._lock:
+            self.opened += 1
+        connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, connection, response):
+        if response.will_close or self._idle.qsize() >= self.size:
+            connection.close()
+        else:
+            self._idle.put(connection)
+
+    def _send(self, connection, method, path, body, headers):
+        try:
+            connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except BaseException:
+            connection.close()
+            raise
+        self._release(connection, response)
+        return response.status, data
+
+    def request(self, method, path, body=None, headers=None):
+        """``(status, body bytes)``; raises ``OSError``/``http.client.HTTPException``"""
+        headers = headers or {}
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            return self._send(self._connect(), method, path, body, headers)
+        try:
+            return self._send(connection, method, path, body, headers)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            # সার্ভার idle কানেকশনটি বন্ধ করে দিয়েছিল; নতুন কানেকশনে একবার
+            return self._send(self._connect(), method, path, body, headers)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class GatewayClient:
+    """JSON calls to one gateway with pooling, timeouts, retries and idempotency keys"""
+
+    def __init__(self, url, timeout=5.0, retries=2, backoff=0.2, pool_size=10):
+        self.pool = ConnectionPool(url, size=pool_size, timeout=timeout)
+        self.retries = retries
+        self.backoff = backoff
+
+    def call(self, method, path, payload, idempotency_key):
+        """POST/GET ``payload`` as JSON and return the decoded answer, or raise ``GatewayError``"""
+        body = json.dumps(payload).encode()
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'Idempotency-Key': idempotency_key,
+        }
+        for attempt in range(self.retries + 1):
+            if attempt:
+                # 0.2s, 0.4s, 0.8s ... (±50%), যাতে সব worker একসাথে না ফেরে
+                time.sleep(self.backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+            started = time.perf_counter()
+            try:
+                status, data = self.pool.request(method, path, body, headers)
+            except (OSError, http.client.HTTPException) as exc:
+                status, error = None, GatewayError(f'{type(exc).__name__}: {exc}', retryable=True)
+            registry.record_timing('gateway', time.perf_counter() - started)
+            if status is not None:
+                if status < 400:
+                    try:
+                        return json.loads(data)
+                    except ValueError:
+                        raise GatewayError(f'invalid JSON from gateway (HTTP {status})', status=status) from None
+                error = GatewayError(
+                    f'HTTP {status}: {data[:200].decode(errors="replace")}',
+                    status=status, retryable=status in RETRYABLE_STATUSES,
+                )
+            if not error.retryable:
+                raise error
+        raise error
+
+    def initiate(self, payment, callback_url=None):
+        """Ask the gateway to start collecting ``payment``"""
+        return self.call('POST', '/payments', {
+            'transaction_id': payment.transaction_id,
+            'amount': str(payment.amount),
+            'method': payment.payment_method,
+            'mobile_number': payment.mobile_number,
+            'callback_url': callback_url,
+        }, idempotency_key=f'{payment.transaction_id}:initiate')
+
+    def verify(self, payment):
+        """Ask the gateway whether the customer's ``customer_reference`` paid ``payment``"""
+        return self.call(
+            'POST', f'/payments/{payment.transaction_id}/verify',
+            {'reference': payment.customer_reference},
+            idempotency_key=f'{payment.transaction_id}:verify:{payment.customer_reference}',
+        )
+
+    def close(self):
+        self.pool.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def gateway_options(method):
+    options = {
+        'url': getattr(settings, 'PAYMENT_GATEWAY_URL', DEFAULT_GATEWAY_URL),
+        'timeout': getattr(settings, 'PAYMENT_GATEWAY_TIMEOUT', 5.0),
+        'retries': getattr(settings, 'PAYMENT_GATEWAY_RETRIES', 2),
+    }
+    options.update(getattr(settings, 'PAYMENT_GATEWAYS', {}).get(method, {}))
+    return options
+
+
+def get_client(method):
+    """The shared client (and connection pool) for a payment method"""
+    options = gateway_options(method)
+    key = (method, tuple(sorted(options.items())))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = GatewayClient(**options)
+        return client
@@ -0,0 +1,124 @@
+# api/image_jobs.py
+
+"""
+Background processing of uploaded product images.
+
+An upload request only streams the original to storage and marks the
+product ``image_status='pending'``.  After commit ``api.signals`` calls
+``enqueue()``, which hands the product to a bounded local pool: a thread
+reads the original and stores the results, while decoding, EXIF rotation,
+resizing and WebP/JPEG encoding run in a process pool
+(``IMAGE_JOB_MODE='process'``), in the thread itself (``'thread'``) or
+inline (``'sync'``, used by tests).
+
+Jobs live in memory, so a restart can drop queued work; ``process_images``
+picks up whatever is still pending.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from . import renditions
+from .instrumentation import registry
+from .models import Product
+from .response_cache import response_cache
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def process(product_id, executor=None, statuses=('pending',)):
+    """
+    Process the image of one product and return its new status.
+
+    The product is claimed with a conditional ``UPDATE`` (``statuses`` ->
+    ``processing``), so a product queued twice, or picked up by
+    ``process_images`` at the same time, is processed once.  Returns
+    ``None`` if someone else got it first.
+    """
+    claimed = Product.objects.filter(pk=product_id, image_status__in=statuses).update(
+        image_status='processing'
+    )
+    if not claimed:
+        return None
+    row = Product.objects.filter(pk=product_id).values('image', 'category_id').first()
+    if row is None:
+        return None
+
+    storage = Product._meta.get_field('image').storage
+    started = time.perf_counter()
+    status, error = 'ready', ''
+    try:
+        renditions.generate(storage, row['image'], executor=executor)
+    except renditions.RenditionError as exc:
+        status, error = 'failed', str(exc)[:255]
+    registry.record_timing('image_job', time.perf_counter() - started)
+
+    # প্রসেসিং এর মাঝে নতুন ছবি এলে তার pending স্ট্যাটাস মুছবেন না
+    Product.objects.filter(pk=product_id, image=row['image'], image_status='processing').update(
+        image_status=status, image_error=error, updated=timezone.now()
+    )
+    response_cache.bump('products', f'category:{row["category_id"]}')
+    return status
+
+
+class ImageJobRunner:
+    """Lazily started, bounded pools shared by every request in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._threads = None
+        self._processes = None
+
+    @property
+    def mode(self):
+        return _setting('IMAGE_JOB_MODE', 'process')
+
+    @property
+    def workers(self):
+        return _setting('IMAGE_JOB_WORKERS', 2)
+
+    def _start(self):
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(self.workers, thread_name_prefix='image-job')
+                if self.mode == 'process':
+                    # fork করা gunicorn worker এর লক/কানেকশন child এ যেন না যায়
+                    self._processes = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._threads
+
+    def _run(self, product_id):
+        try:
+            return process(product_id, executor=self._processes)
+        finally:
+            connections.close_all()
+
+    def submit(self, product_id):
+        return self._start().submit(self._run, product_id)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._threads is not None:
+                self._threads.shutdown(wait=wait)
+            if self._processes is not None:
+                self._processes.shutdown(wait=wait)
+            self._threads = self._processes = None
+
+
+job_runner = ImageJobRunner()
+
+
+def enqueue(product_id):
+    """Queue the image of ``product_id``; runs inline in ``'sync'`` mode"""
+    if job_runner.mode == 'sync':
+        return process(product_id)
+    return job_runner.submit(product_id)
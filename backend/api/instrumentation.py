@@ -0,0 +1,172 @@
+# api/instrumentation.py
+
+"""
+Per-request query counting and query budgets.
+
+``QueryBudgetMixin`` (viewsets) and ``query_budget`` (function views) count
+the SQL statements each request runs through ``connection.execute_wrapper``,
+record them per endpoint, and log a warning when a view goes over its
+budget.  With ``QUERY_BUDGET_STRICT = True`` (used by the test suite) going
+over budget raises ``QueryBudgetExceeded`` instead, so an N+1 regression
+fails loudly.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryCounter:
+    """``execute_wrapper`` callable that counts statements"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield counter
+
+
+class _Registry:
+    """In-process per-endpoint query and timing statistics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with getattr(self, '_lock', threading.Lock()):
+            self._endpoints = {}
+            self._timings = {}
+
+    def record_queries(self, endpoint, queries, budget):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'requests': 0,
+                'queries': 0,
+                'max_queries': 0,
+                'over_budget': 0,
+                'budget': budget,
+            })
+            stats['requests'] += 1
+            stats['queries'] += queries
+            stats['max_queries'] = max(stats['max_queries'], queries)
+            if budget is not None and queries > budget:
+                stats['over_budget'] += 1
+
+    def record_timing(self, name, seconds):
+        with self._lock:
+            stats = self._timings.setdefault(name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            milliseconds = seconds * 1000
+            stats['count'] += 1
+            stats['total_ms'] += milliseconds
+            stats['max_ms'] = max(stats['max_ms'], milliseconds)
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {
+                endpoint: dict(stats, avg_queries=stats['queries'] / stats['requests'])
+                for endpoint, stats in self._endpoints.items()
+            }
+            timings = {
+                name: dict(stats, avg_ms=stats['total_ms'] / stats['count'])
+                for name, stats in self._timings.items()
+            }
+        return {'endpoints': endpoints, 'timings': timings}
+
+
+registry = _Registry()
+
+
+@contextmanager
+def timed(name):
+    """Record how long the block took under ``name``"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.record_timing(name, time.perf_counter() - started)
+
+
+def _check_budget(endpoint, queries, budget, response):
+    registry.record_queries(endpoint, queries, budget)
+    if settings.DEBUG and response is not None:
+        response['X-Query-Count'] = str(queries)
+    if budget is None or queries <= budget:
+        return
+    message = f'{endpoint} ran {queries} queries (budget {budget})'
+    if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class QueryBudgetMixin:
+    """
+    Count queries per viewset action and enforce ``query_budgets``.
+
+    ``query_budgets`` maps action names to the maximum number of queries;
+    actions not listed fall back to ``default_query_budget`` (``None`` means
+    count but never warn).
+    """
+
+    query_budgets = {}
+    default_query_budget = None
+
+    def dispatch(self, request, *args, **kwargs):
+        with count_queries() as counter:
+            response = super().dispatch(request, *args, **kwargs)
+        action = getattr(self, 'action', None) or request.method.lower()
+        endpoint = f'{self.__class__.__name__}.{action}'
+        budget = self.query_budgets.get(action, self.default_query_budget)
+        _check_budget(endpoint, counter.count, budget, response)
+        return response
+
+
+def query_budget(budget):
+    """Decorator for function views: count queries and enforce ``budget``"""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            with count_queries() as counter:
+                response = view(request, *args, **kwargs)
+            _check_budget(view.__name__, counter.count, budget, response)
+            return response
+        return wrapped
+    return decorator
+
+
+class QueryCountMiddleware:
+    """
+    Optional middleware that counts queries for every request, including
+    views without a budget.  Add ``api.instrumentation.QueryCountMiddleware``
+    to ``MIDDLEWARE`` to enable it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with count_queries() as counter:
+            response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        endpoint = match.view_name if match and match.view_name else request.path
+        registry.record_queries(f'request:{endpoint}', counter.count, None)
+        return response
@@ -0,0 +1,338 @@
+# api/inventory.py
+
+"""
+Stock reservation ledger for hot products.
+
+A product with ``stock_shards > 0`` keeps its sellable stock in that many
+``StockShard`` rows.  Checkout takes stock from one randomly chosen shard
+with a conditional ``UPDATE``, so concurrent buyers of the same product
+contend on different rows, and records a TTL'd ``StockReservation``.  When
+payment completes the hold is committed; when it fails or expires the
+quantity goes back into its shard.  ``reconcile`` folds the shards back into
+``Product.stock``/``available``; commits and releases do that for the
+products they touch, so listings only lag behind checkouts still waiting
+for payment (``live_stock`` reads the shards directly).
+
+Holds of an order whose payment is ``processing`` or ``completed`` never
+expire, and a payment that completes after its holds were released takes
+the stock again.
+"""
+
+import logging
+import random
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    BooleanField, Case, Exists, F, OuterRef, PositiveIntegerField, Q, Subquery, Sum, When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Payment, Product, StockReservation, StockShard
+
+logger = logging.getLogger(__name__)
+# এই অবস্থায় পেমেন্ট থাকলে হোল্ডের মেয়াদ শেষ হয় না
+SETTLING_PAYMENT_STATUSES = ('processing', 'completed')
+
+
+class InsufficientStock(Exception):
+    """Raised with ``[(product_id, requested, available), ...]`` for the short lines."""
+
+    def __init__(self, shortages):
+        super().__init__(shortages)
+        self.shortages = shortages
+
+
+def reservation_ttl():
+    return timedelta(seconds=getattr(settings, 'STOCK_RESERVATION_TTL', 15 * 60))
+
+
+def _add_to_shards(amounts):
+    """Add ``{(product_id, shard_index): quantity}`` back with a single UPDATE."""
+    if not amounts:
+        return
+    shards = Q()
+    for product_id, index in amounts:
+        shards |= Q(product_id=product_id, index=index)
+    StockShard.objects.filter(shards).update(quantity=Case(
+        *[When(product_id=product_id, index=index, then=F('quantity') + quantity)
+          for (product_id, index), quantity in amounts.items()],
+        default=F('quantity'),
+        output_field=PositiveIntegerField(),
+    ))
+
+
+def _take(product, quantity):
+    """
+    Take ``quantity`` of a sharded product; returns ``[(shard_index, quantity)]``.
+
+    The fast path tries shards in random order with ``quantity >= qty``
+    conditions, touching one row.  Only when no single shard can cover the
+    line are the shards locked together and drained in index order.
+    """
+    indexes = list(range(product.stock_shards))
+    random.shuffle(indexes)
+    for index in indexes:
+        if StockShard.objects.filter(
+            product=product, index=index, quantity__gte=quantity
+        ).update(quantity=F('quantity') - quantity):
+            return [(index, quantity)]
+
+    shards = list(
+        StockShard.objects.select_for_update()
+        .filter(product=product, quantity__gt=0)
+        .order_by('index')
+    )
+    available = sum(shard.quantity for shard in shards)
+    if available < quantity:
+        raise InsufficientStock([(product.pk, quantity, available)])
+    taken = []
+    remaining = quantity
+    for shard in shards:
+        part = min(shard.quantity, remaining)
+        StockShard.objects.filter(pk=shard.pk).update(quantity=F('quantity') - part)
+        taken.append((shard.index, part))
+        remaining -= part
+        if not remaining:
+            break
+    return taken
+
+
+def reserve(lines, products):
+    """
+    Take stock for the ``(product_id, quantity)`` lines of sharded products.
+
+    Must run inside the checkout transaction; on ``InsufficientStock`` the
+    caller rolls everything back.  Returns unsaved holds for ``attach``.
+    """
+    quantities = Counter()
+    for product_id, quantity in lines:
+        quantities[product_id] += quantity
+
+    holds = []
+    shortages = []
+    for product_id, quantity in quantities.items():
+        try:
+            for index, part in _take(products[product_id], quantity):
+                holds.append((product_id, index, part))
+        except InsufficientStock as exc:
+            shortages.extend(exc.shortages)
+    if shortages:
+        raise InsufficientStock(shortages)
+    return holds
+
+
+def attach(holds, order):
+    """Persist the holds from ``reserve`` for ``order`` with one INSERT."""
+    expires_at = timezone.now() + reservation_ttl()
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            product_id=product_id,
+            shard_index=index,
+            order=order,
+            quantity=quantity,
+            expires_at=expires_at,
+        )
+        for product_id, index, quantity in holds
+    ])
+
+
+def _retake(reservations):
+    """
+    Take the stock of released holds again and commit them.  Holds whose
+    stock has been sold meanwhile stay ``released`` and are logged, since
+    the order is now oversold.
+    """
+    products = Product.objects.in_bulk({reservation.product_id for reservation in reservations})
+    for reservation in reservations:
+        product = products[reservation.product_id]
+        if not product.stock_shards:
+            continue
+        try:
+            parts = _take(product, reservation.quantity)
+        except InsufficientStock:
+            logger.warning(
+                'order %s paid after its hold on product %s was released; %s short',
+                reservation.order_id, product.pk, reservation.quantity,
+            )
+            continue
+        (index, quantity), *rest = parts
+        StockReservation.objects.filter(pk=reservation.pk).update(
+            status='committed', shard_index=index, quantity=quantity
+        )
+        StockReservation.objects.bulk_create([
+            StockReservation(
+                product_id=product.pk, shard_index=index, order_id=reservation.order_id,
+                quantity=quantity, status='committed', expires_at=reservation.expires_at,
+            )
+            for index, quantity in rest
+        ])
+
+
+def commit_order(order_id):
+    """
+    Payment completed: the held stock is sold for good.  Returns the ids of
+    the products whose ``stock`` was refreshed.
+    """
+    with transaction.atomic():
+        reservations = StockReservation.objects.filter(order_id=order_id)
+        reservations.filter(status='held').update(status='committed')
+        # মেয়াদ শেষে (বা আগের ব্যর্থ পেমেন্টে) ছেড়ে দেওয়া স্টক আবার নেওয়া
+        released = list(reservations.select_for_update().filter(status='released'))
+        if released:
+            _retake(released)
+        return reconcile(reservations.values('product_id'))
+
+
+def _release(reservations):
+    """
+    Return held quantities to their shards, mark the rows released and
+    refresh the products' ``stock``.  Returns the released rows' product ids.
+    """
+    rows = list(reservations.values_list('pk', 'product_id', 'shard_index', 'quantity'))
+    if not rows:
+        return []
+    amounts = Counter()
+    for _, product_id, index, quantity in rows:
+        if index is not None:
+            amounts[product_id, index] += quantity
+    _add_to_shards(amounts)
+    StockReservation.objects.filter(pk__in=[row[0] for row in rows]).update(status='released')
+    return reconcile({product_id for _, product_id, _, _ in rows})
+
+
+def release_order(order_id):
+    """
+    Payment failed or was cancelled: give the stock back right away.
+    Returns the ids of the products whose ``stock`` was refreshed.
+    """
+    with transaction.atomic():
+        return _release(
+            StockReservation.objects.select_for_update()
+            .filter(order_id=order_id, status='held')
+        )
+
+
+def release_expired(batch_size=1000, now=None):
+    """
+    Release expired holds ``batch_size`` at a time.
+
+    Each batch is one transaction with one UPDATE per table, and
+    ``skip_locked`` lets several reconcilers run side by side.  Holds of
+    orders whose payment is already ``processing`` or ``completed`` are
+    kept; the payment settles them.
+    """
+    now = now or timezone.now()
+    settling = Payment.objects.filter(order=OuterRef('order_id'), status__in=SETTLING_PAYMENT_STATUSES)
+    released = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                StockReservation.objects.select_for_update(skip_locked=True)
+                .filter(status='held', expires_at__lte=now)
+                .filter(~Exists(settling))
+                .order_by('expires_at')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                return released
+            _release(StockReservation.objects.filter(pk__in=batch))
+            released += len(batch)
+
+
+def _shard_totals():
+    """Subquery: the summed shard quantity of the outer product"""
+    return (
+        StockShard.objects.filter(product=OuterRef('pk'))
+        .values('product')
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+
+
+def _hidden():
+    """An unavailable product that still has (reconciled) stock was hidden on purpose"""
+    return Q(available=False, stock__gt=0)
+
+
+def reconcile(product_ids=None):
+    """
+    Fold shard quantities back into ``Product.stock`` and ``available``.
+
+    Sold-out products become unavailable and come back once their shards
+    hold stock again; a product hidden while it had stock stays hidden.
+    Returns the ids of the sharded products that were reconciled.
+    """
+    products = Product.objects.filter(stock_shards__gt=0)
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+    ids = list(products.values_list('pk', flat=True))
+    if not ids:
+        return ids
+    Product.objects.filter(pk__in=ids).update(
+        stock=Coalesce(Subquery(_shard_totals()), 0),
+        # UPDATE এর ডান পাশে stock/available আগের মান
+        available=Case(
+            When(~Exists(StockShard.objects.filter(product=OuterRef('pk'), quantity__gt=0)), then=False),
+            When(_hidden(), then=False),
+            default=True,
+        ),
+        updated=timezone.now(),
+    )
+    return ids
+
+
+def live_stock():
+    """
+    ``annotate()`` expressions for the sellable stock of any product as of
+    now: the shard total for sharded products, ``stock`` otherwise.
+    """
+    return {
+        'live_stock': Case(
+            When(stock_shards__gt=0, then=Coalesce(Subquery(_shard_totals()), 0)),
+            default=F('stock'),
+            output_field=PositiveIntegerField(),
+        ),
+        'live_available': Case(
+            When(_hidden(), then=False),
+            When(stock_shards__gt=0, then=Exists(
+                StockShard.objects.filter(product=OuterRef('pk'), quantity__gt=0)
+            )),
+            default=F('available'),
+            output_field=BooleanField(),
+        ),
+    }
+
+
+def shard_product(product, shards, total=None):
+    """
+    Spread a product's sellable stock over ``shards`` rows (0 folds it back).
+
+    ``total`` overrides the quantity to distribute, e.g. after restocking.
+    Refuses while holds are outstanding, since they point at shard indexes.
+    """
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product.pk)
+        if product.reservations.filter(status='held').exists():
+            raise ValueError('Product has held reservations; run reconcile_stock first')
+        if total is None:
+            if product.stock_shards:
+                total = product.shards.aggregate(total=Sum('quantity'))['total'] or 0
+            else:
+                total = product.stock
+        product.shards.all().delete()
+        if shards:
+            base, extra = divmod(total, shards)
+            StockShard.objects.bulk_create([
+                StockShard(product=product, index=index, quantity=base + (1 if index < extra else 0))
+                for index in range(shards)
+            ])
+        hidden = not product.available and product.stock > 0
+        product.stock_shards = shards
+        product.stock = total
+        product.available = total > 0 and not hidden
+        product.save(update_fields=['stock_shards', 'stock', 'available', 'updated'])
+        return product
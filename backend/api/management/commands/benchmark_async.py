@@ -0,0 +1,203 @@
+import asyncio
+import io
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db.backends.signals import connection_created
+
+ENDPOINTS = {
+    'search': ('/api/search/', '/api/async/search/', {'q': 'খেজুর'}),
+    'autocomplete': ('/api/search/autocomplete/', '/api/async/search/autocomplete/', {'q': 'খে'}),
+    'statistics': ('/api/search/statistics/', '/api/async/search/statistics/', {}),
+}
+
+
+def _wsgi_get(handler, path, query):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+    response = handler(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        b''.join(response)
+    finally:
+        response.close()
+    return int(statuses[0].split()[0])
+
+
+async def _asgi_get(application, path, query):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    body_sent = False
+    statuses = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # ক্লায়েন্ট কখনো ডিসকানেক্ট করে না
+        await asyncio.Future()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+async def _load(get, connections, requests):
+    """``connections`` clients send ``requests`` requests in total, one at a time each"""
+    remaining = iter(range(requests))
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                status = await get()
+            except Exception:
+                status = None
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return time.perf_counter() - started, sorted(latencies), errors
+
+
+def _percentile(latencies, fraction):
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the sync (WSGI, thread pool) and async (ASGI) search views under concurrent '
+        'connections, in process and on the same hardware'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoint',
+            choices=sorted(ENDPOINTS),
+            default='search',
+            help='Endpoint to load (default: search)',
+        )
+        parser.add_argument(
+            '--query',
+            help='Search term (default: খেজুর, or খে for autocomplete)',
+        )
+        parser.add_argument(
+            '--connections',
+            default='1,10,50,200',
+            help='Comma separated numbers of concurrent connections (default: 1,10,50,200)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=1000,
+            help='Requests per concurrency level and server (default: 1000)',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='WSGI worker threads, like gunicorn --threads (default: 8)',
+        )
+        parser.add_argument(
+            '--db-latency',
+            type=float,
+            default=0.0,
+            metavar='MS',
+            help='Add this much latency to every query, like a database across the network (default: 0)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options['connections'].split(',')]
+        except ValueError:
+            raise CommandError('--connections: কমা দিয়ে আলাদা সংখ্যা দিন')
+        if min(levels) < 1 or options['requests'] < 1 or options['threads'] < 1:
+            raise CommandError('--connections, --requests এবং --threads অন্তত 1 হতে হবে')
+
+        sync_path, async_path, params = ENDPOINTS[options['endpoint']]
+        if options['query']:
+            params = {'q': options['query']}
+        query = urlencode(params)
+        if options['db_latency'] > 0:
+            delay = options['db_latency'] / 1000
+
+            def slow(execute, sql, params, many, context):
+                time.sleep(delay)
+                return execute(sql, params, many, context)
+
+            # প্রতিটি থ্রেডের নিজস্ব কানেকশনেও
+            connection_created.connect(
+                lambda sender, connection, **kwargs: connection.execute_wrappers.append(slow), weak=False
+            )
+        wsgi = get_wsgi_application()
+        asgi = get_asgi_application()
+        self.stdout.write(f'⚡ {sync_path} বনাম {async_path} {params or ""}')
+        asyncio.run(self.run(wsgi, asgi, sync_path, async_path, query, levels, options))
+
+    async def run(self, wsgi, asgi, sync_path, async_path, query, levels, options):
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            servers = (
+                (f'wsgi/{options["threads"]}t', lambda: loop.run_in_executor(pool, _wsgi_get, wsgi, sync_path, query)),
+                ('asgi', lambda: _asgi_get(asgi, async_path, query)),
+            )
+            # প্রথম রিকোয়েস্টে ইনডেক্স তৈরি হয়, মাপের বাইরে রাখুন
+            for name, get in servers:
+                status = await get()
+                if status != 200:
+                    raise CommandError(f'{name}: HTTP {status}')
+
+            self.stdout.write(
+                f'{"server":>8} {"conns":>6} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"max ms":>8} {"errors":>7}'
+            )
+            for connections in levels:
+                for name, get in servers:
+                    elapsed, latencies, errors = await _load(get, connections, options['requests'])
+                    self.stdout.write(
+                        f'{name:>8} {connections:>6} {len(latencies) / elapsed:>8.0f} '
+                        f'{statistics.median(latencies):>8.2f} {_percentile(latencies, 0.99):>8.2f} '
+                        f'{latencies[-1]:>8.2f} {errors:>7}'
+                    )
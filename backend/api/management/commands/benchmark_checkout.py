@@ -0,0 +1,87 @@
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from api.models import Category, Product
+from api.views import OrderViewSet
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark order placement latency and query count by cart size (all writes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1,5,10,25,50',
+            help='Comma separated cart sizes (default: 1,5,10,25,50)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Orders placed per cart size (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        factory = APIRequestFactory()
+        view = OrderViewSet.as_view({'post': 'create'})
+
+        self.stdout.write('🛒 চেকআউট বেঞ্চমার্ক (সব পরিবর্তন rollback হবে)')
+        self.stdout.write(f'{"cart size":>10} {"queries":>8} {"p50 ms":>8} {"p95 ms":>8}')
+
+        try:
+            with transaction.atomic():
+                category = Category.objects.create(name='Benchmark', slug='benchmark-checkout')
+                products = Product.objects.bulk_create([
+                    Product(
+                        category=category,
+                        name=f'Benchmark product {i}',
+                        slug=f'benchmark-checkout-{i}',
+                        price=Decimal('100.00'),
+                        stock=1_000_000,
+                    )
+                    for i in range(max(sizes))
+                ])
+
+                for size in sizes:
+                    payload = {
+                        'name': 'Benchmark',
+                        'email': 'bench@example.com',
+                        'phone': '01700000000',
+                        'address': 'Dhaka',
+                        'items': [
+                            {'product_id': product.id, 'quantity': 1}
+                            for product in products[:size]
+                        ],
+                    }
+                    timings = []
+                    queries = 0
+                    for _ in range(options['repeat']):
+                        request = factory.post('/api/orders/', payload, format='json')
+                        with CaptureQueriesContext(connection) as captured:
+                            started = time.perf_counter()
+                            response = view(request)
+                            timings.append((time.perf_counter() - started) * 1000)
+                        if response.status_code != 201:
+                            self.stderr.write(f'Unexpected response {response.status_code}: {response.data}')
+                            raise _Rollback
+                        queries = len(captured)
+
+                    timings.sort()
+                    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                    self.stdout.write(
+                        f'{size:>10} {queries:>8} {statistics.median(timings):>8.2f} {p95:>8.2f}'
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
@@ -0,0 +1,151 @@
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.fuzzy import FuzzyIndex, fold, threshold, trigrams, words
+from api.models import Category, Product
+from api.transliteration import transliterate
+
+# বাংলা সিলেবল আর তার বাংলিশ বানান; এগুলো জুড়ে কৃত্রিম শব্দ
+SYLLABLES = [
+    ('খে', 'khe'), ('জু', 'ju'), ('র', 'r'), ('ম', 'mo'), ('ধু', 'dhu'), ('বা', 'ba'), ('দা', 'da'),
+    ('কা', 'ka'), ('লো', 'lo'), ('জি', 'ji'), ('রা', 'ra'), ('মি', 'mi'), ('ষ্টি', 'shti'), ('সু', 'su'),
+    ('ন্দ', 'ndo'), ('চা', 'cha'), ('ল', 'l'), ('ঘি', 'ghi'), ('তে', 'te'), ('রে', 're'), ('টি', 'ti'),
+    ('পা', 'pa'), ('নি', 'ni'), ('গু', 'gu'), ('ড়', 'r'), ('শা', 'sha'), ('ভা', 'bha'), ('জা', 'ja'),
+    ('নু', 'nu'), ('দি', 'di'), ('বু', 'bu'), ('হ', 'ho'), ('লু', 'lu'), ('থা', 'tha'), ('ফু', 'phu'),
+    ('ছা', 'chha'), ('ঝা', 'jha'), ('কে', 'ke'), ('সো', 'so'), ('বি', 'bi'),
+]
+# বানান ভুলের সাধারণ জোড়া
+CONFUSABLE = {'ি': 'ী', 'ী': 'ি', 'ু': 'ূ', 'ূ': 'ু', 'ত': 'ট', 'ট': 'ত', 'স': 'শ', 'শ': 'ষ', 'ন': 'ণ', 'র': 'ড়'}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _make_word(rnd):
+    syllables = rnd.sample(SYLLABLES, rnd.randint(2, 4))
+    return ''.join(bengali for bengali, _ in syllables), ''.join(latin for _, latin in syllables)
+
+
+def _typo(rnd, word):
+    """One deletion or one commonly confused letter"""
+    positions = [i for i, char in enumerate(word) if char in CONFUSABLE]
+    if positions and rnd.random() < 0.6:
+        i = rnd.choice(positions)
+        return word[:i] + CONFUSABLE[word[i]] + word[i + 1:]
+    i = rnd.randrange(1, len(word))
+    return word[:i] + word[i + 1:]
+
+
+class Command(BaseCommand):
+    help = 'Recall and latency of fuzzy query correction on a generated catalog (writes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--products',
+            type=int,
+            nargs='+',
+            default=[2000, 20000],
+            help='Catalog sizes to measure (default: 2000 20000)',
+        )
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=300,
+            help='Queries per kind (default: 300)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=1,
+            help='Random seed (default: 1)',
+        )
+
+    def handle(self, *args, **options):
+        if options['queries'] < 1 or min(options['products']) < 1:
+            raise CommandError('--products আর --queries অন্তত 1 হতে হবে')
+        self.stdout.write(f'🎯 threshold {threshold()} (SEARCH_FUZZY_THRESHOLD)')
+        for size in options['products']:
+            try:
+                with transaction.atomic():
+                    self._measure(size, options['queries'], random.Random(options['seed']))
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _measure(self, size, query_count, rnd):
+        # শব্দভাণ্ডার ক্যাটালগের সাথে বাড়ে (প্রতি ৪টি পণ্যে ~১টি নতুন শব্দ)
+        vocabulary = {}
+        while len(vocabulary) < max(size // 4, 10):
+            bengali, latin = _make_word(rnd)
+            vocabulary.setdefault(bengali, latin)
+        pool = list(vocabulary)
+
+        category = Category.objects.create(name='বেঞ্চমার্ক', slug='benchmark-fuzzy')
+        names = [' '.join(rnd.sample(pool, 2)) for _ in range(size)]
+        Product.objects.bulk_create([
+            Product(
+                category=category, name=name, slug=f'benchmark-fuzzy-{i}', price=Decimal('100.00'),
+                description='', stock=1,
+            )
+            for i, name in enumerate(names)
+        ], batch_size=2000)
+
+        index = FuzzyIndex()
+        started = time.perf_counter()
+        index.build()
+        build_ms = (time.perf_counter() - started) * 1000
+
+        # তুলনার জন্য সরল পদ্ধতি: প্রতিটি শব্দের সাথে মিল
+        keys = {fold(word): trigrams(fold(word)) for name in Product.objects.values_list('name', flat=True)
+                for word in words(name)}
+
+        def linear(term):
+            best = None
+            for key in dict.fromkeys([fold(term), *map(fold, transliterate(term))]):
+                grams = trigrams(key)
+                for candidate, candidate_grams in keys.items():
+                    shared = len(grams & candidate_grams)
+                    similarity = shared / (len(grams) + len(candidate_grams) - shared)
+                    if similarity >= threshold() and (best is None or similarity > best[0]):
+                        best = (similarity, candidate)
+            return best and best[1]
+
+        targets = rnd.sample(pool, min(query_count, len(pool)))
+        kinds = {
+            'বাংলিশ': [(vocabulary[word], word) for word in targets],
+            'বাংলিশ, শেষ অক্ষর নেই': [(vocabulary[word][:-1], word) for word in targets],
+            'বাংলা বানান ভুল': [(_typo(rnd, word), word) for word in targets],
+        }
+        noise = [''.join(rnd.choices('qwxzvkp', k=6)) for _ in targets]
+
+        self.stdout.write(
+            f'\n📦 {size} পণ্য, {len(keys)} শব্দ, ইনডেক্স বিল্ড {build_ms:.0f} ms'
+        )
+        self.stdout.write(f'  {"কোয়েরি":<24} {"recall":>7} {"index p50/p95 ms":>18} {"linear p50 ms":>14}')
+        for kind, queries in kinds.items():
+            hits = 0
+            timings = []
+            for query, target in queries:
+                started = time.perf_counter()
+                corrected = index.correct(query, refresh=False)
+                timings.append((time.perf_counter() - started) * 1000)
+                if corrected is not None and fold(corrected) == fold(target):
+                    hits += 1
+            linear_timings = []
+            for query, _ in queries[:20]:
+                started = time.perf_counter()
+                linear(query)
+                linear_timings.append((time.perf_counter() - started) * 1000)
+            p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+            self.stdout.write(
+                f'  {kind:<24} {hits / len(queries):>7.1%} '
+                f'{statistics.median(timings):>8.3f}/{p95:<9.3f} {statistics.median(linear_timings):>14.2f}'
+            )
+        corrected_noise = sum(1 for query in noise if index.correct(query, refresh=False))
+        self.stdout.write(f'  {"এলোমেলো অক্ষর (ভুল সংশোধন)":<24} {corrected_noise / len(noise):>7.1%}')
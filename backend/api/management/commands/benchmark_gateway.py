@@ -0,0 +1,103 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.gateways import GatewayClient, GatewayError
+from api.mock_gateway import MockGateway
+from api.payments import new_transaction_id
+
+
+class Command(BaseCommand):
+    help = 'Throughput and latency of the gateway client against an in-process mock gateway (no database writes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Initiate calls per run (default: 2000)',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=16,
+            help='Concurrent callers, like PAYMENT_JOB_WORKERS (default: 16)',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.005,
+            help='Simulated gateway latency in seconds (default: 0.005)',
+        )
+        parser.add_argument(
+            '--failure-rate',
+            type=float,
+            default=0.05,
+            help='Share of HTTP 503 answers in the flaky run (default: 0.05)',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['threads'] < 1:
+            raise CommandError('--requests আর --threads অন্তত 1 হতে হবে')
+        if not 0 <= options['failure_rate'] < 1:
+            raise CommandError('--failure-rate 0 থেকে 1 এর মধ্যে হতে হবে')
+        self.stdout.write(
+            f'🏦 {options["requests"]} initiate কল, {options["threads"]} থ্রেড, '
+            f'গেটওয়ে latency {options["latency"] * 1000:.0f} ms'
+        )
+        self.stdout.write(
+            f'  {"ক্লায়েন্ট":<28} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} '
+            f'{"কানেকশন":>8} {"ব্যর্থ":>6} {"রিপ্লে":>6}'
+        )
+        runs = [
+            ('প্রতি রিকোয়েস্টে নতুন কানেকশন', {'pool_size': 0}, 0.0),
+            ('keep-alive pool', {'pool_size': options['threads']}, 0.0),
+            (f'pool, {options["failure_rate"]:.0%} 503 + retry', {'pool_size': options['threads']},
+             options['failure_rate']),
+        ]
+        for label, client_options, failure_rate in runs:
+            self._run(label, client_options, failure_rate, options)
+
+    def _run(self, label, client_options, failure_rate, options):
+        gateway = MockGateway(latency=options['latency'], failure_rate=failure_rate, seed=1).start()
+        client = GatewayClient(gateway.url, retries=3, backoff=0.01, **client_options)
+        timings = []
+        failures = []
+        lock = threading.Lock()
+
+        def call(_):
+            payment = SimpleNamespace(
+                transaction_id=new_transaction_id(), amount=Decimal('100.00'),
+                payment_method='bkash', mobile_number='01700000000',
+            )
+            started = time.perf_counter()
+            try:
+                client.initiate(payment)
+            except GatewayError:
+                with lock:
+                    failures.append(payment.transaction_id)
+            with lock:
+                timings.append((time.perf_counter() - started) * 1000)
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(options['threads']) as executor:
+                list(executor.map(call, range(options['requests'])))
+            elapsed = time.perf_counter() - started
+        finally:
+            client.close()
+            gateway.stop()
+        p95 = statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+        self.stdout.write(
+            f'  {label:<28} {len(timings) / elapsed:>8.0f} {statistics.median(timings):>8.2f} {p95:>8.2f} '
+            f'{client.pool.opened:>8} {len(failures):>6} {gateway.stats["replayed"]:>6}'
+        )
+        if gateway.stats['created'] != options['requests'] - len(failures):
+            self.stdout.write(self.style.WARNING(
+                f'  ⚠️ গেটওয়েতে {gateway.stats["created"]} পেমেন্ট তৈরি হয়েছে'
+            ))
@@ -0,0 +1,89 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import Category, Product
+from api.renderers import FastJSONRenderer
+from api.serializers import ProductReadSerializer, ProductSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare ProductSerializer + JSONRenderer with the values() fast path (writes are rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=1000,
+            help='Products in the listing (default: 1000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=10,
+            help='Timed runs per path (default: 10)',
+        )
+
+    def _time(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best * 1000, result
+
+    def handle(self, *args, **options):
+        request = Request(APIRequestFactory().get('/api/products/'))
+        repeat = options['repeat']
+
+        try:
+            with transaction.atomic():
+                category = Category.objects.create(name='Benchmark', slug='benchmark-serializers')
+                Product.objects.bulk_create([
+                    Product(
+                        category=category,
+                        name=f'বেঞ্চমার্ক পণ্য {i}',
+                        slug=f'benchmark-serializers-{i}',
+                        price=Decimal('123.45'),
+                        description='আজওয়া খেজুর ' * 10,
+                        image=f'products/benchmark/{i}.jpg',
+                        stock=i,
+                    )
+                    for i in range(options['products'])
+                ])
+                queryset = Product.objects.filter(category=category)
+
+                def model_path():
+                    products = queryset.select_related('category')
+                    data = ProductSerializer(products, many=True, context={'request': request}).data
+                    return JSONRenderer().render(data)
+
+                def fast_path():
+                    rows = ProductReadSerializer.values(queryset)
+                    data = ProductReadSerializer(request).many(rows)
+                    return FastJSONRenderer().render(data)
+
+                model_ms, model_bytes = self._time(model_path, repeat)
+                fast_ms, fast_bytes = self._time(fast_path, repeat)
+
+                self.stdout.write(f'📦 {options["products"]} পণ্য, {len(fast_bytes)} bytes')
+                self.stdout.write(f'  ModelSerializer + JSONRenderer : {model_ms:8.2f} ms')
+                self.stdout.write(f'  values() + FastJSONRenderer    : {fast_ms:8.2f} ms')
+                self.stdout.write(f'  speedup                        : {model_ms / fast_ms:8.1f}x')
+                if model_bytes == fast_bytes:
+                    self.stdout.write(self.style.SUCCESS('✅ রেসপন্স byte-for-byte একই'))
+                else:
+                    self.stdout.write(self.style.ERROR('❌ রেসপন্স আলাদা!'))
+                raise _Rollback
+        except _Rollback:
+            pass
@@ -0,0 +1,141 @@
+import io
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api import renditions
+from api.image_jobs import job_runner
+from api.models import Category, Product
+from api.views import ProductViewSet
+
+MODES = ('sync', 'thread', 'process')
+
+
+class Command(BaseCommand):
+    help = (
+        'Upload product images concurrently and measure request latency and processing '
+        'throughput per IMAGE_JOB_MODE (created products and files are deleted afterwards)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--uploads',
+            type=int,
+            default=24,
+            help='Images uploaded per mode (default: 24)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Simultaneous upload requests (default: 8)',
+        )
+        parser.add_argument(
+            '--width',
+            type=int,
+            default=3000,
+            help='Width of the uploaded photo in pixels, 4:3 (default: 3000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='IMAGE_JOB_WORKERS for the thread/process modes (default: 2)',
+        )
+        parser.add_argument(
+            '--modes',
+            default='sync,process',
+            help=f'Comma separated job modes to compare, from {", ".join(MODES)} (default: sync,process)',
+        )
+
+    def _photo(self, width):
+        # নয়েজ থাকলে এনকোডিং আসল ছবির মতো ভারী হয়
+        size = (width, width * 3 // 4)
+        image = Image.merge('RGB', [Image.effect_noise(size, 40 + 20 * band) for band in range(3)])
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=90)
+        return buffer.getvalue()
+
+    def _upload(self, category, photo, index, tag):
+        request = APIRequestFactory().post('/api/products/', {
+            'name': f'Upload benchmark {tag} {index}',
+            'slug': f'benchmark-upload-{tag}-{index}',
+            'category_id': category.pk,
+            'price': '100.00',
+            # শেষে কয়েকটা বাইট যোগ: ছবি একই থাকে, কিন্তু হ্যাশ আলাদা হওয়ায় dedupe হয় না
+            'image': SimpleUploadedFile(
+                f'bench-{index}.jpg', photo + f'{tag}-{index}'.encode(), content_type='image/jpeg'
+            ),
+        }, format='multipart')
+        force_authenticate(request, user=User(username='benchmark', is_staff=True, is_superuser=True))
+        try:
+            started = time.perf_counter()
+            response = ProductViewSet.as_view({'post': 'create'})(request)
+            elapsed = (time.perf_counter() - started) * 1000
+        finally:
+            # WSGI handler এর মতো: আপলোডের টেম্প ফাইল বন্ধ
+            request.close()
+            connections.close_all()
+        if response.status_code != 201:
+            raise CommandError(f'Unexpected response {response.status_code}: {response.data}')
+        return elapsed
+
+    def _run(self, mode, category, photo, options):
+        uploads = options['uploads']
+        with override_settings(IMAGE_JOB_MODE=mode, IMAGE_JOB_WORKERS=options['workers']):
+            job_runner.shutdown()
+            started = time.perf_counter()
+            with ThreadPoolExecutor(options['concurrency']) as threads:
+                latencies = list(threads.map(
+                    lambda index: self._upload(category, photo, index, mode), range(uploads)
+                ))
+            accepted = time.perf_counter() - started
+
+            products = Product.objects.filter(category=category, slug__startswith=f'benchmark-upload-{mode}-')
+            while products.filter(image_status__in=('pending', 'processing')).exists():
+                time.sleep(0.05)
+            finished = time.perf_counter() - started
+            job_runner.shutdown()
+
+        failed = products.filter(image_status='failed').count()
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        self.stdout.write(
+            f'{mode:>8} {statistics.median(latencies):>8.0f} {p95:>8.0f} '
+            f'{uploads / accepted:>10.1f} {uploads / finished:>10.1f} {failed:>7}'
+        )
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f'Unknown modes: {", ".join(sorted(unknown))}')
+
+        photo = self._photo(options['width'])
+        self.stdout.write(
+            f'📤 আপলোড বেঞ্চমার্ক: {options["uploads"]} টি ছবি ({len(photo) // 1024} KB), '
+            f'একসাথে {options["concurrency"]} টি রিকোয়েস্ট'
+        )
+        self.stdout.write(
+            f'{"mode":>8} {"p50 ms":>8} {"p95 ms":>8} {"accepted/s":>10} {"ready/s":>10} {"failed":>7}'
+        )
+
+        category = Category.objects.create(name='Upload benchmark', slug='benchmark-uploads')
+        storage = Product._meta.get_field('image').storage
+        try:
+            for mode in modes:
+                self._run(mode, category, photo, options)
+        finally:
+            images = Product.objects.filter(category=category).exclude(image='').values_list('image', flat=True)
+            for image in images:
+                renditions.delete(storage, image)
+                storage.delete(image)
+            category.delete()
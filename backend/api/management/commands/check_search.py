@@ -1,31 +1,74 @@
 # emarket/backend/api/management/commands/check_search.py
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Min
+from django.utils import timezone
 from api.models import Product
+from api.search_backends import backend_name
+from api.search_backends.sqlite import FTS_TABLE, SQLiteFTSBackend
 
 
 class Command(BaseCommand):
-    help = 'Check search vector status'
-    
+    help = 'Check search vector status, FTS table drift and missing FTS triggers'
+    # হারানো ট্রিগার নিজেই রিপোর্ট করে, api.E001 এ আটকে না গিয়ে
+    requires_system_checks = []
+
     def handle(self, *args, **options):
         total = Product.objects.count()
         with_vectors = Product.objects.filter(search_vector__isnull=False).count()
         without_vectors = Product.objects.filter(search_vector__isnull=True).count()
-        
+        stale = Product.objects.filter(search_dirty=True)
+        backlog = stale.count()
+        oldest_stale = stale.aggregate(oldest=Min('updated'))['oldest']
+
         self.stdout.write('🔍 সার্চ ভেক্টর স্ট্যাটাস রিপোর্ট:')
         self.stdout.write('=' * 50)
         self.stdout.write(f'📊 মোট পণ্য: {total}')
         self.stdout.write(f'✅ সার্চ ভেক্টর আছে: {with_vectors}')
         self.stdout.write(f'❌ সার্চ ভেক্টর নেই: {without_vectors}')
-        
-        if without_vectors > 0:
+        self.stdout.write(f'🕒 আপডেটের অপেক্ষায় (backlog): {backlog}')
+        if oldest_stale is not None:
+            age = timezone.now() - oldest_stale
+            self.stdout.write(f'⏳ সবচেয়ে পুরনো stale ভেক্টরের বয়স: {age}')
+        self.stdout.write(f'⚙️ সার্চ ব্যাকএন্ড (SEARCH_BACKEND): {backend_name()}')
+
+        fts_backend = SQLiteFTSBackend()
+        if connection.vendor == 'sqlite' and fts_backend.available():
+            with connection.cursor() as cursor:
+                cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+                indexed = cursor.fetchone()[0]
+            self.stdout.write(f'📚 {FTS_TABLE} এ পণ্য: {indexed}')
+            missing = fts_backend.missing_triggers()
+            if missing:
+                # ট্রিগার ছাড়া টেবিল আর আপডেট হয় না (migrate নিজে আবার তৈরি করে, বাইরে হারালে)
+                raise CommandError(
+                    f'❌ {FTS_TABLE} এর ট্রিগার নেই: {", ".join(missing)}। '
+                    'ঠিক করতে: python manage.py update_search_vectors'
+                )
+            if indexed != total:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'\n⚠️ FTS টেবিল পণ্যের সাথে মেলে না। '
+                        'ঠিক করতে: python manage.py update_search_vectors'
+                    )
+                )
+            else:
+                self.stdout.write(self.style.SUCCESS('\n🎉 FTS টেবিল সব পণ্যের সাথে সিঙ্কড!'))
+        elif connection.vendor != 'postgresql':
             self.stdout.write(
                 self.style.WARNING(
-                    f'\n⚠️ {without_vectors} টি পণ্যের সার্চ ভেক্টর নেই। '
+                    f'\n⚠️ {connection.vendor} ডাটাবেসে search_vector ব্যবহার হয় না।'
+                )
+            )
+        elif backlog > 0:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'\n⚠️ {backlog} টি পণ্যের সার্চ ভেক্টর পুরনো। '
                     'আপডেট করতে: python manage.py update_search_vectors'
                 )
             )
         else:
             self.stdout.write(
                 self.style.SUCCESS('\n🎉 সব পণ্যের সার্চ ভেক্টর আপডেটেড!')
-            )
\ No newline at end of file
+            )
@@ -0,0 +1,103 @@
+import sys
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import exports
+from api.models import Payment
+
+
+class Command(BaseCommand):
+    help = 'Stream orders with their items or payments as flat NDJSON/CSV rows (constant memory)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Output file, or - for stdout',
+        )
+        parser.add_argument(
+            '--format',
+            choices=exports.FORMATS,
+            help='Output format (default: from the extension, ndjson otherwise)',
+        )
+        parser.add_argument(
+            '--record',
+            choices=exports.RECORDS,
+            default='items',
+            help='One row per order item (with a payment summary) or per payment (default: items)',
+        )
+        parser.add_argument('--from', dest='date_from', help='Orders created at/after this ISO date or datetime')
+        parser.add_argument('--to', dest='date_to', help='Orders created at/before this ISO date (whole day) or datetime')
+        parser.add_argument(
+            '--paid',
+            choices=('true', 'false'),
+            help='Only paid or only unpaid orders',
+        )
+        parser.add_argument(
+            '--payment-status',
+            help='Comma separated payment statuses, e.g. completed,failed',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Orders per fetch; items and payments are prefetched per chunk (default: 1000)',
+        )
+        parser.add_argument(
+            '--trace-memory',
+            action='store_true',
+            help='Report peak Python memory used by the export',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+
+        filters = {}
+        try:
+            if options['date_from']:
+                filters['date_from'] = exports.parse_moment(options['date_from'])
+            if options['date_to']:
+                filters['date_to'] = exports.parse_moment(options['date_to'], end_of_day=True)
+        except ValueError as exc:
+            raise CommandError(f'তারিখ বোঝা যায়নি: {exc}')
+        if options['paid']:
+            filters['paid'] = options['paid'] == 'true'
+        statuses = [status for status in (options['payment_status'] or '').split(',') if status]
+        unknown = set(statuses) - {choice for choice, _ in Payment.ORDER_STATUS_CHOICES}
+        if unknown:
+            raise CommandError(f'অজানা payment status: {", ".join(sorted(unknown))}')
+
+        orders = exports.orders_for_export(payment_statuses=statuses, **filters)
+        rows = exports.export_rows(
+            orders, options['record'], chunk_size=options['chunk_size'], payment_statuses=statuses
+        )
+
+        try:
+            stream = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f'ফাইল খোলা যায়নি: {exc}')
+        if options['trace_memory']:
+            tracemalloc.start()
+        started = time.perf_counter()
+        written = 0
+        try:
+            for chunk in exports.encode_rows(rows, fmt, exports.COLUMNS[options['record']]):
+                stream.write(chunk)
+                written += 1
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        elapsed = time.perf_counter() - started
+
+        if fmt == 'csv':
+            written -= 1  # হেডার
+        if path != '-':
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {written} টি সারি {path} এ লেখা হয়েছে ({written / elapsed if elapsed else 0:.0f} rows/s)'
+            ))
+        if options['trace_memory']:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.stderr.write(f'📈 সর্বোচ্চ মেমোরি: {peak / 1024 / 1024:.1f} MB')
@@ -0,0 +1,64 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import catalog_io
+from api.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Stream the product catalog to a CSV or JSONL file that import_products can read back'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Output file, or - for stdout',
+        )
+        parser.add_argument(
+            '--format',
+            choices=catalog_io.FORMATS,
+            help='File format (default: from the extension, csv otherwise)',
+        )
+        parser.add_argument(
+            '--category',
+            help='Only products of this category slug',
+        )
+        parser.add_argument(
+            '--available-only',
+            action='store_true',
+            help='Skip unavailable products',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Products read per query (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = catalog_io.detect_format(path, options['format'])
+
+        products = Product.objects.all()
+        if options['category']:
+            products = products.filter(category__slug=options['category'])
+        if options['available_only']:
+            products = products.filter(available=True)
+
+        try:
+            stream = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        except OSError as exc:
+            raise CommandError(f'ফাইল খোলা যায়নি: {exc}')
+        started = time.perf_counter()
+        try:
+            written = catalog_io.write_rows(stream, catalog_io.export_rows(products, options['batch_size']), fmt)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        elapsed = time.perf_counter() - started
+
+        if path != '-':
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {written} টি পণ্য {path} এ লেখা হয়েছে ({written / elapsed if elapsed else 0:.0f} rows/s)'
+            ))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import renditions
+from api.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnail/WebP renditions for existing product images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default=','.join(renditions.RENDITION_SIZES),
+            help=f'Comma separated sizes (default: {",".join(renditions.RENDITION_SIZES)})',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate renditions that already exist',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Products per batch (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        sizes = [size.strip() for size in options['sizes'].split(',') if size.strip()]
+        unknown = set(sizes) - set(renditions.RENDITION_SIZES)
+        if unknown:
+            raise CommandError(f'Unknown sizes: {", ".join(sorted(unknown))}')
+
+        storage = Product._meta.get_field('image').storage
+        products = Product.objects.exclude(image='').exclude(image__isnull=True)
+        total = products.count()
+        self.stdout.write(f'🖼️ {total} টি পণ্যের ছবির রেন্ডিশন তৈরি হচ্ছে...')
+
+        done = written = failed = 0
+        for ids in products.id_batches(options['batch_size']):
+            for image in Product.objects.filter(id__in=ids).values_list('image', flat=True):
+                try:
+                    written += len(renditions.generate(
+                        storage, image, sizes=sizes, force=options['force']
+                    ))
+                except renditions.RenditionError as exc:
+                    failed += 1
+                    self.stderr.write(f'❌ {exc}')
+            done += len(ids)
+            self.stdout.write(f'  {done}/{total}')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {written} টি রেন্ডিশন লেখা হয়েছে'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠️ {failed} টি ছবি পড়া যায়নি'))
@@ -0,0 +1,81 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import catalog_io
+
+
+class Command(BaseCommand):
+    help = 'Upsert products (matched by slug) from a CSV or JSONL file in batches, in constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help=f'CSV or JSONL file, or - for stdin (columns: {", ".join(catalog_io.FIELDS)})',
+        )
+        parser.add_argument(
+            '--format',
+            choices=catalog_io.FORMATS,
+            help='File format (default: from the extension, csv otherwise)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows per transaction (default: 500)',
+        )
+        parser.add_argument(
+            '--create-categories',
+            action='store_true',
+            help='Create categories whose slug does not exist yet instead of rejecting the row',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Run every batch and roll it back; reports throughput without changing data',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size অন্তত 1 হতে হবে')
+        path = options['path']
+        fmt = catalog_io.detect_format(path, options['format'])
+
+        importer = catalog_io.ProductImporter(
+            batch_size=options['batch_size'],
+            create_categories=options['create_categories'],
+            dry_run=options['dry_run'],
+        )
+        if importer.dry_run:
+            self.stdout.write('🔍 dry run: প্রতিটি ব্যাচ rollback হবে')
+        self.stdout.write(f'📥 {path} থেকে পণ্য ইমপোর্ট হচ্ছে ({fmt})...')
+
+        def progress(importer):
+            stats = importer.stats
+            self.stdout.write(
+                f'  নতুন {stats["created"]}, আপডেট {stats["updated"]}, অপরিবর্তিত {stats["unchanged"]}, '
+                f'ভুল {stats["errors"]} ({importer.rows_per_second:.0f} rows/s)'
+            )
+
+        try:
+            stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        except OSError as exc:
+            raise CommandError(f'ফাইল খোলা যায়নি: {exc}')
+        try:
+            stats = importer.run(catalog_io.read_records(stream, fmt), progress=progress)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for line, message in importer.errors:
+            self.stderr.write(f'❌ line {line}: {message}')
+        if stats['errors'] > len(importer.errors):
+            self.stderr.write(f'… আরও {stats["errors"] - len(importer.errors)} টি ভুল')
+
+        done = 'হতো' if importer.dry_run else 'হয়েছে'
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {stats["created"]} টি নতুন, {stats["updated"]} টি আপডেট {done}, '
+            f'{stats["unchanged"]} টি অপরিবর্তিত ({importer.rows_per_second:.0f} rows/s)'
+        ))
+        if stats['errors']:
+            self.stdout.write(self.style.WARNING(f'⚠️ {stats["errors"]} টি সারি বাদ পড়েছে'))
@@ -0,0 +1,140 @@
+import posixpath
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import Product
+from api.renditions import rendition_names
+from api.signals import products_changed
+from api.storage import addressed_name, content_hash, is_addressed
+
+
+class Command(BaseCommand):
+    help = (
+        'Move product images to content-addressed names (deduplicating copies) '
+        'and delete media files no product refers to'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be renamed and deleted',
+        )
+        parser.add_argument(
+            '--skip-gc',
+            action='store_true',
+            help='Rewrite image paths but do not delete unreferenced files',
+        )
+        parser.add_argument(
+            '--grace-minutes',
+            type=int,
+            default=60,
+            help='Never delete files younger than this; uploads are stored before their row commits (default: 60)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Products per batch (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        field = Product._meta.get_field('image')
+        self.storage = field.storage
+        self.dry_run = options['dry_run']
+        if self.dry_run:
+            self.stdout.write('🔍 dry run: কিছুই লেখা বা মোছা হবে না')
+
+        renamed = self.rewrite(field, options['batch_size'])
+        if not options['skip_gc']:
+            root = field.upload_to.split('/')[0]
+            self.collect_garbage(root, renamed, timedelta(minutes=options['grace_minutes']))
+
+    def rewrite(self, field, batch_size):
+        """Give every image a content-addressed name; returns ``{old: new}``"""
+        products = Product.objects.exclude(image='').exclude(image__isnull=True)
+        total = products.count()
+        self.stdout.write(f'🖼️ {total} টি পণ্যের ছবির পাথ যাচাই হচ্ছে...')
+
+        renamed = {}
+        missing = set()
+        done = updated = 0
+        for ids in products.id_batches(batch_size):
+            rows = Product.objects.filter(id__in=ids).values_list('id', 'image')
+            changed = {}
+            for pk, name in rows:
+                if is_addressed(name) or name in missing:
+                    continue
+                if name not in renamed:
+                    try:
+                        renamed[name] = self.address(field, name)
+                    except OSError as exc:
+                        missing.add(name)
+                        self.stderr.write(f'❌ {name}: {exc}')
+                        continue
+                changed.setdefault(name, []).append(pk)
+
+            if changed and not self.dry_run:
+                now = timezone.now()
+                for name, pks in changed.items():
+                    Product.objects.filter(id__in=pks, image=name).update(image=renamed[name], updated=now)
+                products_changed([pk for pks in changed.values() for pk in pks])
+            updated += sum(len(pks) for pks in changed.values())
+            done += len(ids)
+            self.stdout.write(f'  {done}/{total}')
+
+        unique = len(set(renamed.values()))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {updated} টি পণ্যের পাথ বদল, {len(renamed)} টি পুরনো ফাইল -> {unique} টি ইউনিক ফাইল'
+        ))
+        if missing:
+            self.stdout.write(self.style.WARNING(f'⚠️ {len(missing)} টি ফাইল পাওয়া যায়নি, পাথ বদলানো হয়নি'))
+        return renamed
+
+    def address(self, field, name):
+        """Content-addressed name of ``name``, copying the file there unless dry run"""
+        requested = field.generate_filename(None, posixpath.basename(name))
+        with self.storage.open(name, 'rb') as original:
+            if self.dry_run:
+                return addressed_name(posixpath.dirname(requested), content_hash(original), posixpath.splitext(name)[1])
+            # storage নিজেই হ্যাশ করে; একই কনটেন্ট আগে থাকলে নতুন করে লেখে না
+            return self.storage.save(requested, original)
+
+    def walk(self, directory):
+        directories, files = self.storage.listdir(directory)
+        for name in files:
+            yield posixpath.join(directory, name)
+        for child in directories:
+            yield from self.walk(posixpath.join(directory, child))
+
+    def collect_garbage(self, root, renamed, grace):
+        referenced = set()
+        for name in Product.objects.exclude(image='').exclude(image__isnull=True).values_list('image', flat=True):
+            # dry run এ পাথ এখনো পুরনো, নতুন নামটাকেই রেফারেন্স ধরুন
+            name = renamed.get(name, name)
+            referenced.add(name)
+            referenced.update(rendition_names(name))
+
+        if not self.storage.exists(root):
+            return
+        cutoff = timezone.now() - grace
+        deleted = freed = skipped = 0
+        for name in self.walk(root):
+            if name in referenced:
+                continue
+            if self.storage.get_modified_time(name) > cutoff:
+                skipped += 1
+                continue
+            freed += self.storage.size(name)
+            deleted += 1
+            if not self.dry_run:
+                self.storage.delete(name)
+
+        verb = 'মোছা হবে' if self.dry_run else 'মোছা হয়েছে'
+        self.stdout.write(self.style.SUCCESS(
+            f'🗑️ {deleted} টি অপ্রয়োজনীয় ফাইল {verb} ({freed / 1024 / 1024:.1f} MB)'
+        ))
+        if skipped:
+            self.stdout.write(f'ℹ️ {skipped} টি নতুন ফাইল grace সময়ের মধ্যে, রেখে দেওয়া হলো')
@@ -0,0 +1,81 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api import image_jobs
+from api.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Process product images still waiting for the background job runner (e.g. after a restart)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also retry images whose processing failed',
+        )
+        parser.add_argument(
+            '--stuck',
+            action='store_true',
+            help='Also reclaim images left in "processing" by a worker that died',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Worker processes for decoding/encoding, 0 to run inline (default: 2)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Products per batch (default: 100)',
+        )
+
+    def handle(self, *args, **options):
+        statuses = ['pending']
+        if options['retry_failed']:
+            statuses.append('failed')
+        if options['stuck']:
+            statuses.append('processing')
+
+        products = Product.objects.filter(image_status__in=statuses)
+        total = products.count()
+        self.stdout.write(f'🖼️ {total} টি পণ্যের ছবি প্রসেস হচ্ছে ({", ".join(statuses)})...')
+
+        workers = options['workers']
+        results = Counter()
+        done = 0
+        if workers:
+            processes = ProcessPoolExecutor(workers)
+            threads = ThreadPoolExecutor(workers)
+
+            def run(product_id):
+                try:
+                    return image_jobs.process(product_id, executor=processes, statuses=statuses)
+                finally:
+                    connections.close_all()
+        else:
+            processes = threads = None
+
+            def run(product_id):
+                return image_jobs.process(product_id, statuses=statuses)
+
+        try:
+            for ids in products.id_batches(options['batch_size']):
+                results.update(threads.map(run, ids) if threads else map(run, ids))
+                done += len(ids)
+                self.stdout.write(f'  {done}/{total}')
+        finally:
+            if threads is not None:
+                threads.shutdown()
+                processes.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {results["ready"]} টি ছবি তৈরি'))
+        if results['failed']:
+            self.stdout.write(self.style.WARNING(f'⚠️ {results["failed"]} টি ছবি পড়া যায়নি'))
+        if results[None]:
+            self.stdout.write(f'ℹ️ {results[None]} টি অন্য worker আগেই নিয়েছে')
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from api import inventory
+from api.signals import products_changed
+
+
+class Command(BaseCommand):
+    help = 'Release expired stock reservations and fold shard stock back into products'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Reservations released per transaction (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        released = inventory.release_expired(batch_size=options['batch_size'])
+        self.stdout.write(f'🔓 মেয়াদোত্তীর্ণ রিজার্ভেশন রিলিজ: {released}')
+
+        reconciled = inventory.reconcile()
+        products_changed(reconciled)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(reconciled)} টি শার্ডেড পণ্যের স্টক মিলানো হয়েছে'
+        ))
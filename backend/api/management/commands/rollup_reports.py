@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from api import reports
+
+
+def _date(value):
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise CommandError(f'তারিখ বোঝা যায়নি: {value}')
+    return day
+
+
+class Command(BaseCommand):
+    help = 'Fold new days of orders and payments into the daily summary tables (safe to re-run)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Re-summarize from this ISO date (default: after the last summarized day, minus the lookback)',
+        )
+        parser.add_argument(
+            '--until',
+            help='Last ISO date to summarize (default: yesterday)',
+        )
+        parser.add_argument(
+            '--include-today',
+            action='store_true',
+            help='Also summarize today so far; the next run redoes it',
+        )
+        parser.add_argument(
+            '--lookback',
+            type=int,
+            help='Summarized days to redo for late payment updates (default: REPORT_LOOKBACK_DAYS or 3)',
+        )
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=31,
+            help='Days per transaction (default: 31)',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_days'] < 1:
+            raise CommandError('--chunk-days অন্তত 1 হতে হবে')
+        days = reports.pending_days(
+            since=_date(options['since']) if options['since'] else None,
+            until=_date(options['until']) if options['until'] else None,
+            include_today=options['include_today'],
+            lookback=options['lookback'],
+        )
+        if days is None:
+            self.stdout.write(self.style.SUCCESS('✅ নতুন কোনো দিন নেই'))
+            return
+
+        first, last = days
+        self.stdout.write(f'📊 {first} থেকে {last} পর্যন্ত দৈনিক সারাংশ তৈরি হচ্ছে...')
+        started = time.perf_counter()
+        total = 0
+        for chunk_first, chunk_last in reports.rollup(first, last, chunk_days=options['chunk_days']):
+            total += (chunk_last - chunk_first).days + 1
+            self.stdout.write(f'  {chunk_first} – {chunk_last}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {total} দিনের সারাংশ তৈরি হয়েছে ({time.perf_counter() - started:.1f}s)'
+        ))
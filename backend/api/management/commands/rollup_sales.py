@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import exports, sales
+from api.models import CategorySales, ProductSales
+
+
+class Command(BaseCommand):
+    help = 'Backfill or rebuild the hourly/daily sales rollups and trending scores from order items'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only rebuild buckets from this ISO date (local midnight); default: everything',
+        )
+        parser.add_argument(
+            '--prune-hourly',
+            type=int,
+            metavar='DAYS',
+            help='Afterwards delete hourly buckets older than DAYS (daily and trending rows are kept)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per INSERT (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = exports.parse_moment(options['since'])
+            except ValueError as exc:
+                raise CommandError(f'তারিখ বোঝা যায়নি: {exc}')
+
+        scope = f'{since:%Y-%m-%d} থেকে' if since else 'সব'
+        self.stdout.write(f'📊 {scope} অর্ডার থেকে বিক্রির রোলআপ তৈরি হচ্ছে...')
+        started = time.perf_counter()
+        written = sales.rebuild(since=since, batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        trending = (
+            ProductSales.objects.filter(period='trend').count(),
+            CategorySales.objects.filter(period='trend').count(),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {written} টি বাকেট লেখা হয়েছে, ট্রেন্ডিং: {trending[0]} টি পণ্য, '
+            f'{trending[1]} টি ক্যাটাগরি ({elapsed:.1f}s)'
+        ))
+
+        if options['prune_hourly'] is not None:
+            deleted = sales.prune_hourly(options['prune_hourly'])
+            self.stdout.write(f'🧹 {deleted} টি পুরনো ঘণ্টার বাকেট মুছে ফেলা হয়েছে')
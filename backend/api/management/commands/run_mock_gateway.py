@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.mock_gateway import MockGateway
+
+
+class Command(BaseCommand):
+    help = 'Serve the local mock payment gateway (the default PAYMENT_GATEWAY_URL) until interrupted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--host',
+            default='127.0.0.1',
+            help='Interface to listen on (default: 127.0.0.1)',
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8765,
+            help='Port to listen on (default: 8765)',
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.0,
+            help='Seconds to wait before answering each request (default: 0)',
+        )
+        parser.add_argument(
+            '--failure-rate',
+            type=float,
+            default=0.0,
+            help='Share of requests answered with HTTP 503 (default: 0)',
+        )
+        parser.add_argument(
+            '--callback-delay',
+            type=float,
+            help='Seconds after a verify to POST the signed callback (default: no callbacks)',
+        )
+
+    def handle(self, *args, **options):
+        if not 0 <= options['failure_rate'] <= 1:
+            raise CommandError('--failure-rate 0 থেকে 1 এর মধ্যে হতে হবে')
+        gateway = MockGateway(
+            options['host'], options['port'],
+            latency=options['latency'],
+            failure_rate=options['failure_rate'],
+            callback_delay=options['callback_delay'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'🏦 মক গেটওয়ে চালু: {gateway.url} (বন্ধ করতে Ctrl+C)'))
+        try:
+            gateway.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            gateway.server.server_close()
+        self.stdout.write(
+            f'📊 {gateway.stats["requests"]} রিকোয়েস্ট, {gateway.stats["created"]} পেমেন্ট, '
+            f'{gateway.stats["replayed"]} রিপ্লে, {gateway.stats["callbacks"]} callback'
+        )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import inventory
+from api.models import Product
+
+
+class Command(BaseCommand):
+    help = "Spread a hot product's stock over several rows (0 shards folds it back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_id', type=int)
+        parser.add_argument(
+            '--shards',
+            type=int,
+            default=8,
+            help='Number of stock rows (default: 8, 0 to un-shard)',
+        )
+        parser.add_argument(
+            '--total',
+            type=int,
+            help='Sellable quantity to distribute (default: current stock)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            product = Product.objects.get(pk=options['product_id'])
+        except Product.DoesNotExist:
+            raise CommandError(f'Product {options["product_id"]} পাওয়া যায়নি')
+        if options['shards'] < 0:
+            raise CommandError('--shards ঋণাত্মক হতে পারে না')
+
+        try:
+            product = inventory.shard_product(product, options['shards'], options['total'])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {product.name}: {product.stock} স্টক {product.stock_shards} টি শার্ডে'
+        ))
@@ -1,74 +1,115 @@
-from django.core.management.base import BaseCommand
-from django.contrib.postgres.search import SearchVector
-from django.db.models import F, Value
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from api.models import Product
+from api.search_backends.sqlite import FTS_TABLE, SQLiteFTSBackend
+
+fts_backend = SQLiteFTSBackend()
 
 
 class Command(BaseCommand):
-    help = 'Update search vectors for all products'
-    
+    help = (
+        'Update stale search vectors in small keyset-paginated batches '
+        '(or recreate the SQLite FTS triggers and refill the FTS table)'
+    )
+    # এই কমান্ডই api.E001 (ট্রিগার নেই) ঠিক করে, তাই সেই চেকে আটকানো যাবে না
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild every product, not only the ones marked stale',
+        )
+        parser.add_argument(
+            '--since',
+            help='Only products updated at/after this ISO date or datetime',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Products per UPDATE (default: 1000)',
+        )
+        parser.add_argument(
+            '--resume-from',
+            type=int,
+            default=0,
+            help='Continue a previous run after this product id',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0,
+            help='Seconds to pause between batches to ease load on the primary',
+        )
+
+    def _parse_since(self, value):
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f'--since এর তারিখ বোঝা যায়নি: {value}')
+            moment = timezone.datetime(day.year, day.month, day.day)
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
     def handle(self, *args, **options):
         self.stdout.write('🔄 সার্চ ভেক্টর আপডেট শুরু হচ্ছে...')
-        
-        total = Product.objects.count()
-        self.stdout.write(f'📊 মোট পণ্য: {total}')
-        
-        if total == 0:
-            self.stdout.write(self.style.WARNING('⚠️ কোনো পণ্য পাওয়া যায়নি'))
-            return
-        
-        try:
-            # Method 1: Direct SQL (most reliable)
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    UPDATE api_product p
-                    SET search_vector = 
-                        setweight(to_tsvector('english', coalesce(p.name, '')), 'A') ||
-                        setweight(to_tsvector('english', coalesce(p.description, '')), 'B') ||
-                        setweight(to_tsvector('english', coalesce(c.name, '')), 'C')
-                    FROM api_category c
-                    WHERE p.category_id = c.id
-                """)
-            
+
+        if connection.vendor == 'sqlite' and fts_backend.available():
+            # FTS টেবিল ট্রিগারে সিঙ্ক থাকে; এটা শুধু রিস্টোর/ট্রিগার ছাড়া লোডের পরে,
+            # বা migrate এর বাইরে ট্রিগার হারালে (api.E001)
+            started = time.monotonic()
+            missing = fts_backend.missing_triggers()
+            rows = fts_backend.rebuild()
+            if missing:
+                self.stdout.write(f'🔧 ট্রিগার আবার তৈরি হয়েছে: {", ".join(missing)}')
             self.stdout.write(self.style.SUCCESS(
-                f'✅ {total} টি পণ্যের সার্চ ভেক্টর আপডেট হয়েছে (Direct SQL)'
+                f'✅ {FTS_TABLE} নতুন করে ভরা হয়েছে: {rows} টি পণ্য ({time.monotonic() - started:.1f}s)'
             ))
-            
-        except Exception as e:
+            return
+
+        if connection.vendor != 'postgresql':
             self.stdout.write(self.style.WARNING(
-                f'⚠️ Direct SQL failed: {str(e)[:100]}'
+                f'⚠️ {connection.vendor} ডাটাবেসে search_vector সাপোর্ট নেই, কিছু করা হয়নি'
             ))
-            
-            # Method 2: Loop through each product
-            try:
-                updated = 0
-                for product in Product.objects.select_related('category').all():
-                    # Create search text
-                    search_text = f"{product.name} {product.description}"
-                    if product.category:
-                        search_text += f" {product.category.name}"
-                    
-                    # Update using Django ORM (simpler)
-                    Product.objects.filter(pk=product.pk).update(
-                        search_vector=SearchVector(
-                            Value(product.name), 
-                            Value(product.description),
-                            Value(product.category.name if product.category else '')
-                        )
-                    )
-                    updated += 1
-                
-                self.stdout.write(self.style.SUCCESS(
-                    f'✅ {updated} টি পণ্যের সার্চ ভেক্টর আপডেট হয়েছে (Loop method)'
-                ))
-                
-            except Exception as e2:
-                self.stdout.write(self.style.ERROR(
-                    f'❌ সার্চ ভেক্টর আপডেট ব্যর্থ: {str(e2)[:100]}'
-                ))
-                self.stdout.write(
-                    self.style.WARNING(
-                        '⚠️ Fallback: Using simple search without vectors'
-                    )
-                )
\ No newline at end of file
+            return
+
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size অন্তত 1 হতে হবে')
+
+        products = Product.objects.all()
+        if not options['all']:
+            products = products.filter(search_dirty=True)
+        if options['since']:
+            products = products.filter(updated__gte=self._parse_since(options['since']))
+
+        total = products.filter(id__gt=options['resume_from']).count()
+        self.stdout.write(f'📊 আপডেট করতে হবে: {total} টি পণ্য')
+
+        if total == 0:
+            self.stdout.write(self.style.SUCCESS('✅ সব সার্চ ভেক্টর আপডেটেড'))
+            return
+
+        updated = 0
+        started = time.monotonic()
+        for ids in products.id_batches(batch_size, start_after=options['resume_from']):
+            # প্রতিটি ব্যাচ আলাদা UPDATE, তাই টেবিল লম্বা সময় লক থাকে না
+            updated += Product.objects.filter(id__in=ids).refresh_search_vectors()
+            self.stdout.write(
+                f'  … {updated}/{total} (last id {ids[-1]}, '
+                f'resume with --resume-from {ids[-1]})'
+            )
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {updated} টি পণ্যের সার্চ ভেক্টর আপডেট হয়েছে ({elapsed:.1f}s)'
+        ))
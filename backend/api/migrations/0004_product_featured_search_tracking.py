@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:57
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_payment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='featured',
+            field=models.BooleanField(default=False, verbose_name='Featured Product'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_dirty',
+            field=models.BooleanField(db_index=True, default=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_indexed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['name'], name='api_product_name_73c704_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category'], name='api_product_categor_5c53c5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['featured'], name='api_product_feature_74b041_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_stock_reservations'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-created', '-id'], name='api_order_created_86ef2e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['-created', '-id'], name='api_payment_created_98a03e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-created', '-id'], name='api_product_created_4e8abf_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, verbose_name='Updated At'),
+        ),
+    ]
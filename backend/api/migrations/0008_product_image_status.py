@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:16
+
+from django.db import migrations, models
+
+
+def mark_existing_images_ready(apps, schema_editor):
+    # আগের ছবিগুলো আপলোডের সময়েই যাচাই হয়েছিল; রেন্ডিশন lazy ভাবে তৈরি হবে
+    Product = apps.get_model('api', 'Product')
+    Product.objects.exclude(image__isnull=True).exclude(image='').update(image_status='ready')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_category_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='image_error',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Image Error'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='image_status',
+            field=models.CharField(choices=[('none', 'No Image'), ('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='none', editable=False, max_length=20, verbose_name='Image Status'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['image_status'], name='api_product_image_s_609522_idx'),
+        ),
+        migrations.RunPython(mark_existing_images_ready, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:21
+
+import api.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_product_image_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=api.storage.ContentAddressedStorage(), upload_to='products/', verbose_name='Product Image'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTermDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('searches', models.PositiveIntegerField(default=0)),
+                ('zero_results', models.PositiveIntegerField(default=0)),
+                ('results', models.PositiveBigIntegerField(default=0)),
+                ('clicks', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Search Term (Daily)',
+                'verbose_name_plural': 'Search Terms (Daily)',
+                'ordering': ['-day', '-searches'],
+                'indexes': [models.Index(fields=['day', 'term'], name='api_searcht_day_e4cf2e_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchtermdaily',
+            constraint=models.UniqueConstraint(fields=('term', 'day'), name='unique_search_term_day'),
+        ),
+    ]
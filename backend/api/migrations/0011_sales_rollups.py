@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_search_term_daily'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategorySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('trend', 'Trending')], max_length=5)),
+                ('start', models.DateTimeField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales', to='api.category')),
+            ],
+            options={
+                'verbose_name': 'Category Sales',
+                'verbose_name_plural': 'Category Sales',
+                'ordering': ['-start'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('trend', 'Trending')], max_length=5)),
+                ('start', models.DateTimeField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('score', models.FloatField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sales', to='api.product')),
+            ],
+            options={
+                'verbose_name': 'Product Sales',
+                'verbose_name_plural': 'Product Sales',
+                'ordering': ['-start'],
+                'indexes': [models.Index(fields=['period', 'start', '-score'], name='api_product_period_e65c4b_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='productsales',
+            constraint=models.UniqueConstraint(fields=('product', 'period', 'start'), name='unique_product_sales_bucket'),
+        ),
+        migrations.AddIndex(
+            model_name='categorysales',
+            index=models.Index(fields=['period', 'start', '-score'], name='api_categor_period_711b96_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='categorysales',
+            constraint=models.UniqueConstraint(fields=('category', 'period', 'start'), name='unique_category_sales_bucket'),
+        ),
+    ]
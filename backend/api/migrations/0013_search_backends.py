@@ -0,0 +1,56 @@
+from django.db import migrations, transaction
+from django.db.utils import OperationalError
+
+FTS_TABLE = 'api_product_fts'
+
+# Django এই ট্রিগারগুলো চেনে না। SQLite এ api_product বা api_category এর কোনো
+# ফিল্ড বদলানো মাইগ্রেশন টেবিল নতুন করে তৈরি করে: ট্রিগার মুছে যায় বা rename
+# ব্যর্থ হয়। তাই এখানে তৈরি হয় না; migrate এর শেষে post_migrate এ তৈরি হয় আর
+# শুরুতে pre_migrate এ সরানো হয় (api.signals)। বাইরে থেকে হারালে:
+# python manage.py update_search_vectors (চেক api.E001)
+SQLITE_TRIGGERS = (
+    'api_product_fts_insert', 'api_product_fts_update', 'api_product_fts_delete', 'api_category_fts_rename',
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS api_product_search_vector_gin ON api_product USING gin (search_vector)'
+        )
+    elif connection.vendor == 'sqlite':
+        try:
+            with transaction.atomic(using=connection.alias):
+                schema_editor.execute(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(name, description, category, tokenize='trigram')"
+                )
+        except OperationalError:
+            # SQLite < 3.34 এ trigram নেই; sqlite ব্যাকএন্ড তখন icontains এ চলে
+            return
+        schema_editor.execute(f'''
+            INSERT INTO {FTS_TABLE} (rowid, name, description, category)
+            SELECT p.id, p.name, p.description, c.name
+            FROM api_product p JOIN api_category c ON c.id = p.category_id
+        ''')
+
+
+def drop_search_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS api_product_search_vector_gin')
+    elif connection.vendor == 'sqlite':
+        for name in SQLITE_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_daily_summaries'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
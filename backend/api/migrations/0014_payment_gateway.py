@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_search_backends'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='gateway_detail',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='gateway_reference',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+    ]
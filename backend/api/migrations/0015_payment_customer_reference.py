@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_payment_gateway'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='customer_reference',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='gateway_reference',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+    ]
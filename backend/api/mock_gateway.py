@@ -0,0 +1,184 @@
+# api/mock_gateway.py
+
+"""
+A local stand-in for the payment gateways, speaking the protocol described
+in ``api.gateways``.  ``run_mock_gateway`` serves it for development,
+``benchmark_gateway`` and the tests start one in-process on a free port.
+
+Answers every ``POST /payments`` with a new reference (``status``
+``pending``) and every ``POST /payments/<transaction_id>/verify`` with
+``completed``, or ``failed`` for references starting with ``FAIL``.
+Responses are remembered per ``Idempotency-Key`` and replayed for repeats,
+like a real gateway.  ``latency`` and ``failure_rate`` (share of HTTP 503
+answers) simulate a slow or flaky gateway, ``drop_next`` closes the
+connection without answering the next N requests after processing them
+(a lost response), and with ``callback_delay`` set a signed callback with
+the final status is POSTed to the payment's ``callback_url``.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_VERIFY_PATH = re.compile(r'^/payments/([^/]+)/verify$')
+_PAYMENT_PATH = re.compile(r'^/payments/([^/]+)$')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive, যাতে ক্লায়েন্টের connection pool কাজে লাগে
+    protocol_version = 'HTTP/1.1'
+    # হেডার আর বডি এক সাথে পাঠানো; আলাদা পাঠালে Nagle + delayed ACK এ ~40ms দেরি
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _answer(self, status, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        match = _PAYMENT_PATH.match(self.path)
+        payment = match and self.server.gateway.payments.get(match.group(1))
+        if payment is None:
+            return self._answer(404, {'error': 'unknown payment'})
+        self._answer(200, payment)
+
+    def do_POST(self):
+        gateway = self.server.gateway
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._answer(400, {'error': 'invalid JSON'})
+        gateway.count('requests')
+        if gateway.latency:
+            time.sleep(gateway.latency)
+        if gateway.failure_rate and gateway.random.random() < gateway.failure_rate:
+            return self._answer(503, {'error': 'temporarily unavailable'})
+
+        key = self.headers.get('Idempotency-Key')
+        with gateway.lock:
+            replay = gateway.responses.get(key) if key else None
+        if replay is not None:
+            gateway.count('replayed')
+            status, answer = replay
+        else:
+            status, answer = gateway.handle(self.path, payload)
+            if key and status < 500:
+                with gateway.lock:
+                    gateway.responses[key] = (status, answer)
+        if gateway.take_drop():
+            # প্রসেস হয়েছে কিন্তু উত্তর হারিয়ে গেল
+            self.close_connection = True
+            return
+        self._answer(status, answer)
+
+
+class MockGateway:
+    """In-process gateway server; ``start()``, then point ``PAYMENT_GATEWAY_URL`` at ``url``"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, failure_rate=0.0,
+                 callback_delay=None, secret=None, drop_next=0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.callback_delay = callback_delay
+        self.secret = secret
+        self.drop_next = drop_next
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.payments = {}
+        self.responses = {}
+        self.stats = {'requests': 0, 'created': 0, 'replayed': 0, 'callbacks': 0}
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.gateway = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def take_drop(self):
+        with self.lock:
+            if self.drop_next <= 0:
+                return False
+            self.drop_next -= 1
+            return True
+
+    def handle(self, path, payload):
+        """``(status, answer)`` for a request that is not a replay"""
+        if path == '/payments':
+            transaction_id = payload.get('transaction_id')
+            if not transaction_id or not payload.get('amount'):
+                return 400, {'error': 'transaction_id and amount are required'}
+            with self.lock:
+                self.stats['created'] += 1
+                payment = self.payments[transaction_id] = {
+                    'transaction_id': transaction_id,
+                    'reference': f'MGW{self.stats["created"]:010d}',
+                    'status': 'pending',
+                    'callback_url': payload.get('callback_url'),
+                }
+            return 201, {'reference': payment['reference'], 'status': 'pending'}
+
+        match = _VERIFY_PATH.match(path)
+        if match is None:
+            return 404, {'error': 'not found'}
+        with self.lock:
+            payment = self.payments.get(match.group(1))
+        if payment is None:
+            return 404, {'error': 'unknown payment'}
+        reference = str(payload.get('reference') or '')
+        if not reference:
+            return 400, {'error': 'reference is required'}
+        status = 'failed' if reference.upper().startswith('FAIL') else 'completed'
+        payment.update(status=status, reference=reference)
+        if self.callback_delay is not None and payment['callback_url']:
+            timer = threading.Timer(self.callback_delay, self._callback, args=(dict(payment),))
+            timer.daemon = True
+            timer.start()
+        return 200, {'reference': reference, 'status': status}
+
+    def _callback(self, payment):
+        from .payments import sign
+
+        body = json.dumps({
+            'transaction_id': payment['transaction_id'],
+            'status': payment['status'],
+            'reference': payment['reference'],
+        }).encode()
+        request = urllib.request.Request(payment['callback_url'], data=body, method='POST', headers={
+            'Content-Type': 'application/json',
+            'X-Signature': sign(body, self.secret.encode() if self.secret else None),
+        })
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+            self.count('callbacks')
+        except OSError:
+            pass
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread is not None:
+            self._thread.join()
@@ -1,10 +1,17 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import connection, models
 from django.contrib.auth.models import User
-from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.contrib.postgres.search import SearchVectorField
+from django.utils import timezone
+
+from .storage import product_image_storage
 
 class Category(models.Model):
     name = models.CharField(max_length=100, verbose_name="Category Name")
     slug = models.SlugField(max_length=100, unique=True, verbose_name="Category Slug")
+    # ETag/Last-Modified এর জন্য (পণ্যের রেসপন্সে ক্যাটাগরির নামও থাকে)
+    updated = models.DateTimeField(auto_now=True, verbose_name="Updated At")
     
     class Meta:
         verbose_name = "Category"
@@ -13,9 +20,77 @@ class Category(models.Model):
     
     def __str__(self):
         return self.name
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_name = instance.__dict__.get('name')
+        return instance
+    
+    @property
+    def name_changed(self):
+        return not self._state.adding and self.name != getattr(self, '_loaded_name', self.name)
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_name = self.name
+
+
+class ProductQuerySet(models.QuerySet):
+    def refresh_search_vectors(self):
+        """
+        Rebuild ``search_vector`` for the products in this queryset with one
+        set-based UPDATE (name A, description B, category name C) and clear
+        their ``search_dirty`` flag.  Returns the number of rows updated, or
+        ``None`` when the database has no full-text search support.
+        """
+        if connection.vendor != 'postgresql':
+            return None
+        ids_sql, ids_params = self.order_by().values('id').query.sql_with_params()
+        product_table = Product._meta.db_table
+        category_table = Category._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                UPDATE {product_table} p
+                SET search_vector =
+                        setweight(to_tsvector('english', coalesce(p.name, '')), 'A') ||
+                        setweight(to_tsvector('english', coalesce(p.description, '')), 'B') ||
+                        setweight(to_tsvector('english', coalesce(c.name, '')), 'C'),
+                    search_dirty = false,
+                    search_indexed_at = %s
+                FROM {category_table} c
+                WHERE p.category_id = c.id AND p.id IN ({ids_sql})
+            """, [timezone.now(), *ids_params])
+            return cursor.rowcount
+    
+    def id_batches(self, batch_size, start_after=0):
+        """
+        Yield ascending lists of ids, ``batch_size`` at a time.
+        
+        Batches are keyset-paginated on ``id`` so every batch costs the same
+        no matter how deep into the table we are, and a run can be resumed
+        from the last id it reported.
+        """
+        last_id = start_after
+        while True:
+            ids = list(
+                self.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return
+            yield ids
+            last_id = ids[-1]
 
 
 class Product(models.Model):
+    IMAGE_STATUS_CHOICES = [
+        ('none', 'No Image'),
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    
     category = models.ForeignKey(
         Category, 
         on_delete=models.CASCADE, 
@@ -24,12 +99,23 @@ class Product(models.Model):
     )
     name = models.CharField(max_length=200, verbose_name="Product Name")
     slug = models.SlugField(max_length=200, unique=True, verbose_name="Product Slug")
+    # কনটেন্ট হ্যাশ দিয়ে নাম: products/ab/cd/<sha256>.jpg (api.storage)
     image = models.ImageField(
-        upload_to='products/%Y/%m/%d/', 
+        upload_to='products/',
+        storage=product_image_storage,
         blank=True, 
         null=True,
         verbose_name="Product Image"
     )
+    # আপলোডের পর ছবি ব্যাকগ্রাউন্ডে প্রসেস হয় (api.image_jobs)
+    image_status = models.CharField(
+        max_length=20,
+        choices=IMAGE_STATUS_CHOICES,
+        default='none',
+        editable=False,
+        verbose_name="Image Status"
+    )
+    image_error = models.CharField(max_length=255, blank=True, editable=False, verbose_name="Image Error")
     price = models.DecimalField(
         max_digits=10, 
         decimal_places=2, 
@@ -38,12 +124,22 @@ class Product(models.Model):
     description = models.TextField(blank=True, verbose_name="Description")
     stock = models.PositiveIntegerField(default=0, verbose_name="Stock Quantity")
     available = models.BooleanField(default=True, verbose_name="Is Available?")
+    # ০ হলে স্টক এই রো তেই থাকে; >০ হলে StockShard রো গুলোতে ভাগ করা (হট পণ্যের জন্য)
+    stock_shards = models.PositiveSmallIntegerField(default=0, verbose_name="Stock Shards")
     featured = models.BooleanField(default=False, verbose_name="Featured Product")  # ✅ নতুন ফিল্ড যোগ করুন
     created = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
     updated = models.DateTimeField(auto_now=True, verbose_name="Updated At")
     
     # সার্চ অপটিমাইজেশনের জন্য নতুন ফিল্ড (সিম্পল ভার্সন)
     search_vector = SearchVectorField(null=True, blank=True)
+    # নাম/বিবরণ/ক্যাটাগরি বদলালে True হয়, ভেক্টর আপডেট হলে False
+    search_dirty = models.BooleanField(default=True, db_index=True, editable=False)
+    search_indexed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    objects = ProductQuerySet.as_manager()
+    
+    # এই ফিল্ডগুলো বদলালে search_vector পুরনো হয়ে যায়
+    SEARCH_SOURCE_FIELDS = ('name', 'description', 'category_id')
     
     class Meta:
         ordering = ['-created']
@@ -54,11 +150,50 @@ class Product(models.Model):
             models.Index(fields=['name']),
             models.Index(fields=['category']),
             models.Index(fields=['featured']),  # ✅ নতুন ইন্ডেক্স যোগ করুন
+            # keyset পেজিনেশন (created, id) ক্রমে চলে
+            models.Index(fields=['-created', '-id']),
+            models.Index(fields=['image_status']),
         ]
     
     def __str__(self):
         return self.name
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._search_source = instance._get_search_source()
+        instance._image_source = instance.__dict__.get('image') or ''
+        return instance
+    
+    def _get_search_source(self):
+        return tuple(self.__dict__.get(field) for field in self.SEARCH_SOURCE_FIELDS)
+    
+    def _image_changed(self):
+        if self._state.adding:
+            return bool(self.image)
+        if 'image' in self.get_deferred_fields():
+            return False
+        return (self.image.name or '') != getattr(self, '_image_source', '')
+    
+    def save(self, *args, **kwargs):
+        """
+        Mark the search vector stale whenever an indexed field changes, and
+        queue a new image for processing (see ``api.signals``).
+        """
+        update_fields = kwargs.get('update_fields')
+        if self._state.adding or self._get_search_source() != getattr(self, '_search_source', None):
+            self.search_dirty = True
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = set(update_fields) | {'search_dirty'}
+        if (update_fields is None or 'image' in update_fields) and self._image_changed():
+            self.image_status = 'pending' if self.image else 'none'
+            self.image_error = ''
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'image_status', 'image_error'}
+        super().save(*args, **kwargs)
+        self._search_source = self._get_search_source()
+        self._image_source = self.image.name or ''
+    
     def get_image_url(self):
         """Return full image URL"""
         if self.image and hasattr(self.image, 'url'):
@@ -66,16 +201,17 @@ class Product(models.Model):
         return None
     
     def update_search_vector(self):
-        """Search vector আপডেট করার মেথড (ম্যানুয়ালি কল করতে হবে)"""
-        try:
-            from django.contrib.postgres.search import SearchVector
-            Product.objects.filter(pk=self.pk).update(
-                search_vector=SearchVector('name', weight='A') +
-                              SearchVector('description', weight='B')
-            )
-        except Exception:
-            # If PostgreSQL extensions not available, skip
-            pass
+        """
+        Search vector আপডেট করার মেথড (save এর পরে স্বয়ংক্রিয়ভাবে কল হয়)
+        
+        Returns False when the database has no full-text search support;
+        database errors are not swallowed.
+        """
+        updated = Product.objects.filter(pk=self.pk).refresh_search_vectors()
+        if updated is None:
+            return False
+        self.search_dirty = False
+        return True
 
 
 class Order(models.Model):
@@ -102,6 +238,9 @@ class Order(models.Model):
         ordering = ['-created']
         verbose_name = "Order"
         verbose_name_plural = "Orders"
+        indexes = [
+            models.Index(fields=['-created', '-id']),
+        ]
     
     def __str__(self):
         return f"Order #{self.id} - {self.name}"
@@ -157,11 +296,210 @@ class Payment(models.Model):
     ])
     status = models.CharField(max_length=20, choices=ORDER_STATUS_CHOICES, default='pending')
     mobile_number = models.CharField(max_length=15, blank=True, null=True)
+    # গেটওয়ে initiate এ যে রেফারেন্স দেয়
+    gateway_reference = models.CharField(max_length=100, blank=True, default='', editable=False)
+    # গ্রাহক যে TrxID জমা দেন; এটিই যাচাই হয়
+    customer_reference = models.CharField(max_length=100, blank=True, default='')
+    # গেটওয়ের শেষ সমস্যা (টাইমআউট, প্রত্যাখ্যান); api.payments লেখে
+    gateway_detail = models.CharField(max_length=255, blank=True, default='', editable=False)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(fields=['-created', '-id']),
+        ]
+    
+    def __str__(self):
+        return f"Payment #{self.transaction_id} - {self.order.name}"
+
+
+class StockShard(models.Model):
+    """
+    One slice of a hot product's sellable stock.
+    
+    Spreading stock over several rows lets concurrent checkouts of the same
+    product lock different rows.  ``Product.stock`` is the folded total,
+    maintained by ``api.inventory.reconcile``.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='shards')
+    index = models.PositiveSmallIntegerField()
+    quantity = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'index'], name='unique_stock_shard'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id}#{self.index}: {self.quantity}"
+
+
+class StockReservation(models.Model):
+    """Stock held for an order while the customer goes through payment"""
+    STATUS_CHOICES = [
+        ('held', 'Held'),
+        ('committed', 'Committed'),
+        ('released', 'Released'),
+    ]
+    
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    # কোন শার্ড থেকে নেওয়া (শার্ড না থাকলে null)
+    shard_index = models.PositiveSmallIntegerField(null=True, blank=True)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='held')
+    expires_at = models.DateTimeField()
+    created = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} for Order #{self.order_id} ({self.status})"
+
+
+class SearchTermDaily(models.Model):
+    """
+    Per-day search counts for one normalized term.
+    
+    Written only in batches by ``api.search_analytics``, never from the
+    search request itself.
+    """
+    term = models.CharField(max_length=100)
+    day = models.DateField()
+    searches = models.PositiveIntegerField(default=0)
+    # কতবার কোনো ফলাফল আসেনি
+    zero_results = models.PositiveIntegerField(default=0)
+    # ফলাফলের মোট সংখ্যা (গড় বের করতে)
+    results = models.PositiveBigIntegerField(default=0)
+    clicks = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-day', '-searches']
+        verbose_name = "Search Term (Daily)"
+        verbose_name_plural = "Search Terms (Daily)"
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'day'], name='unique_search_term_day'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'term']),
+        ]
+    
+    def __str__(self):
+        return f"{self.term} ({self.day}): {self.searches}"
+
+
+class SalesRollup(models.Model):
+    """
+    Sales of one product or category in one time bucket (``api.sales``).
+    
+    ``hour`` and ``day`` buckets start at the local hour/midnight.  A
+    ``trend`` row starts at the current trending landmark and holds the
+    running forward-decayed score that trending lists are ordered by.
+    """
+    PERIOD_CHOICES = [
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+        ('trend', 'Trending'),
+    ]
+    
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    start = models.DateTimeField()
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    orders = models.PositiveIntegerField(default=0)
+    # প্রতিটি বিক্রি quantity * 2^((ঘণ্টা - landmark) / half-life)
+    score = models.FloatField(default=0)
+    
+    class Meta:
+        abstract = True
+
+
+class ProductSales(SalesRollup):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='sales')
+    
+    class Meta:
+        ordering = ['-start']
+        verbose_name = "Product Sales"
+        verbose_name_plural = "Product Sales"
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'period', 'start'], name='unique_product_sales_bucket'),
+        ]
+        indexes = [
+            # ট্রেন্ডিং: period='trend', start=landmark, score অনুযায়ী
+            models.Index(fields=['period', 'start', '-score']),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} {self.period} {self.start:%Y-%m-%d %H:%M}: {self.quantity}"
+
+
+class CategorySales(SalesRollup):
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='sales')
+    
+    class Meta:
+        ordering = ['-start']
+        verbose_name = "Category Sales"
+        verbose_name_plural = "Category Sales"
+        constraints = [
+            models.UniqueConstraint(fields=['category', 'period', 'start'], name='unique_category_sales_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'start', '-score']),
+        ]
+    
+    def __str__(self):
+        return f"{self.category_id} {self.period} {self.start:%Y-%m-%d %H:%M}: {self.quantity}"
+
+
+class DailySalesSummary(models.Model):
+    """
+    One local day of orders, pre-aggregated by ``api.reports`` so reports
+    never scan ``Order``/``OrderItem``.
+    """
+    day = models.DateField(unique=True)
+    orders = models.PositiveIntegerField(default=0)
+    paid_orders = models.PositiveIntegerField(default=0)
+    items_sold = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    paid_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-day']
+        verbose_name = "Daily Sales Summary"
+        verbose_name_plural = "Daily Sales Summaries"
+    
+    def __str__(self):
+        return f"{self.day}: {self.orders} orders, {self.revenue}"
+    
+    @property
+    def average_order_value(self):
+        return (self.revenue / self.orders).quantize(Decimal('0.01')) if self.orders else Decimal('0.00')
+
+
+class DailyPaymentSummary(models.Model):
+    """Payments of one local day per method and status (``api.reports``)"""
+    day = models.DateField()
+    payment_method = models.CharField(max_length=50)
+    status = models.CharField(max_length=20)
+    count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        ordering = ['-day', 'payment_method', 'status']
+        verbose_name = "Daily Payment Summary"
+        verbose_name_plural = "Daily Payment Summaries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'payment_method', 'status'], name='unique_daily_payment_summary'
+            ),
+        ]
     
     def __str__(self):
-        return f"Payment #{self.transaction_id} - {self.order.name}"
\ No newline at end of file
+        return f"{self.day} {self.payment_method}/{self.status}: {self.count}"
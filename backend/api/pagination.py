@@ -0,0 +1,242 @@
+# api/pagination.py
+
+"""
+Keyset (cursor) pagination.
+
+Instead of ``OFFSET n`` every page continues from the sort key of the last
+row it returned (``WHERE (created, id) < (...)``), so page 500 costs the same
+index seek as page 1 and rows inserted meanwhile never shift a page.  The
+ordering comes from the queryset (``OrderingFilter``, the view's
+``ordering`` or the model's ``Meta.ordering``) with ``pk`` appended as a
+tiebreaker; the ordering fields must be non-null model fields.
+"""
+
+import base64
+import binascii
+import datetime
+import decimal
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.core.paginator import Paginator
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+INVALID_CURSOR = 'Invalid cursor'
+
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+def _json_default(value):
+    # DjangoJSONEncoder মাইক্রোসেকেন্ড কেটে ফেলে, keyset এ পুরো মান দরকার
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f'{type(value).__name__} is not cursor serializable')
+
+
+def encode_cursor(payload):
+    data = json.dumps(payload, separators=(',', ':'), default=_json_default)
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor from ``encode_cursor``; raises ``NotFound`` if it is garbage"""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(data)
+    except (TypeError, ValueError, binascii.Error):
+        raise NotFound(INVALID_CURSOR)
+    if not isinstance(payload, dict):
+        raise NotFound(INVALID_CURSOR)
+    return payload
+
+
+def keyset_q(ordering, position):
+    """
+    Rows strictly after ``position`` in ``ordering``.
+
+    ``ordering`` is ``[(name, descending), ...]``; the result is the
+    lexicographic ``(a < x) | (a = x & b < y) | ...`` condition.
+    """
+    condition = Q()
+    equal = {}
+    for (name, descending), value in zip(ordering, position):
+        lookup = 'lt' if descending else 'gt'
+        condition |= Q(**equal, **{f'{name}__{lookup}': value})
+        equal[name] = value
+    return condition
+
+
+def truthy_param(request, name, default=True):
+    # DRF Request বা async ভিউ এর সাধারণ HttpRequest
+    value = getattr(request, 'query_params', request.GET).get(name)
+    if value is None:
+        return default
+    return value.lower() not in FALSE_VALUES
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination for ``ModelViewSet`` lists.
+
+    The response is ``{count, next, previous, results}``; ``?count=false``
+    drops the ``COUNT(*)`` for clients that only need next/previous.
+    """
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """The queryset's effective ordering with a ``pk`` tiebreaker"""
+        query = queryset.query
+        order_by = list(query.order_by or (query.default_ordering and queryset.model._meta.ordering) or [])
+        opts = queryset.model._meta
+        ordering = []
+        for name in order_by:
+            if not isinstance(name, str) or name == '?' or '__' in name:
+                raise ImproperlyConfigured(
+                    f'KeysetPagination cannot paginate on {name!r}; order by model fields only'
+                )
+            field, descending = name.lstrip('-'), name.startswith('-')
+            if field == 'pk':
+                field = opts.pk.name
+            try:
+                model_field = opts.get_field(field)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(f'KeysetPagination cannot paginate on unknown field {field!r}')
+            if model_field.is_relation:
+                raise ImproperlyConfigured(f'KeysetPagination cannot paginate on relation {field!r}')
+            ordering.append((field, descending))
+        if opts.pk.name not in [field for field, _ in ordering]:
+            # একই created এ একাধিক রো থাকলে id দিয়ে স্থির ক্রম
+            ordering.append((opts.pk.name, ordering[0][1] if ordering else False))
+        return ordering
+
+    def _position(self, row):
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self.ordering]
+        return [getattr(row, self.opts.get_field(name).attname) for name, _ in self.ordering]
+
+    def _decode_position(self, payload):
+        position = payload.get('p')
+        if (
+            payload.get('o') != self._signature
+            or not isinstance(position, list)
+            or len(position) != len(self.ordering)
+        ):
+            raise NotFound(INVALID_CURSOR)
+        try:
+            return [
+                self.opts.get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, position)
+            ]
+        except Exception:
+            raise NotFound(INVALID_CURSOR)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.opts = queryset.model._meta
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self._signature = ','.join(('-' if desc else '') + name for name, desc in self.ordering)
+        self.with_count = truthy_param(request, self.count_query_param)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        reverse = False
+        position = None
+        if cursor:
+            payload = decode_cursor(cursor)
+            reverse = bool(payload.get('r'))
+            position = self._decode_position(payload)
+
+        self.count = queryset.count() if self.with_count else None
+
+        # পেছনের পেজের জন্য ক্রম উল্টে নিয়ে আবার উল্টাই
+        ordering = [(name, desc != reverse) for name, desc in self.ordering]
+        queryset = queryset.order_by(*[('-' if desc else '') + name for name, desc in ordering])
+        if position is not None:
+            queryset = queryset.filter(keyset_q(ordering, position))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else position is not None
+        self.next_position = self._position(rows[-1]) if rows and has_next else None
+        self.previous_position = self._position(rows[0]) if rows and has_previous else None
+        return rows
+
+    def _link(self, position, reverse):
+        if position is None:
+            return None
+        payload = {'p': position, 'o': self._signature}
+        if reverse:
+            payload['r'] = 1
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(payload))
+
+    def get_next_link(self):
+        return self._link(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        return self._link(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.with_count:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {'type': 'integer', 'example': 123},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class DeferredJoinPaginator(Paginator):
+    """
+    Admin paginator for big tables.
+
+    The admin changelist can only ask for numbered pages, so the OFFSET
+    stays, but it runs over a primary-key-only query that an index on the
+    ordering columns can answer; full rows are then loaded for just the
+    page's ids.
+    """
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        ids = list(self.object_list.values_list('pk', flat=True)[bottom:top])
+        rows = self.object_list.order_by().in_bulk(ids)
+        return self._get_page([rows[pk] for pk in ids if pk in rows], number, self)
@@ -0,0 +1,231 @@
+# api/payments.py
+
+"""
+Payment lifecycle around the gateway clients in ``api.gateways``.
+
+Creating a payment only writes the row (``pending``, with an id from
+``new_transaction_id``).  After commit ``enqueue('initiate', ...)`` asks the
+gateway to start collecting on a background thread, so a slow gateway never
+holds a request worker.  When the customer submits the TrxID the gateway
+gave them, ``PaymentViewSet.verify`` stores it as ``customer_reference``,
+marks the payment ``processing`` and queues ``verify``.
+
+Final statuses come back two ways, and both go through ``apply_status``:
+the answer to ``verify`` (pull) and the gateway's signed callback to
+``/api/payments/callback/`` (push).  ``apply_status`` only moves a payment
+forward (pending -> processing -> completed/failed/cancelled), so duplicate
+or late messages are harmless.  It saves through the model, so
+``api.signals`` commits or releases the order's held stock.
+
+Jobs run on a bounded thread pool (``PAYMENT_JOB_WORKERS``) or inline with
+``PAYMENT_JOB_MODE = 'sync'`` (tests).  Like ``api.image_jobs`` they live in
+memory; a payment left ``processing`` by a restart is verified again when
+the customer (or an admin) repeats the verify call.
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .gateways import GatewayError, get_client
+from .models import Payment
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = frozenset({'completed', 'failed', 'cancelled'})
+# কোন অবস্থা থেকে কোথায় যাওয়া যায়; চূড়ান্ত অবস্থা আর বদলায় না
+TRANSITIONS = {
+    'pending': frozenset({'processing'}) | FINAL_STATUSES,
+    'processing': FINAL_STATUSES,
+}
+
+# ------------------------------------------------------------ transaction ids
+# ২০২৪-০১-০১ UTC থেকে মিলিসেকেন্ড
+EPOCH_MS = 1704067200000
+_CROCKFORD = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+NODE_BITS, PID_BITS, SEQUENCE_BITS = 8, 22, 12
+
+
+class TransactionIdGenerator:
+    """
+    ``TXN`` + 17 Crockford base32 characters encoding milliseconds since
+    2024, ``PAYMENT_NODE_ID`` (0-255, one per host), the process id and a
+    per-millisecond sequence.
+
+    Unique without asking the database as long as each host has its own
+    ``PAYMENT_NODE_ID``: within a process (millisecond, sequence) only ever
+    grows, even if the clock steps back or 4096 ids are taken in one
+    millisecond, and processes running at the same time on a host have
+    different pids.  Ids also sort by creation time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._last = -1
+        self._sequence = 0
+
+    def __call__(self):
+        node = getattr(settings, 'PAYMENT_NODE_ID', 0) & ((1 << NODE_BITS) - 1)
+        with self._lock:
+            pid = os.getpid()
+            if pid != self._pid:
+                # fork এর পরে child নিজের pid দিয়ে নতুন করে শুরু করে
+                self._pid, self._last, self._sequence = pid, -1, 0
+            now = max(int(time.time() * 1000) - EPOCH_MS, self._last)
+            if now == self._last:
+                self._sequence = (self._sequence + 1) & ((1 << SEQUENCE_BITS) - 1)
+                if self._sequence == 0:
+                    # এই মিলিসেকেন্ডের সব নম্বর শেষ, পরেরটা থেকে ধার
+                    now += 1
+            else:
+                self._sequence = 0
+            self._last = now
+            sequence = self._sequence
+        value = now
+        value = (value << NODE_BITS) | node
+        value = (value << PID_BITS) | (pid & ((1 << PID_BITS) - 1))
+        value = (value << SEQUENCE_BITS) | sequence
+        return 'TXN' + ''.join(_CROCKFORD[(value >> shift) & 31] for shift in range(80, -5, -5))
+
+
+new_transaction_id = TransactionIdGenerator()
+
+
+# ---------------------------------------------------------------- callbacks
+def callback_secret():
+    return getattr(settings, 'PAYMENT_CALLBACK_SECRET', settings.SECRET_KEY).encode()
+
+
+def sign(body, secret=None):
+    """Hex HMAC-SHA256 of a callback body, sent as ``X-Signature``"""
+    return hmac.new(secret or callback_secret(), body, hashlib.sha256).hexdigest()
+
+
+def valid_signature(body, signature):
+    return hmac.compare_digest(sign(body), signature or '')
+
+
+def apply_status(transaction_id, status, reference=None, customer_reference=None, detail=''):
+    """
+    Move a payment to ``status`` if that is a step forward.  Returns the
+    payment (changed or not), or ``None`` for an unknown ``transaction_id``.
+
+    The gateway's initiation ``reference`` is recorded only while the
+    payment is still ``pending`` and has none, so a late initiation answer
+    can neither move a ``processing`` payment back nor touch the
+    ``customer_reference`` that ``verify`` sends to the gateway.
+    """
+    with transaction.atomic():
+        payment = Payment.objects.select_for_update().filter(transaction_id=transaction_id).first()
+        if payment is None:
+            return None
+        allowed = TRANSITIONS.get(payment.status)
+        if allowed is None:
+            # চূড়ান্ত পেমেন্টে দেরিতে আসা বার্তা উপেক্ষা
+            return payment
+        fields = set()
+        if reference and payment.status == 'pending' and not payment.gateway_reference:
+            payment.gateway_reference = reference[:100]
+            fields.add('gateway_reference')
+        if customer_reference and customer_reference != payment.customer_reference:
+            payment.customer_reference = customer_reference[:100]
+            fields.add('customer_reference')
+        if status in allowed:
+            payment.status = status
+            fields.add('status')
+        if fields:
+            payment.gateway_detail = detail[:255]
+            # save() দিয়ে, যাতে signals রিজার্ভ করা স্টক commit/release করে
+            payment.save(update_fields=[*fields, 'gateway_detail', 'updated'])
+    return payment
+
+
+# --------------------------------------------------------------------- jobs
+def _gateway_failed(payment_id, exc):
+    logger.warning('payment %s: %s', payment_id, exc)
+    Payment.objects.filter(pk=payment_id).update(gateway_detail=str(exc)[:255], updated=timezone.now())
+
+
+def initiate(payment_id):
+    """Start collection at the gateway; returns the payment, or ``None`` if there was nothing to do"""
+    payment = Payment.objects.filter(pk=payment_id, status='pending').first()
+    if payment is None:
+        return None
+    try:
+        result = get_client(payment.payment_method).initiate(
+            payment, getattr(settings, 'PAYMENT_CALLBACK_URL', None)
+        )
+    except GatewayError as exc:
+        # pending থাকে; গ্রাহক আবার চেষ্টা করতে পারেন
+        _gateway_failed(payment_id, exc)
+        return None
+    return apply_status(payment.transaction_id, result.get('status'), result.get('reference'))
+
+
+def verify(payment_id):
+    """Ask the gateway for the result of the customer's reference"""
+    payment = Payment.objects.filter(pk=payment_id, status__in=TRANSITIONS).first()
+    if payment is None or not payment.customer_reference:
+        return None
+    try:
+        result = get_client(payment.payment_method).verify(payment)
+    except GatewayError as exc:
+        _gateway_failed(payment_id, exc)
+        return None
+    return apply_status(payment.transaction_id, result.get('status'))
+
+
+JOBS = {'initiate': initiate, 'verify': verify}
+
+
+class PaymentJobRunner:
+    """Lazily started thread pool for gateway calls (I/O bound, so threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._threads = None
+
+    @property
+    def mode(self):
+        return getattr(settings, 'PAYMENT_JOB_MODE', 'thread')
+
+    def _run(self, job, payment_id):
+        try:
+            return JOBS[job](payment_id)
+        except Exception:
+            logger.exception('payment job %s(%s) failed', job, payment_id)
+        finally:
+            connections.close_all()
+
+    def submit(self, job, payment_id):
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    getattr(settings, 'PAYMENT_JOB_WORKERS', 8), thread_name_prefix='payment-job'
+                )
+        return self._threads.submit(self._run, job, payment_id)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._threads is not None:
+                self._threads.shutdown(wait=wait)
+            self._threads = None
+
+
+job_runner = PaymentJobRunner()
+
+
+def enqueue(job, payment_id):
+    """Run ``job`` (``'initiate'`` or ``'verify'``) for a payment; inline in ``'sync'`` mode"""
+    if job_runner.mode == 'sync':
+        return JOBS[job](payment_id)
+    return job_runner.submit(job, payment_id)
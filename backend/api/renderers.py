@@ -0,0 +1,50 @@
+# api/renderers.py
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` that encodes with orjson when it is installed.
+
+    Only the compact, non-ASCII-escaped form (the DRF default) takes the fast
+    path.  Datetimes are passed through to DRF's encoder and Decimals are
+    not native to orjson, so both are formatted exactly as ``JSONRenderer``
+    would format them and the output is byte-for-byte the same.
+    """
+
+    if orjson is not None:
+        _options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or not self.compact or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self._options)
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer এর মতো U+2028/U+2029 এস্কেপ করুন
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class NDJSONRenderer(JSONRenderer):
+    """
+    Lets streaming exports negotiate ``?format=ndjson``.  Successful
+    exports are streamed by the view; error payloads render as JSON.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+class CSVRenderer(JSONRenderer):
+    """``?format=csv`` counterpart of ``NDJSONRenderer``"""
+    media_type = 'text/csv'
+    format = 'csv'
@@ -0,0 +1,182 @@
+# api/renditions.py
+
+"""
+Resized WebP / progressive-JPEG renditions of product images.
+
+Renditions are stored next to the original, ``products/3f/a2/3fa2...c1.jpg``
+gets ``products/3f/a2/3fa2...c1__thumb.webp`` and so on.  Serializers link
+to the ``image-rendition`` view, which generates a missing rendition on the
+first request and redirects to the stored file; ``generate_renditions``
+backfills existing media.
+"""
+
+import io
+import posixpath
+from functools import lru_cache
+from urllib.parse import quote
+
+from django.core.files.base import ContentFile
+from django.urls import get_script_prefix, get_urlconf, reverse
+from PIL import Image, ImageOps
+
+# নাম -> (সর্বোচ্চ প্রস্থ, সর্বোচ্চ উচ্চতা); অনুপাত ঠিক রেখে এর ভেতরে আঁটানো হয়
+RENDITION_SIZES = {
+    'thumb': (150, 150),
+    'small': (300, 300),
+    'medium': (600, 600),
+}
+
+# URL এর ফরম্যাট -> (ফাইল এক্সটেনশন, Pillow ফরম্যাট, save অপশন)
+RENDITION_FORMATS = {
+    'webp': ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', 'JPEG', {'quality': 82, 'progressive': True, 'optimize': True}),
+}
+
+SEPARATOR = '__'
+
+# reverse() যেভাবে path কোট করে
+URL_SAFE = "/~:@!$&'()*+,;="
+
+
+class RenditionError(Exception):
+    pass
+
+
+def rendition_name(name, size, fmt):
+    """Storage name of the ``size``/``fmt`` rendition of image ``name``"""
+    root, _ = posixpath.splitext(name)
+    extension = RENDITION_FORMATS[fmt][0]
+    return f'{root}{SEPARATOR}{size}.{extension}'
+
+
+def rendition_names(name):
+    return [
+        rendition_name(name, size, fmt)
+        for size in RENDITION_SIZES
+        for fmt in RENDITION_FORMATS
+    ]
+
+
+def is_rendition(name):
+    root, _ = posixpath.splitext(name)
+    return any(root.endswith(f'{SEPARATOR}{size}') for size in RENDITION_SIZES)
+
+
+@lru_cache(maxsize=None)
+def _view_prefix(urlconf, script_prefix):
+    path = reverse('image-rendition', urlconf=urlconf, kwargs={'size': 'thumb', 'fmt': 'webp', 'name': 'x'})
+    return path[:-len('thumb/webp/x')]
+
+
+def rendition_path(name, size, fmt):
+    """Path of the lazy rendition view, e.g. ``/api/images/thumb/webp/products/...``"""
+    # প্রতি পণ্যে ৬ বার reverse() ধীর, তাই prefix একবার বের করে রাখা হয়
+    prefix = _view_prefix(get_urlconf(), get_script_prefix())
+    return f'{prefix}{size}/{fmt}/{quote(name, safe=URL_SAFE)}'
+
+
+def rendition_map(name, absolute=lambda url: url):
+    """``{size: {fmt: url}}`` for image ``name``; ``absolute`` makes URLs absolute"""
+    return {
+        size: {fmt: absolute(rendition_path(name, size, fmt)) for fmt in RENDITION_FORMATS}
+        for size in RENDITION_SIZES
+    }
+
+
+def _encode(image, size, fmt):
+    _, pillow_format, options = RENDITION_FORMATS[fmt]
+    resized = image.copy()
+    resized.thumbnail(RENDITION_SIZES[size], Image.LANCZOS)
+    if pillow_format == 'JPEG' and resized.mode != 'RGB':
+        # JPEG এ স্বচ্ছতা নেই, সাদা ব্যাকগ্রাউন্ডে বসান
+        background = Image.new('RGB', resized.size, 'white')
+        if resized.mode in ('RGBA', 'LA'):
+            background.paste(resized, mask=resized.getchannel('A'))
+        else:
+            background.paste(resized.convert('RGB'))
+        resized = background
+    buffer = io.BytesIO()
+    resized.save(buffer, pillow_format, **options)
+    return buffer.getvalue()
+
+
+def _decode(data, name):
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise RenditionError(f'Cannot read image {name}: {exc}') from exc
+    # মোবাইলে তোলা ছবির EXIF rotation ঠিক করুন
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    return image
+
+
+def encode(data, variants, name='image'):
+    """
+    Decode the original ``data`` and return the encoded bytes of each
+    ``(size, fmt)`` in ``variants``.
+
+    Pure CPU work with no Django access, so it can run in a worker process.
+    """
+    image = _decode(data, name)
+    return [_encode(image, size, fmt) for size, fmt in variants]
+
+
+def _read(storage, name):
+    try:
+        with storage.open(name, 'rb') as original:
+            return original.read()
+    except OSError as exc:
+        raise RenditionError(f'Cannot read image {name}: {exc}') from exc
+
+
+def _store(storage, name, content):
+    if hasattr(storage, 'save_derived'):
+        # content-addressed storage নাম বদলে দিত
+        storage.save_derived(name, ContentFile(content))
+        return
+    saved = storage.save(name, ContentFile(content))
+    if saved != name:
+        # অন্য worker একই সময়ে বানিয়ে ফেলেছে; আমাদের কপি বাদ
+        storage.delete(saved)
+
+
+def generate(storage, name, sizes=None, formats=None, force=False, executor=None):
+    """
+    Write the missing renditions of image ``name`` (all of them with
+    ``force``).  Returns the storage names that were written.
+
+    With an ``executor`` (e.g. a process pool) decoding and encoding run
+    there; only reading and storing the files happens in the caller.
+    """
+    targets = [
+        (size, fmt, rendition_name(name, size, fmt))
+        for size in sizes or RENDITION_SIZES
+        for fmt in formats or RENDITION_FORMATS
+    ]
+    if not force:
+        targets = [target for target in targets if not storage.exists(target[2])]
+    if not targets:
+        return []
+
+    data = _read(storage, name)
+    variants = [(size, fmt) for size, fmt, _ in targets]
+    if executor is None:
+        contents = encode(data, variants, name)
+    else:
+        contents = executor.submit(encode, data, variants, name).result()
+
+    written = []
+    for (_, _, target), content in zip(targets, contents):
+        if force and storage.exists(target):
+            storage.delete(target)
+        _store(storage, target, content)
+        written.append(target)
+    return written
+
+
+def delete(storage, name):
+    for target in rendition_names(name):
+        storage.delete(target)
@@ -0,0 +1,192 @@
+# api/reports.py
+
+"""
+Daily summary tables for revenue reporting.
+
+``rollup_reports`` folds ``Order``, ``OrderItem`` and ``Payment`` into
+``DailySalesSummary`` (one row per local day, also for days without
+orders) and ``DailyPaymentSummary`` (per day, payment method and status)
+with three GROUP BY queries per chunk of days.  Every chunk replaces its
+days in one transaction, so a run can be repeated or interrupted at any
+point.  By default a run starts after the last summarized day, minus
+``REPORT_LOOKBACK_DAYS`` so payments that completed or failed later are
+picked up.
+
+The admin dashboard reads only these tables (see ``dashboard``).
+"""
+
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyPaymentSummary, DailySalesSummary, Order, OrderItem, Payment
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _bounds(first, last):
+    """Aware ``[start, end)`` covering the local days ``first``..``last``"""
+    start = timezone.make_aware(datetime.combine(first, time.min))
+    end = timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min))
+    return start, end
+
+
+def pending_days(since=None, until=None, include_today=False, lookback=None):
+    """
+    ``(first, last)`` days a run should summarize, or ``None`` if there is
+    nothing to do.  Today is left out unless ``include_today``, since it is
+    not over yet.
+    """
+    today = timezone.localdate()
+    last = until or (today if include_today else today - timedelta(days=1))
+    if since is None:
+        latest = DailySalesSummary.objects.aggregate(latest=Max('day'))['latest']
+        if latest is not None:
+            if lookback is None:
+                lookback = _setting('REPORT_LOOKBACK_DAYS', 3)
+            since = latest + timedelta(days=1) - timedelta(days=lookback)
+        else:
+            first_order = Order.objects.aggregate(first=Min('created'))['first']
+            if first_order is None:
+                return None
+            since = timezone.localtime(first_order).date()
+    if since > last:
+        return None
+    return since, last
+
+
+def summarize(first, last):
+    """Replace the summaries of the days ``first``..``last``; returns the day count"""
+    start, end = _bounds(first, last)
+    orders = (
+        Order.objects.filter(created__gte=start, created__lt=end)
+        .annotate(day=TruncDate('created'))
+        .values('day')
+        .annotate(
+            total_orders=Count('id'),
+            total_paid=Count('id', filter=Q(paid=True)),
+            total_revenue=Sum('total_price'),
+            total_paid_revenue=Sum('total_price', filter=Q(paid=True)),
+        )
+        .order_by()
+    )
+    items = (
+        OrderItem.objects.filter(order__created__gte=start, order__created__lt=end)
+        .annotate(day=TruncDate('order__created'))
+        .values('day')
+        .annotate(total_quantity=Sum('quantity'))
+        .order_by()
+    )
+    payments = (
+        Payment.objects.filter(created__gte=start, created__lt=end)
+        .annotate(day=TruncDate('created'))
+        .values('day', 'payment_method', 'status')
+        .annotate(total_count=Count('id'), total_amount=Sum('amount'))
+        .order_by()
+    )
+
+    # অর্ডার ছাড়া দিনও সারি পায়, তাই পরের রান জানে কোথা থেকে শুরু
+    days = {}
+    day = first
+    while day <= last:
+        days[day] = DailySalesSummary(day=day)
+        day += timedelta(days=1)
+    for row in orders:
+        summary = days[row['day']]
+        summary.orders = row['total_orders']
+        summary.paid_orders = row['total_paid']
+        summary.revenue = row['total_revenue'] or Decimal('0')
+        summary.paid_revenue = row['total_paid_revenue'] or Decimal('0')
+    for row in items:
+        days[row['day']].items_sold = row['total_quantity']
+    payment_rows = [
+        DailyPaymentSummary(
+            day=row['day'], payment_method=row['payment_method'], status=row['status'],
+            count=row['total_count'], amount=row['total_amount'] or Decimal('0'),
+        )
+        for row in payments
+    ]
+
+    with transaction.atomic():
+        DailySalesSummary.objects.filter(day__range=(first, last)).delete()
+        DailyPaymentSummary.objects.filter(day__range=(first, last)).delete()
+        DailySalesSummary.objects.bulk_create(days.values())
+        DailyPaymentSummary.objects.bulk_create(payment_rows)
+    return len(days)
+
+
+def rollup(first, last, chunk_days=31):
+    """Summarize ``first``..``last`` in chunks; yields each ``(first, last)`` done"""
+    while first <= last:
+        chunk_last = min(first + timedelta(days=chunk_days - 1), last)
+        summarize(first, chunk_last)
+        yield first, chunk_last
+        first = chunk_last + timedelta(days=1)
+
+
+# ------------------------------------------------------------------ dashboard
+def _rate(part, whole):
+    return round(part * 100 / whole, 1) if whole else None
+
+
+def dashboard(summaries):
+    """
+    Totals, payment method mix and completion rates for the days in
+    ``summaries`` (a ``DailySalesSummary`` queryset).  Reads summary tables
+    only.
+    """
+    totals = summaries.order_by().aggregate(
+        days=Count('id'),
+        orders=Sum('orders'),
+        paid_orders=Sum('paid_orders'),
+        items_sold=Sum('items_sold'),
+        revenue=Sum('revenue'),
+        paid_revenue=Sum('paid_revenue'),
+    )
+    for field in ('orders', 'paid_orders', 'items_sold'):
+        totals[field] = totals[field] or 0
+    for field in ('revenue', 'paid_revenue'):
+        totals[field] = totals[field] or Decimal('0.00')
+    totals['average_order_value'] = (
+        (totals['revenue'] / totals['orders']).quantize(Decimal('0.01')) if totals['orders'] else Decimal('0.00')
+    )
+    totals['paid_rate'] = _rate(totals['paid_orders'], totals['orders'])
+
+    rows = (
+        DailyPaymentSummary.objects.filter(day__in=summaries.order_by().values('day'))
+        .values('payment_method', 'status')
+        .annotate(total_count=Sum('count'), total_amount=Sum('amount'))
+        .order_by()
+    )
+    labels = dict(Payment._meta.get_field('payment_method').choices)
+    methods = {}
+    for row in rows:
+        method = methods.setdefault(row['payment_method'], {
+            'method': labels.get(row['payment_method'], row['payment_method']),
+            'payments': 0, 'completed': 0, 'failed': 0, 'amount': Decimal('0.00'),
+            'completed_amount': Decimal('0.00'),
+        })
+        method['payments'] += row['total_count']
+        method['amount'] += row['total_amount']
+        if row['status'] == 'completed':
+            method['completed'] += row['total_count']
+            method['completed_amount'] += row['total_amount']
+        elif row['status'] in ('failed', 'cancelled'):
+            method['failed'] += row['total_count']
+
+    payments = sum(method['payments'] for method in methods.values())
+    completed = sum(method['completed'] for method in methods.values())
+    for method in methods.values():
+        method['share'] = _rate(method['payments'], payments)
+        method['completion_rate'] = _rate(method['completed'], method['payments'])
+    totals['payments'] = payments
+    totals['completion_rate'] = _rate(completed, payments)
+    totals['methods'] = sorted(methods.values(), key=lambda method: -method['payments'])
+    return totals
@@ -0,0 +1,180 @@
+# api/response_cache.py
+
+"""
+Versioned cache for responses that every visitor shares.
+
+Each cached response depends on one or more *scopes* (``'products'``,
+``'categories'``, ``'category:<id>'``) and is stored under the current
+generation number of those scopes.  Writes bump the generations (see
+``api.signals``), so old entries are never read again and simply expire.
+
+Entries live in a small in-process LRU in front of the shared Django cache
+(``RESPONSE_CACHE_ALIAS``).  On a miss one worker takes a short lock and
+recomputes while the others keep serving the last value they had
+(stale-while-revalidate).
+"""
+
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+
+PREFIX = 'respcache'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class ResponseCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = OrderedDict()
+        self._stats = Counter()
+
+    @property
+    def cache(self):
+        return caches[_setting('RESPONSE_CACHE_ALIAS', 'default')]
+
+    @property
+    def enabled(self):
+        return _setting('RESPONSE_CACHE_ENABLED', True)
+
+    # ------------------------------------------------------------ generations
+    @staticmethod
+    def _generation_key(scope):
+        return f'{PREFIX}:gen:{scope}'
+
+    @staticmethod
+    def _fresh_generation():
+        # কী cache থেকে evict হলে 0 থেকে শুরু করলে পুরনো এন্ট্রি আবার মিলে যেত
+        return time.time_ns() // 1000
+
+    def generations(self, scopes):
+        keys = [self._generation_key(scope) for scope in scopes]
+        found = self.cache.get_many(keys)
+        generations = []
+        for key in keys:
+            if key not in found:
+                self.cache.add(key, self._fresh_generation(), None)
+                found[key] = self.cache.get(key)
+            generations.append(found[key])
+        return generations
+
+    def _bump(self, scopes):
+        for scope in scopes:
+            key = self._generation_key(scope)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.add(key, self._fresh_generation(), None)
+
+    def bump(self, *scopes):
+        """
+        Invalidate every response that depends on ``scopes``.
+
+        Bumps right away and, inside a transaction, once more after commit,
+        so a response rebuilt from pre-commit data in between is dropped too.
+        """
+        self._bump(scopes)
+        if connection.in_atomic_block:
+            transaction.on_commit(lambda: self._bump(scopes))
+
+    # ------------------------------------------------------------ local tier
+    def _local_get(self, key):
+        with self._lock:
+            if key not in self._local:
+                return None
+            self._local.move_to_end(key)
+            return self._local[key]
+
+    def _local_set(self, key, value):
+        with self._lock:
+            self._local[key] = value
+            self._local.move_to_end(key)
+            while len(self._local) > _setting('RESPONSE_CACHE_LOCAL_SIZE', 256):
+                self._local.popitem(last=False)
+
+    # ------------------------------------------------------------ lookups
+    @staticmethod
+    def variant(request):
+        """Host (image URLs are absolute) and query string of ``request``"""
+        params = sorted(getattr(request, 'query_params', request.GET).lists())
+        raw = f'{request.build_absolute_uri("/")}?{params}'
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def get_or_set(self, name, scopes, request, compute):
+        """Return the cached data for ``name``, calling ``compute()`` on a miss"""
+        if not self.enabled:
+            return compute()
+
+        variant = self.variant(request)
+        generations = '.'.join(str(generation) for generation in self.generations(scopes))
+        key = f'{PREFIX}:{name}:{variant}:{generations}'
+
+        value = self._local_get(key)
+        if value is not None:
+            self._stats['local_hits'] += 1
+            return value
+
+        value = self.cache.get(key)
+        if value is not None:
+            self._stats['shared_hits'] += 1
+            self._local_set(key, value)
+            return value
+
+        latest_key = f'{PREFIX}:{name}:{variant}:latest'
+        lock_key = f'{key}:lock'
+        locked = self.cache.add(lock_key, 1, _setting('RESPONSE_CACHE_LOCK_TIMEOUT', 10))
+        if not locked:
+            # অন্য worker নতুন করে বানাচ্ছে, ততক্ষণ আগের ভার্সন দিন
+            stale = self.cache.get(latest_key)
+            if stale is not None:
+                self._stats['stale_hits'] += 1
+                return stale
+
+        self._stats['misses'] += 1
+        try:
+            value = compute()
+            timeout = _setting('RESPONSE_CACHE_TIMEOUT', 300)
+            self.cache.set_many({key: value, latest_key: value}, timeout)
+            self._local_set(key, value)
+        finally:
+            if locked:
+                self.cache.delete(lock_key)
+        return value
+
+    async def aget_or_set(self, name, scopes, request, compute):
+        """``get_or_set`` for async views; ``compute`` is a coroutine function"""
+        # cache ব্যাকএন্ড sync, তাই লুকআপ worker থ্রেডে; মিস হলে compute আবার ইভেন্ট লুপে
+        return await sync_to_async(self.get_or_set)(name, scopes, request, async_to_sync(compute))
+
+    # ------------------------------------------------------------ metrics
+    def stats(self):
+        stats = {
+            name: self._stats[name]
+            for name in ('local_hits', 'shared_hits', 'stale_hits', 'misses')
+        }
+        lookups = sum(stats.values())
+        hits = lookups - stats['misses']
+        stats['hit_ratio'] = round(hits / lookups, 4) if lookups else None
+        stats['local_entries'] = len(self._local)
+        return stats
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def reset(self):
+        with self._lock:
+            self._local.clear()
+            self._stats.clear()
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,300 @@
+# api/sales.py
+
+"""
+Incrementally maintained sales rollups and trending rankings.
+
+Every placed order adds its lines to ``ProductSales`` / ``CategorySales``
+rows for its local hour, its local day and the ``trend`` row, after the
+order commits and in a short transaction of its own, so checkout never
+waits on a hot product's rollup row.  ``rollup_sales`` rebuilds the rows
+from ``OrderItem`` (backfill, or after a failed update).
+
+Trending uses forward decay: a sale in hour ``t`` is worth
+``quantity * 2 ** ((t - landmark) / TRENDING_HALF_LIFE_HOURS)``.  Newer
+sales weigh more, and because every score shares the same landmark the
+running sum in the ``trend`` row ranks products the same way a score
+decayed to "now" would, so trending is one indexed ``ORDER BY score``.
+
+The landmark is the ``start`` of the ``trend`` rows (``TRENDING_LANDMARK``
+until the first sale).  Weights double every half-life, so before they
+get anywhere near overflowing (about 1000 half-lives) the landmark moves:
+``record_order`` advances it once a sale is ``RENORMALIZE_HALF_LIVES``
+past it, and ``rebuild`` moves it to today.  ``advance_landmark``
+rescales every stored score, which keeps the rankings unchanged.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Subquery, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import Category, CategorySales, OrderItem, Product, ProductSales
+from .response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ('quantity', 'revenue', 'orders', 'score')
+DEFAULT_LANDMARK = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+# এর বেশি half-life পরের বিক্রিতে landmark এগিয়ে যায় (2^64 এখনও নিরাপদ)
+RENORMALIZE_HALF_LIVES = 64
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _half_lives(moment, since):
+    return (moment - since).total_seconds() / 3600 / _setting('TRENDING_HALF_LIFE_HOURS', 24)
+
+
+def landmark():
+    """The landmark stored scores are relative to (``TRENDING_LANDMARK`` before any sale)"""
+    current = ProductSales.objects.filter(period='trend').aggregate(start=Max('start'))['start']
+    if current is not None:
+        return current
+    value = _setting('TRENDING_LANDMARK', DEFAULT_LANDMARK)
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def _current_landmark(model):
+    return Subquery(model.objects.filter(period='trend').order_by('-start').values('start')[:1])
+
+
+def weight(hour, since):
+    """Forward-decay weight of a sale in the bucket starting at ``hour``, relative to landmark ``since``"""
+    return 2 ** _half_lives(hour, since)
+
+
+def advance_landmark(to):
+    """
+    Move the landmark forward to ``to`` and rescale every stored score by
+    the same factor, so rankings stay as they were.  Returns the landmark
+    now in use (the current one if ``to`` is not later).
+    """
+    current = landmark()
+    if to <= current:
+        return current
+    # পুরনো স্কোর ছোট হয়, বড় হয় না; খুব পুরনোগুলো ০ হয়ে যায়
+    factor = 2 ** -_half_lives(to, current)
+    for model in (ProductSales, CategorySales):
+        # অন্য landmark এর ছুটে যাওয়া trend রো ভিন্ন স্কেলে; rebuild আবার বানায়
+        model.objects.filter(period='trend').exclude(start=current).delete()
+        model.objects.filter(period='trend').update(start=to)
+        model.objects.update(score=F('score') * factor)
+    logger.info('trending landmark moved from %s to %s', current, to)
+    return to
+
+
+def hour_start(moment):
+    return timezone.localtime(moment).replace(minute=0, second=0, microsecond=0)
+
+
+def day_start(moment):
+    local = timezone.localtime(moment)
+    # DST এর দিনে মধ্যরাতের অফসেট আলাদা হতে পারে
+    return timezone.make_aware(datetime.combine(local.date(), datetime.min.time()))
+
+
+# ------------------------------------------------------------------ writes
+def _increment(model, key_field, increments):
+    """Add ``{(key, period, start): {counter: value}}`` to ``model`` rows"""
+    if not increments:
+        return
+    model.objects.bulk_create(
+        [model(**{key_field: key, 'period': period, 'start': start}) for key, period, start in increments],
+        ignore_conflicts=True,
+    )
+    rows = model.objects.filter(**{
+        f'{key_field}__in': {key for key, _, _ in increments},
+        'period__in': {period for _, period, _ in increments},
+        'start__in': {start for _, _, start in increments},
+    }).only('id', key_field, 'period', 'start')
+    rows = {(getattr(row, key_field), row.period, row.start): row for row in rows}
+    changed = []
+    for key, counts in increments.items():
+        row = rows[key]
+        for field in COUNTERS:
+            setattr(row, field, F(field) + counts[field])
+        changed.append(row)
+    # একই ক্রমে লক নিলে একসাথে দুটি অর্ডারে deadlock হয় না
+    model.objects.bulk_update(sorted(changed, key=lambda row: row.pk), COUNTERS)
+
+
+def record_order(order, items):
+    """
+    Add one order's ``OrderItem``s (with ``product`` loaded) to the rollups.
+
+    Called after the order commits.  Any failure is logged rather than
+    raised: the order stands and ``rollup_sales`` can rebuild the buckets.
+    """
+    hour = hour_start(order.created)
+    try:
+        with transaction.atomic():
+            current = landmark()
+            if _half_lives(hour, current) > RENORMALIZE_HALF_LIVES:
+                current = advance_landmark(day_start(order.created))
+            buckets = (('hour', hour), ('day', day_start(order.created)), ('trend', current))
+            hour_weight = weight(hour, current)
+
+            products = defaultdict(lambda: defaultdict(int))
+            categories = defaultdict(lambda: defaultdict(int))
+            for item in items:
+                revenue = item.price * item.quantity
+                for totals in (products[item.product_id], categories[item.product.category_id]):
+                    totals['quantity'] += item.quantity
+                    totals['revenue'] += revenue
+                    totals['score'] += item.quantity * hour_weight
+                    totals['orders'] = 1
+
+            for model, key_field, totals in (
+                (ProductSales, 'product_id', products),
+                (CategorySales, 'category_id', categories),
+            ):
+                _increment(model, key_field, {
+                    (key, period, start): counts
+                    for key, counts in totals.items()
+                    for period, start in buckets
+                })
+    except Exception:
+        # শুধু অ্যানালিটিক্স; চেকআউট কখনো এর জন্য ব্যর্থ হয় না
+        logger.exception('sales rollup failed for order %s', order.pk)
+        return
+    response_cache.bump('sales')
+
+
+# ------------------------------------------------------------------ rebuild
+def _rebuild(model, key_field, group_field, since, current, batch_size):
+    """
+    Recompute hour/day buckets from ``OrderItem`` since ``since``, scored
+    against landmark ``current``.  Category buckets use each product's
+    current category.
+    """
+    items = OrderItem.objects.all()
+    stale = model.objects.filter(period__in=('hour', 'day'))
+    if since is not None:
+        items = items.filter(order__created__gte=since)
+        stale = stale.filter(start__gte=since)
+    stale.delete()
+
+    hourly = (
+        items.annotate(hour=TruncHour('order__created'))
+        .values(group_field, 'hour')
+        .annotate(
+            total_quantity=Sum('quantity'),
+            total_revenue=Sum(F('price') * F('quantity')),
+            total_orders=Count('order', distinct=True),
+        )
+        .order_by()
+    )
+    days = defaultdict(lambda: defaultdict(int))
+    batch = []
+    written = 0
+    for row in hourly.iterator(chunk_size=batch_size):
+        hour = hour_start(row['hour'])
+        counts = {
+            'quantity': row['total_quantity'],
+            'revenue': row['total_revenue'] or Decimal('0'),
+            'orders': row['total_orders'],
+            'score': row['total_quantity'] * weight(hour, current),
+        }
+        key = row[group_field]
+        batch.append(model(**{key_field: key, 'period': 'hour', 'start': hour}, **counts))
+        # একটি অর্ডার একটিই ঘণ্টায়, তাই দিনের অর্ডার = ঘণ্টাগুলোর যোগফল
+        for field, value in counts.items():
+            days[key, day_start(hour)][field] += value
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+    model.objects.bulk_create(batch)
+    written += len(batch)
+
+    model.objects.bulk_create(
+        [
+            model(**{key_field: key, 'period': 'day', 'start': day}, **counts)
+            for (key, day), counts in days.items()
+        ],
+        batch_size=batch_size,
+    )
+    return written + len(days)
+
+
+def _rebuild_trend(model, key_field, current, batch_size):
+    """``trend`` rows are the sum of the (already weighted) day scores"""
+    model.objects.filter(period='trend').delete()
+    totals = (
+        model.objects.filter(period='day')
+        .values(key_field)
+        .annotate(
+            total_quantity=Sum('quantity'),
+            total_revenue=Sum('revenue'),
+            total_orders=Sum('orders'),
+            total_score=Sum('score'),
+        )
+        .order_by()
+    )
+    model.objects.bulk_create(
+        [
+            model(**{
+                key_field: row[key_field],
+                'period': 'trend',
+                'start': current,
+                'quantity': row['total_quantity'],
+                'revenue': row['total_revenue'],
+                'orders': row['total_orders'],
+                'score': row['total_score'],
+            })
+            for row in totals.iterator(chunk_size=batch_size)
+        ],
+        batch_size=batch_size,
+    )
+
+
+def rebuild(since=None, batch_size=1000):
+    """
+    Rebuild buckets from ``OrderItem``: everything, or only hours/days from
+    the local midnight of ``since``.  The landmark first moves to today's
+    local midnight (rescaling the kept buckets), then ``trend`` rows are
+    recomputed from the day buckets.
+    """
+    if since is not None:
+        since = day_start(since)
+    with transaction.atomic():
+        current = advance_landmark(day_start(timezone.now()))
+        written = _rebuild(ProductSales, 'product_id', 'product_id', since, current, batch_size)
+        written += _rebuild(CategorySales, 'category_id', 'product__category_id', since, current, batch_size)
+        _rebuild_trend(ProductSales, 'product_id', current, batch_size)
+        _rebuild_trend(CategorySales, 'category_id', current, batch_size)
+    response_cache.bump('sales')
+    return written
+
+
+def prune_hourly(days):
+    """Delete hourly buckets older than ``days``; day and trend rows stay"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted = 0
+    for model in (ProductSales, CategorySales):
+        deleted += model.objects.filter(period='hour', start__lt=cutoff).delete()[0]
+    return deleted
+
+
+# ------------------------------------------------------------------ reads
+def trending_products(limit=10):
+    """Available products by trending score (one indexed query)"""
+    return Product.objects.filter(
+        available=True, sales__period='trend', sales__start=_current_landmark(ProductSales),
+        sales__score__gt=0,
+    ).order_by('-sales__score', '-id')[:limit]
+
+
+def trending_categories(limit=8):
+    return Category.objects.filter(
+        sales__period='trend', sales__start=_current_landmark(CategorySales), sales__score__gt=0,
+    ).order_by('-sales__score', 'id')[:limit]
@@ -0,0 +1,224 @@
+# api/search_analytics.py
+
+"""
+Buffered search analytics.
+
+``search_products`` and the click endpoint only add to an in-process buffer
+of per ``(normalized term, day)`` counters, so a search never waits on the
+database.  A daemon thread flushes the buffer every
+``SEARCH_ANALYTICS_FLUSH_SECONDS`` (sooner once
+``SEARCH_ANALYTICS_BATCH_SIZE`` terms are waiting) into ``SearchTermDaily``,
+one transaction per ``SEARCH_ANALYTICS_BATCH_SIZE`` rows.  With
+``SEARCH_ANALYTICS_FLUSH_SECONDS = None`` no thread is started and
+``search_log.flush()`` must be called explicitly (tests do this).
+
+The buffer holds at most ``SEARCH_ANALYTICS_MAX_BUFFER`` distinct terms.
+When the database falls behind, events for terms not yet in the buffer are
+dropped (and counted) instead of slowing searches down; events still
+buffered when a process exits are lost.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .autocomplete import autocomplete_index, normalize
+from .instrumentation import registry
+from .models import SearchTermDaily
+from .response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ('searches', 'zero_results', 'results', 'clicks')
+MAX_TERM_LENGTH = SearchTermDaily._meta.get_field('term').max_length
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def normalize_term(query):
+    """The key a query is counted under (see ``api.autocomplete.normalize``)"""
+    return normalize(query)[:MAX_TERM_LENGTH].strip()
+
+
+class SearchLog:
+    """Per-process buffer of search counters and its flusher thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffer = {}
+        self._stats = Counter()
+        self._wake = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self):
+        return _setting('SEARCH_ANALYTICS_ENABLED', True)
+
+    @property
+    def batch_size(self):
+        return _setting('SEARCH_ANALYTICS_BATCH_SIZE', 500)
+
+    # ---------------------------------------------------------------- record
+    def _add(self, query, **counts):
+        if not self.enabled:
+            return
+        term = normalize_term(query)
+        if not term:
+            return
+        key = (term, timezone.localdate())
+        with self._lock:
+            counters = self._buffer.get(key)
+            if counters is None:
+                if len(self._buffer) >= _setting('SEARCH_ANALYTICS_MAX_BUFFER', 10000):
+                    # DB পিছিয়ে আছে: সার্চ ধীর না করে ইভেন্ট বাদ
+                    self._stats['dropped'] += 1
+                    return
+                counters = self._buffer[key] = Counter()
+            counters.update(counts)
+            self._stats['recorded'] += 1
+            waiting = len(self._buffer)
+        if waiting >= self.batch_size:
+            self._wake.set()
+        self._start()
+
+    def record_search(self, query, results):
+        """Count one search for ``query`` that found ``results`` products"""
+        self._add(query, searches=1, results=results, zero_results=int(results == 0))
+
+    def record_click(self, query):
+        """Count one click on a result of ``query``"""
+        self._add(query, clicks=1)
+
+    # ---------------------------------------------------------------- flush
+    def _restore(self, items):
+        """Put unwritten counters back, within the buffer limit"""
+        with self._lock:
+            for key, counts in items:
+                if key in self._buffer:
+                    self._buffer[key].update(counts)
+                elif len(self._buffer) < _setting('SEARCH_ANALYTICS_MAX_BUFFER', 10000):
+                    self._buffer[key] = counts
+                else:
+                    self._stats['dropped'] += sum(counts[field] for field in ('searches', 'clicks'))
+
+    def flush(self):
+        """Write the buffered counters; returns the number of rows touched"""
+        with self._lock:
+            pending, self._buffer = self._buffer, {}
+        if not pending:
+            return 0
+        items = list(pending.items())
+        written = 0
+        started = time.perf_counter()
+        try:
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start:start + self.batch_size]
+                _write(batch)
+                written += len(batch)
+        except DatabaseError:
+            self._restore(items[written:])
+            raise
+        finally:
+            registry.record_timing('search_analytics_flush', time.perf_counter() - started)
+            with self._lock:
+                self._stats['flushed'] += written
+            if written:
+                response_cache.bump('search_terms')
+                autocomplete_index.popular_changed()
+        return written
+
+    # ---------------------------------------------------------------- thread
+    def _start(self):
+        if _setting('SEARCH_ANALYTICS_FLUSH_SECONDS', 10) is None:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            # fork এর পরে child এ পুরনো thread অবজেক্ট থাকে কিন্তু চলে না
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='search-analytics', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            interval = _setting('SEARCH_ANALYTICS_FLUSH_SECONDS', 10)
+            if interval is None:
+                return
+            self._wake.wait(interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('search analytics flush failed')
+            finally:
+                connections.close_all()
+
+    def stats(self):
+        with self._lock:
+            stats = {name: self._stats[name] for name in ('recorded', 'dropped', 'flushed')}
+            stats['buffered'] = len(self._buffer)
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._buffer.clear()
+            self._stats.clear()
+
+
+def _write(batch):
+    """Add one batch of ``((term, day), counters)`` to ``SearchTermDaily``"""
+    with transaction.atomic():
+        # নেই এমন সারি আগে শূন্য দিয়ে, তারপর F() দিয়ে যোগ: একাধিক প্রসেস একসাথে flush করলেও ঠিক
+        SearchTermDaily.objects.bulk_create(
+            [SearchTermDaily(term=term, day=day) for (term, day), _ in batch],
+            ignore_conflicts=True,
+        )
+        rows = SearchTermDaily.objects.filter(
+            term__in={term for (term, _), _ in batch},
+            day__in={day for (_, day), _ in batch},
+        ).only('id', 'term', 'day')
+        rows = {(row.term, row.day): row for row in rows}
+        for key, counts in batch:
+            for field in COUNTERS:
+                setattr(rows[key], field, F(field) + counts[field])
+        SearchTermDaily.objects.bulk_update([rows[key] for key, _ in batch], COUNTERS)
+
+
+search_log = SearchLog()
+
+
+# ------------------------------------------------------------------ reports
+def _totals(days=None):
+    days = days or _setting('SEARCH_ANALYTICS_WINDOW_DAYS', 30)
+    since = timezone.localdate() - timedelta(days=days)
+    return SearchTermDaily.objects.filter(day__gt=since).values('term').annotate(
+        total_searches=Sum('searches'),
+        total_zero_results=Sum('zero_results'),
+        total_clicks=Sum('clicks'),
+    )
+
+
+def popular_terms(limit=10, days=None):
+    """Most searched terms of the last ``days`` that do find products"""
+    rows = _totals(days).filter(
+        total_searches__gt=F('total_zero_results')
+    ).order_by('-total_searches', 'term')[:limit]
+    return [
+        {'term': row['term'], 'count': row['total_searches'], 'clicks': row['total_clicks']}
+        for row in rows
+    ]
+
+
+def zero_result_terms(limit=10, days=None):
+    """Terms of the last ``days`` that most often found nothing"""
+    rows = _totals(days).filter(total_zero_results__gt=0).order_by('-total_zero_results', 'term')[:limit]
+    return [{'term': row['term'], 'count': row['total_zero_results']} for row in rows]
@@ -0,0 +1,53 @@
+# api/search_backends/__init__.py
+
+"""
+Pluggable search for ``search_products`` and ``autocomplete_suggestions``.
+
+``SEARCH_BACKEND`` picks the implementation, by name or dotted path to a
+``SearchBackend`` subclass:
+
+``memory`` (default)
+    per-process inverted index (``api.search_index``)
+``database``
+    scored ``icontains`` scan in SQL (``api.search_db``), any database
+``postgres``
+    ``tsvector`` + GIN index, ranked by ``ts_rank``
+``sqlite``
+    FTS5 trigram table kept in sync by triggers, ranked by ``bm25``
+
+The older ``SEARCH_ENGINE`` setting (``'index'`` or ``'database'``) is still
+honoured when ``SEARCH_BACKEND`` is not set.
+"""
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .base import SearchBackend
+
+BACKENDS = {
+    'memory': 'api.search_backends.memory.MemoryBackend',
+    'database': 'api.search_backends.database.DatabaseBackend',
+    'postgres': 'api.search_backends.postgres.PostgresBackend',
+    'sqlite': 'api.search_backends.sqlite.SQLiteFTSBackend',
+}
+LEGACY_ENGINES = {'index': 'memory', 'database': 'database'}
+
+_instances = {}
+
+
+def backend_name():
+    name = getattr(settings, 'SEARCH_BACKEND', None)
+    if name is None:
+        name = LEGACY_ENGINES.get(getattr(settings, 'SEARCH_ENGINE', 'index'), 'memory')
+    return name
+
+
+def get_backend():
+    """The configured backend (one instance per class and process)"""
+    path = BACKENDS.get(backend_name(), backend_name())
+    if path not in _instances:
+        _instances[path] = import_string(path)()
+    return _instances[path]
+
+
+__all__ = ['BACKENDS', 'SearchBackend', 'backend_name', 'get_backend']
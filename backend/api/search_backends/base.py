@@ -0,0 +1,49 @@
+# api/search_backends/base.py
+
+from asgiref.sync import sync_to_async
+
+from ..autocomplete import autocomplete_index
+
+
+class SearchBackend:
+    """
+    What ``search_products`` and ``autocomplete_suggestions`` need from a
+    search implementation.
+
+    ``search`` ranks one page and returns ``(total, [(row, score), ...])``
+    with ``ProductReadSerializer`` rows; ``total`` is ``None`` with
+    ``with_total=False``.  ``after`` is a keyset position in ``ordering()``
+    (what a search cursor records) to continue from instead of ``offset``.
+    ``facets`` feeds every match, filters left out, to an
+    ``api.search_facets.FacetCounter``.  Suggestions come from the in-memory
+    prefix index (``api.autocomplete``) unless a backend has its own.
+
+    ``asearch`` and ``asuggest`` are for ``api.async_views``; by default they
+    run the sync method in a worker thread.
+    """
+
+    name = None
+
+    def ordering(self):
+        """``[(name, descending), ...]`` of the result order"""
+        return [('relevance', True), ('created', True), ('id', True)]
+
+    def search(self, query, category_id=None, min_price=None, max_price=None,
+               offset=0, limit=20, after=None, with_total=True):
+        raise NotImplementedError
+
+    def facets(self, query, counter):
+        raise NotImplementedError
+
+    def suggest(self, query):
+        return autocomplete_index.suggest(query)
+
+    # ---------------------------------------------------------------- async
+    async def asearch(self, query, **arguments):
+        return await sync_to_async(self.search)(query, **arguments)
+
+    async def asuggest(self, query):
+        # প্রিফিক্স ইনডেক্স তাজা থাকলে ইভেন্ট লুপেই, DB তে যেতে হলে worker থ্রেডে
+        if not autocomplete_index.is_fresh():
+            await sync_to_async(autocomplete_index.ensure_fresh)()
+        return autocomplete_index.suggest(query, refresh=False)
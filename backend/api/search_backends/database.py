@@ -0,0 +1,63 @@
+# api/search_backends/database.py
+
+import asyncio
+
+from .. import search_db
+from ..pagination import keyset_q
+from ..serializers import ProductReadSerializer
+from .base import SearchBackend
+
+
+async def _none():
+    return None
+
+
+class DatabaseBackend(SearchBackend):
+    """
+    Scoring, ordering, LIMIT/OFFSET and COUNT in SQL over ``icontains``
+    matches (``api.search_db``); works on every database, but scans.
+
+    Subclasses only change ``matches``: any queryset annotated with a
+    ``relevance`` and ordered by ``ordering()`` gets paging, cursors, the
+    async path and facets from here.
+    """
+
+    name = 'database'
+
+    def ordering(self):
+        return search_db.ordering()
+
+    def matches(self, query, category_id=None, min_price=None, max_price=None):
+        """Matching products annotated with ``relevance``, in ``ordering()``"""
+        return search_db.search_queryset(query, category_id, min_price, max_price)
+
+    def _querysets(self, query, offset=0, limit=20, after=None, **filters):
+        """``(matches, page)``: the match set to count and one page of rows"""
+        matches = self.matches(query, **filters)
+        page = matches
+        if after is not None:
+            page = page.filter(keyset_q(self.ordering(), after))
+        fields = list(ProductReadSerializer.values_fields)
+        fields += [name for name, _ in self.ordering() if name not in fields]
+        return matches, page.values(*fields)[offset:offset + limit]
+
+    def search(self, query, with_total=True, **arguments):
+        matches, page = self._querysets(query, **arguments)
+        total = matches.count() if with_total else None
+        return total, [(row, row.pop('relevance')) for row in page]
+
+    async def asearch(self, query, with_total=True, **arguments):
+        matches, page = self._querysets(query, **arguments)
+        # COUNT আর পেজ একসাথে
+        total, rows = await asyncio.gather(
+            matches.acount() if with_total else _none(),
+            _rows(page),
+        )
+        return total, [(row, row.pop('relevance')) for row in rows]
+
+    def facets(self, query, counter):
+        search_db.facet_groups(self.matches(query), counter)
+
+
+async def _rows(queryset):
+    return [row async for row in queryset]
@@ -0,0 +1,51 @@
+# api/search_backends/memory.py
+
+from asgiref.sync import sync_to_async
+
+from ..models import Product
+from ..search_index import product_index, split_query
+from ..serializers import ProductReadSerializer
+from .base import SearchBackend
+
+
+def _page_queryset(ranked):
+    # শুধু এই পেজের ~২০টি পণ্য লোড
+    return ProductReadSerializer.values(Product.objects.filter(pk__in=[product_id for product_id, _ in ranked]))
+
+
+def _pair_rows(ranked, rows):
+    rows = {row['id']: row for row in rows}
+    return [(rows[product_id], score) for product_id, score in ranked if product_id in rows]
+
+
+class MemoryBackend(SearchBackend):
+    """
+    The per-process inverted index (``api.search_index``): ranks ids in
+    memory and hydrates only the page.  The default.
+    """
+
+    name = 'memory'
+
+    def _rank(self, query, after=None, with_total=True, refresh=True, **arguments):
+        if after is not None:
+            score, created, product_id = after
+            after = (score, created.timestamp(), product_id)
+        # মোট সংখ্যা ইনডেক্সে এমনিতেই জানা, তাই with_total লাগে না
+        return product_index.search(query, after=after, refresh=refresh, **arguments)
+
+    def search(self, query, **arguments):
+        total, ranked = self._rank(query, **arguments)
+        return total, _pair_rows(ranked, _page_queryset(ranked))
+
+    def facets(self, query, counter):
+        product_index.facets(query, counter)
+
+    async def asearch(self, query, **arguments):
+        if not product_index.is_fresh():
+            await sync_to_async(product_index.ensure_fresh)()
+        if split_query(query)[1]:
+            total, ranked = self._rank(query, refresh=False, **arguments)
+        else:
+            # ছোট শব্দের কোয়েরি ইনডেক্সে নয়, DB তে icontains দিয়ে মেলে
+            total, ranked = await sync_to_async(self._rank)(query, refresh=False, **arguments)
+        return total, _pair_rows(ranked, [row async for row in _page_queryset(ranked)])
@@ -0,0 +1,49 @@
+# api/search_backends/postgres.py
+
+import operator
+from functools import reduce
+
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Coalesce
+
+from ..search_db import SEARCH_CONFIG, filtered_products, match_q
+from ..search_index import split_query
+from .database import DatabaseBackend
+
+
+class PostgresBackend(DatabaseBackend):
+    """
+    PostgreSQL full-text search: ``search_vector @@ query`` through the GIN
+    index ``api_product_search_vector_gin`` (migration 0013), ranked by
+    ``ts_rank`` over the A/B/C weighted vector (name, description,
+    category).
+
+    Vectors are refreshed after commit (``Product.update_search_vector``);
+    until then a product marked ``search_dirty`` is matched with
+    ``icontains`` too (ranked by its old vector, if any), so new and
+    renamed products show up at once.  ``update_search_vectors`` works through any backlog.
+    """
+
+    name = 'postgres'
+
+    def ordering(self):
+        return [('relevance', True), ('created', True), ('id', True)]
+
+    def matches(self, query, category_id=None, min_price=None, max_price=None):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        _, match_terms = split_query(query)
+        search_query = reduce(
+            operator.or_,
+            (SearchQuery(term, config=SEARCH_CONFIG) for term in match_terms or [query]),
+        )
+        # GIN এর bitmap আর search_dirty এর btree ইনডেক্স BitmapOr হয়
+        match = Q(search_vector=search_query) | (Q(search_dirty=True) & match_q(query))
+        return (
+            filtered_products(category_id, min_price, max_price)
+            .filter(match)
+            .annotate(relevance=Coalesce(
+                SearchRank(F('search_vector'), search_query), Value(0.0), output_field=FloatField()
+            ))
+            .order_by('-relevance', '-created', '-id')
+        )
@@ -0,0 +1,189 @@
+# api/search_backends/sqlite.py
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+from ..models import Category, Product
+from ..search_db import facet_groups, filtered_products
+from ..search_index import split_query
+from .base import SearchBackend
+from .database import DatabaseBackend
+from .memory import _page_queryset, _pair_rows
+
+FTS_TABLE = 'api_product_fts'
+
+# FTS টেবিলকে api_product আর api_category এর সাথে মিলিয়ে রাখে
+TRIGGERS = {
+    'api_product_fts_insert': f'''
+        CREATE TRIGGER api_product_fts_insert AFTER INSERT ON api_product BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, name, description, category)
+            SELECT NEW.id, NEW.name, NEW.description, name FROM api_category WHERE id = NEW.category_id;
+        END
+    ''',
+    'api_product_fts_update': f'''
+        CREATE TRIGGER api_product_fts_update AFTER UPDATE OF name, description, category_id ON api_product BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+            INSERT INTO {FTS_TABLE} (rowid, name, description, category)
+            SELECT NEW.id, NEW.name, NEW.description, name FROM api_category WHERE id = NEW.category_id;
+        END
+    ''',
+    'api_product_fts_delete': f'''
+        CREATE TRIGGER api_product_fts_delete AFTER DELETE ON api_product BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+        END
+    ''',
+    'api_category_fts_rename': f'''
+        CREATE TRIGGER api_category_fts_rename AFTER UPDATE OF name ON api_category BEGIN
+            UPDATE {FTS_TABLE} SET category = NEW.name
+            WHERE rowid IN (SELECT id FROM api_product WHERE category_id = NEW.id);
+        END
+    ''',
+}
+
+# bm25 কলাম ওয়েট: নাম, বিবরণ, ক্যাটাগরি (ইনডেক্সের ৫০/২০/৩০ এর অনুপাতে)
+COLUMN_WEIGHTS = (5.0, 2.0, 3.0)
+
+# trigram টোকেনাইজার এর চেয়ে ছোট টার্ম মেলাতে পারে না
+MIN_TRIGRAM_LENGTH = 3
+
+
+def fts_expression(query):
+    """
+    FTS5 ``MATCH`` expression for ``query``: any of its terms as a substring.
+    ``None`` when a term is too short for the trigram index.
+    """
+    _, match_terms = split_query(query)
+    if not match_terms or any(len(term) < MIN_TRIGRAM_LENGTH for term in match_terms):
+        return None
+    return ' OR '.join('"%s"' % term.replace('"', '""') for term in match_terms)
+
+
+class SQLiteFTSBackend(DatabaseBackend):
+    """
+    SQLite FTS5 search over ``api_product_fts`` (migration 0013), ranked by
+    ``bm25`` with name, description and category weighted like the other
+    backends.
+
+    The table uses the ``trigram`` tokenizer, so a term matches anywhere in
+    a word, as with ``icontains`` (and unlike word tokenizers, Bengali vowel
+    signs do not split words).  Triggers on ``api_product`` and
+    ``api_category`` keep it in step with every write, bulk ``UPDATE``s
+    included.  Queries with a term shorter than three characters, and
+    databases without the table (SQLite older than 3.34), fall back to the
+    ``database`` backend.
+
+    The triggers (``TRIGGERS``) are plain SQL that Django's model state
+    does not know about.  SQLite cannot alter most columns in place: a
+    migration that alters a field of ``api_product`` or ``api_category``
+    rebuilds the table, which drops the triggers on it and fails on the
+    ones that name it.  So ``migrate`` drops them before it runs and
+    ``rebuild`` puts them back afterwards, refilling the table (see
+    ``api.signals.drop_fts_triggers``).  Migrations applied without those
+    signals, or a database restored without triggers, need
+    ``update_search_vectors`` to recreate them; until then the ``api.E001``
+    system check fails and ``check_search`` exits with an error.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self):
+        self._available = {}
+
+    def available(self):
+        database = connection.settings_dict['NAME']
+        if database not in self._available:
+            self._available[database] = (
+                connection.vendor == 'sqlite'
+                and FTS_TABLE in connection.introspection.table_names()
+            )
+        return self._available[database]
+
+    def _where(self, expression, category_id, min_price, max_price):
+        conditions = [f'{FTS_TABLE} MATCH %s', 'p.available']
+        params = [expression]
+        for condition, value in (
+            ('p.category_id = %s', category_id),
+            ('p.price >= %s', min_price),
+            ('p.price <= %s', max_price),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        return ' AND '.join(conditions), params
+
+    def _rank(self, expression, category_id=None, min_price=None, max_price=None,
+              offset=0, limit=20, after=None, with_total=True):
+        """``(total, [(product_id, score), ...])`` of one page, best first"""
+        where, params = self._where(expression, category_id, min_price, max_price)
+        matches = f'{FTS_TABLE} JOIN {Product._meta.db_table} p ON p.id = {FTS_TABLE}.rowid WHERE {where}'
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        keyset = ''
+        keyset_params = []
+        if after is not None:
+            score, created, product_id = after
+            created = connection.ops.adapt_datetimefield_value(created)
+            keyset = 'WHERE score < %s OR (score = %s AND (created < %s OR (created = %s AND id < %s)))'
+            keyset_params = [score, score, created, created, product_id]
+
+        with connection.cursor() as cursor:
+            total = None
+            if with_total:
+                cursor.execute(f'SELECT COUNT(*) FROM {matches}', params)
+                total = cursor.fetchone()[0]
+            cursor.execute(f'''
+                SELECT id, score FROM (
+                    SELECT p.id AS id, p.created AS created, -bm25({FTS_TABLE}, {weights}) AS score
+                    FROM {matches}
+                ) {keyset}
+                ORDER BY score DESC, created DESC, id DESC
+                LIMIT %s OFFSET %s
+            ''', [*params, *keyset_params, limit, offset])
+            return total, cursor.fetchall()
+
+    def search(self, query, **arguments):
+        expression = fts_expression(query)
+        if expression is None or not self.available():
+            return super().search(query, **arguments)
+        total, ranked = self._rank(expression, **arguments)
+        return total, _pair_rows(ranked, _page_queryset(ranked))
+
+    # কাঁচা SQL কার্সর async ORM এ নেই, তাই পুরোটা worker থ্রেডে
+    asearch = SearchBackend.asearch
+
+    def facets(self, query, counter):
+        expression = fts_expression(query)
+        if expression is None or not self.available():
+            return super().facets(query, counter)
+        matches = filtered_products().filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [expression])
+        )
+        facet_groups(matches, counter)
+
+    def missing_triggers(self):
+        """Names of the sync triggers that are not in the database"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            present = {name for name, in cursor.fetchall()}
+        return sorted(set(TRIGGERS) - present)
+
+    def drop_triggers(self):
+        with connection.cursor() as cursor:
+            for name in TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+    def rebuild(self):
+        """
+        Recreate missing triggers and refill the FTS table from
+        ``api_product``; returns the row count.
+        """
+        missing = self.missing_triggers()
+        with transaction.atomic(), connection.cursor() as cursor:
+            for name in missing:
+                cursor.execute(TRIGGERS[name])
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(f'''
+                INSERT INTO {FTS_TABLE} (rowid, name, description, category)
+                SELECT p.id, p.name, p.description, c.name
+                FROM {Product._meta.db_table} p JOIN {Category._meta.db_table} c ON c.id = p.category_id
+            ''')
+            return cursor.rowcount
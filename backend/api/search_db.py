@@ -0,0 +1,154 @@
+# api/search_db.py
+
+"""
+Database-side ranking for ``search_products`` (the ``database`` search
+backend, ``api.search_backends.database``).
+
+The weights of the in-memory index (``api.search_index``) are expressed as a
+SQL annotation, so ordering, LIMIT/OFFSET and the total COUNT all run in the
+database and only one page of rows is ever materialized.
+"""
+
+import operator
+from functools import reduce
+
+from django.db import connection
+from django.db.models import BooleanField, Case, Count, F, FloatField, IntegerField, Max, Min, Q, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Product
+from .search_index import (
+    CATEGORY_WEIGHT,
+    DESCRIPTION_WEIGHT,
+    EXACT_NAME_WEIGHT,
+    FEATURED_BONUS,
+    IN_STOCK_BONUS,
+    NAME_WEIGHT,
+    phrase_q,
+    split_query,
+)
+
+# update_search_vectors কমান্ডের কনফিগের সাথে মিল রাখতে হবে
+SEARCH_CONFIG = 'english'
+
+
+def _hit(weight, **lookup):
+    return Case(
+        When(Q(**lookup), then=Value(weight)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def relevance_expression(query, terms):
+    """Same scoring as the old ``calculate_relevance``, as one SQL expression."""
+    score = _hit(EXACT_NAME_WEIGHT, name__icontains=query)
+    for term in terms:
+        score += _hit(NAME_WEIGHT, name__icontains=term)
+        score += _hit(DESCRIPTION_WEIGHT, description__icontains=term)
+        score += _hit(CATEGORY_WEIGHT, category__name__icontains=term)
+    score += _hit(FEATURED_BONUS, featured=True)
+    score += _hit(IN_STOCK_BONUS, stock__gt=0)
+    return score
+
+
+def ordering():
+    """``[(name, descending), ...]`` of the search order, for keyset cursors"""
+    if connection.vendor == 'postgresql':
+        return [('relevance', True), ('rank', True), ('created', True), ('id', True)]
+    return [('relevance', True), ('created', True), ('id', True)]
+
+
+def position(row, score):
+    """Keyset position of a row returned by ``search``"""
+    return [score if name == 'relevance' else row[name] for name, _ in ordering()]
+
+
+def filtered_products(category_id=None, min_price=None, max_price=None):
+    """Available products passing the search filters"""
+    queryset = Product.objects.filter(available=True)
+    if category_id is not None:
+        queryset = queryset.filter(category_id=category_id)
+    if min_price is not None:
+        queryset = queryset.filter(price__gte=min_price)
+    if max_price is not None:
+        queryset = queryset.filter(price__lte=max_price)
+    return queryset
+
+
+def match_q(query):
+    """``icontains`` match of any usable term, or of the whole query without one"""
+    _, match_terms = split_query(query)
+    if match_terms:
+        return reduce(operator.or_, (phrase_q(term) for term in match_terms))
+    return phrase_q(query)
+
+
+def search_queryset(query, category_id=None, min_price=None, max_price=None):
+    """
+    Matching products annotated with ``relevance`` and ordered best first.
+
+    On PostgreSQL the ``search_vector`` column also participates: rows whose
+    vector matches are included, and ``SearchRank`` breaks relevance ties.
+    """
+    terms, match_terms = split_query(query)
+    queryset = filtered_products(category_id, min_price, max_price)
+    match = match_q(query)
+
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search_query = reduce(
+            operator.or_,
+            (SearchQuery(term, config=SEARCH_CONFIG) for term in match_terms or [query]),
+        )
+        match |= Q(search_vector=search_query)
+        # ভেক্টর না থাকলে rank -1, অর্থাৎ nulls last; cursor এ NULL তুলনা এড়াতে
+        queryset = queryset.annotate(rank=Coalesce(
+            SearchRank(F('search_vector'), search_query), Value(-1.0), output_field=FloatField()
+        ))
+
+    return (
+        queryset.filter(match)
+        .annotate(relevance=relevance_expression(query.lower(), terms))
+        .order_by(*[('-' if descending else '') + name for name, descending in ordering()])
+    )
+
+
+def facet_groups(matches, counter):
+    """
+    Feed the products of ``matches`` to ``counter`` (an
+    ``api.search_facets.FacetCounter``) with one GROUP BY query over
+    category, price bucket and whether the price filter holds.
+    """
+    bucket = Case(
+        *[When(price__lt=bound, then=Value(position)) for position, bound in enumerate(counter.bounds)],
+        default=Value(len(counter.bounds)),
+        output_field=IntegerField(),
+    )
+    price_filter = Q()
+    if counter.min_price is not None:
+        price_filter &= Q(price__gte=counter.min_price)
+    if counter.max_price is not None:
+        price_filter &= Q(price__lte=counter.max_price)
+    in_price = Value(True)
+    if price_filter:
+        in_price = Case(When(price_filter, then=Value(True)), default=Value(False), output_field=BooleanField())
+    groups = (
+        matches
+        .order_by()
+        .annotate(bucket=bucket, in_price=in_price)
+        .values('category_id', 'bucket', 'in_price')
+        .annotate(
+            total=Count('id'),
+            total_in_stock=Count('id', filter=Q(stock__gt=0)),
+            total_featured=Count('id', filter=Q(featured=True)),
+            lowest=Min('price'),
+            highest=Max('price'),
+        )
+    )
+    for row in groups:
+        counter.add_group(
+            row['category_id'], row['bucket'], row['in_price'], row['total'],
+            row['total_in_stock'], row['total_featured'], row['lowest'], row['highest'],
+        )
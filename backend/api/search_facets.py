@@ -0,0 +1,130 @@
+# api/search_facets.py
+
+"""
+Facet counts for ``search_products`` (``?facets=true``).
+
+For the current query the response gets hit counts per category, a price
+histogram over ``SEARCH_PRICE_BUCKETS`` and the number of in-stock and
+featured hits.  Facets are disjunctive, the way a filter sidebar needs
+them: category counts ignore the category filter (but respect the price
+filter), the histogram ignores the price filter (but respects the
+category), and the in-stock/featured counts respect both, so they add up
+to ``total_results``.
+
+Everything comes out of one pass over the matches: the postings of the
+in-memory index, or one grouped aggregate query with the SQL backends
+(``api.search_db.facet_groups``).  Each computation is timed as
+``search:facets`` in ``api.instrumentation``.
+"""
+
+from bisect import bisect_right
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework import serializers
+
+from .instrumentation import timed
+from .models import Category
+from .search_backends import get_backend
+
+# বাকেটের সীমা: [0, 100), [100, 250), ... [5000, ∞)
+DEFAULT_PRICE_BUCKETS = (100, 250, 500, 1000, 2500, 5000)
+
+_price_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+def price_buckets():
+    bounds = getattr(settings, 'SEARCH_PRICE_BUCKETS', DEFAULT_PRICE_BUCKETS)
+    return tuple(sorted(Decimal(str(bound)) for bound in bounds))
+
+
+def _price(value):
+    return _price_field.to_representation(value) if value is not None else None
+
+
+class FacetCounter:
+    """Facet counts for one query, fed one match (or one group of them) at a time"""
+
+    def __init__(self, category_id=None, min_price=None, max_price=None):
+        self.category_id = category_id
+        self.min_price = min_price
+        self.max_price = max_price
+        self.bounds = price_buckets()
+        self.categories = Counter()
+        self.histogram = [0] * (len(self.bounds) + 1)
+        self.lowest = self.highest = None
+        self.in_stock = 0
+        self.featured = 0
+
+    def in_price(self, price):
+        return (
+            (self.min_price is None or price >= self.min_price)
+            and (self.max_price is None or price <= self.max_price)
+        )
+
+    def bucket(self, price):
+        return bisect_right(self.bounds, price)
+
+    def add_group(self, category_id, bucket, in_price, count, in_stock, featured, lowest, highest):
+        """Add ``count`` matches of one category, price bucket and price-filter outcome"""
+        in_category = self.category_id is None or category_id == self.category_id
+        if in_price:
+            self.categories[category_id] += count
+        if in_category:
+            self.histogram[bucket] += count
+            if self.lowest is None or lowest < self.lowest:
+                self.lowest = lowest
+            if self.highest is None or highest > self.highest:
+                self.highest = highest
+            if in_price:
+                self.in_stock += in_stock
+                self.featured += featured
+
+    def add(self, category_id, price, stock, featured):
+        """Add one matching product"""
+        self.add_group(
+            category_id, self.bucket(price), self.in_price(price), 1,
+            int(stock > 0), int(featured), price, price,
+        )
+
+    def result(self, categories):
+        """
+        The ``facets`` of the response; ``categories`` are ``id``/``name``/
+        ``slug`` rows of at least the counted categories.
+        """
+        names = {row['id']: row for row in categories}
+        category_facets = [
+            {**names[category_id], 'count': count}
+            for category_id, count in self.categories.items()
+            if count and category_id in names
+        ]
+        category_facets.sort(key=lambda facet: (-facet['count'], facet['name']))
+        edges = (None, *self.bounds, None)
+        return {
+            'categories': category_facets,
+            'price': {
+                'min': _price(self.lowest),
+                'max': _price(self.highest),
+                'buckets': [
+                    {'min': _price(edges[i] if i else Decimal('0')), 'max': _price(edges[i + 1]), 'count': count}
+                    for i, count in enumerate(self.histogram)
+                ],
+            },
+            'in_stock': self.in_stock,
+            'featured': self.featured,
+        }
+
+
+def facets(query, category_id=None, min_price=None, max_price=None, backend=None):
+    """
+    Facets of ``query``, counted by ``backend`` (the configured search
+    backend by default): one pass over the in-memory index, or one grouped
+    query for the SQL backends.
+    """
+    backend = backend or get_backend()
+    with timed('search:facets'):
+        counter = FacetCounter(category_id, min_price, max_price)
+        backend.facets(query, counter)
+        categories = Category.objects.filter(pk__in=list(counter.categories)).values('id', 'name', 'slug')
+        return counter.result(categories)
@@ -0,0 +1,362 @@
+# api/search_index.py
+
+"""
+In-memory inverted index for product search.
+
+The index is built once per process from ``Product``/``Category`` and kept
+current by the signal handlers in ``api.signals``.  Matching follows the
+semantics of the old ``icontains`` scan: a term matches a field when it is a
+substring of that field.  Because terms never contain whitespace, that is the
+same as the term being a substring of one whitespace-separated token, so we
+only look at vocabulary tokens, and only at those that share every
+character bigram with the term (``_grams``), never at every product.
+"""
+
+import heapq
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+
+
+# রিলেভেন্স স্কোরিং ওয়েট (আগের calculate_relevance এর মতোই)
+EXACT_NAME_WEIGHT = 100
+NAME_WEIGHT = 50
+DESCRIPTION_WEIGHT = 20
+CATEGORY_WEIGHT = 30
+FEATURED_BONUS = 10
+IN_STOCK_BONUS = 5
+
+# Field bits stored in each posting
+FIELD_NAME = 1
+FIELD_DESCRIPTION = 2
+FIELD_CATEGORY = 4
+
+MIN_TERM_LENGTH = 2
+
+
+def tokenize(text):
+    """Lower-case whitespace tokenization, same as ``str.split`` on the field."""
+    return (text or '').lower().split()
+
+
+def grams(text):
+    """Single characters and character bigrams of ``text`` (substring lookup keys)"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def split_query(query):
+    """
+    Return ``(terms, match_terms)`` for a raw query string.
+
+    ``terms`` are used for scoring, ``match_terms`` (at least two characters
+    long) decide whether a product matches at all.
+    """
+    terms = [term.lower() for term in query.split()]
+    match_terms = [term for term in terms if len(term) >= MIN_TERM_LENGTH]
+    return terms, match_terms
+
+
+class _Document:
+    __slots__ = (
+        'id', 'name', 'category_id', 'price', 'stock',
+        'featured', 'created', 'updated', 'tokens',
+    )
+
+    def __init__(self, product, category_name):
+        self.id = product.id
+        self.name = (product.name or '').lower()
+        self.category_id = product.category_id
+        self.price = product.price
+        self.stock = product.stock
+        self.featured = bool(product.featured)
+        self.created = product.created.timestamp() if product.created else 0.0
+        self.updated = product.updated
+        tokens = {}
+        for bit, text in (
+            (FIELD_NAME, product.name),
+            (FIELD_DESCRIPTION, product.description),
+            (FIELD_CATEGORY, category_name),
+        ):
+            for token in tokenize(text):
+                tokens[token] = tokens.get(token, 0) | bit
+        self.tokens = tokens
+
+
+class ProductSearchIndex:
+    """
+    Per-process inverted index: ``token -> {product_id: field_bits}``.
+
+    Only available products are indexed.  ``search`` returns the total hit
+    count and the ranked ids of one page, so callers hydrate ~20 rows instead
+    of the whole match set.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._documents = {}
+        self._built = False
+        self._last_updated = None
+        self._checked_at = 0.0
+        # অক্ষর/বাইগ্রাম -> টোকেন, সাবস্ট্রিং খোঁজার জন্য
+        self._grams = {}
+
+    @property
+    def built(self):
+        return self._built
+
+    # ---------------------------------------------------------------- build
+    def _database_fingerprint(self):
+        from .models import Product
+
+        stats = Product.objects.filter(available=True).aggregate(
+            count=Count('id'), last_updated=Max('updated')
+        )
+        return stats['count'], stats['last_updated']
+
+    def _local_fingerprint(self):
+        return len(self._documents), self._last_updated
+
+    def build(self):
+        """(Re)build the whole index from the database."""
+        from .models import Product
+
+        with self._lock:
+            self._postings = {}
+            self._documents = {}
+            self._grams = {}
+            self._last_updated = None
+            products = (
+                Product.objects.filter(available=True)
+                .select_related('category')
+                .only(
+                    'id', 'name', 'description', 'price', 'stock',
+                    'featured', 'created', 'updated', 'category__name',
+                )
+                .iterator(chunk_size=2000)
+            )
+            for product in products:
+                self._add(_Document(product, product.category.name))
+            self._checked_at = time.monotonic()
+            self._built = True
+
+    def ensure_fresh(self):
+        """
+        Build lazily, and every ``SEARCH_INDEX_REFRESH_SECONDS`` compare a cheap
+        fingerprint with the database so writes made by other processes (which
+        never reach our signal handlers) are picked up.
+        """
+        interval = getattr(settings, 'SEARCH_INDEX_REFRESH_SECONDS', 30)
+        with self._lock:
+            if not self._built:
+                self.build()
+                return
+            if interval is None or time.monotonic() - self._checked_at < interval:
+                return
+            self._checked_at = time.monotonic()
+            if self._database_fingerprint() != self._local_fingerprint():
+                self.build()
+
+    def is_fresh(self):
+        """True when ``ensure_fresh`` has nothing to do; never touches the database"""
+        interval = getattr(settings, 'SEARCH_INDEX_REFRESH_SECONDS', 30)
+        return self._built and (
+            interval is None or time.monotonic() - self._checked_at < interval
+        )
+
+    def invalidate(self):
+        """Drop the index; the next search rebuilds it."""
+        with self._lock:
+            self._built = False
+            self._postings = {}
+            self._documents = {}
+            self._grams = {}
+            self._last_updated = None
+
+    # ------------------------------------------------------ incremental updates
+    def _add(self, document):
+        self._documents[document.id] = document
+        if document.updated and (
+            self._last_updated is None or document.updated > self._last_updated
+        ):
+            self._last_updated = document.updated
+        for token, bits in document.tokens.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                for gram in grams(token):
+                    self._grams.setdefault(gram, set()).add(token)
+            postings[document.id] = bits
+
+    def _remove(self, product_id):
+        document = self._documents.pop(product_id, None)
+        if document is None:
+            return
+        for token in document.tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[token]
+                for gram in grams(token):
+                    tokens = self._grams[gram]
+                    tokens.discard(token)
+                    if not tokens:
+                        del self._grams[gram]
+
+    def update_product(self, product):
+        """Re-index one product after it was saved."""
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(product.id)
+            if product.available:
+                self._add(_Document(product, product.category.name))
+
+    def remove_product(self, product_id):
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(product_id)
+
+    def update_category(self, category):
+        """Re-index every product of a renamed category."""
+        from .models import Product
+
+        with self._lock:
+            if not self._built:
+                return
+            products = Product.objects.filter(
+                category=category, available=True
+            ).select_related('category')
+            for product in products:
+                self._remove(product.id)
+                self._add(_Document(product, category.name))
+
+    # --------------------------------------------------------------- lookups
+    def _tokens_containing(self, term):
+        """Vocabulary tokens that contain ``term``"""
+        if len(term) == 1:
+            return self._grams.get(term, ())
+        # যে টোকেনে টার্মের সব বাইগ্রাম আছে, ছোট সেট থেকে শুরু করে
+        sets = sorted((self._grams.get(gram, ()) for gram in grams(term) if len(gram) == 2), key=len)
+        if not sets[0]:
+            return ()
+        candidates = set(sets[0]).intersection(*sets[1:])
+        return [token for token in candidates if term in token]
+
+    def _term_hits(self, term):
+        """``{product_id: field_bits}`` for every product containing ``term``."""
+        hits = {}
+        for token in self._tokens_containing(term):
+            for product_id, bits in self._postings[token].items():
+                hits[product_id] = hits.get(product_id, 0) | bits
+        return hits
+
+    def _phrase_hits(self, phrase):
+        """Fallback for queries without a usable term (e.g. ``"a b"``)."""
+        from .models import Product
+
+        return set(
+            Product.objects.filter(available=True)
+            .filter(phrase_q(phrase))
+            .values_list('id', flat=True)
+        )
+
+    def _candidates(self, query, per_term):
+        """Ids matching ``query``; ``per_term`` are the ``_term_hits`` of its terms"""
+        terms, match_terms = split_query(query)
+        if not match_terms:
+            return self._phrase_hits(query)
+        candidates = set()
+        for term, hits in zip(terms, per_term):
+            if len(term) >= MIN_TERM_LENGTH:
+                candidates.update(hits)
+        return candidates
+
+    def search(self, query, category_id=None, min_price=None, max_price=None,
+               offset=0, limit=20, after=None, refresh=True):
+        """
+        Rank products for ``query``.
+
+        Returns ``(total, [(product_id, score), ...])`` for the requested page.
+        ``after`` is a ``(score, created_timestamp, product_id)`` keyset
+        position; only products ranked below it are returned.
+        ``refresh=False`` skips ``ensure_fresh`` for async callers, which
+        refresh in a worker thread first.
+        """
+        if refresh:
+            self.ensure_fresh()
+        terms, _ = split_query(query)
+        query_lower = query.lower()
+
+        with self._lock:
+            per_term = [self._term_hits(term) for term in terms]
+            candidates = self._candidates(query, per_term)
+
+            scored = []
+            for product_id in candidates:
+                document = self._documents.get(product_id)
+                if document is None:
+                    continue
+                if category_id is not None and document.category_id != category_id:
+                    continue
+                if min_price is not None and document.price < min_price:
+                    continue
+                if max_price is not None and document.price > max_price:
+                    continue
+
+                score = 0
+                if query_lower in document.name:
+                    score += EXACT_NAME_WEIGHT
+                for hits in per_term:
+                    bits = hits.get(product_id, 0)
+                    if bits & FIELD_NAME:
+                        score += NAME_WEIGHT
+                    if bits & FIELD_DESCRIPTION:
+                        score += DESCRIPTION_WEIGHT
+                    if bits & FIELD_CATEGORY:
+                        score += CATEGORY_WEIGHT
+                if document.featured:
+                    score += FEATURED_BONUS
+                if document.stock > 0:
+                    score += IN_STOCK_BONUS
+                scored.append((score, document.created, product_id))
+
+        total = len(scored)
+        if after is not None:
+            scored = [entry for entry in scored if entry < after]
+        # একই স্কোরে নতুন পণ্য আগে (আগের '-created' অর্ডারিং এর মতো)
+        top = heapq.nlargest(offset + limit, scored)
+        page = [(product_id, score) for score, _, product_id in top[offset:offset + limit]]
+        return total, page
+
+    def facets(self, query, counter):
+        """
+        Feed every product matching ``query`` to ``counter`` (an
+        ``api.search_facets.FacetCounter``) in one pass; the counter applies
+        the filters.
+        """
+        self.ensure_fresh()
+        terms, _ = split_query(query)
+        with self._lock:
+            per_term = [self._term_hits(term) for term in terms]
+            for product_id in self._candidates(query, per_term):
+                document = self._documents.get(product_id)
+                if document is not None:
+                    counter.add(document.category_id, document.price, document.stock, document.featured)
+
+
+def phrase_q(phrase):
+    """``icontains`` match of a whole phrase over name, description and category."""
+    return (
+        Q(name__icontains=phrase) |
+        Q(description__icontains=phrase) |
+        Q(category__name__icontains=phrase)
+    )
+
+
+product_index = ProductSearchIndex()
@@ -1,5 +1,10 @@
+from django.conf import settings
+from django.core.validators import validate_image_file_extension
+from django.utils import timezone
 from rest_framework import serializers
+from . import inventory
 from .models import Category, Product, Order, OrderItem, Payment
+from .renditions import rendition_map
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -20,8 +25,17 @@ class ProductSerializer(serializers.ModelSerializer):
         help_text="Category ID (required)"
     )
     
+    # Pillow দিয়ে ডিকোড রিকোয়েস্টে নয়, ব্যাকগ্রাউন্ড জবে হয় (api.image_jobs)
+    image = serializers.FileField(
+        required=False,
+        allow_null=True,
+        validators=[validate_image_file_extension]
+    )
+    
     # Custom image URL field
     image_url = serializers.SerializerMethodField()
+    # size -> {webp, jpeg} URL map
+    image_renditions = serializers.SerializerMethodField()
     
     class Meta:
         model = Product
@@ -33,6 +47,8 @@ class ProductSerializer(serializers.ModelSerializer):
             'category_id', 
             'image', 
             'image_url',
+            'image_renditions',
+            'image_status',
             'price', 
             'description', 
             'stock', 
@@ -41,10 +57,9 @@ class ProductSerializer(serializers.ModelSerializer):
             'created', 
             'updated'
         ]
-        read_only_fields = ['created', 'updated', 'image_url']
+        read_only_fields = ['created', 'updated', 'image_url', 'image_renditions', 'image_status']
         extra_kwargs = {
             'slug': {'required': False},
-            'image': {'required': False},
         }
     
     def get_image_url(self, obj):
@@ -53,6 +68,138 @@ class ProductSerializer(serializers.ModelSerializer):
         if obj.image and request:
             return request.build_absolute_uri(obj.image.url)
         return None
+    
+    def get_image_renditions(self, obj):
+        """Thumbnail/WebP URLs once the uploaded image has been processed"""
+        if not obj.image or obj.image_status != 'ready':
+            return None
+        request = self.context.get('request')
+        if request is None:
+            return rendition_map(obj.image.name)
+        return rendition_map(obj.image.name, request.build_absolute_uri)
+
+
+class ProductReadSerializer:
+    """
+    Read-only fast path for product listings.
+    
+    Works on ``values()`` rows instead of model instances and resolves the
+    absolute URL prefix once per request instead of calling
+    ``request.build_absolute_uri`` per object.  The output is identical to
+    ``ProductSerializer(...).data`` for reads; price and dates are formatted
+    by the same DRF fields, so REST_FRAMEWORK settings still apply.
+    """
+    
+    values_fields = (
+        'id', 'name', 'slug', 'category_id', 'category__name', 'category__slug',
+        'image', 'image_status', 'price', 'description', 'stock', 'available', 'featured',
+        'created', 'updated',
+    )
+    
+    _price_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+    
+    def __init__(self, request=None):
+        self.request = request
+        # বর্তমান timezone একবারই বের করুন, প্রতি ফিল্ডে না
+        self._datetime_field = serializers.DateTimeField(
+            default_timezone=timezone.get_current_timezone() if settings.USE_TZ else None
+        )
+        self.storage = Product._meta.get_field('image').storage
+        self.scheme_host = request.build_absolute_uri('/')[:-1] if request is not None else None
+    
+    @classmethod
+    def values(cls, queryset):
+        """Turn a product queryset into the rows this serializer expects"""
+        return queryset.values(*cls.values_fields)
+    
+    def _absolute(self, url):
+        # build_absolute_uri এর দ্রুত পথ: '/...' লোকেশনের আগে শুধু scheme://host বসে
+        if url.startswith('/') and not url.startswith('//') and '/./' not in url and '/../' not in url:
+            return self.scheme_host + url
+        return self.request.build_absolute_uri(url)
+    
+    def to_representation(self, row):
+        image = image_url = renditions = None
+        if row['image']:
+            image = self.storage.url(row['image'])
+            ready = row['image_status'] == 'ready'
+            if self.request is not None:
+                image = image_url = self._absolute(image)
+                if ready:
+                    renditions = rendition_map(row['image'], self._absolute)
+            elif ready:
+                renditions = rendition_map(row['image'])
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'slug': row['slug'],
+            'category': {
+                'id': row['category_id'],
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            },
+            'image': image,
+            'image_url': image_url,
+            'image_renditions': renditions,
+            'image_status': row['image_status'],
+            'price': self._price_field.to_representation(row['price']),
+            'description': row['description'],
+            'stock': row['stock'],
+            'available': row['available'],
+            'featured': row['featured'],
+            'created': self._datetime_field.to_representation(row['created']),
+            'updated': self._datetime_field.to_representation(row['updated']),
+        }
+    
+    def many(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+class ProductBatchSerializer(ProductReadSerializer):
+    """
+    Compact product records for ``/api/products/batch/`` (cart and order
+    hydration): only the requested ``fields``, read from only the columns
+    they need.  ``stock`` and ``available`` of sharded products come from
+    the shards (``api.inventory.live_stock``), not the reconciled copy.
+    """
+    
+    # ফিল্ড -> values() কলাম
+    FIELDS = {
+        'id': 'id',
+        'slug': 'slug',
+        'name': 'name',
+        'price': 'price',
+        'stock': 'live_stock',
+        'available': 'live_available',
+        'category_id': 'category_id',
+        'image': 'image',
+        'updated': 'updated',
+    }
+    DEFAULT_FIELDS = ('id', 'slug', 'name', 'price', 'stock', 'available')
+    
+    def __init__(self, request=None, fields=DEFAULT_FIELDS):
+        super().__init__(request)
+        self.fields = fields
+    
+    def values(self, queryset):
+        # id আর slug সবসময়, যাতে view অনুপস্থিত গুলো খুঁজে পায়
+        columns = dict.fromkeys(['id', 'slug', *(self.FIELDS[field] for field in self.fields)])
+        live = {name: expression for name, expression in inventory.live_stock().items() if name in columns}
+        return queryset.annotate(**live).values(*columns)
+    
+    def to_representation(self, row):
+        record = {}
+        for field in self.fields:
+            if field == 'price':
+                record[field] = self._price_field.to_representation(row['price'])
+            elif field == 'updated':
+                record[field] = self._datetime_field.to_representation(row['updated'])
+            elif field == 'image':
+                image = self.storage.url(row['image']) if row['image'] else None
+                record[field] = self._absolute(image) if image and self.request is not None else image
+            else:
+                record[field] = row[self.FIELDS[field]]
+        return record
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -101,6 +248,9 @@ class PaymentSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'order', 'order_id', 'transaction_id', 
             'amount', 'payment_method', 'status',
-            'mobile_number', 'created', 'updated'
+            'mobile_number', 'gateway_reference', 'customer_reference', 'gateway_detail',
+            'created', 'updated'
         ]
-        read_only_fields = ['transaction_id', 'created', 'updated']
\ No newline at end of file
+        read_only_fields = [
+            'transaction_id', 'status', 'gateway_reference', 'customer_reference', 'created', 'updated'
+        ]
\ No newline at end of file
@@ -0,0 +1,144 @@
+# api/signals.py
+
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import image_jobs, inventory
+from .autocomplete import autocomplete_index
+from .fuzzy import fuzzy_index
+from .models import Category, Payment, Product
+from .response_cache import response_cache
+from .search_backends.sqlite import SQLiteFTSBackend
+from .search_index import product_index
+
+
+def products_changed(product_ids):
+    """
+    Sync in-memory indexes and cached responses after a bulk ``UPDATE``
+    that bypassed ``save()`` (and therefore the signals below), e.g. stock
+    decrements at checkout.
+    """
+    if not product_ids:
+        return
+    
+    def sync():
+        category_ids = Product.objects.filter(pk__in=product_ids).values_list('category_id', flat=True)
+        response_cache.bump('products', *{f'category:{pk}' for pk in category_ids})
+        if not (product_index.built or autocomplete_index.built or fuzzy_index.built):
+            return
+        products = Product.objects.filter(pk__in=product_ids).select_related('category')
+        for product in products:
+            product_index.update_product(product)
+            autocomplete_index.update_product(product)
+            fuzzy_index.update_product(product)
+    transaction.on_commit(sync)
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, raw=False, **kwargs):
+    """Keep the in-memory search index in step with product writes"""
+    if raw:
+        return
+    # পণ্য অন্য ক্যাটাগরিতে গেলে পুরনোটার cache ও বাতিল
+    old_category_id = getattr(instance, '_search_source', (None,) * 3)[2]
+    response_cache.bump(
+        'products',
+        *{f'category:{pk}' for pk in (instance.category_id, old_category_id) if pk is not None}
+    )
+    
+    def index():
+        product_index.update_product(instance)
+        autocomplete_index.update_product(instance)
+        fuzzy_index.update_product(instance)
+    # rollback হলে ইনডেক্সও আগের মতো থাকে
+    transaction.on_commit(index)
+    if instance.search_dirty and connection.vendor == 'postgresql':
+        transaction.on_commit(instance.update_search_vector)
+    if instance.image_status == 'pending':
+        # ডিকোড/রিসাইজ রিকোয়েস্টের বাইরে, কমিটের পরে
+        transaction.on_commit(lambda: image_jobs.enqueue(instance.pk))
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    response_cache.bump('products', f'category:{instance.category_id}')
+    # delete() শেষে instance.pk None হয়ে যায়
+    product_id = instance.pk
+    
+    def unindex():
+        product_index.remove_product(product_id)
+        autocomplete_index.remove_product(product_id)
+        fuzzy_index.remove_product(product_id)
+    transaction.on_commit(unindex)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category(sender, instance, created=False, raw=False, **kwargs):
+    """Category name is indexed with every product, so re-index its products"""
+    if raw:
+        return
+    response_cache.bump('categories', f'category:{instance.pk}')
+    name_changed = not created and instance.name_changed
+    
+    def index():
+        autocomplete_index.update_category(instance)
+        fuzzy_index.update_category(instance)
+        if name_changed:
+            product_index.update_category(instance)
+    transaction.on_commit(index)
+    if name_changed:
+        # শুধু এই ক্যাটাগরির পণ্যের search_vector পুরনো হয়েছে
+        products = Product.objects.filter(category=instance)
+        products.update(search_dirty=True)
+        if connection.vendor == 'postgresql':
+            transaction.on_commit(lambda: _refresh_in_batches(products))
+
+
+@receiver(post_delete, sender=Category)
+def unindex_category(sender, instance, **kwargs):
+    response_cache.bump('categories', f'category:{instance.pk}')
+    category_id = instance.pk
+    
+    def unindex():
+        autocomplete_index.remove_category(category_id)
+        fuzzy_index.remove_category(category_id)
+    transaction.on_commit(unindex)
+
+
+def _refresh_in_batches(queryset, batch_size=1000):
+    for ids in queryset.id_batches(batch_size):
+        Product.objects.filter(id__in=ids).refresh_search_vectors()
+
+
+@receiver(post_save, sender=Payment)
+def settle_reservations(sender, instance, raw=False, **kwargs):
+    """Commit held stock when payment completes, release it when payment fails"""
+    if raw:
+        return
+    if instance.status == 'completed':
+        products_changed(inventory.commit_order(instance.order_id))
+    elif instance.status in ('failed', 'cancelled'):
+        products_changed(inventory.release_order(instance.order_id))
+
+
+def drop_fts_triggers(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    ``pre_migrate``: remove the SQLite FTS triggers while migrations run, so
+    a rebuilt ``api_product`` or ``api_category`` neither loses them nor
+    fails to rename because a trigger names it.
+    """
+    backend = SQLiteFTSBackend()
+    if using == DEFAULT_DB_ALIAS and connection.vendor == 'sqlite' and backend.available():
+        backend.drop_triggers()
+
+
+def restore_fts_triggers(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    ``post_migrate``: recreate the triggers and refill the FTS table, which
+    data migrations may have changed while the triggers were gone.
+    """
+    backend = SQLiteFTSBackend()
+    if using == DEFAULT_DB_ALIAS and connection.vendor == 'sqlite' and backend.available():
+        if backend.missing_triggers():
+            backend.rebuild()
@@ -0,0 +1,78 @@
+# api/storage.py
+
+"""
+Content-addressed storage for product images.
+
+A file is stored under the SHA-256 of its bytes, sharded two levels deep
+below the ``upload_to`` directory::
+
+    products/3f/a2/3fa2...c1.jpg
+
+Uploading the same photo again (for another product, or twice by mistake)
+reuses the existing file instead of writing ``photo_kJBKj9L.jpg``, and
+since a name never changes content, the files can be cached forever.
+"""
+
+import hashlib
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# ছবি কখনো বদলায় না, তাই ব্রাউজার/CDN এক বছর রাখতে পারে
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+_ADDRESSED = re.compile(r'(?:^|/)([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}(?:__\w+)?\.\w+$')
+
+
+def is_addressed(name):
+    """True for content-addressed names and the renditions stored next to them"""
+    return bool(_ADDRESSED.search(name or ''))
+
+
+def content_hash(content):
+    """SHA-256 hex digest of a Django ``File``, read in chunks"""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def addressed_name(directory, digest, extension):
+    return posixpath.join(directory, digest[:2], digest[2:4], f'{digest}{extension.lower()}')
+
+
+@deconstructible(path='api.storage.ContentAddressedStorage')
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    ``FileSystemStorage`` that names saved files by content.
+
+    Only the directory and extension of the requested name are kept.
+    Derived files whose name is already fixed (renditions) are written with
+    ``save_derived``.
+    """
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1]
+        target = addressed_name(directory, content_hash(content), extension)
+        if self.exists(target):
+            return target
+        saved = super()._save(target, content)
+        if saved != target:
+            # একই ফাইল অন্য রিকোয়েস্ট একই সময়ে লিখেছে
+            self.delete(saved)
+        return target
+
+    def save_derived(self, name, content):
+        """Write ``content`` under exactly ``name`` unless it already exists"""
+        if self.exists(name):
+            return name
+        saved = super()._save(name, content)
+        if saved != name:
+            self.delete(saved)
+        return name
+
+
+product_image_storage = ContentAddressedStorage()
@@ -1,3 +1,2249 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from itertools import count
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import CommandError, call_command
+from django.core.management.base import SystemCheckError
+from django.db import DatabaseError, connection
+from django.db.models import F, Q
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import checks, inventory, payments, reports, renditions, sales, signals
+from .admin import ProductAdmin
+from .autocomplete import _PrefixArray, autocomplete_index, normalize
+from .fuzzy import fold, fuzzy_index
+from .instrumentation import QueryBudgetExceeded, registry
+from .mock_gateway import MockGateway
+from .models import (
+    Category, CategorySales, DailyPaymentSummary, DailySalesSummary, Order, OrderItem, Payment, Product,
+    ProductQuerySet, ProductSales, SearchTermDaily, StockReservation, StockShard,
+)
+from .response_cache import response_cache
+from .search_analytics import search_log
+from .search_backends import get_backend
+from .search_backends.sqlite import FTS_TABLE, TRIGGERS, SQLiteFTSBackend
+from .search_index import product_index
+from .serializers import ProductReadSerializer, ProductSerializer
+from .storage import IMMUTABLE_CACHE_CONTROL, is_addressed
+from .transliteration import transliterate
+from .views import CategoryViewSet, serve_media
+
+_sequence = count()
+
+
+def make_products(n, category=None, **fields):
+    """``n`` products priced 100 with 100 in stock, in a new category unless one is given"""
+    if category is None:
+        i = next(_sequence)
+        category = Category.objects.create(name=f'খেজুর {i}', slug=f'category-{i}')
+    products = []
+    for _ in range(n):
+        i = next(_sequence)
+        products.append(Product.objects.create(
+            category=category,
+            name=f'আজওয়া খেজুর {i}',
+            slug=f'product-{i}',
+            price=Decimal('100.00'),
+            description='মদিনার আজওয়া খেজুর',
+            image=f'products/{i}.jpg',
+            stock=100,
+            **fields,
+        ))
+    return products
+
+
+def make_orders(n, items=2, with_payment=False):
+    """``n`` orders of ``items`` new products each, optionally with a pending bKash payment"""
+    for _ in range(n):
+        order = Order.objects.create(
+            name='Test', email='test@example.com', phone='01700000000',
+            address='Dhaka', total_price=Decimal('200.00'),
+        )
+        for product in make_products(items):
+            OrderItem.objects.create(order=order, product=product, price=product.price, quantity=1)
+        if with_payment:
+            Payment.objects.create(
+                order=order, transaction_id=f'TXN{next(_sequence)}', amount=order.total_price,
+                payment_method='bkash', mobile_number='01700000000',
+            )
+
+
+def reset_caches():
+    """Empty the shared and per-process response caches, which outlive a test's transaction"""
+    cache.clear()
+    response_cache.reset()
+
+
+def reset_search():
+    """Forget the per-process search structures and buffered analytics"""
+    # ইনডেক্সগুলো প্রসেস-লেভেল, প্রতি টেস্টের DB এর সাথে মিলিয়ে নিন
+    product_index.invalidate()
+    autocomplete_index.invalidate()
+    fuzzy_index.invalidate()
+    search_log.reset()
+
+
+@override_settings(
+    QUERY_BUDGET_STRICT=True, SEARCH_INDEX_REFRESH_SECONDS=None, IMAGE_JOB_MODE='sync',
+    SEARCH_ANALYTICS_FLUSH_SECONDS=None,
+)
+class QueryCountTestCase(TestCase):
+    """
+    Base class for query-count regression tests.
+
+    Budgets are strict here, so any view over its budget raises
+    ``QueryBudgetExceeded``.  ``assertConstantQueries`` additionally checks
+    that doubling the result size does not add queries.  Feature tests use a
+    plain ``TestCase`` with their own fixtures instead.
+    """
+
+    def setUp(self):
+        reset_search()
+        registry.reset()
+        reset_caches()
+
+    def count_get(self, url, **params):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, getattr(response, 'data', response))
+        return len(captured)
+
+    def assertConstantQueries(self, url, grow, params=None, warm=None):
+        """``grow()`` adds rows; the query count for ``url`` must not change"""
+        params = params or {}
+        grow()
+        if warm:
+            warm()
+        before = self.count_get(url, **params)
+        grow()
+        if warm:
+            warm()
+        after = self.count_get(url, **params)
+        self.assertEqual(before, after, f'{url} went from {before} to {after} queries')
+
+
+class ProductQueryCountTests(QueryCountTestCase):
+
+    def test_list(self):
+        self.assertConstantQueries('/api/products/', lambda: make_products(5))
+
+    def test_featured(self):
+        self.assertConstantQueries('/api/products/featured/', lambda: make_products(3, featured=True))
+
+    def test_by_category(self):
+        category = Category.objects.create(name='মধু', slug='honey')
+        self.assertConstantQueries(
+            '/api/products/by_category/',
+            lambda: make_products(5, category=category),
+            params={'category_slug': 'honey'},
+        )
+
+    def test_retrieve(self):
+        product = make_products(1)[0]
+        self.assertLessEqual(self.count_get(f'/api/products/{product.pk}/'), 2)
+
+
+class CategoryQueryCountTests(QueryCountTestCase):
+
+    def test_list(self):
+        self.assertConstantQueries('/api/categories/', lambda: make_products(1))
+
+
+class OrderQueryCountTests(QueryCountTestCase):
+
+    def test_list(self):
+        self.assertConstantQueries('/api/orders/', lambda: make_orders(3))
+
+    def test_order_items_list(self):
+        self.assertConstantQueries('/api/order-items/', lambda: make_orders(3))
+
+    def test_payments_list(self):
+        self.assertConstantQueries('/api/payments/', lambda: make_orders(3, with_payment=True))
+
+    def test_create_does_not_grow_with_cart_size(self):
+        def place(size):
+            products = make_products(size)
+            payload = {
+                'name': 'Test', 'email': 'test@example.com', 'phone': '01700000000',
+                'address': 'Dhaka',
+                'items': [{'product_id': product.pk, 'quantity': 1} for product in products],
+            }
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.post('/api/orders/', payload, content_type='application/json')
+            self.assertEqual(response.status_code, 201, response.data)
+            self.assertEqual(len(response.data['items']), size)
+            return len(captured)
+
+        self.assertEqual(place(2), place(6))
+
+
+class SearchQueryCountTests(QueryCountTestCase):
+
+    def warm(self):
+        product_index.ensure_fresh()
+        autocomplete_index.ensure_fresh()
+
+    def test_search_index_engine(self):
+        self.assertConstantQueries(
+            reverse('search-products'), lambda: make_products(5), params={'q': 'আজওয়া'}, warm=self.warm,
+        )
+
+    @override_settings(SEARCH_ENGINE='database')
+    def test_search_database_engine(self):
+        self.assertConstantQueries(
+            reverse('search-products'), lambda: make_products(5), params={'q': 'আজওয়া'},
+        )
+
+    @override_settings(SEARCH_BACKEND='sqlite')
+    def test_search_sqlite_backend(self):
+        params = {'q': 'আজওয়া', 'facets': 'true'}
+        # FTS টেবিল আছে কিনা প্রসেসে একবারই দেখা হয়
+        self.assertConstantQueries(
+            reverse('search-products'), lambda: make_products(5), params=params, warm=get_backend().available,
+        )
+
+    def test_search_facets(self):
+        params = {'q': 'আজওয়া', 'facets': 'true', 'max_price': '500'}
+        self.assertConstantQueries(
+            reverse('search-products'), lambda: make_products(5), params=params, warm=self.warm,
+        )
+        with override_settings(SEARCH_ENGINE='database'):
+            self.assertConstantQueries(reverse('search-products'), lambda: make_products(5), params=params)
+
+    def test_autocomplete(self):
+        self.assertConstantQueries(
+            reverse('autocomplete'), lambda: make_products(5), params={'q': 'আজ'}, warm=self.warm,
+        )
+
+    def test_corrected_search(self):
+        def warm():
+            self.warm()
+            fuzzy_index.ensure_fresh()
+        params = {'q': 'khejur', 'facets': 'true'}
+        self.assertConstantQueries(reverse('search-products'), lambda: make_products(5), params=params, warm=warm)
+        with override_settings(SEARCH_ENGINE='database'):
+            self.assertConstantQueries(reverse('search-products'), lambda: make_products(5), params=params)
+
+    def test_statistics(self):
+        self.assertConstantQueries(reverse('search-stats'), lambda: make_products(5))
+
+
+class AdminQueryCountTests(QueryCountTestCase):
+
+    def setUp(self):
+        super().setUp()
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+
+    def test_product_changelist(self):
+        self.assertConstantQueries(reverse('admin:api_product_changelist'), lambda: make_products(5))
+
+    def test_payment_changelist(self):
+        self.assertConstantQueries(
+            reverse('admin:api_payment_changelist'), lambda: make_orders(2, with_payment=True),
+        )
+
+
+class InstrumentationTests(QueryCountTestCase):
+
+    def test_budget_exceeded_raises_in_strict_mode(self):
+        make_products(1)
+        with mock.patch.object(CategoryViewSet, 'query_budgets', {'list': 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/categories/')
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_budget_exceeded_warns_at_runtime(self):
+        make_products(1)
+        with mock.patch.object(CategoryViewSet, 'query_budgets', {'list': 0}):
+            with self.assertLogs('api.instrumentation', level='WARNING'):
+                response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/products/')
+        self.assertIn(self.client.get(reverse('metrics')).status_code, (401, 403))
+
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()['endpoints']['ProductViewSet.list']
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['budget'], 4)
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+
+    def walk(self, url, key='next', **params):
+        names = []
+        response = self.client.get(url, params).json()
+        while True:
+            names.extend(item['name'] for item in response['results'])
+            if not response[key]:
+                return names, response
+            response = self.client.get(response[key]).json()
+
+    def test_pages_cover_every_row_once(self):
+        category = Category.objects.create(name='মধু', slug='honey')
+        make_products(7, category=category)
+        # একই created এ কয়েকটি পণ্য, id দিয়ে ক্রম স্থির থাকতে হবে
+        Product.objects.filter(category=category).update(created=Product.objects.first().created)
+        expected = list(Product.objects.filter(category=category).order_by('-created', '-id')
+                        .values_list('name', flat=True))
+
+        names, last = self.walk('/api/products/', category=category.pk, page_size=3)
+        self.assertEqual(names, expected)
+        self.assertEqual(last['count'], 7)
+
+        # previous লিংক ধরে পেছনে গেলেও একই ক্রম
+        back, _ = self.walk(last['previous'], key='previous')
+        self.assertEqual(back[:3], expected[3:6])
+
+    def test_ordering_param(self):
+        for product, price in zip(make_products(3), ('30.00', '10.00', '20.00')):
+            Product.objects.filter(pk=product.pk).update(price=price)
+        names, _ = self.walk('/api/products/', ordering='price', page_size=2)
+        expected = list(Product.objects.order_by('price', 'id').values_list('name', flat=True))
+        self.assertEqual(names, expected)
+
+    def test_deep_page_costs_the_same(self):
+        make_products(12)
+        first = self.client.get('/api/products/', {'page_size': 2})
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get('/api/products/', {'page_size': 2})
+        response = first.json()
+        for _ in range(4):
+            response = self.client.get(response['next']).json()
+        with CaptureQueriesContext(connection) as deep:
+            self.client.get(response['next'])
+        self.assertEqual(len(captured), len(deep))
+        self.assertNotIn('OFFSET', deep[-1]['sql'].upper())
+
+    def test_count_opt_out(self):
+        make_products(3)
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/products/', {'count': 'false'})
+        self.assertNotIn('count', response.json())
+        # ETag এর aggregate + পেজের রো, COUNT নেই
+        self.assertEqual(len(captured), 2)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/products/', {'cursor': 'garbage'}).status_code, 404)
+
+    def test_orders_and_payments_paginate(self):
+        make_orders(3, items=1, with_payment=True)
+        for url in ('/api/orders/', '/api/payments/', '/api/order-items/', '/api/categories/'):
+            response = self.client.get(url, {'page_size': 2}).json()
+            self.assertEqual(len(response['results']), 2)
+            self.assertIsNotNone(response['next'])
+
+
+@override_settings(SEARCH_INDEX_REFRESH_SECONDS=None, SEARCH_ANALYTICS_FLUSH_SECONDS=None)
+class SearchCursorTests(TestCase):
+
+    def setUp(self):
+        reset_search()
+        reset_caches()
+
+    def walk(self):
+        response = self.client.get(reverse('search-products'), {'q': 'আজওয়া'}).json()
+        ids = [product['id'] for product in response['products']]
+        while response['next_cursor']:
+            response = self.client.get(
+                reverse('search-products'), {'q': 'আজওয়া', 'cursor': response['next_cursor']}
+            ).json()
+            ids.extend(product['id'] for product in response['products'])
+        return ids
+
+    def check_cursor_matches_pages(self):
+        make_products(25)
+        make_products(20, featured=True)
+        pages = []
+        for page in (1, 2, 3):
+            response = self.client.get(reverse('search-products'), {'q': 'আজওয়া', 'page': page}).json()
+            pages.extend(product['id'] for product in response['products'])
+        self.assertEqual(self.walk(), pages)
+        self.assertEqual(len(pages), 45)
+
+    def test_index_engine(self):
+        self.check_cursor_matches_pages()
+
+    @override_settings(SEARCH_ENGINE='database')
+    def test_database_engine(self):
+        self.check_cursor_matches_pages()
+
+    @override_settings(SEARCH_BACKEND='sqlite')
+    def test_sqlite_backend(self):
+        self.check_cursor_matches_pages()
+
+    @override_settings(SEARCH_ENGINE='database')
+    def test_count_opt_out(self):
+        make_products(3)
+        response = self.client.get(reverse('search-products'), {'q': 'আজওয়া', 'count': 'false'}).json()
+        self.assertIsNone(response['total_results'])
+        self.assertEqual(len(response['products']), 3)
+
+
+class ResponseCacheTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+
+    def test_shared_responses_are_cached_until_a_write(self):
+        product = make_products(2, featured=True)[0]
+        # ক্যাটাগরি তালিকায় শুধু ETag এর aggregate বাকি থাকে
+        for url, queries in (('/api/products/featured/', 0), ('/api/categories/', 1), (reverse('search-stats'), 0)):
+            first = self.client.get(url).json()
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(self.client.get(url).json(), first)
+            self.assertEqual(len(captured), queries, url)
+
+        product.price = Decimal('55.00')
+        product.save()
+        featured = self.client.get('/api/products/featured/').json()
+        self.assertIn('55.00', [item['price'] for item in featured])
+
+    def test_category_generation_keeps_other_categories_warm(self):
+        honey = Category.objects.create(name='মধু', slug='honey')
+        dates = Category.objects.create(name='খেজুর', slug='dates')
+        honey_product = make_products(1, category=honey)[0]
+        make_products(1, category=dates)
+        url = '/api/products/by_category/'
+        for slug in ('honey', 'dates'):
+            self.client.get(url, {'category_slug': slug})
+
+        honey_product.price = Decimal('55.00')
+        honey_product.save()
+
+        # শুধু ক্যাটাগরি lookup, পণ্যের ক্যোয়ারী নয়
+        with self.assertNumQueries(1):
+            self.client.get(url, {'category_slug': 'dates'})
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(url, {'category_slug': 'honey'})
+        self.assertGreater(len(captured), 1)
+        honey = self.client.get(url, {'category_slug': 'honey'}).json()
+        self.assertEqual(honey['results'][0]['price'], '55.00')
+
+    def test_stale_value_served_while_another_worker_recomputes(self):
+        make_products(1, featured=True)
+        stale = self.client.get('/api/products/featured/').json()
+        make_products(1, featured=True)
+
+        with mock.patch.object(cache, 'add', return_value=False):
+            with CaptureQueriesContext(connection) as captured:
+                self.assertEqual(self.client.get('/api/products/featured/').json(), stale)
+        self.assertEqual(len(captured), 0)
+        self.assertEqual(len(self.client.get('/api/products/featured/').json()), 2)
+
+    def test_metrics(self):
+        self.client.get('/api/categories/')
+        self.client.get('/api/categories/')
+        response_cache.clear_local()
+        self.client.get('/api/categories/')
+        stats = response_cache.stats()
+        self.assertEqual(
+            (stats['misses'], stats['local_hits'], stats['shared_hits']), (1, 1, 1)
+        )
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+
+    def revalidate(self, url, response, **params):
+        with CaptureQueriesContext(connection) as captured:
+            again = self.client.get(url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+        return again, len(captured)
+
+    def test_product_detail(self):
+        product = make_products(1)[0]
+        url = f'/api/products/{product.pk}/'
+        response = self.client.get(url)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertIn('Last-Modified', response)
+
+        again, queries = self.revalidate(url, response)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b'')
+        self.assertEqual(queries, 1)
+
+        product.stock = 5
+        product.save()
+        self.assertEqual(self.revalidate(url, response)[0].status_code, 200)
+
+    def test_category_rename_changes_product_validators(self):
+        product = make_products(1)[0]
+        url = f'/api/products/{product.pk}/'
+        response = self.client.get(url)
+        category = product.category
+        category.name = 'নতুন নাম'
+        category.save()
+        again, _ = self.revalidate(url, response)
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json()['category']['name'], 'নতুন নাম')
+
+    def test_lists(self):
+        make_products(3)
+        for url in ('/api/products/', '/api/categories/'):
+            response = self.client.get(url, {'page_size': 2})
+            again, queries = self.revalidate(url, response, page_size=2)
+            self.assertEqual(again.status_code, 304, url)
+            self.assertEqual(queries, 1, url)
+            # অন্য পেজ, অন্য ETag
+            other = self.client.get(url, {'page_size': 1})
+            self.assertNotEqual(other['ETag'], response['ETag'])
+
+        response = self.client.get('/api/products/')
+        Product.objects.first().delete()
+        self.assertEqual(self.revalidate('/api/products/', response)[0].status_code, 200)
+
+    def test_category_detail(self):
+        category = make_products(1)[0].category
+        url = f'/api/categories/{category.slug}/'
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response)[0].status_code, 304)
+
+
+@override_settings(IMAGE_JOB_MODE='sync')
+class MediaTestCase(TestCase):
+    """Product images are written to a throwaway ``MEDIA_ROOT``"""
+
+    def setUp(self):
+        reset_caches()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(self.settings(MEDIA_ROOT=media_root))
+        self.storage = Product._meta.get_field('image').storage
+
+    @staticmethod
+    def jpeg(size=(1200, 800), exif=None):
+        buffer = io.BytesIO()
+        Image.new('RGB', size, 'green').save(buffer, 'JPEG', exif=exif or Image.Exif())
+        return buffer.getvalue()
+
+
+class RenditionTests(MediaTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.product = make_products(1)[0]
+        self.product.image.save('dates.jpg', ContentFile(self.jpeg()))
+        # মাইগ্রেশনের আগের ছবির মতো: ready, কিন্তু রেন্ডিশন এখনো নেই
+        Product.objects.filter(pk=self.product.pk).update(image_status='ready')
+        self.name = self.product.image.name
+
+    def test_serializer_map_and_lazy_generation(self):
+        data = self.client.get(f'/api/products/{self.product.pk}/').json()
+        url = data['image_renditions']['thumb']['webp']
+        self.assertTrue(url.startswith('http://testserver/api/images/thumb/webp/'))
+
+        target = renditions.rendition_name(self.name, 'thumb', 'webp')
+        self.assertFalse(self.storage.exists(target))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], self.storage.url(target))
+        with self.storage.open(target) as rendition:
+            image = Image.open(rendition)
+            self.assertEqual((image.format, image.size), ('WEBP', (150, 100)))
+
+        # দ্বিতীয়বার কোনো ক্যোয়ারী বা এনকোড নয়
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.client.get(url).status_code, 302)
+        self.assertEqual(len(captured), 0)
+
+    def test_only_product_images(self):
+        self.assertEqual(self.client.get('/api/images/thumb/webp/products/other.jpg').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/images/huge/webp/{self.name}').status_code, 404)
+
+    def test_backfill_command(self):
+        call_command('generate_renditions', stdout=io.StringIO())
+        for target in renditions.rendition_names(self.name):
+            self.assertTrue(self.storage.exists(target), target)
+        with self.storage.open(renditions.rendition_name(self.name, 'medium', 'jpeg')) as rendition:
+            image = Image.open(rendition)
+            self.assertEqual(image.size, (600, 400))
+            self.assertTrue(image.info.get('progressive'))
+
+
+class ImageJobTests(MediaTestCase):
+
+    def upload(self, content, filename='dates.jpg'):
+        category = Category.objects.create(name='খেজুর', slug='dates')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/products/', {
+                'name': 'Ajwa',
+                'slug': 'ajwa',
+                'category_id': category.pk,
+                'price': '1200.00',
+                # মাল্টিপার্ট ফর্মে না পাঠালে boolean False ধরা হয়
+                'available': 'true',
+                'image': ContentFile(content, name=filename),
+            })
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def test_upload_is_processed_after_commit(self):
+        # EXIF orientation 6: ছবিটি ৯০° ঘোরানো
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        created = self.upload(self.jpeg((1200, 800), exif))
+        self.assertEqual(created['image_status'], 'pending')
+        self.assertIsNone(created['image_renditions'])
+
+        product = self.client.get(f'/api/products/{created["id"]}/').json()
+        self.assertEqual(product['image_status'], 'ready')
+        self.assertIn('small', product['image_renditions'])
+        name = Product.objects.get(pk=created['id']).image.name
+        with self.storage.open(renditions.rendition_name(name, 'medium', 'webp')) as rendition:
+            self.assertEqual(Image.open(rendition).size, (400, 600))
+
+    def test_unreadable_upload_fails_in_background(self):
+        created = self.upload(b'not really a jpeg')
+        product = Product.objects.get(pk=created['id'])
+        self.assertEqual(product.image_status, 'failed')
+        self.assertIn('Cannot read image', product.image_error)
+
+        response = self.client.get(f'/api/images/thumb/webp/{product.image.name}')
+        self.assertEqual(response.status_code, 404)
+
+    def test_extension_is_checked_in_request(self):
+        category = Category.objects.create(name='খেজুর', slug='dates')
+        response = self.client.post('/api/products/', {
+            'name': 'Ajwa', 'slug': 'ajwa', 'category_id': category.pk, 'price': '1200.00',
+            'image': ContentFile(b'#!/bin/sh', name='dates.sh'),
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('image', response.json())
+
+    def test_process_images_picks_up_pending(self):
+        product = make_products(1)[0]
+        # on_commit চলেনি: যেন সার্ভার রিস্টার্টে জবটি হারিয়ে গেছে
+        product.image.save('dates.jpg', ContentFile(self.jpeg()))
+        self.assertEqual(Product.objects.get(pk=product.pk).image_status, 'pending')
+
+        call_command('process_images', workers=0, stdout=io.StringIO())
+        self.assertEqual(Product.objects.get(pk=product.pk).image_status, 'ready')
+        for target in renditions.rendition_names(product.image.name):
+            self.assertTrue(self.storage.exists(target), target)
+
+
+class ContentAddressedStorageTests(MediaTestCase):
+
+    def test_identical_uploads_share_one_file(self):
+        first, second = make_products(2)
+        first.image.save('dates.jpg', ContentFile(self.jpeg()))
+        second.image.save('IMG_2041.JPG', ContentFile(self.jpeg()))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(is_addressed(first.image.name))
+        self.assertRegex(first.image.name, r'^products/([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}\.jpg$')
+        directory = os.path.dirname(self.storage.path(first.image.name))
+        self.assertEqual(os.listdir(directory), [os.path.basename(first.image.name)])
+
+    def test_renditions_keep_their_names(self):
+        product = make_products(1)[0]
+        product.image.save('dates.jpg', ContentFile(self.jpeg()))
+        written = renditions.generate(self.storage, product.image.name, sizes=['thumb'])
+        self.assertEqual(written, [renditions.rendition_name(product.image.name, 'thumb', fmt) for fmt in ('webp', 'jpeg')])
+        self.assertTrue(all(self.storage.exists(name) and is_addressed(name) for name in written))
+
+    def test_addressed_media_is_immutable(self):
+        product = make_products(1)[0]
+        product.image.save('dates.jpg', ContentFile(self.jpeg()))
+        banner = FileSystemStorage(location=self.storage.location).save('banners/eid.jpg', ContentFile(self.jpeg()))
+
+        def get(path):
+            return serve_media(RequestFactory().get(f'/media/{path}'), path, document_root=self.storage.location)
+
+        self.assertEqual(get(product.image.name)['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+        self.assertNotIn('Cache-Control', get(banner))
+
+    def test_migrate_media_rewrites_and_collects_garbage(self):
+        legacy = FileSystemStorage(location=self.storage.location)
+        photo = self.jpeg()
+        names = [
+            legacy.save('products/2025/12/07/133912852882437468.jpg', ContentFile(photo)),
+            legacy.save('products/133912852882437468.jpg', ContentFile(photo)),
+            legacy.save('products/133912852882437468.jpg', ContentFile(photo)),
+        ]
+        orphan = legacy.save('products/2025/12/07/orphan.jpg', ContentFile(self.jpeg((10, 10))))
+        fresh = legacy.save('products/uploading.jpg', ContentFile(self.jpeg((20, 20))))
+        two_hours_ago = (timezone.now() - timedelta(hours=2)).timestamp()
+        for name in [*names, orphan]:
+            os.utime(legacy.path(name), (two_hours_ago, two_hours_ago))
+        products = make_products(3)
+        for product, name in zip(products, names):
+            Product.objects.filter(pk=product.pk).update(image=name)
+
+        call_command('migrate_media', stdout=io.StringIO())
+
+        images = set(Product.objects.filter(pk__in=[p.pk for p in products]).values_list('image', flat=True))
+        self.assertEqual(len(images), 1)
+        image = images.pop()
+        self.assertTrue(is_addressed(image))
+        self.assertTrue(self.storage.exists(image))
+        for name in [*names, orphan]:
+            self.assertFalse(legacy.exists(name), name)
+        # grace সময়ের ভেতরের ফাইল (হয়তো কমিট না হওয়া আপলোড) থাকে
+        self.assertTrue(legacy.exists(fresh))
+
+
+class CatalogImportExportTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+        self.category = Category.objects.create(name='খেজুর', slug='dates')
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'catalog')
+
+    def write(self, text, extension='.csv'):
+        path = self.path + extension
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def run_import(self, path, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_products', path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_upsert(self):
+        Product.objects.create(category=self.category, name='Ajwa', slug='ajwa', price=Decimal('900.00'), stock=5)
+        path = self.write(
+            'slug,name,category,price,stock,featured\n'
+            'ajwa,,,1200.00,,true\n'
+            ',Ajwa,dates,800,3,\n'
+            ',Ajwa,dates,850,3,\n'
+            ',Mabroom,honey,500,1,\n'
+            ',Sukkari,dates,,1,\n'
+        )
+        out, err = self.run_import(path, '--batch-size', '2')
+
+        ajwa = Product.objects.get(slug='ajwa')
+        # শুধু দেওয়া কলাম বদলায়
+        self.assertEqual((ajwa.price, ajwa.stock, ajwa.featured), (Decimal('1200.00'), 5, True))
+        self.assertEqual(
+            list(Product.objects.filter(name='Ajwa').order_by('slug').values_list('slug', 'price')),
+            [('ajwa', Decimal('1200.00')), ('ajwa-2', Decimal('800.00')), ('ajwa-3', Decimal('850.00'))],
+        )
+        self.assertIn('line 5: unknown category: honey', err)
+        self.assertIn('line 6: new product needs price', err)
+        self.assertIn('2 টি নতুন, 1 টি আপডেট', out)
+
+    def test_dry_run_changes_nothing(self):
+        path = self.write('name,category,price\nAjwa,dates,800\nMabroom,new-arrivals,500\n')
+        out, _ = self.run_import(path, '--dry-run', '--create-categories')
+        self.assertIn('rows/s', out)
+        self.assertIn('2 টি নতুন', out)
+        self.assertFalse(Product.objects.exists())
+        self.assertFalse(Category.objects.filter(slug='new-arrivals').exists())
+
+    def test_import_is_visible_to_cached_listing(self):
+        self.assertEqual(self.client.get('/api/products/').json()['results'], [])
+        self.run_import(self.write('{"name": "Ajwa", "category": "dates", "price": "800"}\n', '.jsonl'))
+        self.assertEqual(len(self.client.get('/api/products/').json()['results']), 1)
+
+    def test_export_round_trip(self):
+        make_products(3, category=self.category)
+        Product.objects.create(category=self.category, name='Mabroom', slug='mabroom', price=Decimal('5.00'), available=False)
+        for extension in ('.csv', '.jsonl'):
+            path = self.path + extension
+            call_command('export_products', path, stdout=io.StringIO())
+            out, err = self.run_import(path)
+            self.assertEqual(err, '')
+            self.assertIn('0 টি নতুন, 0 টি আপডেট হয়েছে, 4 টি অপরিবর্তিত', out)
+
+        call_command('export_products', self.path + '.jsonl', '--available-only', stdout=io.StringIO())
+        with open(self.path + '.jsonl', encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 3)
+
+    def test_bengali_names_get_readable_slugs(self):
+        path = self.write(
+            'name,category,price\n'
+            'আজওয়া খেজুর,dates,800\n'
+            'আজওয়া খেজুর,dates,850\n'
+            'মধু (সুন্দরবন) ১ কেজি,dates,500\n'
+        )
+        self.run_import(path)
+        self.assertEqual(
+            list(Product.objects.order_by('price').values_list('slug', flat=True)),
+            ['মধু-সুন্দরবন-১-কেজি', 'আজওয়া-খেজুর', 'আজওয়া-খেজুর-2'],
+        )
+
+    def test_sharded_stock_is_restocked_through_shards(self):
+        product = Product.objects.create(
+            category=self.category, name='Ajwa', slug='ajwa', price=Decimal('900.00'), stock=10,
+        )
+        inventory.shard_product(product, 2)
+        _, err = self.run_import(self.write('slug,stock\najwa,30\n'))
+        self.assertEqual(err, '')
+        product.refresh_from_db()
+        self.assertEqual((product.stock, product.available), (30, True))
+        self.assertEqual(list(product.shards.order_by('index').values_list('quantity', flat=True)), [15, 15])
+
+        response = self.client.post('/api/orders/', {
+            'name': 'Test', 'email': 'test@example.com', 'phone': '01700000000', 'address': 'Dhaka',
+            'items': [{'product_id': product.pk, 'quantity': 2}],
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.data)
+        _, err = self.run_import(self.write('slug,stock,price\najwa,50,950\n'))
+        self.assertIn('line 2: sharded stock has held reservations', err)
+        product.refresh_from_db()
+        self.assertEqual((product.stock, product.price), (30, Decimal('900.00')))
+        self.assertEqual(sum(product.shards.values_list('quantity', flat=True)), 28)
+
+
+class OrderExportTests(TestCase):
+
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        make_orders(3, items=2, with_payment=True)
+        self.empty = Order.objects.create(
+            name='Empty', email='e@example.com', phone='1', address='Dhaka', total_price=Decimal('0.00'),
+        )
+        Payment.objects.filter(order=Order.objects.order_by('id').first()).update(status='completed')
+
+    def export(self, **params):
+        response = self.client.get(reverse('export-orders'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_item_rows(self):
+        rows = [json.loads(line) for line in self.export().splitlines()]
+        self.assertEqual(len(rows), 3 * 2 + 1)
+        first = rows[0]
+        self.assertEqual(first['payment_status'], 'completed')
+        self.assertEqual(first['paid_amount'], '200.00')
+        self.assertEqual(first['line_total'], '100.00')
+        self.assertIn('আজওয়া', first['product_name'])
+        self.assertEqual(rows[-1]['order_id'], self.empty.pk)
+        self.assertIsNone(rows[-1]['item_id'])
+
+    def test_csv_payment_rows_with_filters(self):
+        text = self.export(format='csv', record='payments', payment_status='completed')
+        rows = list(csv.DictReader(io.StringIO(text)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['payment_status'], 'completed')
+        self.assertEqual(rows[0]['order_paid'], 'false')
+
+        tomorrow = (timezone.localdate() + timedelta(days=1)).isoformat()
+        self.assertEqual(self.export(**{'from': tomorrow}), '')
+        self.assertEqual(len(self.export(to=timezone.localdate().isoformat()).splitlines()), 7)
+
+    def test_queries_do_not_grow_with_orders(self):
+        def count():
+            with CaptureQueriesContext(connection) as captured:
+                self.export()
+            return len(captured)
+
+        before = count()
+        make_orders(5, items=3, with_payment=True)
+        self.assertEqual(before, count())
+
+    def test_admin_only_and_validation(self):
+        self.assertEqual(
+            self.client.get(reverse('export-orders'), {'payment_status': 'lost'}).status_code, 400
+        )
+        self.assertEqual(self.client.get(reverse('export-orders'), {'from': 'yesterday'}).status_code, 400)
+        self.client.logout()
+        self.assertIn(self.client.get(reverse('export-orders')).status_code, (401, 403))
+
+    def test_command(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'payments.csv')
+        call_command('export_orders', path, '--record', 'payments', '--chunk-size', '2', stdout=io.StringIO())
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(len(list(csv.DictReader(f))), 3)
+
+
+@override_settings(SEARCH_INDEX_REFRESH_SECONDS=None, SEARCH_ANALYTICS_FLUSH_SECONDS=None)
+class SearchAnalyticsTests(TestCase):
+
+    def setUp(self):
+        reset_search()
+        reset_caches()
+
+    def search(self, q):
+        return self.client.get(reverse('search-products'), {'q': q}).json()
+
+    def test_searches_are_buffered_then_flushed_in_batches(self):
+        make_products(2)
+        with CaptureQueriesContext(connection) as captured:
+            self.search('আজওয়া')
+        self.assertFalse([q for q in captured if 'searchtermdaily' in q['sql'].lower()])
+        self.search('  আজওয়া ')
+        self.search('AJWA')
+        self.search('আজওয়া')
+        # পরের পেজ আলাদা সার্চ নয়
+        self.client.get(reverse('search-products'), {'q': 'আজওয়া', 'page': 2})
+        response = self.client.post(reverse('search-click'), {'q': 'আজওয়া', 'product_id': 1})
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.post(reverse('search-click'), {'q': 'আজওয়া'}).status_code, 400)
+        self.assertEqual(SearchTermDaily.objects.count(), 0)
+
+        with self.settings(SEARCH_ANALYTICS_BATCH_SIZE=1):
+            self.assertEqual(search_log.flush(), 2)
+        search_log.record_search('ajwa', 0)
+        search_log.flush()
+
+        row = SearchTermDaily.objects.get(term='আজওয়া')
+        self.assertEqual((row.searches, row.zero_results, row.results, row.clicks), (3, 0, 6, 1))
+        # "AJWA" বাংলিশ থেকে আজওয়া হয়ে ফলাফল পায়, তাই শুধু হাতে রেকর্ড করাটা শূন্য
+        ajwa = SearchTermDaily.objects.get(term='ajwa')
+        self.assertEqual((ajwa.searches, ajwa.zero_results), (2, 1))
+        self.assertEqual(search_log.stats()['buffered'], 0)
+
+    def test_popular_and_zero_result_terms(self):
+        make_products(1)
+        for _ in range(2):
+            self.search('খেজুর')
+        self.search('আজওয়া')
+        self.search('কাজু')
+        stats = self.client.get(reverse('search-stats')).json()
+        self.assertEqual(stats['popular_searches'], [])
+
+        search_log.flush()
+        stats = self.client.get(reverse('search-stats')).json()
+        self.assertEqual([row['term'] for row in stats['popular_searches']], ['খেজুর', 'আজওয়া'])
+        self.assertEqual(stats['popular_searches'][0]['count'], 2)
+        self.assertEqual(stats['zero_result_searches'], [{'term': 'কাজু', 'count': 1}])
+
+        suggestions = self.client.get(reverse('autocomplete'), {'q': 'খেজ'}).json()['suggestions']
+        self.assertIn(('popular', 'খেজুর'), [(s['type'], s['name']) for s in suggestions])
+        suggestions = self.client.get(reverse('autocomplete'), {'q': 'কাজ'}).json()['suggestions']
+        self.assertEqual(suggestions, [])
+
+    @override_settings(SEARCH_ANALYTICS_MAX_BUFFER=2)
+    def test_full_buffer_drops_new_terms(self):
+        for term in ('a1', 'b2', 'c3', 'a1'):
+            search_log.record_search(term, 1)
+        self.assertEqual(search_log.stats(), {'recorded': 3, 'dropped': 1, 'flushed': 0, 'buffered': 2})
+        search_log.flush()
+        self.assertEqual(SearchTermDaily.objects.get(term='a1').searches, 2)
+        self.assertFalse(SearchTermDaily.objects.filter(term='c3').exists())
+
+
+@override_settings(IMAGE_JOB_MODE='sync')
+class SalesRollupTests(TestCase):
+
+    def setUp(self):
+        reset_caches()
+        self.dates = Category.objects.create(name='খেজুর', slug='dates')
+        self.honey = Category.objects.create(name='মধু', slug='honey')
+        self.ajwa, self.medjool = make_products(2, category=self.dates)
+        self.sundarban = make_products(1, category=self.honey)[0]
+
+    def place(self, *lines, hours_ago=0):
+        payload = {
+            'name': 'Test', 'email': 'test@example.com', 'phone': '01700000000', 'address': 'Dhaka',
+            'items': [{'product_id': product.pk, 'quantity': quantity} for product, quantity in lines],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/orders/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.data)
+        if hours_ago:
+            Order.objects.filter(pk=response.data['id']).update(created=timezone.now() - timedelta(hours=hours_ago))
+
+    def buckets(self, model=ProductSales, **filters):
+        return {
+            (row.period, getattr(row, 'product_id', None) or row.category_id): (row.quantity, row.revenue, row.orders)
+            for row in model.objects.filter(**filters)
+        }
+
+    def test_orders_update_buckets_incrementally(self):
+        self.place((self.ajwa, 2), (self.sundarban, 1))
+        self.place((self.ajwa, 1), (self.medjool, 3))
+        products = self.buckets()
+        for period in ('hour', 'day', 'trend'):
+            self.assertEqual(products[period, self.ajwa.pk], (3, Decimal('300.00'), 2))
+            self.assertEqual(products[period, self.medjool.pk], (3, Decimal('300.00'), 1))
+        categories = self.buckets(CategorySales, period='day')
+        self.assertEqual(categories, {
+            ('day', self.dates.pk): (6, Decimal('600.00'), 2),
+            ('day', self.honey.pk): (1, Decimal('100.00'), 1),
+        })
+
+    def test_recent_sales_outrank_older_ones_and_rebuild_matches(self):
+        # মেডজুল আগে বেশি বিক্রি হয়েছে, আজওয়া এখন
+        self.place((self.medjool, 5), hours_ago=24 * 7)
+        self.place((self.ajwa, 2))
+        self.place((self.sundarban, 1))
+        sales.rebuild()
+        ranked = [product.pk for product in sales.trending_products()]
+        self.assertEqual(ranked, [self.ajwa.pk, self.sundarban.pk, self.medjool.pk])
+        self.assertEqual(list(sales.trending_categories()), [self.dates, self.honey])
+
+        incremental = dict(ProductSales.objects.filter(period='trend').values_list('product_id', 'score'))
+        self.place((self.ajwa, 1))
+        ProductSales.objects.all().delete()
+        sales.rebuild()
+        rebuilt = dict(ProductSales.objects.filter(period='trend').values_list('product_id', 'score'))
+        self.assertAlmostEqual(rebuilt[self.medjool.pk], incremental[self.medjool.pk])
+        self.assertAlmostEqual(rebuilt[self.ajwa.pk], incremental[self.ajwa.pk] * 1.5)
+        self.assertEqual(self.buckets(period='day')['day', self.ajwa.pk], (3, Decimal('300.00'), 2))
+
+        call_command('rollup_sales', '--since', timezone.localdate().isoformat(), '--prune-hourly', '3',
+                     stdout=io.StringIO())
+        self.assertEqual(self.buckets(period='trend'), {
+            ('trend', self.ajwa.pk): (3, Decimal('300.00'), 2),
+            ('trend', self.medjool.pk): (5, Decimal('500.00'), 1),
+            ('trend', self.sundarban.pk): (1, Decimal('100.00'), 1),
+        })
+        self.assertFalse(ProductSales.objects.filter(period='hour', product=self.medjool).exists())
+
+    def test_landmark_moves_forward_instead_of_overflowing(self):
+        self.place((self.medjool, 5))
+        today = sales.day_start(timezone.now())
+        self.assertEqual(sales.landmark(), today)
+        # landmark ২০০০ half-life পুরনো: আগে 2 ** 2000 এ OverflowError হতো
+        ProductSales.objects.filter(period='trend').update(start=today - timedelta(days=2000))
+        CategorySales.objects.filter(period='trend').update(start=today - timedelta(days=2000))
+        self.place((self.ajwa, 1))
+        self.assertEqual(sales.landmark(), today)
+        scores = dict(ProductSales.objects.filter(period='trend').values_list('product_id', 'score'))
+        self.assertEqual(scores[self.medjool.pk], 0)
+        self.assertGreater(scores[self.ajwa.pk], 0)
+        self.assertEqual(list(sales.trending_products()), [self.ajwa])
+
+        ranked = list(sales.trending_products())
+        sales.advance_landmark(today + timedelta(days=3))
+        self.assertEqual(sales.landmark(), today + timedelta(days=3))
+        self.assertEqual(list(sales.trending_products()), ranked)
+        sales.rebuild()
+        self.assertEqual(sales.landmark(), today + timedelta(days=3))
+        self.assertEqual(list(sales.trending_categories()), [self.dates])
+
+    def test_rollup_failure_does_not_fail_checkout(self):
+        with mock.patch.object(sales, '_increment', side_effect=OverflowError), \
+                self.assertLogs('api.sales', 'ERROR'):
+            self.place((self.ajwa, 1))
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertFalse(ProductSales.objects.exists())
+        sales.rebuild()
+        self.assertEqual(self.buckets(period='trend'), {('trend', self.ajwa.pk): (1, Decimal('100.00'), 1)})
+
+    def test_statistics_and_home_page_read_rankings(self):
+        stats = self.client.get(reverse('search-stats')).json()
+        # বিক্রি নেই: নতুন পণ্য আগে
+        self.assertEqual(stats['trending_products'][0]['id'], self.sundarban.pk)
+        self.assertEqual(self.client.get('/api/products/trending/').json(), [])
+
+        self.place((self.medjool, 4))
+        stats = self.client.get(reverse('search-stats')).json()
+        self.assertEqual([row['id'] for row in stats['trending_products']], [self.medjool.pk])
+        self.assertEqual([row['slug'] for row in stats['popular_categories']], ['dates'])
+
+        def count():
+            with CaptureQueriesContext(connection) as captured:
+                self.client.get('/api/products/trending/')
+            return len(captured)
+
+        self.place((make_products(1)[0], 1))
+        before = count()
+        self.place((make_products(1)[0], 1))
+        self.assertEqual(count(), before)
+
+
+class ReportRollupTests(TestCase):
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        make_orders(2, items=1, with_payment=True)
+        make_orders(1, items=3)
+        Payment.objects.filter(pk=Payment.objects.order_by('id').first().pk).update(status='completed')
+        Order.objects.filter(pk=Order.objects.order_by('id').first().pk).update(paid=True)
+        # সব অর্ডার তিন দিন আগে, দুটি দিন কোনো অর্ডার ছাড়া
+        moment = timezone.now() - timedelta(days=3)
+        Order.objects.update(created=moment)
+        Payment.objects.update(created=moment)
+
+    def rollup(self, *args):
+        out = io.StringIO()
+        call_command('rollup_reports', *args, stdout=out)
+        return out.getvalue()
+
+    def test_rollup_is_incremental_and_idempotent(self):
+        self.rollup()
+        self.assertEqual(DailySalesSummary.objects.count(), 3)
+        day = DailySalesSummary.objects.get(day=self.today - timedelta(days=3))
+        self.assertEqual((day.orders, day.paid_orders, day.items_sold), (3, 1, 5))
+        self.assertEqual((day.revenue, day.paid_revenue, day.average_order_value),
+                         (Decimal('600.00'), Decimal('200.00'), Decimal('200.00')))
+        self.assertEqual(
+            set(DailyPaymentSummary.objects.values_list('payment_method', 'status', 'count')),
+            {('bkash', 'completed', 1), ('bkash', 'pending', 1)},
+        )
+        self.assertEqual(DailySalesSummary.objects.get(day=self.today - timedelta(days=1)).orders, 0)
+
+        # নতুন দিন না থাকলে কিছুই হয় না; lookback শুধু শেষ দিনগুলো
+        self.assertIn('নতুন কোনো দিন নেই', self.rollup('--lookback', '0'))
+        self.assertEqual(reports.pending_days(lookback=2), (self.today - timedelta(days=2), self.today - timedelta(days=1)))
+
+        # দেরিতে ব্যর্থ হওয়া পেমেন্ট lookback এর বাইরে, --since দিয়ে আবার
+        Payment.objects.filter(status='pending').update(status='failed')
+        self.rollup('--since', (self.today - timedelta(days=3)).isoformat(), '--chunk-days', '1')
+        self.assertEqual(DailySalesSummary.objects.count(), 3)
+        self.assertEqual(
+            set(DailyPaymentSummary.objects.values_list('status', flat=True)), {'completed', 'failed'}
+        )
+
+        make_orders(1, items=1)
+        self.rollup('--include-today', '--lookback', '0')
+        self.assertEqual(DailySalesSummary.objects.get(day=self.today).orders, 1)
+
+    def test_dashboard_reads_only_summaries(self):
+        self.rollup()
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        url = reverse('admin:api_dailysalessummary_changelist')
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        dashboard = response.context['dashboard']
+        self.assertEqual((dashboard['orders'], dashboard['revenue'], dashboard['payments']), (3, Decimal('600.00'), 2))
+        self.assertEqual(dashboard['completion_rate'], 50.0)
+        self.assertEqual(dashboard['methods'][0]['method'], 'bKash')
+        self.assertContains(response, 'Completion rate')
+        for table in ('api_order', 'api_orderitem', 'api_payment'):
+            self.assertFalse([q for q in captured if f'"{table}"' in q['sql']], table)
+        self.assertEqual(self.client.get(reverse('admin:api_dailysalessummary_add')).status_code, 403)
+
+
+@override_settings(SEARCH_INDEX_REFRESH_SECONDS=None, SEARCH_ANALYTICS_FLUSH_SECONDS=None)
+class AsyncSearchViewTests(TestCase):
+
+    def setUp(self):
+        reset_search()
+        reset_caches()
+        registry.reset()
+
+    def async_request(self, method, url, params):
+        async def request():
+            return await getattr(self.async_client, method)(url, params)
+        return async_to_sync(request)()
+
+    def get_both(self, name, params=None):
+        """The async view must answer exactly like the DRF one"""
+        params = params or {}
+        response = self.async_request('get', reverse(f'async-{name}'), params)
+        # cache এ থাকা রেসপন্স নয়, দুটোই নতুন করে হিসাব করুক
+        cache.clear()
+        response_cache.reset()
+        expected = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json(), expected.json())
+        return response.json()
+
+    def check_search(self):
+        category = Category.objects.create(name='খেজুর', slug='dates')
+        make_products(15, category=category)
+        make_products(15, featured=True)
+        first = self.get_both('search-products', {'q': 'আজওয়া'})
+        self.assertEqual(len(first['products']), 20)
+        self.get_both('search-products', {'q': 'আজওয়া', 'cursor': first['next_cursor']})
+        self.get_both('search-products', {'q': 'আজওয়া', 'page': 2, 'count': 'false'})
+        filtered = self.get_both('search-products', {'q': 'খেজুর', 'category': 'dates', 'max_price': '150'})
+        self.assertEqual(filtered['total_results'], 15)
+        self.get_both('search-products', {'q': 'আজওয়া', 'category': 'missing'})
+        self.get_both('search-products', {'q': 'আ জ'})
+        self.get_both('search-products', {'q': 'খেজুর', 'category': 'dates', 'facets': 'true'})
+        corrected = self.get_both('search-products', {'q': 'kheju', 'facets': 'true'})
+        self.assertEqual(corrected['corrected_query'], 'খেজুর')
+
+    def test_search_index_engine(self):
+        self.check_search()
+
+    @override_settings(SEARCH_ENGINE='database')
+    def test_search_database_engine(self):
+        self.check_search()
+
+    @override_settings(SEARCH_BACKEND='sqlite')
+    def test_search_sqlite_backend(self):
+        self.check_search()
+
+    def test_search_errors(self):
+        self.assertEqual(self.get_both('search-products', {'q': ' '})['success'], False)
+        self.get_both('search-products', {'q': 'আজওয়া', 'cursor': 'broken'})
+        response = self.async_request('post', reverse('async-search-products'), {'q': 'আজওয়া'})
+        self.assertEqual(response.status_code, 405)
+
+    def test_autocomplete(self):
+        make_products(3)
+        search_log.record_search('আজওয়া প্যাকেট', 3)
+        search_log.flush()
+        suggestions = self.get_both('autocomplete', {'q': 'আজ'})['suggestions']
+        self.assertEqual(suggestions[-1]['type'], 'popular')
+        self.assertEqual(self.get_both('autocomplete', {'q': 'আ'}), {'suggestions': []})
+
+    def test_statistics(self):
+        # খালি রোলআপে নতুন পণ্য, পরে বিক্রি অনুযায়ী
+        make_products(4)
+        empty = self.get_both('search-stats')
+        self.assertEqual(len(empty['trending_products']), 4)
+        make_orders(2, items=1)
+        search_log.record_search('অজানা', 0)
+        search_log.flush()
+        sales.rebuild()
+        data = self.get_both('search-stats')
+        self.assertEqual(len(data['trending_products']), 2)
+        self.assertEqual(data['zero_result_searches'], [{'term': 'অজানা', 'count': 1}])
+        self.assertIn('async:search_statistics', registry.snapshot()['timings'])
+
+
+@override_settings(SEARCH_INDEX_REFRESH_SECONDS=None, SEARCH_ANALYTICS_FLUSH_SECONDS=None)
+class SearchFacetTests(TestCase):
+
+    def setUp(self):
+        reset_search()
+        reset_caches()
+        registry.reset()
+        self.dates = Category.objects.create(name='খেজুর', slug='dates')
+        self.honey = Category.objects.create(name='মধু', slug='honey')
+        make_products(3, category=self.dates)
+        featured = make_products(2, category=self.dates, featured=True)
+        Product.objects.filter(pk__in=[product.pk for product in featured]).update(price=Decimal('300.00'))
+        make_products(1, category=self.honey)
+        Product.objects.filter(category=self.honey).update(price=Decimal('5000.00'), stock=0)
+
+    def search(self, **params):
+        return self.client.get(reverse('search-products'), {'q': 'আজওয়া', **params}).json()
+
+    def check_facets(self):
+        self.assertIsNone(self.search()['facets'])
+
+        facets = self.search(facets='true')['facets']
+        self.assertEqual(
+            [(facet['slug'], facet['count']) for facet in facets['categories']], [('dates', 5), ('honey', 1)]
+        )
+        self.assertEqual((facets['price']['min'], facets['price']['max']), ('100.00', '5000.00'))
+        self.assertEqual([bucket['count'] for bucket in facets['price']['buckets']], [0, 3, 2, 0, 0, 0, 1])
+        self.assertEqual(facets['price']['buckets'][-1], {'min': '5000.00', 'max': None, 'count': 1})
+        self.assertEqual((facets['in_stock'], facets['featured']), (5, 2))
+
+        # ক্যাটাগরি গণনায় ক্যাটাগরি ফিল্টার নয়, হিস্টোগ্রামে দামের ফিল্টার নয়
+        response = self.search(facets='true', category='dates', min_price='200')
+        facets = response['facets']
+        self.assertEqual([facet['count'] for facet in facets['categories']], [2, 1])
+        self.assertEqual([bucket['count'] for bucket in facets['price']['buckets']], [0, 3, 2, 0, 0, 0, 0])
+        self.assertEqual((facets['in_stock'], facets['featured']), (2, 2))
+        self.assertEqual(response['total_results'], 2)
+        self.assertIn('search:facets', registry.snapshot()['timings'])
+
+    def test_index_engine(self):
+        self.check_facets()
+
+    @override_settings(SEARCH_ENGINE='database')
+    def test_database_engine(self):
+        self.check_facets()
+
+    @override_settings(SEARCH_BACKEND='sqlite')
+    def test_sqlite_backend(self):
+        self.check_facets()
+
+    @override_settings(SEARCH_PRICE_BUCKETS=[500])
+    def test_price_buckets_setting(self):
+        buckets = self.search(facets='true')['facets']['price']['buckets']
+        self.assertEqual(buckets, [
+            {'min': '0.00', 'max': '500.00', 'count': 5},
+            {'min': '500.00', 'max': None, 'count': 1},
+        ])
+
+
+@override_settings(
+    SEARCH_BACKEND='sqlite', SEARCH_INDEX_REFRESH_SECONDS=None, SEARCH_ANALYTICS_FLUSH_SECONDS=None,
+)
+class SQLiteFTSBackendTests(TestCase):
+
+    def setUp(self):
+        reset_search()
+        reset_caches()
+        self.backend = get_backend()
+        self.dates = Category.objects.create(name='খেজুর', slug='dates')
+
+    def fts_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid, name, category FROM {FTS_TABLE} ORDER BY rowid')
+            return cursor.fetchall()
+
+    def search_ids(self, query, **params):
+        response = self.client.get(reverse('search-products'), {'q': query, **params}).json()
+        return [product['id'] for product in response['products']]
+
+    def test_backend_setting(self):
+        self.assertIsInstance(self.backend, SQLiteFTSBackend)
+        self.assertTrue(self.backend.available())
+        with override_settings(SEARCH_BACKEND=None, SEARCH_ENGINE='database'):
+            self.assertEqual(get_backend().name, 'database')
+        with override_settings(SEARCH_BACKEND='api.search_backends.memory.MemoryBackend'):
+            self.assertEqual(get_backend().name, 'memory')
+
+    def test_triggers_keep_table_in_sync(self):
+        product, = make_products(1, category=self.dates)
+        self.assertEqual(self.fts_rows(), [(product.pk, product.name, 'খেজুর')])
+
+        Product.objects.filter(pk=product.pk).update(name='সুক্কারি')
+        self.dates.name = 'শুকনো ফল'
+        self.dates.save()
+        self.assertEqual(self.fts_rows(), [(product.pk, 'সুক্কারি', 'শুকনো ফল')])
+        self.assertEqual(self.search_ids('সুক্কারি'), [product.pk])
+        self.assertEqual(self.search_ids('শুকনো'), [product.pk])
+
+        product.delete()
+        self.assertEqual(self.fts_rows(), [])
+        self.backend.rebuild()
+        self.assertEqual(self.fts_rows(), [])
+
+    def test_bm25_ranking(self):
+        in_description, = make_products(1, category=self.dates)
+        Product.objects.filter(pk=in_description.pk).update(name='মিষ্টি খাবার', description='সুক্কারি খেজুর')
+        in_name, = make_products(1, category=self.dates)
+        Product.objects.filter(pk=in_name.pk).update(name='সুক্কারি খেজুর')
+        Product.objects.filter(pk=make_products(1, category=self.dates)[0].pk).update(available=False)
+        self.assertEqual(self.search_ids('সুক্কারি'), [in_name.pk, in_description.pk])
+        # কোয়েরির যেকোনো অংশ (trigram) মিললেই
+        self.assertEqual(self.search_ids('ক্কারি'), [in_name.pk, in_description.pk])
+
+    def test_short_terms_fall_back(self):
+        product, = make_products(1, category=self.dates)
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.search_ids('আজ'), [product.pk])
+        self.assertNotIn(FTS_TABLE, ' '.join(query['sql'] for query in captured))
+        self.assertEqual(self.search_ids('আজওয়া'), [product.pk])
+
+    def test_missing_triggers_fail_loudly(self):
+        with connection.cursor() as cursor:
+            # SQLite এ api_product/api_category এর AlterField এর পরে যেমন হয়
+            cursor.execute('DROP TRIGGER api_product_fts_insert')
+            cursor.execute('DROP TRIGGER api_category_fts_rename')
+        self.assertEqual(self.backend.missing_triggers(), ['api_category_fts_rename', 'api_product_fts_insert'])
+        self.assertEqual([error.id for error in checks.fts_triggers()], ['api.E001'])
+        with override_settings(SEARCH_BACKEND='memory'):
+            self.assertEqual([error.id for error in checks.fts_triggers()], ['api.W001'])
+        with self.assertRaises(SystemCheckError):
+            call_command('check', stdout=io.StringIO(), stderr=io.StringIO())
+        with self.assertRaisesMessage(CommandError, 'api_product_fts_insert'):
+            call_command('check_search', stdout=io.StringIO())
+
+        product, = make_products(1, category=self.dates)
+        self.assertEqual(self.fts_rows(), [])
+        out = io.StringIO()
+        call_command('update_search_vectors', stdout=out)
+        self.assertIn('api_category_fts_rename, api_product_fts_insert', out.getvalue())
+        self.assertEqual(checks.fts_triggers(), [])
+        self.assertEqual(self.fts_rows(), [(product.pk, product.name, 'খেজুর')])
+        self.dates.name = 'শুকনো ফল'
+        self.dates.save()
+        self.assertEqual(self.fts_rows(), [(product.pk, product.name, 'শুকনো ফল')])
+        out = io.StringIO()
+        call_command('check_search', stdout=out)
+        self.assertIn('সিঙ্কড', out.getvalue())
+
+    def test_migrate_sets_triggers_aside(self):
+        product, = make_products(1, category=self.dates)
+        signals.drop_fts_triggers(sender=None)
+        self.assertEqual(self.backend.missing_triggers(), sorted(TRIGGERS))
+        # ট্রিগার ছাড়া ডেটা মাইগ্রেশন
+        Product.objects.filter(pk=product.pk).update(name='সুক্কারি')
+
+        signals.restore_fts_triggers(sender=None)
+        self.assertEqual(self.backend.missing_triggers(), [])
+        self.assertEqual(self.fts_rows(), [(product.pk, 'সুক্কারি', 'খেজুর')])
+
+        call_command('migrate', verbosity=0)
+        self.assertEqual(self.backend.missing_triggers(), [])
+        self.assertEqual(checks.fts_triggers(), [])
+
+
+@override_settings(
+    SEARCH_INDEX_REFRESH_SECONDS=None, SEARCH_ANALYTICS_FLUSH_SECONDS=None, IMAGE_JOB_MODE='sync',
+)
+class FuzzySearchTests(TestCase):
+
+    def setUp(self):
+        reset_search()
+        reset_caches()
+        self.dates = Category.objects.create(name='খেজুর', slug='dates')
+        self.honey = Category.objects.create(name='মধু', slug='honey')
+        self.ajwa, = make_products(1, category=self.dates)
+        self.sundarban, = make_products(1, category=self.honey)
+        Product.objects.filter(pk=self.sundarban.pk).update(name='সুন্দরবনের খাঁটি মধু', description='চাকের মধু')
+
+    def search(self, q, **params):
+        return self.client.get(reverse('search-products'), {'q': q, **params}).json()
+
+    def test_transliteration_and_folding(self):
+        self.assertEqual(transliterate('khejur'), ['খেজুর'])
+        self.assertIn('মধু', transliterate('modhu'))
+        self.assertEqual(transliterate('খেজুর'), [])
+        self.assertEqual(fold('মধূ'), fold('মধু'))
+        self.assertEqual(fold('মিষ্টি'), fold('মিস্টি'))
+
+    def test_misspelled_and_banglish_queries(self):
+        for query, corrected, product in (
+            ('khejur', 'খেজুর', self.ajwa),
+            ('kheju', 'খেজুর', self.ajwa),
+            ('মধূ', 'মধু', self.sundarban),
+            ('shundorbon', 'সুন্দরবনের', self.sundarban),
+            ('ajwa khati', 'আজওয়া খাঁটি', None),
+        ):
+            response = self.search(query)
+            self.assertEqual(response['corrected_query'], corrected, query)
+            ids = [row['id'] for row in response['products']]
+            if product is None:
+                self.assertEqual(len(ids), 2)
+            else:
+                self.assertEqual(ids, [product.pk])
+
+    def test_exact_and_hopeless_queries_are_left_alone(self):
+        self.assertIsNone(self.search('খেজুর')['corrected_query'])
+        response = self.search('xyzzy')
+        self.assertEqual((response['corrected_query'], response['products']), (None, []))
+        # পরের পেজ বা ফিল্টারে খালি হলে সংশোধন নয়
+        self.assertIsNone(self.search('khejur', page=2)['corrected_query'])
+        self.assertIsNone(self.search('আজওয়া', category='honey')['corrected_query'])
+        with override_settings(SEARCH_FUZZY=False):
+            self.assertIsNone(self.search('khejur')['corrected_query'])
+
+    def test_index_follows_catalog_edits(self):
+        fuzzy_index.ensure_fresh()
+        self.ajwa.name = 'মেডজুল'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ajwa.save()
+        self.assertEqual(fuzzy_index.correct('medjul'), 'মেডজুল')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ajwa.delete()
+        self.assertIsNone(fuzzy_index.correct('medjul'))
+        self.dates.name = 'শুকনো ফল'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dates.save()
+        self.assertEqual(fuzzy_index.correct('shukno'), 'শুকনো')
+        with self.settings(SEARCH_FUZZY_THRESHOLD=0.9):
+            self.assertIsNone(fuzzy_index.correct('shukn'))
+
+
+def legacy_search(query, category_id=None, min_price=None, max_price=None):
+    """
+    ``[(product_id, score), ...]`` exactly as the original ``search_products``
+    view ranked them: ``icontains`` filtering, ``calculate_relevance`` and a
+    stable sort over the model's ``-created`` ordering.
+    """
+    terms = query.split()
+    products = Product.objects.filter(available=True).select_related('category')
+    if category_id is not None:
+        products = products.filter(category_id=category_id)
+    if min_price is not None:
+        products = products.filter(price__gte=min_price)
+    if max_price is not None:
+        products = products.filter(price__lte=max_price)
+    match = Q()
+    for term in terms:
+        if len(term) >= 2:
+            match |= Q(name__icontains=term) | Q(description__icontains=term) | Q(category__name__icontains=term)
+    if not match:
+        match = Q(name__icontains=query) | Q(description__icontains=query) | Q(category__name__icontains=query)
+
+    def relevance(product):
+        score = 100 if query.lower() in product.name.lower() else 0
+        for term in terms:
+            term = term.lower()
+            score += 50 if term in product.name.lower() else 0
+            score += 20 if term in (product.description or '').lower() else 0
+            score += 30 if term in product.category.name.lower() else 0
+        return score + (10 if product.featured else 0) + (5 if product.stock > 0 else 0)
+
+    ranked = [(product.id, relevance(product)) for product in products.filter(match).distinct()]
+    ranked.sort(key=lambda item: item[1], reverse=True)
+    return ranked
+
+
+@override_settings(SEARCH_INDEX_REFRESH_SECONDS=None)
+class SearchRankingParityTests(TestCase):
+    """The in-memory index ranks and scores like the original view"""
+
+    QUERIES = [
+        'খেজুর', 'মধু', 'খেজুর মধু', 'আজওয়া খেজুর', 'জুর', 'বাদাম', 'ড্রাই',
+        'dates', 'DATES', 'Date Syrup', 'nuts almond', 'x dates', 'a', 'ক', 'নেই',
+    ]
+
+    def setUp(self):
+        product_index.invalidate()
+        self.dates = Category.objects.create(name='খেজুর', slug='dates')
+        self.honey = Category.objects.create(name='মধু', slug='honey')
+        self.dry = Category.objects.create(name='ড্রাই ফ্রুটস Nuts', slug='dry-fruits')
+        rows = [
+            # নাম, বিবরণ, ক্যাটাগরি, দাম, স্টক, featured, available
+            ('আজওয়া খেজুর', 'মদিনার খেজুর', self.dates, '900', 10, True, True),
+            ('মেডজুল খেজুর প্রিমিয়াম', 'বড় দানা', self.dates, '1200', 0, False, True),
+            ('সুন্দরবনের মধু', 'খাঁটি, খেজুরের গুড়ের মতো মিষ্টি', self.honey, '650', 5, False, True),
+            ('Mixed Nuts', 'almond, cashew and DATES', self.dry, '800', 3, False, True),
+            ('Date Syrup', 'made from dates', self.honey, '350', 8, True, True),
+            ('কালিজিরা মধু', '', self.honey, '500', 0, False, True),
+            ('কাঠবাদাম', 'California almond', self.dry, '1100', 2, False, True),
+            ('খেজুর পুরনো', 'স্টক শেষ', self.dates, '100', 0, False, False),
+        ]
+        now = timezone.now()
+        for position, (name, description, category, price, stock, featured, available) in enumerate(rows):
+            product = Product.objects.create(
+                category=category, name=name, slug=f'ranking-{position}', description=description,
+                price=Decimal(price), stock=stock, featured=featured, available=available,
+            )
+            # একই স্কোরে created অনুযায়ী ক্রম, তাই আলাদা সময়
+            Product.objects.filter(pk=product.pk).update(created=now - timedelta(minutes=position))
+
+    def ranked(self, query, **filters):
+        """``[(product_id, score), ...]`` for every match, best first"""
+        return product_index.search(query, limit=100, **filters)[1]
+
+    def assertSameRanking(self, query, **filters):
+        self.assertEqual(self.ranked(query, **filters), legacy_search(query, **filters), query)
+
+    def test_name_description_and_category_matches(self):
+        for query in self.QUERIES:
+            self.assertSameRanking(query)
+
+    def test_filters(self):
+        for query in ('খেজুর', 'মধু', 'dates'):
+            self.assertSameRanking(query, category_id=self.honey.id)
+            self.assertSameRanking(query, min_price=Decimal('400'), max_price=Decimal('1000'))
+
+    def test_field_weights(self):
+        scores = dict(self.ranked('খেজুর'))
+        ajwa, medjool, honey = Product.objects.filter(slug__in=['ranking-0', 'ranking-1', 'ranking-2']).order_by('slug')
+        # পুরো নাম 100 + নাম 50 + বিবরণ 20 + ক্যাটাগরি 30 + featured 10 + স্টক 5
+        self.assertEqual(scores[ajwa.id], 215)
+        self.assertEqual(scores[medjool.id], 180)
+        self.assertEqual(scores[honey.id], 25)
+
+    def test_ranking_follows_edits(self):
+        syrup = Product.objects.get(slug='ranking-4')
+        with self.captureOnCommitCallbacks(execute=True):
+            syrup.description = 'খেজুরের রস থেকে তৈরি'
+            syrup.save()
+            self.honey.name = 'মধু ও খেজুর'
+            self.honey.save()
+        for query in self.QUERIES:
+            self.assertSameRanking(query)
+
+    def test_rolled_back_edit_leaves_index_alone(self):
+        self.ranked('খেজুর')
+        syrup = Product.objects.get(slug='ranking-4')
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            syrup.name = 'খেজুর সিরাপ'
+            syrup.save()
+        # commit হয়নি, তাই ইনডেক্স আগের মতোই
+        self.assertNotIn(syrup.id, dict(self.ranked('খেজুর')))
+        self.assertTrue(callbacks)
+
+
+@override_settings(SEARCH_BACKEND='database')
+class DatabaseRankingParityTests(SearchRankingParityTests):
+    """The SQL scoring of ``api.search_db`` ranks and scores like the original view"""
+
+    # ইনডেক্স নেই, ডাটাবেসই উৎস
+    test_rolled_back_edit_leaves_index_alone = None
+
+    def ranked(self, query, **filters):
+        _, rows = get_backend().search(query, limit=100, **filters)
+        return [(row['id'], score) for row, score in rows]
+
+    def test_uses_database_backend(self):
+        self.assertEqual(get_backend().name, 'database')
+        with self.assertNumQueries(2):
+            self.ranked('খেজুর')
+
+
+@override_settings(PAYMENT_JOB_MODE='sync', PAYMENT_GATEWAYS={'bkash': {'backoff': 0.01}})
+class PaymentGatewayTests(TestCase):
+    def setUp(self):
+        self.gateway = MockGateway().start()
+        self.addCleanup(self.gateway.stop)
+        settings_override = self.settings(PAYMENT_GATEWAY_URL=self.gateway.url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def place_order(self):
+        # শার্ড করা পণ্যের স্টক reservation এ থাকে
+        product = make_products(1)[0]
+        inventory.shard_product(product, 2)
+        payload = {
+            'name': 'Test', 'email': 'test@example.com', 'phone': '01700000000', 'address': 'Dhaka',
+            'items': [{'product_id': product.pk, 'quantity': 2}],
+        }
+        response = self.client.post('/api/orders/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def pay(self, order_id=None):
+        payload = {
+            'order_id': order_id or self.place_order(), 'amount': '200.00', 'payment_method': 'bkash',
+            'mobile_number': '01700000000', 'status': 'completed',
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/payments/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return Payment.objects.get(pk=response.data['id'])
+
+    def verify(self, payment, reference):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f'/api/payments/{payment.pk}/verify/', {'transaction_id': reference}, content_type='application/json'
+            )
+
+    def callback(self, body, signature=None):
+        body = json.dumps(body).encode()
+        return self.client.post(
+            reverse('payment-callback'), body, content_type='application/json',
+            HTTP_X_SIGNATURE=signature or payments.sign(body),
+        )
+
+    def test_transaction_ids_are_unique_and_sorted(self):
+        ids = [payments.new_transaction_id() for _ in range(20000)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+        self.assertTrue(all(len(value) == 20 and value.startswith('TXN') for value in ids))
+
+    def test_create_initiates_without_trusting_client_status(self):
+        payment = self.pay()
+        self.assertEqual(payment.status, 'pending')
+        self.assertTrue(payment.transaction_id.startswith('TXN'))
+        self.assertEqual(payment.gateway_reference, self.gateway.payments[payment.transaction_id]['reference'])
+
+    def test_verify_completes_payment_and_commits_stock(self):
+        payment = self.pay()
+        response = self.verify(payment, 'BK7Q2X9')
+        self.assertEqual(response.status_code, 202, response.data)
+        payment.refresh_from_db()
+        self.assertEqual((payment.status, payment.customer_reference), ('completed', 'BK7Q2X9'))
+        self.assertTrue(payment.gateway_reference.startswith('MGW'))
+        self.assertEqual(
+            set(StockReservation.objects.filter(order_id=payment.order_id).values_list('status', flat=True)),
+            {'committed'},
+        )
+        # সম্পন্ন পেমেন্ট আবার যাচাই করলে একই উত্তর
+        self.assertEqual(self.verify(payment, 'BK7Q2X9').status_code, 200)
+
+    def test_rejected_reference_fails_payment_and_releases_stock(self):
+        payment = self.pay()
+        self.verify(payment, 'FAIL-1')
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'failed')
+        self.assertEqual(
+            set(StockReservation.objects.filter(order_id=payment.order_id).values_list('status', flat=True)),
+            {'released'},
+        )
+        self.assertEqual(self.verify(payment, 'BK7Q2X9').status_code, 409)
+
+    def test_late_initiate_result_does_not_undo_verify(self):
+        with self.captureOnCommitCallbacks() as initiate:
+            response = self.client.post('/api/payments/', {
+                'order_id': self.place_order(), 'amount': '200.00', 'payment_method': 'bkash',
+                'mobile_number': '01700000000',
+            }, content_type='application/json')
+        payment = Payment.objects.get(pk=response.data['id'])
+        # initiate গেটওয়েতে পৌঁছেছে, কিন্তু উত্তর আসার আগেই গ্রাহক TrxID দিলেন
+        result = payments.get_client('bkash').initiate(payment)
+        with self.captureOnCommitCallbacks() as verify:
+            self.assertEqual(self.client.post(
+                f'/api/payments/{payment.pk}/verify/', {'transaction_id': 'BK7Q2X9'}, content_type='application/json'
+            ).status_code, 202)
+        payments.apply_status(payment.transaction_id, result['status'], result['reference'])
+        for callback in initiate + verify:
+            callback()
+        payment.refresh_from_db()
+        self.assertEqual((payment.status, payment.customer_reference), ('completed', 'BK7Q2X9'))
+        self.assertEqual(self.gateway.payments[payment.transaction_id]['reference'], 'BK7Q2X9')
+
+    def test_lost_responses_are_retried_with_the_same_idempotency_key(self):
+        self.gateway.drop_next = 2
+        payment = self.pay()
+        self.assertEqual(self.gateway.stats['created'], 1)
+        self.assertEqual(self.gateway.stats['replayed'], 2)
+        self.assertTrue(payment.gateway_reference.startswith('MGW'))
+
+    def test_gateway_timeout_leaves_payment_pending(self):
+        self.gateway.latency = 0.3
+        with self.settings(PAYMENT_GATEWAY_TIMEOUT=0.05, PAYMENT_GATEWAY_RETRIES=0), \
+                self.assertLogs('api.payments', 'WARNING'):
+            payment = self.pay()
+        self.assertEqual((payment.status, payment.gateway_reference), ('pending', ''))
+        self.assertIn('timed out', payment.gateway_detail)
+
+    def test_signed_callback_updates_status_once(self):
+        payment = self.pay()
+        body = {'transaction_id': payment.transaction_id, 'status': 'completed', 'reference': 'BK1'}
+        self.assertEqual(self.callback(body, signature='0' * 64).status_code, 403)
+        self.assertEqual(self.callback(body).status_code, 204)
+        # দেরিতে আসা বা পুনরাবৃত্ত বার্তা চূড়ান্ত status বদলায় না
+        self.assertEqual(self.callback({**body, 'status': 'failed'}).status_code, 204)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'completed')
+        self.assertTrue(payment.gateway_reference.startswith('MGW'))
+        self.assertEqual(self.callback({**body, 'transaction_id': 'TXN0'}).status_code, 404)
+        self.assertEqual(self.callback({**body, 'status': 'refunded'}).status_code, 400)
+        other = self.pay()
+        self.assertEqual(self.callback({**body, 'transaction_id': other.transaction_id, 'status': 'failed'}).status_code, 204)
+        self.assertEqual(
+            set(StockReservation.objects.filter(order_id=other.order_id).values_list('status', flat=True)),
+            {'released'},
+        )
+
+
+class ProductBatchTests(TestCase):
+    def setUp(self):
+        self.products = make_products(4)
+        Product.objects.filter(pk=self.products[3].pk).update(available=False, stock=0)
+
+    def batch(self, expected=200, **params):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/products/batch/', params)
+        self.assertEqual(response.status_code, expected, response.data)
+        if expected == 200:
+            self.assertEqual(len(captured), 1)
+        return response.data
+
+    def test_ids_and_slugs_in_request_order(self):
+        first, second, third, hidden = self.products
+        data = self.batch(ids=f'{third.pk},{first.pk},0,{third.pk}', slugs=f'{hidden.slug},{first.slug},nope')
+        self.assertEqual([row['id'] for row in data['products']], [third.pk, first.pk, hidden.pk])
+        self.assertEqual(data['missing'], [0, 'nope'])
+        self.assertEqual(data['products'][0], {
+            'id': third.pk, 'slug': third.slug, 'name': third.name, 'price': '100.00', 'stock': 100,
+            'available': True,
+        })
+        self.assertEqual((data['products'][2]['stock'], data['products'][2]['available']), (0, False))
+
+    def test_field_selection_and_post(self):
+        first = self.products[0]
+        data = self.batch(ids=str(first.pk), fields='price,stock')
+        self.assertEqual(data['products'], [{'price': '100.00', 'stock': 100}])
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(
+                '/api/products/batch/',
+                {'ids': [product.pk for product in self.products], 'fields': ['id', 'updated']},
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(len(captured), 1)
+        self.assertEqual([set(row) for row in response.data['products']], [{'id', 'updated'}] * 4)
+
+    def test_rejects_bad_requests(self):
+        self.batch(400)
+        self.batch(400, ids='1,x')
+        self.assertIn('fields', self.batch(400, ids='1', fields='id,cost'))
+        with self.settings(PRODUCT_BATCH_MAX=3):
+            self.batch(400, ids='1,2', slugs='a,b')
+            self.batch(ids='1,2,1', slugs='a')
+
+
+class InventoryTests(TestCase):
+    """Sharded stock: reservations, settlement by payment, expiry and reconcile"""
+
+    def setUp(self):
+        category = Category.objects.create(name='খেজুর', slug='dates')
+        self.product = Product.objects.create(
+            category=category, name='আজওয়া খেজুর', slug='ajwa', price=Decimal('100.00'), stock=10,
+        )
+        inventory.shard_product(self.product, 2)
+
+    def shard_total(self):
+        return sum(StockShard.objects.filter(product=self.product).values_list('quantity', flat=True))
+
+    def stock(self):
+        self.product.refresh_from_db()
+        return self.product.stock, self.product.available
+
+    def order(self, quantity):
+        payload = {
+            'name': 'Test', 'email': 'test@example.com', 'phone': '01700000000', 'address': 'Dhaka',
+            'items': [{'product_id': self.product.pk, 'quantity': quantity}],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/orders/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return Order.objects.get(pk=response.data['id'])
+
+    def pay(self, order, status):
+        payment = Payment.objects.create(
+            order=order, transaction_id=f'TXN{order.pk}', amount=order.total_price, payment_method='bkash',
+        )
+        payment.status = status
+        payment.save()
+        return payment
+
+    def holds(self, order):
+        return list(StockReservation.objects.filter(order=order).values_list('status', 'quantity'))
+
+    def test_checkout_reserves_and_payment_commits(self):
+        order = self.order(3)
+        self.assertEqual(self.shard_total(), 7)
+        self.assertEqual(self.holds(order), [('held', 3)])
+        # তালিকার stock পেমেন্টের আগে পুরনো, batch এন্ডপয়েন্ট শার্ড থেকে পড়ে
+        self.assertEqual(self.stock(), (10, True))
+        row = self.client.get('/api/products/batch/', {'ids': self.product.pk}).data['products'][0]
+        self.assertEqual((row['stock'], row['available']), (7, True))
+
+        self.pay(order, 'completed')
+        self.assertEqual(self.holds(order), [('committed', 3)])
+        self.assertEqual(self.stock(), (7, True))
+
+    def test_failed_payment_releases_and_refreshes_stock(self):
+        order = self.order(3)
+        self.pay(order, 'failed')
+        self.assertEqual(self.holds(order), [('released', 3)])
+        self.assertEqual((self.shard_total(), self.stock()), (10, (10, True)))
+
+    def test_checkout_cannot_take_more_than_the_shards_hold(self):
+        self.order(8)
+        payload = {
+            'name': 'Test', 'email': 'test@example.com', 'phone': '01700000000', 'address': 'Dhaka',
+            'items': [{'product_id': self.product.pk, 'quantity': 3}],
+        }
+        response = self.client.post('/api/orders/', payload, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['items'][0]['available'], '2')
+        self.assertEqual(self.shard_total(), 2)
+
+    def test_release_expired_skips_orders_being_paid(self):
+        unpaid, paying = self.order(2), self.order(3)
+        self.pay(paying, 'processing')
+        later = timezone.now() + inventory.reservation_ttl() + timedelta(seconds=1)
+        self.assertEqual(inventory.release_expired(batch_size=1, now=later), 1)
+        self.assertEqual(self.holds(unpaid), [('released', 2)])
+        self.assertEqual(self.holds(paying), [('held', 3)])
+        self.assertEqual((self.shard_total(), self.stock()), (7, (7, True)))
+
+    def test_payment_after_expiry_takes_the_stock_again(self):
+        order = self.order(4)
+        inventory.release_expired(now=timezone.now() + inventory.reservation_ttl() + timedelta(seconds=1))
+        self.assertEqual(self.shard_total(), 10)
+        self.pay(order, 'completed')
+        self.assertEqual(sum(quantity for _, quantity in self.holds(order)), 4)
+        self.assertEqual({status for status, _ in self.holds(order)}, {'committed'})
+        self.assertEqual((self.shard_total(), self.stock()), (6, (6, True)))
+
+    def test_payment_after_expiry_when_stock_is_gone_is_logged(self):
+        order = self.order(4)
+        inventory.release_expired(now=timezone.now() + inventory.reservation_ttl() + timedelta(seconds=1))
+        self.order(10)
+        with self.assertLogs('api.inventory', 'WARNING'):
+            self.pay(order, 'completed')
+        self.assertEqual(self.holds(order), [('released', 4)])
+
+    def test_reconcile_folds_shards_into_product(self):
+        StockShard.objects.filter(product=self.product).update(quantity=0)
+        self.assertEqual(inventory.reconcile(), [self.product.pk])
+        self.assertEqual(self.stock(), (0, False))
+        self.assertEqual(inventory.reconcile([0]), [])
+
+    def test_admin_cannot_edit_sharded_stock(self):
+        self.product.refresh_from_db()
+        request = RequestFactory().get('/')
+        model_admin = ProductAdmin(Product, admin.site)
+        form_class = model_admin.get_changelist_form(request, fields=model_admin.list_editable)
+        form = form_class(
+            {'price': '120.00', 'stock': '999', 'available': 'on', 'featured': ''}, instance=self.product,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(self.stock(), (10, True))
+        self.assertEqual(self.product.price, Decimal('120.00'))
+        self.assertIn('stock', model_admin.get_readonly_fields(request, self.product))
+
+    def test_hidden_product_stays_hidden(self):
+        self.product.refresh_from_db()
+        request = RequestFactory().get('/')
+        model_admin = ProductAdmin(Product, admin.site)
+        form_class = model_admin.get_changelist_form(request, fields=model_admin.list_editable)
+        form = form_class(
+            {'price': '100.00', 'stock': '10', 'available': '', 'featured': ''}, instance=self.product,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+        self.assertEqual(inventory.reconcile(), [self.product.pk])
+        self.assertEqual(self.stock(), (10, False))
+        row = Product.objects.annotate(**inventory.live_stock()).get(pk=self.product.pk)
+        self.assertFalse(row.live_available)
+        inventory.shard_product(self.product, 2, total=20)
+        self.assertEqual(self.stock(), (20, False))
+
+    def test_sold_out_product_comes_back_when_stock_returns(self):
+        order = self.order(10)
+        inventory.reconcile()
+        self.assertEqual(self.stock(), (0, False))
+        inventory.release_expired(now=timezone.now() + inventory.reservation_ttl() + timedelta(seconds=1))
+        self.assertEqual({status for status, _ in self.holds(order)}, {'released'})
+        inventory.reconcile()
+        self.assertEqual(self.stock(), (10, True))
+
+
+class CheckoutStockTests(TestCase):
+    """Plain (unsharded) stock taken by the conditional UPDATE at checkout"""
+
+    def setUp(self):
+        category = Category.objects.create(name='খেজুর', slug='dates')
+        self.ajwa = Product.objects.create(
+            category=category, name='আজওয়া খেজুর', slug='ajwa', price=Decimal('100.00'), stock=3,
+        )
+        self.honey = Product.objects.create(
+            category=category, name='সুন্দরবনের মধু', slug='honey', price=Decimal('50.00'), stock=5,
+        )
+
+    def order(self, *lines):
+        payload = {
+            'name': 'Test', 'email': 'test@example.com', 'phone': '01700000000', 'address': 'Dhaka',
+            'items': [{'product_id': product.pk, 'quantity': quantity} for product, quantity in lines],
+        }
+        return self.client.post('/api/orders/', payload, content_type='application/json')
+
+    def stock(self, product):
+        product.refresh_from_db()
+        return product.stock, product.available
+
+    def test_competing_orders_cannot_oversell(self):
+        in_bulk = Product.objects.in_bulk
+
+        def read_then_lose_race(*args, **kwargs):
+            products = in_bulk(*args, **kwargs)
+            # পড়ার পরে অন্য একটি চেকআউট শেষ দুটি কিনে ফেলল
+            Product.objects.filter(pk=self.ajwa.pk).update(stock=F('stock') - 2)
+            return products
+
+        with mock.patch.object(Product.objects, 'in_bulk', side_effect=read_then_lose_race):
+            response = self.order((self.ajwa, 2))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['items'][0]['available'], '1')
+        # নকল প্রতিযোগীর UPDATE ও এই রিকোয়েস্টের rollback এ বাতিল
+        self.assertEqual(self.stock(self.ajwa), (3, True))
+        self.assertFalse(Order.objects.exists())
+
+        self.assertEqual(self.order((self.ajwa, 2)).status_code, 201)
+        self.assertEqual(self.order((self.ajwa, 2)).status_code, 400)
+        self.assertEqual(self.order((self.ajwa, 1)).status_code, 201)
+        self.assertEqual(self.stock(self.ajwa), (0, False))
+
+    def test_short_line_rolls_back_the_whole_order(self):
+        response = self.order((self.honey, 2), (self.ajwa, 4))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.stock(self.honey), (5, True))
+        self.assertEqual(self.stock(self.ajwa), (3, True))
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+
+    def test_every_short_line_is_reported(self):
+        # একই পণ্যের লাইনগুলো যোগ করে যাচাই হয়
+        response = self.order((self.ajwa, 2), (self.honey, 6), (self.ajwa, 2))
+        self.assertEqual(response.status_code, 400)
+        errors = sorted(
+            ((int(error['product_id']), int(error['requested']), int(error['available']), str(error['error']))
+             for error in response.data['items']),
+        )
+        self.assertEqual(errors, sorted([
+            (self.ajwa.pk, 4, 3, 'insufficient stock'),
+            (self.honey.pk, 6, 5, 'insufficient stock'),
+        ]))
+
+
+class SearchVectorMaintenanceTests(TestCase):
+    """``search_dirty`` bookkeeping, ``update_search_vectors`` and ``check_search``"""
+
+    def setUp(self):
+        self.dates = Category.objects.create(name='খেজুর', slug='dates')
+        self.honey = Category.objects.create(name='মধু', slug='honey')
+        self.products = [
+            Product.objects.create(
+                category=self.dates if i % 2 else self.honey, name=f'পণ্য {i}', slug=f'vector-{i}',
+                price=Decimal('100.00'), stock=10,
+            )
+            for i in range(7)
+        ]
+        Product.objects.update(search_dirty=False)
+        self.refreshed = []
+
+    def dirty(self):
+        return set(Product.objects.filter(search_dirty=True).values_list('id', flat=True))
+
+    def fake_refresh(self, queryset):
+        """The flag side of the PostgreSQL UPDATE, recording each batch"""
+        self.refreshed.append(sorted(queryset.values_list('id', flat=True)))
+        return queryset.update(search_dirty=False, search_indexed_at=timezone.now())
+
+    def update_vectors(self, *args, refresh=None, out=None):
+        """Run the PostgreSQL path of ``update_search_vectors``; returns its output"""
+        out = out or io.StringIO()
+        with mock.patch('api.management.commands.update_search_vectors.connection', mock.Mock(vendor='postgresql')), \
+                mock.patch.object(ProductQuerySet, 'refresh_search_vectors', autospec=True,
+                                  side_effect=refresh or self.fake_refresh):
+            call_command('update_search_vectors', *args, stdout=out)
+        return out.getvalue()
+
+    def test_save_marks_indexed_changes_dirty(self):
+        ajwa, other = self.products[:2]
+        ajwa.refresh_from_db()
+        ajwa.price = Decimal('120.00')
+        ajwa.stock = 3
+        ajwa.save()
+        self.assertEqual(self.dirty(), set())
+
+        ajwa.name = 'আজওয়া খেজুর'
+        ajwa.save(update_fields=['name'])
+        self.assertEqual(self.dirty(), {ajwa.pk})
+
+        other.refresh_from_db()
+        other.description = 'মদিনার'
+        other.save()
+        self.assertEqual(self.dirty(), {ajwa.pk, other.pk})
+
+    def test_category_rename_marks_its_products_dirty(self):
+        self.dates.name = 'শুকনো খেজুর'
+        self.dates.save()
+        self.assertEqual(self.dirty(), {product.pk for product in self.products if product.category_id == self.dates.pk})
+
+    def test_update_refreshes_only_dirty_rows_in_batches(self):
+        dirty = {product.pk for product in self.products[1:6]}
+        Product.objects.filter(pk__in=dirty).update(search_dirty=True)
+        output = self.update_vectors('--batch-size', '2')
+        dirty_ids = sorted(dirty)
+        self.assertEqual(self.refreshed, [dirty_ids[:2], dirty_ids[2:4], dirty_ids[4:]])
+        self.assertEqual(self.dirty(), set())
+        self.assertEqual(
+            set(Product.objects.filter(search_indexed_at__isnull=False).values_list('id', flat=True)), dirty,
+        )
+        self.assertIn('5/5', output)
+
+        self.refreshed = []
+        self.assertIn('0 টি পণ্য', self.update_vectors())
+        self.assertEqual(self.refreshed, [])
+
+    def test_resume_after_a_stop(self):
+        Product.objects.update(search_dirty=True)
+
+        def fail_second_batch(queryset):
+            if self.refreshed:
+                raise DatabaseError('connection lost')
+            return self.fake_refresh(queryset)
+
+        out = io.StringIO()
+        with self.assertRaises(DatabaseError):
+            self.update_vectors('--batch-size', '3', refresh=fail_second_batch, out=out)
+        first = [product.pk for product in self.products[:3]]
+        self.assertEqual(self.refreshed, [first])
+        self.assertIn(f'--resume-from {first[-1]}', out.getvalue())
+        self.assertEqual(self.dirty(), {product.pk for product in self.products[3:]})
+
+        self.refreshed = []
+        output = self.update_vectors('--batch-size', '3', '--resume-from', str(first[-1]))
+        self.assertIn('4 টি পণ্য', output)
+        self.assertEqual(self.refreshed, [[product.pk for product in self.products[3:6]], [self.products[6].pk]])
+        self.assertEqual(self.dirty(), set())
+
+    def test_since_limits_to_recent_updates(self):
+        Product.objects.update(search_dirty=True)
+        old = [product.pk for product in self.products[:4]]
+        Product.objects.filter(pk__in=old).update(updated=timezone.now() - timedelta(days=10))
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        self.update_vectors('--since', since, '--batch-size', '10')
+        self.assertEqual(self.refreshed, [[product.pk for product in self.products[4:]]])
+        self.assertEqual(self.dirty(), set(old))
+
+        with self.assertRaises(CommandError):
+            self.update_vectors('--since', 'গতকাল')
+        with self.assertRaises(CommandError):
+            self.update_vectors('--batch-size', '0')
+
+    def check_search(self):
+        out = io.StringIO()
+        call_command('check_search', stdout=out)
+        return out.getvalue()
+
+    def test_check_search_reports_backlog_and_fts_drift(self):
+        output = self.check_search()
+        self.assertIn('backlog): 0', output)
+        self.assertIn(f'{FTS_TABLE} এ পণ্য: 7', output)
+        self.assertIn('সিঙ্কড', output)
+
+        Product.objects.filter(pk__in=[product.pk for product in self.products[:2]]).update(search_dirty=True)
+        with connection.cursor() as cursor:
+            # ট্রিগার ছাড়া লোড করা ডাটার মতো, FTS টেবিলে একটা সারি কম
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [self.products[0].pk])
+        output = self.check_search()
+        self.assertIn('backlog): 2', output)
+        self.assertIn(f'{FTS_TABLE} এ পণ্য: 6', output)
+        self.assertIn('মেলে না', output)
+
+        call_command('update_search_vectors', stdout=io.StringIO())
+        self.assertIn('সিঙ্কড', self.check_search())
+
+
+@override_settings(SEARCH_INDEX_REFRESH_SECONDS=None, SEARCH_ANALYTICS_FLUSH_SECONDS=None)
+class AutocompleteTests(TestCase):
+    """Lookup keys and the ``autocomplete_suggestions`` response"""
+
+    def setUp(self):
+        autocomplete_index.invalidate()
+        self.dates = Category.objects.create(name='খেজুর', slug='dates')
+
+    def suggest(self, query):
+        response = self.client.get(reverse('autocomplete'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def make_product(self, name, minutes_ago=0):
+        product = Product.objects.create(
+            category=self.dates, name=name, slug=f'autocomplete-{next(_sequence)}', price=Decimal('100.00'),
+        )
+        Product.objects.filter(pk=product.pk).update(created=timezone.now() - timedelta(minutes=minutes_ago))
+        return product
+
+    def test_normalize(self):
+        # ড়/য় একক কোডপয়েন্ট আর ড/য + নুকতা একই
+        self.assertEqual(normalize('বড়ই'), normalize('ব\u09a1\u09bcই'))
+        self.assertEqual(normalize('\u09dfা'), normalize('\u09af\u09bcা'))
+        # খণ্ড ত, আর ZWJ দিয়ে লেখা পুরনো রূপ
+        self.assertEqual(normalize('ভবিষ্যৎ'), 'ভবিষ্যত্')
+        self.assertEqual(normalize('ভবিষ্যত্\u200d'), 'ভবিষ্যত্')
+        self.assertEqual(normalize('১২৩ গ্রাম'), '123 গ্রাম')
+        self.assertEqual(normalize('\ufeffখে\u200cজু\u200bর\u2060'), 'খেজুর')
+        self.assertEqual(normalize('  Ajwa\t\nDATES  '), 'ajwa dates')
+        self.assertEqual(normalize(None), '')
+
+    def test_spelling_variants_find_the_same_product(self):
+        product = self.make_product('বড়ই আচার ৫০০ গ্রাম')
+        for query in ('বড়ই', 'ব\u09a1\u09bcই', 'আচার 500', 'আ\u200cচার'):
+            self.assertEqual([s['id'] for s in self.suggest(query)['suggestions']], [product.pk], query)
+
+    def test_suggestion_response_shape(self):
+        older = self.make_product('আজওয়া খেজুর', minutes_ago=5)
+        newer = self.make_product('খেজুর গুড়')
+        SearchTermDaily.objects.create(term='খেজুর', day=timezone.localdate(), searches=5)
+        SearchTermDaily.objects.create(term='খেজুরের রস', day=timezone.localdate(), searches=3)
+
+        self.assertEqual(self.suggest('খেজ'), {'query': 'খেজ', 'suggestions': [
+            {'type': 'product', 'name': 'খেজুর গুড়', 'slug': newer.slug, 'id': newer.pk, 'url': f'/product/{newer.pk}'},
+            {'type': 'product', 'name': 'আজওয়া খেজুর', 'slug': older.slug, 'id': older.pk, 'url': f'/product/{older.pk}'},
+            {'type': 'category', 'name': 'খেজুর', 'slug': 'dates', 'id': self.dates.pk, 'url': '/category/dates'},
+            # 'খেজুর' নামে ক্যাটাগরি আছে, তাই জনপ্রিয় টার্মটা বাদ
+            {'type': 'popular', 'name': 'খেজুরের রস', 'slug': 'খেজুরের-রস', 'url': '/search?q=খেজুরের রস'},
+        ]})
+        self.assertEqual(self.suggest('AJ')['query'], 'aj')
+        self.assertEqual(self.suggest('খ'), {'suggestions': []})
+        self.assertEqual(self.suggest('কাজু'), {'query': 'কাজু', 'suggestions': []})
+
+    def test_suggestions_are_capped(self):
+        for i in range(12):
+            self.make_product(f'খেজুর {i}', minutes_ago=i)
+        for i in range(6):
+            Category.objects.create(name=f'খেজুর বাগান {i}', slug=f'dates-{i}')
+        suggestions = self.suggest('খেজুর')['suggestions']
+        self.assertEqual(len(suggestions), 15)
+        self.assertEqual([s['type'] for s in suggestions], ['product'] * 10 + ['category'] * 5)
+        self.assertEqual(suggestions[0]['name'], 'খেজুর 0')
+
+    def test_writes_drop_only_affected_prefixes(self):
+        prefixes = _PrefixArray(limit=2)
+        prefixes.add(1, 'কাজু বাদাম', 1, {'name': 'কাজু বাদাম'})
+        prefixes.add(2, 'আজওয়া খেজুর', 2, {'name': 'আজওয়া খেজুর'})
+        nuts = prefixes.lookup('বা')
+        self.assertEqual(prefixes.lookup('খে'), ({'name': 'আজওয়া খেজুর'},))
+
+        prefixes.add(3, 'খেজুর গুড়', 0, {'name': 'খেজুর গুড়'})
+        self.assertIs(prefixes.lookup('বা'), nuts)
+        self.assertEqual(prefixes.lookup('খে'), ({'name': 'খেজুর গুড়'}, {'name': 'আজওয়া খেজুর'}))
+
+        prefixes.remove(1)
+        self.assertEqual(prefixes.lookup('বা'), ())
+        self.assertEqual(prefixes.lookup('খেজুর গ'), ({'name': 'খেজুর গুড়'},))
+
+    def test_index_follows_product_edits(self):
+        product = self.make_product('আজওয়া খেজুর')
+        self.assertEqual([s['name'] for s in self.suggest('আজও')['suggestions']], ['আজওয়া খেজুর'])
+        with self.captureOnCommitCallbacks(execute=True):
+            product.name = 'মরিয়ম খেজুর'
+            product.save()
+        self.assertEqual(self.suggest('আজও')['suggestions'], [])
+        self.assertEqual([s['name'] for s in self.suggest('মরি')['suggestions']], ['মরিয়ম খেজুর'])
+
+
+class ProductReadSerializerTests(TestCase):
+    """``ProductReadSerializer`` is a faster ``ProductSerializer(...).data``, not a different one"""
+
+    def setUp(self):
+        category = Category.objects.create(name='খেজুর', slug='dates')
+        images = {
+            'ready': 'products/ab/cd/abcd1234.jpg',
+            'pending': 'products/ef/01/ef012345.jpg',
+            'failed': 'products/23/45/23456789.png',
+            'none': None,
+        }
+        for position, (status, image) in enumerate(images.items()):
+            product = Product.objects.create(
+                category=category, name=f'আজওয়া খেজুর {position}', slug=f'read-{status}',
+                description='মদিনার খেজুর' if position % 2 else '', price=Decimal('1250.5'),
+                stock=position, featured=bool(position % 2), image=image,
+            )
+            # ছবির জব চালানো ছাড়াই অবস্থা বসানো
+            Product.objects.filter(pk=product.pk).update(image_status=status)
+        self.products = Product.objects.select_related('category').order_by('id')
+
+    def assertSameOutput(self, request=None):
+        expected = ProductSerializer(self.products, many=True, context={'request': request}).data
+        actual = ProductReadSerializer(request).many(ProductReadSerializer.values(self.products))
+        self.assertEqual(actual, expected)
+        self.assertEqual([row['image_status'] for row in actual], ['ready', 'pending', 'failed', 'none'])
+
+    def test_without_request(self):
+        self.assertSameOutput()
+
+    def test_with_request(self):
+        factory = RequestFactory()
+        self.assertSameOutput(factory.get('/api/products/'))
+        self.assertSameOutput(factory.get('/api/products/', secure=True, HTTP_HOST='shop.example.com:8443'))
+
+    def test_image_fields(self):
+        rows = {
+            row['slug']: row
+            for row in ProductReadSerializer(RequestFactory().get('/')).many(ProductReadSerializer.values(self.products))
+        }
+        self.assertTrue(rows['read-ready']['image_url'].startswith('http://testserver/'))
+        self.assertIsNotNone(rows['read-ready']['image_renditions'])
+        self.assertIsNone(rows['read-pending']['image_renditions'])
+        self.assertEqual(rows['read-pending']['image'], rows['read-pending']['image_url'])
+        self.assertEqual(
+            {key: rows['read-none'][key] for key in ('image', 'image_url', 'image_renditions')},
+            {'image': None, 'image_url': None, 'image_renditions': None},
+        )
+
+    @override_settings(USE_TZ=True, TIME_ZONE='Asia/Dhaka')
+    def test_timezone_and_decimal_formatting(self):
+        timezone.activate('Asia/Dhaka')
+        self.addCleanup(timezone.deactivate)
+        self.assertSameOutput()
+        row = ProductReadSerializer().to_representation(ProductReadSerializer.values(self.products)[0])
+        self.assertEqual(row['price'], '1250.50')
+        self.assertTrue(row['created'].endswith('+06:00'), row['created'])
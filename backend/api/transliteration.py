@@ -0,0 +1,71 @@
+# api/transliteration.py
+
+"""
+Latin ("Banglish") to Bengali transliteration for search queries.
+
+Customers often type Bengali words phonetically in Latin letters
+(``khejur``, ``modhu``, ``ajwa``).  ``transliterate`` turns such a word into
+a few Bengali spellings; they are only used as lookup keys for
+``api.fuzzy``, which folds away the distinctions Banglish cannot express
+(ত/ট, স/শ/ষ, ি/ী ...), so the table below stays small and a spelling only
+has to be close, not exact.
+"""
+
+import re
+from itertools import product
+
+# দীর্ঘতম মিল আগে: অক্ষর -> বাংলা ব্যঞ্জন
+CONSONANTS = {
+    'chh': 'ছ', 'kh': 'খ', 'gh': 'ঘ', 'ng': 'ং', 'ch': 'চ', 'jh': 'ঝ', 'th': 'থ',
+    'dh': 'ধ', 'ph': 'ফ', 'bh': 'ভ', 'sh': 'শ', 'wa': 'ওয়া',
+    'k': 'ক', 'g': 'গ', 'c': 'ক', 'q': 'ক', 'j': 'জ', 'z': 'জ', 't': 'ত', 'd': 'দ',
+    'n': 'ন', 'p': 'প', 'f': 'ফ', 'b': 'ব', 'v': 'ভ', 'm': 'ম', 'y': 'য়', 'r': 'র',
+    'l': 'ল', 's': 'স', 'h': 'হ', 'x': 'ক্স', 'w': 'ও',
+}
+
+# অক্ষর -> (স্বাধীন স্বরবর্ণ, ব্যঞ্জনের পরে কার-চিহ্নের বিকল্পগুলো)
+VOWELS = {
+    'aa': ('আ', ('া',)), 'ee': ('ই', ('ি',)), 'oo': ('উ', ('ু',)),
+    'ai': ('ঐ', ('ৈ',)), 'oi': ('ঐ', ('ৈ',)), 'au': ('ঔ', ('ৌ',)), 'ou': ('ঔ', ('ৌ',)),
+    # 'a' আর 'o' দুটোই অন্তর্নিহিত অ হতে পারে ("modhu", "badam")
+    'a': ('আ', ('া', '')), 'i': ('ই', ('ি',)), 'u': ('উ', ('ু',)),
+    'e': ('এ', ('ে',)), 'o': ('অ', ('', 'ো')),
+}
+
+_TOKENS = sorted([*CONSONANTS, *VOWELS], key=len, reverse=True)
+_LATIN_WORD = re.compile(r'^[a-z]+$')
+
+MAX_SPELLINGS = 16
+
+
+def is_latin(word):
+    return bool(_LATIN_WORD.match(word))
+
+
+def transliterate(word):
+    """
+    Bengali spellings of a lower-case Latin ``word``, most likely first (at
+    most ``MAX_SPELLINGS``); empty for anything that is not plain Latin.
+    """
+    if not is_latin(word):
+        return []
+    choices = []
+    after_consonant = False
+    position = 0
+    while position < len(word):
+        token = next(token for token in _TOKENS if word.startswith(token, position))
+        position += len(token)
+        if token in CONSONANTS:
+            choices.append((CONSONANTS[token],))
+            after_consonant = not CONSONANTS[token].endswith(('া', 'ও'))
+        else:
+            independent, signs = VOWELS[token]
+            choices.append(signs if after_consonant else (independent,))
+            after_consonant = False
+
+    spellings = []
+    for combination in product(*choices):
+        spellings.append(''.join(combination))
+        if len(spellings) == MAX_SPELLINGS:
+            break
+    return spellings
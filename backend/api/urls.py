@@ -1,8 +1,9 @@
 # api/urls.py
 
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'categories', views.CategoryViewSet)
@@ -11,13 +12,34 @@ router.register(r'orders', views.OrderViewSet)
 router.register(r'order-items', views.OrderItemViewSet)
 router.register(r'payments', views.PaymentViewSet)
 
+# ASGI সার্ভারে (uvicorn) মূল সার্চ URL গুলোও async ভিউ দিয়ে
+search = async_views if getattr(settings, 'ASYNC_SEARCH_VIEWS', False) else views
+
 urlpatterns = [
+    # ✅ পেমেন্ট গেটওয়ের callback (router এর payments/<pk>/ এর আগে)
+    path('payments/callback/', views.payment_callback, name='payment-callback'),
+    
     path('', include(router.urls)),
     
     # ✅ সার্চ এন্ডপয়েন্টস
-    path('search/', views.search_products, name='search-products'),
-    path('search/autocomplete/', views.autocomplete_suggestions, name='autocomplete'),
-    path('search/statistics/', views.search_statistics, name='search-stats'),
+    path('search/', search.search_products, name='search-products'),
+    path('search/click/', views.search_click, name='search-click'),
+    path('search/autocomplete/', search.autocomplete_suggestions, name='autocomplete'),
+    path('search/statistics/', search.search_statistics, name='search-stats'),
+    
+    # ✅ async সার্চ (ASGI), রেসপন্স উপরের গুলোর মতোই
+    path('async/search/', async_views.search_products, name='async-search-products'),
+    path('async/search/autocomplete/', async_views.autocomplete_suggestions, name='async-autocomplete'),
+    path('async/search/statistics/', async_views.search_statistics, name='async-search-stats'),
+    
+    # ✅ পণ্যের ছবির থাম্বনেইল/WebP (প্রথম রিকোয়েস্টে তৈরি)
+    path('images/<str:size>/<str:fmt>/<path:name>', views.image_rendition, name='image-rendition'),
+    
+    # ✅ অর্ডার/পেমেন্ট এক্সপোর্ট, NDJSON/CSV স্ট্রিম (অ্যাডমিন)
+    path('exports/orders/', views.export_orders, name='export-orders'),
+    
+    # ✅ মেট্রিক্স (অ্যাডমিন)
+    path('metrics/', views.metrics, name='metrics'),
     
     # ✅ পণ্যের দ্বারা সার্চ
     path('products/search/', views.ProductViewSet.as_view({'get': 'list'})),
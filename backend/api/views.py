@@ -1,47 +1,96 @@
 # api/views.py
 
 from rest_framework import viewsets, status, filters
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import (
+    action, api_view, authentication_classes, permission_classes, renderer_classes,
+)
 from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from django.shortcuts import get_object_or_404
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http import HttpResponseRedirect, StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
-from django.db import models
-import uuid
+from django.db.models import Case, F, Q, Value, When, prefetch_related_objects
+from django.db import models, transaction
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.static import serve
+from decimal import Decimal
 
 from .models import Category, Product, Order, OrderItem, Payment
+from . import exports, inventory, payments, renditions, sales, search_facets
+from .conditional import ConditionalGetMixin
+from .fuzzy import fuzzy_index
+from .instrumentation import QueryBudgetMixin, query_budget, registry
+from .pagination import INVALID_CURSOR, KeysetPagination, decode_cursor, encode_cursor, truthy_param
+from .search_backends import get_backend
+from .renderers import CSVRenderer, FastJSONRenderer, NDJSONRenderer
+from .response_cache import response_cache
+from .search_analytics import popular_terms, search_log, zero_result_terms
+from .signals import products_changed
+from .storage import IMMUTABLE_CACHE_CONTROL, is_addressed
 from .serializers import (
     CategorySerializer, 
     ProductSerializer, 
+    ProductReadSerializer,
     OrderSerializer, 
     OrderItemSerializer,
-    PaymentSerializer
+    PaymentSerializer,
+    ProductBatchSerializer,
 )
 
 # ============================ Category ViewSet ============================
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(QueryBudgetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for categories
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    pagination_class = KeysetPagination
     lookup_field = 'slug'
+    # প্রথম ক্যোয়ারী ETag এর জন্য
+    query_budgets = {'list': 3, 'retrieve': 2}
+    
+    def list(self, request, *args, **kwargs):
+        # সব ভিজিটর একই তালিকা পায়, ক্যাটাগরি বদলালেই cache বাতিল
+        return self.conditional(lambda: Response(response_cache.get_or_set(
+            'categories', ['categories'], request,
+            lambda: super(CategoryViewSet, self).list(request, *args, **kwargs).data
+        )))
+    
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(lambda: super(CategoryViewSet, self).retrieve(request, *args, **kwargs))
 
 
 # ============================ Product ViewSet ============================
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(QueryBudgetMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for products
     """
-    queryset = Product.objects.filter(available=True)
+    queryset = Product.objects.filter(available=True).select_related('category')
     serializer_class = ProductSerializer
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'available', 'featured']  # ✅ featured যোগ করুন
     search_fields = ['name', 'description']
     ordering_fields = ['price', 'created', 'name']
     ordering = ['-created']
     parser_classes = [MultiPartParser, FormParser]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    # filter ?category= ভ্যালিডেশনে একটি, ETag এ একটি ক্যোয়ারী লাগে
+    query_budgets = {'list': 4, 'retrieve': 2, 'by_category': 3, 'featured': 1, 'trending': 1, 'batch': 1}
+    # পণ্যের ভেতরে ক্যাটাগরির নামও থাকে
+    validator_fields = ('updated', 'category__updated')
+    
+    def initialize_request(self, request, *args, **kwargs):
+        # ছবি মেমোরিতে না রেখে chunk করে টেম্প ফাইলে; storage পরে শুধু move করে
+        if request.method in ('POST', 'PUT', 'PATCH'):
+            request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
     
     def get_serializer_context(self):
         """Add request to serializer context for image URL"""
@@ -49,6 +98,27 @@ class ProductViewSet(viewsets.ModelViewSet):
         context['request'] = self.request
         return context
     
+    def _read_response(self, queryset):
+        """Serialize a product queryset through the values() fast path"""
+        serializer = ProductReadSerializer(self.request)
+        rows = ProductReadSerializer.values(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.many(page))
+        return Response(serializer.many(rows))
+    
+    def list(self, request, *args, **kwargs):
+        return self.conditional(lambda: self._read_response(self.filtered_queryset()))
+    
+    def retrieve(self, request, *args, **kwargs):
+        def respond():
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            rows = ProductReadSerializer.values(self.filtered_queryset())
+            row = get_object_or_404(rows, **{self.lookup_field: kwargs[lookup_url_kwarg]})
+            return Response(ProductReadSerializer(request).to_representation(row))
+        
+        return self.conditional(respond)
+    
     @action(detail=False, methods=['get'])
     def by_category(self, request):
         """
@@ -64,248 +134,557 @@ class ProductViewSet(viewsets.ModelViewSet):
         
         category = get_object_or_404(Category, slug=category_slug)
         products = Product.objects.filter(category=category, available=True)
-        
-        page = self.paginate_queryset(products)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = self.get_serializer(products, many=True)
-        return Response(serializer.data)
+        # শুধু এই ক্যাটাগরির জেনারেশন, অন্য ক্যাটাগরির লেখায় cache থাকে
+        data = response_cache.get_or_set(
+            'by_category', [f'category:{category.pk}'], request,
+            lambda: self._read_response(products).data
+        )
+        return Response(data)
     
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """
         Get featured products
         """
-        featured_products = Product.objects.filter(available=True, featured=True).order_by('-created')[:8]
-        serializer = self.get_serializer(featured_products, many=True)
-        return Response(serializer.data)
+        def build():
+            featured_products = Product.objects.filter(available=True, featured=True).order_by('-created')[:8]
+            rows = ProductReadSerializer.values(featured_products)
+            return ProductReadSerializer(request).many(rows)
+        
+        return Response(response_cache.get_or_set('featured', ['products', 'categories'], request, build))
+    
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        """
+        Get trending products, ranked by recent sales (``api.sales``)
+        """
+        try:
+            limit = min(max(int(request.query_params.get('limit', 8)), 1), 50)
+        except ValueError:
+            limit = 8
+        
+        def build():
+            rows = ProductReadSerializer.values(sales.trending_products(limit))
+            return ProductReadSerializer(request).many(rows)
+        
+        return Response(response_cache.get_or_set('trending', ['products', 'categories', 'sales'], request, build))
+    
+    @action(detail=False, methods=['get', 'post'], parser_classes=[JSONParser])
+    def batch(self, request):
+        """
+        Live price/stock of specific products in one query
+        Example: /api/products/batch/?ids=3,7,12&slugs=ajwa-dates&fields=id,price,stock
+        
+        Long lists can be POSTed as JSON (``{"ids": [...], "slugs": [...],
+        "fields": [...]}``).  Unavailable products are included
+        (``available: false``); unknown ids and slugs come back in ``missing``.
+        """
+        source = request.data if request.method == 'POST' else request.query_params
+        ids = _list_param(source, 'ids')
+        slugs = _list_param(source, 'slugs')
+        fields = _list_param(source, 'fields') or ProductBatchSerializer.DEFAULT_FIELDS
+        
+        try:
+            ids = [int(value) for value in ids]
+        except (TypeError, ValueError):
+            return Response({"error": "ids must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        unknown = [field for field in fields if field not in ProductBatchSerializer.FIELDS]
+        if unknown:
+            return Response(
+                {"error": f"unknown fields: {', '.join(map(str, unknown))}",
+                 "fields": list(ProductBatchSerializer.FIELDS)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # ক্রম ঠিক রেখে ডুপ্লিকেট বাদ
+        ids, slugs, fields = list(dict.fromkeys(ids)), list(dict.fromkeys(slugs)), list(dict.fromkeys(fields))
+        limit = getattr(settings, 'PRODUCT_BATCH_MAX', 100)
+        if not ids and not slugs:
+            return Response({"error": "ids or slugs parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) + len(slugs) > limit:
+            return Response(
+                {"error": f"at most {limit} products per batch"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # id (primary key) আর slug (unique) দুটোই ইনডেক্সড, একটি ক্যোয়ারী
+        serializer = ProductBatchSerializer(request, fields)
+        rows = list(serializer.values(Product.objects.filter(Q(pk__in=ids) | Q(slug__in=slugs)).order_by()))
+        by_id = {row['id']: row for row in rows}
+        by_slug = {row['slug']: row for row in rows}
+        
+        products, seen, missing = [], set(), []
+        for key, row in [(pk, by_id.get(pk)) for pk in ids] + [(slug, by_slug.get(slug)) for slug in slugs]:
+            if row is None:
+                missing.append(key)
+            elif row['id'] not in seen:
+                seen.add(row['id'])
+                products.append(serializer.to_representation(row))
+        return Response({'products': products, 'missing': missing})
+
+
+def _list_param(source, name):
+    """``?name=a,b&name=c`` or a JSON list, as a list of non-empty strings"""
+    if hasattr(source, 'getlist'):
+        values = [part for value in source.getlist(name) for part in value.split(',')]
+    else:
+        values = source.get(name) or []
+        if isinstance(values, str):
+            values = values.split(',')
+        elif not isinstance(values, list):
+            values = [values]
+    return [str(value).strip() for value in values if str(value).strip()]
 
 
 # ============================ Order ViewSet ============================
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     """
     API endpoint for orders
     """
-    queryset = Order.objects.all()
+    queryset = Order.objects.prefetch_related('items__product__category')
     serializer_class = OrderSerializer
+    pagination_class = KeysetPagination
+    # orders + items + products + categories (+ pagination count)
+    query_budgets = {'list': 5, 'retrieve': 4}
     
     def perform_create(self, serializer):
-        """Calculate total price before saving"""
-        order = serializer.save()
+        """
+        Place the order as one atomic unit.
         
-        # Calculate total price from items
-        total = 0
-        items_data = self.request.data.get('items', [])
+        Products are fetched in one query, stock for every line is decremented
+        by a single conditional UPDATE, and the order and its items are each
+        written once, so the query count does not grow with the cart size.
+        """
+        lines = self._parse_items(self.request.data.get('items', []))
         
-        for item_data in items_data:
-            product_id = item_data.get('product_id')
-            quantity = item_data.get('quantity', 1)
+        with transaction.atomic():
+            products = Product.objects.in_bulk({product_id for product_id, _ in lines})
+            for product_id, _ in lines:
+                if product_id not in products:
+                    raise NotFound(f'Product {product_id} not found')
             
-            product = get_object_or_404(Product, id=product_id)
-            price = product.price
+            # হট পণ্যের স্টক শার্ডে থাকে, সেগুলো reservation দিয়ে ধরে রাখা হয়
+            sharded = [line for line in lines if products[line[0]].stock_shards]
+            plain = [line for line in lines if not products[line[0]].stock_shards]
+            try:
+                self._decrement_stock(plain)
+                holds = inventory.reserve(sharded, products)
+            except inventory.InsufficientStock as exc:
+                raise ValidationError({'items': [
+                    {
+                        'product_id': product_id,
+                        'error': 'insufficient stock',
+                        'requested': requested,
+                        'available': available,
+                    }
+                    for product_id, requested, available in exc.shortages
+                ]})
             
-            OrderItem.objects.create(
-                order=order,
-                product=product,
-                price=price,
-                quantity=quantity
+            total = sum(
+                (products[product_id].price * quantity for product_id, quantity in lines),
+                Decimal('0')
             )
+            order = serializer.save(total_price=total)
             
-            total += price * quantity
-            
-            # Update product stock
-            if product.stock >= quantity:
-                product.stock -= quantity
-                if product.stock == 0:
-                    product.available = False
-                product.save()
+            items = OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order,
+                    product=products[product_id],
+                    price=products[product_id].price,
+                    quantity=quantity
+                )
+                for product_id, quantity in lines
+            ])
+            inventory.attach(holds, order)
+            # বিক্রির রোলআপ কমিটের পরে, আলাদা ছোট ট্রানজেকশনে (হট রো চেকআউট আটকায় না)
+            transaction.on_commit(lambda: sales.record_order(order, items), robust=True)
+        
+        # রেসপন্সের nested items এর জন্য একবারে prefetch
+        prefetch_related_objects([order], 'items__product__category')
+        products_changed(list(products))
+    
+    @staticmethod
+    def _parse_items(items_data):
+        """Validate the posted cart lines into ``[(product_id, quantity), ...]``"""
+        lines = []
+        errors = []
+        for item_data in items_data:
+            try:
+                product_id = int(item_data.get('product_id'))
+                quantity = int(item_data.get('quantity', 1))
+            except (AttributeError, TypeError, ValueError):
+                errors.append({'item': item_data, 'error': 'product_id and quantity must be integers'})
+                continue
+            if quantity < 1:
+                errors.append({'product_id': product_id, 'error': 'quantity must be at least 1'})
+                continue
+            lines.append((product_id, quantity))
+        if errors:
+            raise ValidationError({'items': errors})
+        return lines
+    
+    @staticmethod
+    def _decrement_stock(lines):
+        """
+        Decrement stock for all lines with one ``UPDATE ... WHERE stock >= qty``.
+        
+        The row-level condition makes concurrent checkouts safe without
+        ``SELECT ... FOR UPDATE``; if any product is short,
+        ``inventory.InsufficientStock`` is raised and the caller rolls back.
+        """
+        quantities = {}
+        for product_id, quantity in lines:
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        if not quantities:
+            return
         
-        order.total_price = total
-        order.save()
+        enough_stock = Q()
+        for product_id, quantity in quantities.items():
+            enough_stock |= Q(pk=product_id, stock__gte=quantity)
+        
+        updated = Product.objects.filter(enough_stock).update(
+            stock=Case(
+                *[When(pk=product_id, then=F('stock') - quantity)
+                  for product_id, quantity in quantities.items()],
+                default=F('stock'),
+                output_field=models.PositiveIntegerField()
+            ),
+            # স্টক শূন্য হলে পণ্য আর available থাকবে না
+            available=Case(
+                *[When(pk=product_id, stock=quantity, then=Value(False))
+                  for product_id, quantity in quantities.items()],
+                default=F('available')
+            ),
+            updated=timezone.now()
+        )
+        if updated == len(quantities):
+            return
+        
+        # কোন লাইনে স্টক কম তা রিপোর্ট করুন (transaction rollback হবে)
+        in_stock = dict(
+            Product.objects.filter(pk__in=quantities).values_list('pk', 'stock')
+        )
+        raise inventory.InsufficientStock([
+            (product_id, quantity, in_stock.get(product_id, 0))
+            for product_id, quantity in quantities.items()
+            if in_stock.get(product_id, 0) < quantity
+        ])
 
 
 # ============================ OrderItem ViewSet ============================
-class OrderItemViewSet(viewsets.ModelViewSet):
+class OrderItemViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     """
     API endpoint for order items
     """
-    queryset = OrderItem.objects.all()
+    queryset = OrderItem.objects.select_related('product__category')
     serializer_class = OrderItemSerializer
+    pagination_class = KeysetPagination
+    query_budgets = {'list': 2, 'retrieve': 1}
 
 
 # ============================ Payment ViewSet ============================
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     """
     API endpoint for payments
     """
-    queryset = Payment.objects.all()
+    # প্রতিটি payment এ পুরো order nested থাকে, তাই items ও একবারে prefetch
+    queryset = Payment.objects.select_related('order').prefetch_related('order__items__product__category')
     serializer_class = PaymentSerializer
+    pagination_class = KeysetPagination
+    query_budgets = {'list': 5, 'retrieve': 4, 'verify': 8}
     
     def perform_create(self, serializer):
         """Create payment with unique transaction ID"""
-        # Unique transaction ID তৈরি
-        transaction_id = f"TXN{str(uuid.uuid4())[:8].upper()}"
-        
+        # ডাটাবেস না দেখেই অনন্য ID (api.payments.TransactionIdGenerator)
         payment = serializer.save(
-            transaction_id=transaction_id,
+            transaction_id=payments.new_transaction_id(),
             status='pending'
         )
         
-        # Log payment creation
-        print(f"Payment created: {transaction_id} for Order #{payment.order.id}")
+        # bKash/Rocket API কল রিকোয়েস্টের বাইরে, কমিটের পরে
+        transaction.on_commit(lambda: payments.enqueue('initiate', payment.pk))
+    
+    @action(detail=True, methods=['post', 'patch'])
+    def verify(self, request, pk=None):
+        """
+        গ্রাহকের দেওয়া gateway ট্রানজেকশন আইডি জমা (``{"transaction_id": ...}``)।
+        যাচাই ব্যাকগ্রাউন্ডে হয়; ফলাফলের জন্য payment টি আবার GET করুন।
+        """
+        payment = self.get_object()
+        reference = str(request.data.get('reference') or request.data.get('transaction_id') or '').strip()
+        if payment.status == 'completed':
+            return Response(self.get_serializer(payment).data)
+        if payment.status not in payments.TRANSITIONS:
+            return Response({
+                'success': False,
+                'error': f'পেমেন্টটি {payment.status}, আর যাচাই করা যাবে না'
+            }, status=status.HTTP_409_CONFLICT)
+        if not reference:
+            return Response({
+                'success': False,
+                'error': 'transaction_id প্রয়োজন'
+            }, status=400)
         
-        # এখানে bKash/Rocket API কল করতে হবে (পরে যোগ করব)
-        # payment.payment_method অনুযায়ী আলাদা API কল হবে
+        # ক্লায়েন্টের পাঠানো status উপেক্ষা; চূড়ান্ত status আসে gateway থেকে
+        updated = payments.apply_status(payment.transaction_id, 'processing', customer_reference=reference)
+        payment.status = updated.status
+        payment.customer_reference = updated.customer_reference
+        transaction.on_commit(lambda: payments.enqueue('verify', payment.pk))
+        return Response(self.get_serializer(payment).data, status=status.HTTP_202_ACCEPTED)
 
 
-# ============================ SEARCH VIEWS ============================
-@api_view(['GET'])
-def search_products(request):
+@api_view(['POST'])
+@authentication_classes([])
+@permission_classes([])
+# স্টক commit/release ও শার্ডেড পণ্যের stock হালনাগাদ (api.inventory) সহ
+@query_budget(11)
+def payment_callback(request):
     """
-    উন্নত সার্চ ফিচার - ফুল-টেক্সট সার্চ
+    Gateway থেকে চূড়ান্ত status (``{"transaction_id", "status", "reference"}``),
+    ``X-Signature`` হেডারে বডির HMAC-SHA256 সহ
     """
-    query = request.GET.get('q', '').strip()
-    category_slug = request.GET.get('category', None)
-    min_price = request.GET.get('min_price', None)
-    max_price = request.GET.get('max_price', None)
-    
-    if not query:
+    if not payments.valid_signature(request.body, request.headers.get('X-Signature')):
+        return Response({'success': False, 'error': 'অবৈধ signature'}, status=status.HTTP_403_FORBIDDEN)
+    transaction_id = str(request.data.get('transaction_id', ''))
+    new_status = request.data.get('status')
+    if not transaction_id or new_status not in dict(Payment.ORDER_STATUS_CHOICES):
         return Response({
             'success': False,
-            'error': 'সার্চ ক্যোয়ারী প্রয়োজন'
+            'error': 'transaction_id এবং বৈধ status প্রয়োজন'
         }, status=400)
     
-    # সার্চ ক্যোয়ারী প্রসেসিং
-    search_terms = query.split()
-    
-    # প্রোডাক্ট কুয়েরি
-    products_qs = Product.objects.filter(available=True)
-    
-    # ক্যাটাগরি ফিল্টার
-    if category_slug:
-        try:
-            category = Category.objects.get(slug=category_slug)
-            products_qs = products_qs.filter(category=category)
-        except Category.DoesNotExist:
-            pass
-    
-    # প্রাইস ফিল্টার
-    if min_price:
-        try:
-            products_qs = products_qs.filter(price__gte=float(min_price))
-        except:
-            pass
-    
-    if max_price:
-        try:
-            products_qs = products_qs.filter(price__lte=float(max_price))
-        except:
-            pass
-    
-    # মাল্টিপল ফিল্ডে সার্চ
-    q_objects = Q()
-    
-    for term in search_terms:
-        if len(term) >= 2:  # অন্তত ২ অক্ষরের শব্দ
-            q_objects |= (
-                Q(name__icontains=term) |
-                Q(description__icontains=term) |
-                Q(category__name__icontains=term)
-            )
-    
-    # যদি কোনো টার্ম না মেলে, তাহলে সম্পূর্ণ ক্যোয়ারী দিয়ে সার্চ
-    if not q_objects:
-        q_objects = (
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(category__name__icontains=query)
-        )
-    
-    products = products_qs.filter(q_objects).distinct()
-    
-    # ✅ রিলেভেন্স স্কোরিং ফাংশন - fixed
-    def calculate_relevance(product, query):
-        score = 0
-        
-        # নামে এক্সাক্ট ম্যাচ
-        if query.lower() in product.name.lower():
-            score += 100
-        
-        # নামে পার্শিয়াল ম্যাচ
-        for term in search_terms:
-            if term.lower() in product.name.lower():
-                score += 50
-        
-        # ডেসক্রিপশনে ম্যাচ
-        for term in search_terms:
-            if term.lower() in (product.description or '').lower():
-                score += 20
-        
-        # ক্যাটাগরিতে ম্যাচ
-        for term in search_terms:
-            if term.lower() in (product.category.name or '').lower():
-                score += 30
-        
-        # জনপ্রিয় পণ্যের বোনাস - ✅ hasattr চেক যোগ করুন
-        if hasattr(product, 'featured') and product.featured:
-            score += 10
-        
-        # স্টক থাকলে বোনাস
-        if product.stock > 0:
-            score += 5
-        
-        return score
-    
-    # প্রোডাক্ট লিস্ট তৈরি
-    product_list = []
-    for product in products:
-        try:
-            serializer = ProductSerializer(product, context={'request': request})
-            product_data = serializer.data
-            product_data['relevance_score'] = calculate_relevance(product, query)
-            product_list.append(product_data)
-        except Exception as e:
-            # লগ করুন কিন্তু প্রোগ্রাম ক্রাশ করবেন না
-            print(f"Error serializing product {product.id}: {e}")
-            continue
-    
-    # রিলেভেন্স অনুসারে সর্টিং
-    product_list.sort(key=lambda x: x['relevance_score'], reverse=True)
-    
+    payment = payments.apply_status(
+        transaction_id, new_status,
+        reference=str(request.data.get('reference') or ''),
+        detail=str(request.data.get('detail') or ''),
+    )
+    if payment is None:
+        raise NotFound('পেমেন্ট পাওয়া যায়নি')
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ============================ SEARCH VIEWS ============================
+def _parse_price(value):
+    """Parse a price filter, ignoring malformed values like before"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _search_ordering():
+    """Sort keys of search results, which a search cursor records"""
+    return get_backend().ordering()
+
+
+def _search_cursor(row, score):
+    ordering = _search_ordering()
+    position = [score if name == 'relevance' else row[name] for name, _ in ordering]
+    return encode_cursor({'p': position, 'o': ','.join(name for name, _ in ordering)})
+
+
+def _parse_search_cursor(cursor):
+    """Decode a search cursor into a keyset position, or raise ``NotFound``"""
+    ordering = _search_ordering()
+    payload = decode_cursor(cursor)
+    position = payload.get('p')
+    if (
+        payload.get('o') != ','.join(name for name, _ in ordering)
+        or not isinstance(position, list)
+        or len(position) != len(ordering)
+    ):
+        raise NotFound(INVALID_CURSOR)
+    try:
+        position = [
+            parse_datetime(value) if name == 'created' else value
+            for (name, _), value in zip(ordering, position)
+        ]
+    except (TypeError, ValueError):
+        raise NotFound(INVALID_CURSOR)
+    if None in position:
+        raise NotFound(INVALID_CURSOR)
+    return position
+
+
+SEARCH_PAGE_SIZE = 20
+
+
+def _search_params(request):
+    """
+    Query-string parameters of a search, shared by the sync and async views.
+    Raises ``NotFound`` for a bad cursor.
+    """
     # পেজিনেশন
-    page = request.GET.get('page', 1)
     try:
-        page = int(page)
-    except:
+        page = int(request.GET.get('page', 1))
+    except (TypeError, ValueError):
         page = 1
-    
-    items_per_page = 20
-    total_items = len(product_list)
-    total_pages = (total_items + items_per_page - 1) // items_per_page
-    
-    start_index = (page - 1) * items_per_page
-    end_index = min(start_index + items_per_page, total_items)
-    
-    paginated_products = product_list[start_index:end_index]
-    
-    return Response({
+    cursor = request.GET.get('cursor')
+    after = _parse_search_cursor(cursor) if cursor else None
+    return {
+        'query': request.GET.get('q', '').strip(),
+        'category_slug': request.GET.get('category', None),
+        'min_price': request.GET.get('min_price', None),
+        'max_price': request.GET.get('max_price', None),
+        'page': page,
+        'after': after,
+        'offset': 0 if after is not None else max(page - 1, 0) * SEARCH_PAGE_SIZE,
+        'with_total': truthy_param(request, 'count'),
+        'facets': truthy_param(request, 'facets', default=False),
+        'corrected_query': None,
+    }
+
+
+def _rank_arguments(params, category_id):
+    """Keyword arguments of ``SearchBackend.search`` for ``_search_params``"""
+    return {
+        'category_id': category_id,
+        'min_price': _parse_price(params['min_price']),
+        'max_price': _parse_price(params['max_price']),
+        'offset': params['offset'],
+        # একটি বাড়তি রো দিয়ে বোঝা যায় পরের পেজ আছে কিনা
+        'limit': SEARCH_PAGE_SIZE + 1,
+        'after': params['after'],
+        'with_total': params['with_total'],
+    }
+
+
+def _needs_correction(params, ranked):
+    """
+    Whether to retry with ``api.fuzzy``: only when the first page is empty,
+    i.e. nothing matched at all (``SEARCH_FUZZY = False`` turns it off).
+    """
+    return (
+        not ranked
+        and params['after'] is None
+        and params['offset'] == 0
+        and getattr(settings, 'SEARCH_FUZZY', True)
+    )
+
+
+def _search_facets(params, arguments):
+    """``api.search_facets`` of the search, or ``None`` unless ``?facets=true``"""
+    if not params['facets']:
+        return None
+    return search_facets.facets(
+        params['corrected_query'] or params['query'],
+        category_id=arguments['category_id'],
+        min_price=arguments['min_price'],
+        max_price=arguments['max_price'],
+        backend=get_backend(),
+    )
+
+
+def _search_payload(request, params, total_items, ranked, facets=None):
+    """Response body of a search; also counts first-page searches for analytics"""
+    query, with_total = params['query'], params['with_total']
+    has_more = len(ranked) > SEARCH_PAGE_SIZE
+    ranked = ranked[:SEARCH_PAGE_SIZE]
+    total_pages = None
+    if total_items is not None:
+        total_pages = (total_items + SEARCH_PAGE_SIZE - 1) // SEARCH_PAGE_SIZE
+    
+    if params['after'] is None and params['offset'] == 0:
+        # শুধু মেমোরির বাফারে; DB তে লেখা ব্যাকগ্রাউন্ডে ব্যাচে
+        search_log.record_search(query, total_items if total_items is not None else len(ranked))
+    
+    serializer = ProductReadSerializer(request)
+    paginated_products = []
+    for row, score in ranked:
+        product_data = serializer.to_representation(row)
+        product_data['relevance_score'] = score
+        paginated_products.append(product_data)
+    
+    return {
         'success': True,
         'query': query,
-        'total_results': total_items,
-        'total_pages': total_pages,
-        'current_page': page,
+        # বানান সংশোধন হলে এই কোয়েরির ফলাফল; পরের পেজে এটাই পাঠাতে হবে
+        'corrected_query': params['corrected_query'],
+        'total_results': total_items if with_total else None,
+        'total_pages': total_pages if with_total else None,
+        'current_page': params['page'],
+        'next_cursor': _search_cursor(*ranked[-1]) if has_more else None,
         'products': paginated_products,
+        'facets': facets,
         'filters': {
-            'category': category_slug,
-            'min_price': min_price,
-            'max_price': max_price
+            'category': params['category_slug'],
+            'min_price': params['min_price'],
+            'max_price': params['max_price']
         }
-    })
+    }
+
+
+SEARCH_QUERY_REQUIRED = {
+    'success': False,
+    'error': 'সার্চ ক্যোয়ারী প্রয়োজন'
+}
+
+
+@api_view(['GET'])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+# ফেসেট চাইলে +২ (গ্রুপড কোয়েরি ও ক্যাটাগরির নাম), বানান সংশোধনে আরও
+# ৪ পর্যন্ত (ঠান্ডা ইনডেক্স বিল্ড ও দ্বিতীয় সার্চ)
+@query_budget(9)
+def search_products(request):
+    """
+    উন্নত সার্চ ফিচার - ফুল-টেক্সট সার্চ
+    
+    ``page`` দিয়ে পেজ নম্বর, অথবা আগের রেসপন্সের ``next_cursor`` দিয়ে পরের
+    পেজ (গভীর পেজেও খরচ একই)। ``count=false`` দিলে মোট সংখ্যা গোনা হয় না।
+    প্রথম পেজের প্রতিটি সার্চ ``api.search_analytics`` এর বাফারে গোনা হয়।
+    ``facets=true`` দিলে ক্যাটাগরি, দামের হিস্টোগ্রাম ও স্টক/ফিচার্ড গণনা
+    (``api.search_facets``)।
+    কিছুই না মিললে বানান ভুল ও বাংলিশ ("khejur") ``api.fuzzy`` দিয়ে ঠিক করে
+    আবার সার্চ হয়; তখন ``corrected_query`` এ নতুন কোয়েরি থাকে।
+    ASGI তে ``api.async_views.search_products`` একই কাজ করে।
+    """
+    params = _search_params(request)
+    if not params['query']:
+        return Response(SEARCH_QUERY_REQUIRED, status=400)
+    
+    # ক্যাটাগরি ফিল্টার
+    category_id = None
+    if params['category_slug']:
+        category_id = Category.objects.filter(slug=params['category_slug']).values_list('id', flat=True).first()
+    
+    arguments = _rank_arguments(params, category_id)
+    # SEARCH_BACKEND অনুযায়ী memory / database / postgres / sqlite
+    backend = get_backend()
+    total_items, ranked = backend.search(params['query'], **arguments)
+    if _needs_correction(params, ranked):
+        # "khejur", "মধূ" -> "খেজুর", "মধু"
+        params['corrected_query'] = fuzzy_index.correct(params['query'])
+        if params['corrected_query']:
+            total_items, ranked = backend.search(params['corrected_query'], **arguments)
+    return Response(_search_payload(request, params, total_items, ranked, _search_facets(params, arguments)))
+
+
+@api_view(['POST'])
+@authentication_classes([])
+@query_budget(0)
+def search_click(request):
+    """
+    সার্চ ফলাফলে ক্লিক রেকর্ড (``{"q": ..., "product_id": ...}``, sendBeacon থেকে)
+    """
+    query = str(request.data.get('q', '')).strip()
+    try:
+        product_id = int(request.data.get('product_id'))
+    except (TypeError, ValueError):
+        product_id = 0
+    if not query or product_id < 1:
+        return Response({
+            'success': False,
+            'error': 'q এবং product_id প্রয়োজন'
+        }, status=400)
+    
+    search_log.record_click(query)
+    return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+@query_budget(3)
 def autocomplete_suggestions(request):
     """
     অটোকমপ্লিট সুজেশন এন্ডপয়েন্ট
@@ -315,95 +694,163 @@ def autocomplete_suggestions(request):
     if len(query) < 2:
         return Response({'suggestions': []})
     
-    # পণ্যের নাম থেকে সুজেশন
-    product_suggestions = Product.objects.filter(
-        name__icontains=query,
-        available=True
-    ).values('name', 'slug', 'id')[:10]
-    
-    # ক্যাটাগরি থেকে সুজেশন
-    category_suggestions = Category.objects.filter(
-        name__icontains=query
-    ).values('name', 'slug', 'id')[:5]
-    
-    # ইউনিক নাম সংগ্রহ
-    suggestions = []
-    seen_names = set()
-    
-    # পণ্য সুজেশন
-    for product in product_suggestions:
-        name = product['name']
-        if name not in seen_names:
-            suggestions.append({
-                'type': 'product',
-                'name': name,
-                'slug': product['slug'],
-                'id': product['id'],
-                'url': f'/product/{product["id"]}'
-            })
-            seen_names.add(name)
-    
-    # ক্যাটাগরি সুজেশন
-    for category in category_suggestions:
-        name = category['name']
-        if name not in seen_names:
-            suggestions.append({
-                'type': 'category',
-                'name': name,
-                'slug': category['slug'],
-                'id': category['id'],
-                'url': f'/category/{category["slug"]}'
-            })
-            seen_names.add(name)
-    
-    # জনপ্রিয় সার্চ টার্মস (স্ট্যাটিক বা ডাইনামিক)
-    popular_searches = [
-        'খেজুর', 'চেরি ফল', 'কাট বাদাম', 'দেশি বাদাম', 'মধু', 
-        'কিচমিচ', 'আখরোট', 'হানি নাট'
-    ]
-    
-    for term in popular_searches:
-        if query in term.lower() and term not in seen_names:
-            suggestions.append({
-                'type': 'popular',
-                'name': term,
-                'slug': term.lower().replace(' ', '-'),
-                'url': f'/search?q={term}'
-            })
-            seen_names.add(term)
+    # মেমরির প্রিফিক্স ইনডেক্স থেকে সুজেশন (DB তে যায় না)
+    suggestions = get_backend().suggest(query)
     
     return Response({
         'query': query,
-        'suggestions': suggestions[:15]  # সর্বোচ্চ ১৫টি
+        'suggestions': suggestions  # সর্বোচ্চ ১৫টি
     })
 
 
+def _trending_querysets():
+    """
+    Products ranked by the sales rollups (``api.sales``), and the newest
+    products to show while the rollups are still empty.
+    """
+    return (
+        ProductReadSerializer.values(sales.trending_products(10)),
+        ProductReadSerializer.values(Product.objects.filter(available=True).order_by('-created')[:10]),
+    )
+
+
+def _popular_category_querysets():
+    """Trending categories, and the largest ones while the rollups are empty"""
+    return (
+        sales.trending_categories(8),
+        Category.objects.annotate(product_count=models.Count('products')).order_by('-product_count')[:8],
+    )
+
+
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+# খালি রোলআপে (নতুন দোকান) আগের মতো নতুন পণ্য/পণ্য-সংখ্যা, তাই +২
+@query_budget(6)
 def search_statistics(request):
     """
     সার্চ স্ট্যাটিস্টিক্স এবং ট্রেন্ডিং প্রোডাক্টস
-    """
-    # ট্রেন্ডিং পণ্য (সর্বশিক ক্রয়কৃত/ভিউকৃত)
-    trending_products = Product.objects.filter(
-        available=True
-    ).order_by('-created')[:10]
     
-    # জনপ্রিয় ক্যাটাগরি
-    popular_categories = Category.objects.annotate(
-        product_count=models.Count('products')
-    ).order_by('-product_count')[:8]
+    ASGI তে ``api.async_views.search_statistics`` লুকআপগুলো একসাথে চালায়।
+    """
+    def build():
+        trending, newest = _trending_querysets()
+        categories, largest = _popular_category_querysets()
+        return {
+            'trending_products': ProductReadSerializer(request).many(list(trending) or newest),
+            'popular_categories': CategorySerializer(list(categories) or largest, many=True).data,
+            # আসল সার্চ থেকে (api.search_analytics)
+            'popular_searches': popular_terms(limit=5),
+            'zero_result_searches': zero_result_terms(limit=5),
+        }
     
-    trending_serializer = ProductSerializer(trending_products, many=True, context={'request': request})
-    category_serializer = CategorySerializer(popular_categories, many=True)
+    # সবার জন্য একই ডেটা: পণ্য/ক্যাটাগরি/বিক্রি/সার্চ টার্ম না বদলানো পর্যন্ত cache থেকে
+    return Response(response_cache.get_or_set(
+        'search_statistics', ['products', 'categories', 'sales', 'search_terms'], request, build
+    ))
+
+
+# ============================ IMAGES ============================
+@api_view(['GET'])
+def image_rendition(request, size, fmt, name):
+    """
+    পণ্যের ছবির রেন্ডিশন: না থাকলে এখনই তৈরি করে স্টোরেজের ফাইলে redirect
+    """
+    if (
+        size not in renditions.RENDITION_SIZES
+        or fmt not in renditions.RENDITION_FORMATS
+        or '..' in name.split('/')
+        or renditions.is_rendition(name)
+    ):
+        raise NotFound('Unknown rendition')
+    
+    storage = Product._meta.get_field('image').storage
+    target = renditions.rendition_name(name, size, fmt)
+    if not storage.exists(target):
+        # শুধু প্রসেস হওয়া পণ্যের ছবি থেকেই, যেকোনো মিডিয়া ফাইল বা নতুন আপলোড থেকে নয়
+        if not Product.objects.filter(image=name, image_status='ready').exists():
+            raise NotFound('Unknown image')
+        try:
+            renditions.generate(storage, name, sizes=[size], formats=[fmt])
+        except renditions.RenditionError:
+            raise NotFound('Unreadable image')
+    
+    response = HttpResponseRedirect(storage.url(target))
+    # হ্যাশ-নামের ছবির রেন্ডিশনও কখনো বদলায় না
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if is_addressed(name) else 'public, max-age=86400'
+    return response
+
+
+# ============================ MEDIA ============================
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    ``django.views.static.serve`` with far-future cache headers on
+    content-addressed files.  Mounted for MEDIA_URL when DEBUG is on;
+    production web servers should send the same header for them.
+    """
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    if response.status_code in (200, 304) and is_addressed(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+# ============================ EXPORTS ============================
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@renderer_classes([JSONRenderer, NDJSONRenderer, CSVRenderer])
+def export_orders(request):
+    """
+    অর্ডার/পেমেন্টের ফ্ল্যাট এক্সপোর্ট, স্ট্রিমিং (শুধু অ্যাডমিন)
     
+    ?format=ndjson|csv&record=items|payments&from=2025-01-01&to=2025-01-31
+    &paid=true&payment_status=completed,failed
+    """
+    fmt = request.accepted_renderer.format
+    if fmt not in exports.FORMATS:
+        fmt = 'ndjson'
+    record = request.query_params.get('record', 'items')
+    if record not in exports.RECORDS:
+        raise ValidationError({'record': f'One of: {", ".join(exports.RECORDS)}'})
+    
+    filters = {}
+    try:
+        if request.query_params.get('from'):
+            filters['date_from'] = exports.parse_moment(request.query_params['from'])
+        if request.query_params.get('to'):
+            filters['date_to'] = exports.parse_moment(request.query_params['to'], end_of_day=True)
+    except ValueError as exc:
+        raise ValidationError({'date': str(exc)})
+    if 'paid' in request.query_params:
+        filters['paid'] = truthy_param(request, 'paid')
+    statuses = [status for status in request.query_params.get('payment_status', '').split(',') if status]
+    unknown = set(statuses) - {choice for choice, _ in Payment.ORDER_STATUS_CHOICES}
+    if unknown:
+        raise ValidationError({'payment_status': f'Unknown status: {", ".join(sorted(unknown))}'})
+    
+    orders = exports.orders_for_export(payment_statuses=statuses, **filters)
+    rows = exports.export_rows(
+        orders, record,
+        chunk_size=getattr(settings, 'EXPORT_CHUNK_SIZE', 1000),
+        payment_statuses=statuses,
+    )
+    content_type = NDJSONRenderer.media_type if fmt == 'ndjson' else f'{CSVRenderer.media_type}; charset=utf-8'
+    response = StreamingHttpResponse(
+        exports.buffered(exports.encode_rows(rows, fmt, exports.COLUMNS[record])),
+        content_type=content_type,
+    )
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+    response['Content-Disposition'] = f'attachment; filename="orders-{record}-{stamp}.{fmt}"'
+    return response
+
+
+# ============================ METRICS ============================
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics(request):
+    """
+    প্রতি এন্ডপয়েন্টের ক্যোয়ারী সংখ্যা ও টাইমিং (শুধু অ্যাডমিন)
+    """
     return Response({
-        'trending_products': trending_serializer.data,
-        'popular_categories': category_serializer.data,
-        'popular_searches': [
-            {'term': 'আজওয়া খেজুর', 'count': 125},
-            {'term': 'পাহাড়ি মধু', 'count': 98},
-            {'term': 'কিচমিচ', 'count': 76},
-            {'term': 'আখরোট', 'count': 65},
-            {'term': 'চেরি ফল', 'count': 54},
-        ]
-    })
\ No newline at end of file
+        **registry.snapshot(),
+        'response_cache': response_cache.stats(),
+        'search_analytics': search_log.stats(),
+    })
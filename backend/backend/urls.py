@@ -3,6 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse  # নতুন লাইন যোগ করুন
+from api.views import serve_media
 
 # হোমপেজের জন্য ফাংশন যোগ করুন
 def home(request):
@@ -23,4 +24,5 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    # হ্যাশ-নামের ছবিতে immutable cache header সহ
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { BrowserRouter as Router, Routes, Route } from 'react-router-dom';
+import axios from 'axios';
 import 'bootstrap/dist/css/bootstrap.min.css';
 import './App.css';
 
@@ -83,6 +84,40 @@ function App() {
         ));
     };
     
+    // কার্টের সব পণ্যের বর্তমান দাম/স্টক এক রিকোয়েস্টে
+    const refreshCart = async () => {
+        if (cartItems.length === 0) {
+            return;
+        }
+        try {
+            const response = await axios.post(
+                'https://organic.satbeta.top/api/products/batch/',
+                {
+                    ids: cartItems.map(item => item.id),
+                    fields: ['id', 'price', 'stock', 'available']
+                }
+            );
+            const live = new Map(response.data.products.map(product => [product.id, product]));
+            setCartItems(items => items
+                // মুছে ফেলা পণ্য কার্ট থেকে বাদ
+                .filter(item => !response.data.missing.includes(item.id))
+                .map(item => {
+                    const product = live.get(item.id);
+                    return product
+                        ? {
+                            ...item,
+                            price: parseFloat(product.price),
+                            stock: product.stock,
+                            available: product.available
+                        }
+                        : item;
+                })
+            );
+        } catch (error) {
+            console.error('Error refreshing cart:', error);
+        }
+    };
+    
     const clearCart = () => {
         setCartItems([]);
         // localStorage থেকেও মুছে ফেলা
@@ -116,6 +151,7 @@ function App() {
                                     removeFromCart={removeFromCart}
                                     updateQuantity={updateQuantity}
                                     clearCart={clearCart}
+                                    refreshCart={refreshCart}
                                 />
                             } 
                         />
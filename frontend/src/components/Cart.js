@@ -2,7 +2,7 @@ import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import axios from 'axios';
 
-const Cart = ({ cartItems, removeFromCart, updateQuantity, clearCart }) => {
+const Cart = ({ cartItems, removeFromCart, updateQuantity, clearCart, refreshCart }) => {
     const [showPayment, setShowPayment] = useState(false);
     const [currentOrder, setCurrentOrder] = useState(null);
     const [loading, setLoading] = useState(false);
@@ -25,6 +25,14 @@ const Cart = ({ cartItems, removeFromCart, updateQuantity, clearCart }) => {
     const API_BASE_URL = 'https://organic.satbeta.top';
     // const API_BASE_URL = 'http://127.0.0.1:8000'; // বিকল্প
     
+    // কার্ট খুললে সংরক্ষিত দাম/স্টক হালনাগাদ (একটি batch রিকোয়েস্ট)
+    useEffect(() => {
+        if (refreshCart) {
+            refreshCart();
+        }
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, []);
+    
     // delivery charge গণনা
     const calculateDeliveryCharge = () => {
         const total = calculateTotal();
@@ -802,6 +810,13 @@ const Cart = ({ cartItems, removeFromCart, updateQuantity, clearCart }) => {
                                                 <td>
                                                     <div>
                                                         <h6 className="mb-1">{item.name}</h6>
+                                                        {(item.available === false || item.stock < item.quantity) && (
+                                                            <span className="badge bg-danger me-1">
+                                                                {item.available === false || !item.stock
+                                                                    ? 'স্টক নেই'
+                                                                    : `মাত্র ${item.stock}টি আছে`}
+                                                            </span>
+                                                        )}
                                                         {item.category && (
                                                             <small className="text-muted">
                                                                 <i className="bi bi-tag me-1"></i>
@@ -12,6 +12,10 @@ const CategoryProducts = () => {
     const [error, setError] = useState(null);
     const [allCategories, setAllCategories] = useState([]);
     const [sortBy, setSortBy] = useState('default'); // ডিফল্ট, price_asc, price_desc, new
+    // ✅ কার্সর পেজিনেশন: পরের পেজের লিংক ও মোট পণ্য
+    const [nextPage, setNextPage] = useState(null);
+    const [totalCount, setTotalCount] = useState(0);
+    const [loadingMore, setLoadingMore] = useState(false);
     
     // API URLs
     const API_BASE_URL = 'https://organic.satbeta.top';
@@ -28,12 +32,12 @@ const CategoryProducts = () => {
             console.log(`Fetching data for category: ${slug}`);
             
             // ১. সব ক্যাটাগরি লোড
-            const categoriesResponse = await axios.get(`${API_BASE_URL}/api/categories/`, {
+            const categoriesResponse = await axios.get(`${API_BASE_URL}/api/categories/?page_size=100&count=false`, {
                 headers: { 'Accept': 'application/json' }
             }).catch(err => {
                 console.error('Categories API Error:', err);
                 // ফ্যালব্যাক
-                return axios.get('http://127.0.0.1:8000/api/categories/');
+                return axios.get('http://127.0.0.1:8000/api/categories/?page_size=100&count=false');
             });
             
             let categoriesData = [];
@@ -72,7 +76,7 @@ const CategoryProducts = () => {
                     apiUrl += '&ordering=-price';
                     break;
                 case 'new':
-                    apiUrl += '&ordering=-created_at';
+                    apiUrl += '&ordering=-created';
                     break;
                 default:
                     // ডিফল্ট: API ডিফল্ট অর্ডার
@@ -96,12 +100,18 @@ const CategoryProducts = () => {
                     // পেজিনেশন আছে
                     const sortedProducts = sortProducts(productsResponse.data.results);
                     setProducts(sortedProducts);
+                    setNextPage(productsResponse.data.next || null);
+                    setTotalCount(productsResponse.data.count ?? sortedProducts.length);
                 } else if (Array.isArray(productsResponse.data)) {
                     // সরাসরি অ্যারে
                     const sortedProducts = sortProducts(productsResponse.data);
                     setProducts(sortedProducts);
+                    setNextPage(null);
+                    setTotalCount(sortedProducts.length);
                 } else {
                     setProducts([]);
+                    setNextPage(null);
+                    setTotalCount(0);
                 }
                 
             } catch (apiError) {
@@ -130,6 +140,8 @@ const CategoryProducts = () => {
                     
                     const sortedProducts = sortProducts(filteredProducts);
                     setProducts(sortedProducts);
+                    setNextPage(null);
+                    setTotalCount(sortedProducts.length);
                 } else {
                     setProducts([]);
                 }
@@ -151,10 +163,28 @@ const CategoryProducts = () => {
             
             setError(errorMessage);
             setProducts([]);
+            setNextPage(null);
             setLoading(false);
         }
     };
     
+    // ✅ পরের পেজের পণ্য লোড (API এর next কার্সর লিংক)
+    const loadMoreProducts = async () => {
+        if (!nextPage || loadingMore) return;
+        try {
+            setLoadingMore(true);
+            const response = await axios.get(nextPage, {
+                headers: { 'Accept': 'application/json' }
+            });
+            setProducts(prev => sortProducts([...prev, ...(response.data.results || [])]));
+            setNextPage(response.data.next || null);
+        } catch (err) {
+            console.error('আরও পণ্য লোড করতে সমস্যা:', err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+    
     // ক্লায়েন্ট সাইড সর্টিং
     const sortProducts = (productsArray) => {
         if (!Array.isArray(productsArray)) return [];
@@ -279,7 +309,7 @@ const CategoryProducts = () => {
                             <div className="d-flex flex-wrap gap-3 align-items-center">
                                 <span className="badge bg-primary fs-6 py-2 px-3">
                                     <i className="bi bi-box-seam me-1"></i>
-                                    {products.length} টি পণ্য
+                                    {totalCount} টি পণ্য
                                 </span>
                                 {category?.product_count && (
                                     <span className="badge bg-info fs-6 py-2 px-3">
@@ -448,7 +478,7 @@ const CategoryProducts = () => {
                                             <span className="badge bg-primary rounded-pill me-2">
                                                 <i className="bi bi-box-seam"></i>
                                             </span>
-                                            <strong>{products.length}</strong> টি পণ্য পাওয়া গেছে
+                                            <strong>{totalCount}</strong> টি পণ্য পাওয়া গেছে
                                         </div>
                                         <div className="text-muted small">
                                             সর্ট করা হয়েছে: {
@@ -471,28 +501,26 @@ const CategoryProducts = () => {
                                 ))}
                             </div>
                             
-                            {/* পেজিনেশন (যদি থাকে) */}
-                            {products.length >= 20 && (
+                            {/* আরও পণ্য */}
+                            {nextPage && (
                                 <div className="mt-5 text-center">
-                                    <nav aria-label="Page navigation">
-                                        <ul className="pagination justify-content-center">
-                                            <li className="page-item disabled">
-                                                <span className="page-link">পূর্ববর্তী</span>
-                                            </li>
-                                            <li className="page-item active">
-                                                <span className="page-link">1</span>
-                                            </li>
-                                            <li className="page-item">
-                                                <a className="page-link" href="#">2</a>
-                                            </li>
-                                            <li className="page-item">
-                                                <a className="page-link" href="#">3</a>
-                                            </li>
-                                            <li className="page-item">
-                                                <a className="page-link" href="#">পরবর্তী</a>
-                                            </li>
-                                        </ul>
-                                    </nav>
+                                    <button
+                                        className="btn btn-outline-success"
+                                        onClick={loadMoreProducts}
+                                        disabled={loadingMore}
+                                    >
+                                        {loadingMore ? (
+                                            <>
+                                                <span className="spinner-border spinner-border-sm me-2" role="status"></span>
+                                                লোড হচ্ছে...
+                                            </>
+                                        ) : (
+                                            <>
+                                                <i className="bi bi-arrow-down-circle me-1"></i>
+                                                আরও পণ্য দেখুন
+                                            </>
+                                        )}
+                                    </button>
                                 </div>
                             )}
                         </>
@@ -11,6 +11,10 @@ const Home = () => {
     const [activeTab, setActiveTab] = useState('all');
     const [heroProducts, setHeroProducts] = useState([]);
     const [currentProductIndex, setCurrentProductIndex] = useState(0);
+    // ✅ কার্সর পেজিনেশন: পরের পেজের লিংক ও মোট পণ্য
+    const [nextPage, setNextPage] = useState(null);
+    const [totalProducts, setTotalProducts] = useState(0);
+    const [loadingMore, setLoadingMore] = useState(false);
     
     const API_BASE_URL = 'https://organic.satbeta.top';
     const WHATSAPP_NUMBER = '+8801722292603'; // ✅ Country code যোগ করা হয়েছে
@@ -111,6 +115,24 @@ const Home = () => {
         return () => clearInterval(interval);
     }, [heroProducts.length]);
     
+    // ✅ পরের পেজের পণ্য লোড (API এর next কার্সর লিংক)
+    const loadMoreProducts = async () => {
+        if (!nextPage || loadingMore) return;
+        try {
+            setLoadingMore(true);
+            const response = await axios.get(nextPage, {
+                headers: { 'Accept': 'application/json' },
+                timeout: 10000
+            });
+            setProducts(prev => [...prev, ...(response.data.results || [])]);
+            setNextPage(response.data.next || null);
+        } catch (err) {
+            console.error('❌ আরও পণ্য লোড করতে সমস্যা:', err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+    
     const fetchData = async () => {
         try {
             setLoading(true);
@@ -123,7 +145,7 @@ const Home = () => {
                     headers: { 'Accept': 'application/json' },
                     timeout: 10000
                 }),
-                axios.get(`${API_BASE_URL}/api/categories/`, {
+                axios.get(`${API_BASE_URL}/api/categories/?page_size=100&count=false`, {
                     headers: { 'Accept': 'application/json' },
                     timeout: 10000
                 })
@@ -156,6 +178,8 @@ const Home = () => {
             });
             
             setProducts(productsData);
+            setNextPage(productsResponse.data.next || null);
+            setTotalProducts(productsResponse.data.count ?? productsData.length);
             
             // ✅ হিরো পণ্য নির্বাচন - FIXED LOGIC
             // প্রথমে ইমেজ আছে এমন পণ্য
@@ -178,6 +202,16 @@ const Home = () => {
             
             setHeroProducts(heroCandidates);
             
+            // ✅ বিক্রি থাকলে হিরোতে ট্রেন্ডিং পণ্য (সার্ভারে আগেই র‍্যাঙ্ক করা)
+            axios.get(`${API_BASE_URL}/api/products/trending/?limit=5`, {
+                headers: { 'Accept': 'application/json' },
+                timeout: 10000
+            }).then(response => {
+                if (Array.isArray(response.data) && response.data.length > 0) {
+                    setHeroProducts(response.data);
+                }
+            }).catch(err => console.warn('Trending load failed:', err));
+            
             // ✅ ক্যাটাগরি ডেটা প্রসেস
             let categoriesData = [];
             if (categoriesResponse.data.results) {
@@ -207,6 +241,7 @@ const Home = () => {
             
             setError(errorMessage);
             setProducts([]);
+            setNextPage(null);
             setCategories([]);
             setHeroProducts([]);
             setLoading(false);
@@ -502,7 +537,7 @@ const Home = () => {
                                 <div className="display-6 text-primary mb-2">
                                     <i className="bi bi-box-seam"></i>
                                 </div>
-                                <h3 className="card-title">{products.length}</h3>
+                                <h3 className="card-title">{totalProducts}</h3>
                                 <p className="card-text text-muted">মোট পণ্য</p>
                             </div>
                         </div>
@@ -674,6 +709,29 @@ const Home = () => {
                     </div>
                 )}
                 
+                {/* আরও পণ্য */}
+                {nextPage && (
+                    <div className="mt-4 text-center">
+                        <button
+                            className="btn btn-outline-success"
+                            onClick={loadMoreProducts}
+                            disabled={loadingMore}
+                        >
+                            {loadingMore ? (
+                                <>
+                                    <span className="spinner-border spinner-border-sm me-2" role="status"></span>
+                                    লোড হচ্ছে...
+                                </>
+                            ) : (
+                                <>
+                                    <i className="bi bi-arrow-down-circle me-1"></i>
+                                    আরও পণ্য দেখুন
+                                </>
+                            )}
+                        </button>
+                    </div>
+                )}
+                
                 {/* ফুটার সেকশন */}
                 <div className="mt-5 pt-4 border-top text-center">
                     <p className="text-muted mb-2">
@@ -5,6 +5,7 @@ const Payment = ({ order, onPaymentSuccess }) => {
     const [paymentMethod, setPaymentMethod] = useState('bkash');
     const [mobileNumber, setMobileNumber] = useState('');
     const [transactionId, setTransactionId] = useState('');
+    const [paymentId, setPaymentId] = useState(null);
     const [loading, setLoading] = useState(false);
     const [step, setStep] = useState(1); // 1: মোবাইল নম্বর, 2: ট্রাঞ্জাকশন ID, 3: সম্পন্ন
     
@@ -12,6 +13,21 @@ const Payment = ({ order, onPaymentSuccess }) => {
     const API_BASE_URL = 'https://organic.satbeta.top';
     // const API_BASE_URL = 'http://127.0.0.1:8000'; // বিকল্প
     
+    // গেটওয়ে যাচাই ব্যাকগ্রাউন্ডে হয়, তাই চূড়ান্ত status না আসা পর্যন্ত GET
+    const POLL_INTERVAL_MS = 1500;
+    const POLL_ATTEMPTS = 40;
+    
+    const waitForPayment = async (id) => {
+        for (let attempt = 0; attempt < POLL_ATTEMPTS; attempt++) {
+            const { data } = await axios.get(`${API_BASE_URL}/api/payments/${id}/`);
+            if (['completed', 'failed', 'cancelled'].includes(data.status)) {
+                return data;
+            }
+            await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+        }
+        return null;
+    };
+    
     const paymentInstructions = {
         bkash: {
             name: 'bKash',
@@ -77,8 +93,7 @@ const Payment = ({ order, onPaymentSuccess }) => {
                 order_id: order.id,
                 amount: order.total_price,
                 payment_method: paymentMethod,
-                mobile_number: mobileNumber,
-                status: 'pending'
+                mobile_number: mobileNumber
             };
             
             console.log('Sending payment data:', paymentData);
@@ -95,6 +110,7 @@ const Payment = ({ order, onPaymentSuccess }) => {
             );
             
             console.log('Payment response:', response.data);
+            setPaymentId(response.data.id);
             
             // স্টেপ 2-এ যান (ট্রাঞ্জাকশন ID)
             setStep(2);
@@ -128,18 +144,21 @@ const Payment = ({ order, onPaymentSuccess }) => {
         setLoading(true);
         
         try {
+            if (!paymentId) {
+                alert('পেমেন্ট রেকর্ড পাওয়া যায়নি। প্রথমে পেমেন্ট শুরু করুন।');
+                setStep(1);
+                return;
+            }
+            
             const verifyData = {
-                order_id: order.id,
-                transaction_id: transactionId,
-                payment_method: paymentMethod,
-                status: 'completed'
+                transaction_id: transactionId.trim()
             };
             
             console.log('Verifying payment with:', verifyData);
             
-            // পেমেন্ট আপডেট API কল (PUT/PATCH)
-            const response = await axios.patch(
-                `${API_BASE_URL}/api/payments/${order.id}/verify/`,
+            // ট্রাঞ্জাকশন ID জমা, status ঠিক করে গেটওয়ে
+            await axios.post(
+                `${API_BASE_URL}/api/payments/${paymentId}/verify/`,
                 verifyData,
                 {
                     headers: {
@@ -148,14 +167,24 @@ const Payment = ({ order, onPaymentSuccess }) => {
                 }
             );
             
-            console.log('Verification response:', response.data);
+            const payment = await waitForPayment(paymentId);
+            console.log('Verification response:', payment);
+            
+            if (!payment) {
+                alert('পেমেন্ট এখনো যাচাই হচ্ছে। কিছুক্ষণ পরে আবার চেষ্টা করুন।');
+                return;
+            }
+            if (payment.status !== 'completed') {
+                alert('পেমেন্ট ভেরিফাই হয়নি। ট্রাঞ্জাকশন ID চেক করে আবার চেষ্টা করুন।');
+                return;
+            }
             
             // পেমেন্ট সফল হলে
             setStep(3);
             
             if (onPaymentSuccess) {
                 onPaymentSuccess({
-                    ...response.data,
+                    ...payment,
                     transaction_id: transactionId
                 });
             }
@@ -172,6 +201,8 @@ const Payment = ({ order, onPaymentSuccess }) => {
                 if (error.response.status === 404) {
                     alert('পেমেন্ট রেকর্ড পাওয়া যায়নি। প্রথমে পেমেন্ট শুরু করুন।');
                     setStep(1);
+                } else if (error.response.status === 409) {
+                    alert(error.response.data.error);
                 } else if (error.response.status === 400) {
                     alert(`পেমেন্ট ভেরিফিকেশন সমস্যা: ${JSON.stringify(error.response.data)}`);
                 } else {
@@ -26,6 +26,8 @@ const ProductCard = ({ product }) => {
     };
     
     const imageUrl = getImageUrl();
+    // গ্রিডে ৩০০px রেন্ডিশন যথেষ্ট, পুরো ছবি নয়
+    const renditions = product.image_renditions && product.image_renditions.small;
     
     return (
         <div className="card h-100 shadow-sm hover-shadow" style={{
@@ -40,23 +42,27 @@ const ProductCard = ({ product }) => {
                     backgroundColor: '#f8f9fa'
                 }}
             >
-                <img 
-                    src={imageUrl} 
-                    className="card-img-top" 
-                    alt={product.name || 'Product Image'}
-                    style={{ 
-                        height: '100%', 
-                        width: '100%', 
-                        objectFit: 'contain',
-                        padding: '10px'
-                    }}
-                    loading="lazy"
-                    onError={(e) => {
-                        e.target.src = 'https://via.placeholder.com/300x200.png?text=Image+Not+Found';
-                        e.target.style.objectFit = 'cover';
-                        e.target.style.padding = '0';
-                    }}
-                />
+                <picture>
+                    {renditions && <source srcSet={renditions.webp} type="image/webp" />}
+                    <img 
+                        src={renditions ? renditions.jpeg : imageUrl} 
+                        className="card-img-top" 
+                        alt={product.name || 'Product Image'}
+                        style={{ 
+                            height: '100%', 
+                            width: '100%', 
+                            objectFit: 'contain',
+                            padding: '10px'
+                        }}
+                        loading="lazy"
+                        onError={(e) => {
+                            e.target.parentNode.querySelectorAll('source').forEach((source) => source.remove());
+                            e.target.src = 'https://via.placeholder.com/300x200.png?text=Image+Not+Found';
+                            e.target.style.objectFit = 'cover';
+                            e.target.style.padding = '0';
+                        }}
+                    />
+                </picture>
                 
                 {!product.available && (
                     <div className="position-absolute top-0 start-0 bg-danger text-white p-2" 
@@ -32,8 +32,9 @@ const ProductDetail = ({ addToCart }) => {
             
             if (response.data.category && response.data.category.id) {
                 try {
+                    // পুরো ক্যাটাগরি নয়, শুধু দেখানোর মতো কয়েকটি
                     const relatedResponse = await axios.get(
-                        `https://organic.satbeta.top/api/products/?category=${response.data.category.slug}`
+                        `https://organic.satbeta.top/api/products/?category=${response.data.category.id}&page_size=5`
                     );
                     
                     const allRelated = relatedResponse.data.results || relatedResponse.data;
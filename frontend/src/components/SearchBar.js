@@ -25,13 +25,15 @@ const SearchBar = () => {
         return () => document.removeEventListener('mousedown', handleClickOutside);
     }, []);
     
-    // অটোকমপ্লিট সুজেশন ফেচ
+    // অটোকমপ্লিট সুজেশন ফেচ (টাইপ থামার ২৫০ms পরে, প্রতি কীস্ট্রোকে না)
     useEffect(() => {
-        if (searchTerm.length >= 2) {
-            fetchSuggestions();
-        } else {
+        if (searchTerm.length < 2) {
             setSuggestions([]);
+            return;
         }
+
+        const timer = setTimeout(fetchSuggestions, 250);
+        return () => clearTimeout(timer);
     }, [searchTerm]);
     
     const fetchSuggestions = async () => {
@@ -32,7 +32,8 @@ const SearchResults = () => {
         setError(null);
         
         try {
-            let apiUrl = `${API_BASE_URL}/api/search/?q=${encodeURIComponent(query)}`;
+            // ফেসেট: ক্যাটাগরি গণনা, দামের হিস্টোগ্রাম, স্টক/ফিচার্ড
+            let apiUrl = `${API_BASE_URL}/api/search/?q=${encodeURIComponent(query)}&facets=true`;
             
             // ফিল্টার প্যারামিটার যোগ
             const params = [];
@@ -58,6 +59,14 @@ const SearchResults = () => {
         }
     };
     
+    // ফলাফলে ক্লিক সার্চ অ্যানালিটিক্সে পাঠান (পেজ বদলালেও sendBeacon হারায় না)
+    const recordClick = (productId) => {
+        const data = new FormData();
+        data.append('q', query);
+        data.append('product_id', productId);
+        navigator.sendBeacon?.(`${API_BASE_URL}/api/search/click/`, data);
+    };
+    
     const handleFilterChange = (key, value) => {
         setFilters(prev => ({
             ...prev,
@@ -120,7 +129,17 @@ const SearchResults = () => {
         );
     }
     
-    const { products, total_results, total_pages, current_page } = searchData;
+    const { products, total_results, total_pages, current_page, facets, corrected_query } = searchData;
+    // বানান সংশোধন হলে পরের পেজগুলো সংশোধিত কোয়েরিতে
+    const pageQuery = encodeURIComponent(corrected_query || query);
+    
+    const selectPriceBucket = (bucket) => {
+        setFilters(prev => ({
+            ...prev,
+            min_price: bucket.min,
+            max_price: bucket.max || ''
+        }));
+    };
     
     return (
         <div className="search-results-page container mt-4">
@@ -130,6 +149,12 @@ const SearchResults = () => {
                     <i className="bi bi-search me-2"></i>
                     সার্চ ফলাফল: "{query}"
                 </h1>
+                {corrected_query && (
+                    <p className="text-muted mb-3">
+                        <i className="bi bi-magic me-1"></i>
+                        দেখানো হচ্ছে: "<strong>{corrected_query}</strong>" এর ফলাফল
+                    </p>
+                )}
                 
                 <div className="row">
                     <div className="col-md-8">
@@ -139,6 +164,11 @@ const SearchResults = () => {
                                     <i className="bi bi-box-seam"></i>
                                 </span>
                                 <strong>{total_results}</strong> টি পণ্য পাওয়া গেছে
+                                {facets && (
+                                    <span className="text-muted small ms-2">
+                                        (স্টকে {facets.in_stock}, ফিচার্ড {facets.featured})
+                                    </span>
+                                )}
                             </div>
                             <div className="text-muted small">
                                 পৃষ্ঠা {current_page} / {total_pages}
@@ -197,7 +227,27 @@ const SearchResults = () => {
                             </h5>
                         </div>
                         <div className="card-body">
-                            {/* প্রাইস ফিল্টার */}
+                            {/* ক্যাটাগরি ফেসেট */}
+                            {facets?.categories.length > 0 && (
+                                <div className="mb-4">
+                                    <h6 className="border-bottom pb-2 mb-3">ক্যাটাগরি</h6>
+                                    <ul className="list-unstyled mb-0">
+                                        {facets.categories.map(category => (
+                                            <li key={category.id}>
+                                                <button
+                                                    className={`btn btn-sm w-100 d-flex justify-content-between ${filters.category === category.slug ? 'btn-primary' : 'btn-link text-decoration-none'}`}
+                                                    onClick={() => handleFilterChange('category', filters.category === category.slug ? '' : category.slug)}
+                                                >
+                                                    <span>{category.name}</span>
+                                                    <span className="badge bg-light text-dark">{category.count}</span>
+                                                </button>
+                                            </li>
+                                        ))}
+                                    </ul>
+                                </div>
+                            )}
+                            
+                                                        {/* প্রাইস ফিল্টার */}
                             <div className="mb-4">
                                 <h6 className="border-bottom pb-2 mb-3">দামের রেঞ্জ</h6>
                                 <div className="row g-2">
@@ -220,6 +270,19 @@ const SearchResults = () => {
                                         />
                                     </div>
                                 </div>
+                                {facets && (
+                                    <div className="d-flex flex-wrap gap-1 mt-2">
+                                        {facets.price.buckets.filter(bucket => bucket.count > 0).map(bucket => (
+                                            <button
+                                                key={bucket.min}
+                                                className="btn btn-outline-secondary btn-sm"
+                                                onClick={() => selectPriceBucket(bucket)}
+                                            >
+                                                ৳{bucket.min}{bucket.max ? ` - ৳${bucket.max}` : '+'} ({bucket.count})
+                                            </button>
+                                        ))}
+                                    </div>
+                                )}
                             </div>
                             
                             {/* সার্চ টিপস */}
@@ -285,7 +348,7 @@ const SearchResults = () => {
                             {/* পণ্য গ্রিড */}
                             <div className="row row-cols-1 row-cols-sm-2 row-cols-md-3 g-4">
                                 {products.map(product => (
-                                    <div key={product.id} className="col">
+                                    <div key={product.id} className="col" onClickCapture={() => recordClick(product.id)}>
                                         <ProductCard product={product} />
                                     </div>
                                 ))}
@@ -298,7 +361,7 @@ const SearchResults = () => {
                                         <li className={`page-item ${current_page <= 1 ? 'disabled' : ''}`}>
                                             <button 
                                                 className="page-link"
-                                                onClick={() => navigate(`/search?q=${query}&page=${current_page - 1}`)}
+                                                onClick={() => navigate(`/search?q=${pageQuery}&page=${current_page - 1}`)}
                                             >
                                                 <i className="bi bi-chevron-left"></i>
                                             </button>
@@ -310,7 +373,7 @@ const SearchResults = () => {
                                                 <li key={pageNum} className={`page-item ${current_page === pageNum ? 'active' : ''}`}>
                                                     <button 
                                                         className="page-link"
-                                                        onClick={() => navigate(`/search?q=${query}&page=${pageNum}`)}
+                                                        onClick={() => navigate(`/search?q=${pageQuery}&page=${pageNum}`)}
                                                     >
                                                         {pageNum}
                                                     </button>
@@ -321,7 +384,7 @@ const SearchResults = () => {
                                         <li className={`page-item ${current_page >= total_pages ? 'disabled' : ''}`}>
                                             <button 
                                                 className="page-link"
-                                                onClick={() => navigate(`/search?q=${query}&page=${current_page + 1}`)}
+                                                onClick={() => navigate(`/search?q=${pageQuery}&page=${current_page + 1}`)}
                                             >
                                                 <i className="bi bi-chevron-right"></i>
                                             </button>